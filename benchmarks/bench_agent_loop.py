@@ -0,0 +1,353 @@
+"""
+Per-step overhead of the agent loop, measured against a scripted model.
+
+Drives ``run_research_agent``, ``run_planning_agent`` and
+``run_task_implementation_agent`` end to end on generated fixture
+repositories, with the ``fake`` provider replaying a fixed script of tool
+calls. Provider latency is simulated (``--latency``) and subtracted, so the
+remaining wall time is RA.Aid's own work: prompt building, tool dispatch,
+trajectory and memory writes, console rendering. For each agent and backend
+the report has the per-step framework overhead, time spent in tools, database
+writes and traced memory growth, and memory retained across iterations.
+
+Usage:
+    python -m benchmarks.bench_agent_loop --iterations 3 --files 200
+"""
+
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.common import make_parser, quiet, summarize_latencies, write_report
+from ra_aid.chat_models.scripted_chat import ChatScripted
+from ra_aid.metrics import DB_WRITE_DURATION, TOOL_DURATION, get_metrics_registry
+
+BACKENDS = ("ciayn", "react")
+
+TASK = "Add a `describe` function to app/core.py that returns the module summary"
+
+Step = Tuple[str, Dict[str, Any]]
+
+
+def make_fixture_repo(root: str, num_files: int) -> str:
+    """
+    Create a git repository with a small Python package.
+
+    Args:
+        root: Directory to create the repository in
+        num_files: Number of generated modules besides app/core.py
+
+    Returns:
+        str: Path of the repository
+    """
+    repo = os.path.join(root, "repo")
+    os.makedirs(os.path.join(repo, "app", "handlers"))
+    with open(os.path.join(repo, "app", "__init__.py"), "w") as f:
+        f.write('"""Fixture application."""\n')
+    with open(os.path.join(repo, "app", "core.py"), "w") as f:
+        f.write('"""Core helpers."""\n\nSUMMARY = "fixture"\n\n\ndef run():\n    return SUMMARY\n')
+    for index in range(num_files):
+        with open(os.path.join(repo, "app", "handlers", f"handler_{index}.py"), "w") as f:
+            f.write(
+                f'"""Handler {index}."""\n\nfrom app.core import run\n\n\n'
+                f"def handle_{index}(event):\n    return run(), event\n"
+            )
+    for args in (
+        ["init", "-q"],
+        ["add", "."],
+        ["-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-q", "-m", "fixture"],
+    ):
+        subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+    return repo
+
+
+def research_steps() -> List[Step]:
+    return [
+        ("run_shell_command", {"command": "git ls-files app | head -50"}),
+        ("read_file_tool", {"filepath": "app/core.py"}),
+        ("run_shell_command", {"command": "grep -rn 'def run' app"}),
+        (
+            "emit_research_notes",
+            {"notes": "app/core.py defines SUMMARY and run(); handlers under app/handlers import run()."},
+        ),
+        ("mark_research_complete_no_implementation_required", {"message": "Research complete."}),
+    ]
+
+
+def planning_steps() -> List[Step]:
+    return [
+        ("read_file_tool", {"filepath": "app/core.py"}),
+        ("plan_implementation_completed", {"message": "Plan: add describe() next to run() in app/core.py."}),
+    ]
+
+
+def implementation_steps() -> List[Step]:
+    return [
+        ("read_file_tool", {"filepath": "app/core.py"}),
+        (
+            "file_str_replace",
+            {
+                "filepath": "app/core.py",
+                "old_str": "def run():",
+                "new_str": "def describe():\n    return SUMMARY\n\n\ndef run():",
+            },
+        ),
+        ("read_file_tool", {"filepath": "app/core.py"}),
+        ("task_completed", {"message": "Added describe()."}),
+    ]
+
+
+def to_script(steps: List[Step], backend: str, latency: float) -> Dict[str, Any]:
+    """Render tool calls as CIAYN code or as native tool calls."""
+    if backend == "ciayn":
+        responses = [
+            f"{name}({', '.join(f'{key}={value!r}' for key, value in args.items())})"
+            for name, args in steps
+        ]
+    else:
+        responses = [{"tool_calls": [{"name": name, "args": args}]} for name, args in steps]
+        # A ReAct run ends with an answer that calls no tool
+        responses.append({"content": "Done."})
+    return {"latency": latency, "responses": responses}
+
+
+def configure(config_repo, backend: str) -> None:
+    """Store the configuration a CLI run would, with prompts disabled."""
+    for key, value in {
+        "provider": "fake",
+        "model": backend,
+        "expert_provider": "fake",
+        "expert_model": backend,
+        "cowboy_mode": True,
+        "show_thoughts": False,
+        "show_cost": False,
+        "track_cost": False,
+        "web_research_enabled": False,
+        "research_cache": False,
+        "limit_tokens": True,
+    }.items():
+        config_repo.set(key, value)
+
+
+def run_agent(
+    name: str, steps: List[Step], backend: str, latency: float, call: Callable[[ChatScripted], Any]
+) -> Dict[str, Any]:
+    """
+    Run one agent against its script and measure it.
+
+    Returns:
+        Dict[str, Any]: See measure_agent
+    """
+    model = ChatScripted.from_script(
+        to_script(steps, backend, latency),
+        model_name=backend,
+        metadata={"model_name": backend, "provider": "fake"},
+    )
+    return measure_agent(name, model, call, expected_calls=len(steps))
+
+
+def tool_call_counts(snapshot: Dict[str, Any]) -> Dict[str, int]:
+    """Count tool calls per tool in a metrics snapshot, over all statuses."""
+    counts: Dict[str, int] = {}
+    for key, histogram in snapshot.get(TOOL_DURATION, {}).items():
+        tool = dict(key).get("tool", "unknown")
+        counts[tool] = counts.get(tool, 0) + histogram.count
+    return counts
+
+
+def measure_agent(
+    name: str, model: ChatScripted, call: Callable[[ChatScripted], Any], expected_calls: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run one agent with a scripted model and measure it.
+
+    The agent completed if it made expected_calls model calls, by default as
+    many as the script has responses.
+
+    Tool and database metrics are reset first. Memory growth is only measured
+    while tracemalloc is tracing, and is None otherwise.
+
+    Returns:
+        Dict[str, Any]: Wall time, simulated latency, tool time, steps, tokens, DB writes and memory growth
+    """
+    registry = get_metrics_registry()
+    registry.reset()
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with quiet():
+        call(model)
+    wall = time.perf_counter() - start
+    if tracing:
+        after, peak = tracemalloc.get_traced_memory()
+
+    snapshot = registry.snapshot()
+    tool_seconds = sum(h.sum for h in snapshot.get(TOOL_DURATION, {}).values())
+    tool_calls = sum(h.count for h in snapshot.get(TOOL_DURATION, {}).values())
+    db_writes = sum(h.count for h in snapshot.get(DB_WRITE_DURATION, {}).values())
+    overhead = wall - model.simulated_latency - tool_seconds
+    steps_run = max(model.calls, 1)
+    return {
+        "agent": name,
+        "completed": model.calls >= (len(model.responses) if expected_calls is None else expected_calls),
+        "steps": model.calls,
+        "wall": wall,
+        "model_latency": model.simulated_latency,
+        "tools": tool_seconds,
+        "tool_calls": tool_calls,
+        "tool_calls_by_name": tool_call_counts(snapshot),
+        "input_tokens": model.input_tokens,
+        "output_tokens": model.output_tokens,
+        "overhead": overhead,
+        "overhead_per_step": overhead / steps_run,
+        "db_writes": db_writes,
+        "memory_growth_kb": (after - before) / 1024 if tracing else None,
+        "memory_peak_kb": (peak - before) / 1024 if tracing else None,
+    }
+
+
+def run_iteration(repo: str, backend: str, latency: float) -> List[Dict[str, Any]]:
+    """Run research, planning and implementation once on a fresh checkout."""
+    from ra_aid.agents.implementation_agent import run_task_implementation_agent
+    from ra_aid.agents.planning_agent import run_planning_agent
+    from ra_aid.agents.research_agent import run_research_agent
+    from ra_aid.database.repositories.config_repository import get_config_repository
+
+    subprocess.run(["git", "checkout", "-q", "--", "."], cwd=repo, check=True)
+    config_repo = get_config_repository()
+
+    config_repo.set("research_only", True)
+    results = [
+        run_agent(
+            "research",
+            research_steps(),
+            backend,
+            latency,
+            lambda model: run_research_agent(TASK, model, research_only=True),
+        )
+    ]
+    config_repo.set("research_only", False)
+    results.append(
+        run_agent("planning", planning_steps(), backend, latency, lambda model: run_planning_agent(TASK, model))
+    )
+    results.append(
+        run_agent(
+            "implementation",
+            implementation_steps(),
+            backend,
+            latency,
+            lambda model: run_task_implementation_agent(
+                TASK,
+                ["Add describe()"],
+                "Add describe()",
+                "Add describe() next to run() in app/core.py.",
+                ["app/core.py"],
+                model,
+            ),
+        )
+    )
+    return results
+
+
+def bench_backend(root: str, repo: str, backend: str, iterations: int, latency: float) -> Dict[str, Any]:
+    """Run all iterations for one backend in its own project state."""
+    from ra_aid.database.connection import DatabaseManager
+    from ra_aid.database.migrations import ensure_migrations_applied
+    from ra_aid.database.repositories.config_repository import ConfigRepositoryManager
+    from ra_aid.database.repositories.human_input_repository import HumanInputRepositoryManager
+    from ra_aid.database.repositories.key_fact_repository import KeyFactRepositoryManager
+    from ra_aid.database.repositories.key_snippet_repository import KeySnippetRepositoryManager
+    from ra_aid.database.repositories.related_files_repository import RelatedFilesRepositoryManager
+    from ra_aid.database.repositories.research_note_repository import ResearchNoteRepositoryManager
+    from ra_aid.database.repositories.session_repository import SessionRepositoryManager
+    from ra_aid.database.repositories.trajectory_repository import TrajectoryRepositoryManager
+    from ra_aid.database.repositories.work_log_repository import WorkLogRepositoryManager
+    from ra_aid.env_inv_context import EnvInvManager
+
+    state_dir = os.path.join(root, f"state-{backend}")
+    os.makedirs(state_dir)
+    runs: List[List[Dict[str, Any]]] = []
+    retained: List[float] = []
+    cwd = os.getcwd()
+    os.chdir(repo)
+    try:
+        with DatabaseManager(base_dir=state_dir) as db:
+            ensure_migrations_applied()
+            with (
+                SessionRepositoryManager(db) as session_repo,
+                KeyFactRepositoryManager(db),
+                KeySnippetRepositoryManager(db),
+                HumanInputRepositoryManager(db) as human_input_repo,
+                ResearchNoteRepositoryManager(db),
+                RelatedFilesRepositoryManager(),
+                TrajectoryRepositoryManager(db),
+                WorkLogRepositoryManager(),
+                ConfigRepositoryManager() as config_repo,
+                EnvInvManager({}),
+            ):
+                configure(config_repo, backend)
+                session_repo.create_session()
+                human_input_repo.create(content=TASK, source="cli")
+                tracemalloc.start()
+                try:
+                    for _ in range(iterations):
+                        runs.append(run_iteration(repo, backend, latency))
+                        retained.append(tracemalloc.get_traced_memory()[0] / 1024)
+                finally:
+                    tracemalloc.stop()
+    finally:
+        os.chdir(cwd)
+
+    agents: Dict[str, Any] = {}
+    for name in ("research", "planning", "implementation"):
+        samples = [result for run in runs for result in run if result["agent"] == name]
+        agents[name] = {
+            "completed": all(sample["completed"] for sample in samples),
+            "steps": samples[0]["steps"],
+            "tool_calls": samples[0]["tool_calls"],
+            "db_writes": samples[0]["db_writes"],
+            "wall": summarize_latencies([sample["wall"] for sample in samples]),
+            "tools": summarize_latencies([sample["tools"] for sample in samples]),
+            "overhead": summarize_latencies([sample["overhead"] for sample in samples]),
+            "overhead_per_step": summarize_latencies([sample["overhead_per_step"] for sample in samples]),
+            "memory_growth_kb": round(max(sample["memory_growth_kb"] for sample in samples), 1),
+            "memory_peak_kb": round(max(sample["memory_peak_kb"] for sample in samples), 1),
+        }
+    return {
+        "agents": agents,
+        # Traced memory still held after each full iteration; steady growth is a leak
+        "retained_kb_per_iteration": [round(kb, 1) for kb in retained],
+    }
+
+
+def main() -> None:
+    parser = make_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=3, help="Research/plan/implement cycles per backend")
+    parser.add_argument("--files", type=int, default=50, help="Generated modules in the fixture repository")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated provider latency per model call, seconds")
+    parser.add_argument("--backend", choices=[*BACKENDS, "all"], default="all", help="Agent backend to measure")
+    args = parser.parse_args()
+
+    backends = BACKENDS if args.backend == "all" else (args.backend,)
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_fixture_repo(tmp, args.files)
+        for backend in backends:
+            results[backend] = bench_backend(tmp, repo, backend, args.iterations, args.latency)
+
+    results["parameters"] = {
+        "iterations": args.iterations,
+        "files": args.files,
+        "latency": args.latency,
+    }
+    write_report("agent_loop", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
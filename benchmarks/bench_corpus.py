@@ -0,0 +1,347 @@
+"""
+Wall-clock, tokens and tool calls per task over an offline task corpus.
+
+Each task in the corpus directory (``benchmarks/corpus`` by default) is a
+fixture repository and a ``task.json`` spec with scripted or recorded model
+responses for the research, planning and implementation stages. A task runs
+the stages in order on a fresh git checkout of its fixture, with the ``fake``
+provider replaying each stage's script, then runs the spec's check command.
+Every run happens in its own process, so peak RSS is per task. The report has,
+per task and stage, wall-clock, tokens and tool calls, plus the growth of the
+project database and the peak RSS of the run, for gating performance changes
+across configurations and commits.
+
+A ``task.json`` looks like::
+
+    {
+        "description": "Add describe() to app/core.py",
+        "task": "Add a `describe` function to app/core.py ...",
+        "model": "ciayn",
+        "research": {"responses": ["read_file_tool(filepath='app/core.py')", ...]},
+        "planning": "planning.json",
+        "plan": "Add describe() next to run() in app/core.py.",
+        "implementation": [{"task": "Add describe()", "script": {...}}],
+        "related_files": ["app/core.py"],
+        "check": "python -c 'from app.core import describe'"
+    }
+
+``model`` selects the agent backend (``ciayn`` or ``react``) and so the
+response format; see ``ra_aid/chat_models/scripted_chat.py``. A script is
+inline or the path of a JSON file next to ``task.json``, e.g. responses
+recorded from a real session. The fixture repository is the ``repo``
+directory next to ``task.json``.
+
+Usage:
+    python -m benchmarks.bench_corpus --repeat 3
+    python -m benchmarks.bench_corpus --corpus path/to/corpus --task add-describe
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from benchmarks.bench_agent_loop import configure, measure_agent
+from benchmarks.common import current_rss_mb, make_parser, peak_rss_mb, quiet, summarize_latencies, write_report
+from ra_aid.chat_models.scripted_chat import ChatScripted, load_script
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+STAGES = ("research", "planning", "implementation")
+
+
+def load_task(task_dir: str) -> Dict[str, Any]:
+    """
+    Load a task spec, resolving script paths relative to its directory.
+
+    Args:
+        task_dir: Directory holding task.json and the repo fixture
+
+    Returns:
+        Dict[str, Any]: The spec, with scripts loaded
+    """
+    with open(os.path.join(task_dir, "task.json"), encoding="utf-8") as f:
+        spec = json.load(f)
+
+    def script(source: Any) -> Dict[str, Any]:
+        if isinstance(source, str):
+            source = os.path.join(task_dir, source)
+        return load_script(source)
+
+    spec["research"] = script(spec["research"])
+    spec["planning"] = script(spec["planning"])
+    spec["implementation"] = [
+        {**entry, "script": script(entry["script"])} for entry in spec.get("implementation", [])
+    ]
+    spec.setdefault("model", "ciayn")
+    spec.setdefault("related_files", [])
+    return spec
+
+
+def discover_tasks(corpus: str) -> Dict[str, str]:
+    """Map the name of each task in a corpus to its directory, sorted by name."""
+    return {
+        name: os.path.join(corpus, name)
+        for name in sorted(os.listdir(corpus))
+        if os.path.isfile(os.path.join(corpus, name, "task.json"))
+    }
+
+
+def checkout_fixture(task_dir: str, root: str) -> str:
+    """Copy a task's fixture repository and commit it to a fresh git repository."""
+    repo = os.path.join(root, "repo")
+    shutil.copytree(os.path.join(task_dir, "repo"), repo)
+    for args in (
+        ["init", "-q"],
+        ["add", "."],
+        ["-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-q", "-m", "fixture"],
+    ):
+        subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+    return repo
+
+
+def db_size(state_dir: str) -> int:
+    """Get the size of the project database, including its write-ahead log."""
+    return sum(
+        os.path.getsize(os.path.join(state_dir, name))
+        for name in ("pk.db", "pk.db-wal")
+        if os.path.exists(os.path.join(state_dir, name))
+    )
+
+
+def tool_steps(script: Dict[str, Any]) -> int:
+    """Count the responses of a script that call tools; a ReAct script ends with a plain answer."""
+    return sum(
+        1 for response in script["responses"] if isinstance(response, str) or response.get("tool_calls")
+    )
+
+
+def scripted_model(script: Dict[str, Any], model: str, latency: Optional[float]) -> ChatScripted:
+    if latency is not None:
+        script = {**script, "latency": latency}
+    return ChatScripted.from_script(
+        script, model_name=model, metadata={"model_name": model, "provider": "fake"}
+    )
+
+
+def combine(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the measurements of the agents of one stage, e.g. implementation tasks."""
+    tool_calls: Dict[str, int] = {}
+    for sample in samples:
+        for tool, count in sample["tool_calls_by_name"].items():
+            tool_calls[tool] = tool_calls.get(tool, 0) + count
+    return {
+        "completed": all(sample["completed"] for sample in samples),
+        "agents": len(samples),
+        "steps": sum(sample["steps"] for sample in samples),
+        "wall": sum(sample["wall"] for sample in samples),
+        "model_latency": sum(sample["model_latency"] for sample in samples),
+        "tools": sum(sample["tools"] for sample in samples),
+        "tool_calls": sum(sample["tool_calls"] for sample in samples),
+        "tool_calls_by_name": tool_calls,
+        "input_tokens": sum(sample["input_tokens"] for sample in samples),
+        "output_tokens": sum(sample["output_tokens"] for sample in samples),
+        "db_writes": sum(sample["db_writes"] for sample in samples),
+    }
+
+
+def run_task(task_dir: str, root: str, latency: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run the research, planning and implementation stages of a task and measure them.
+
+    Args:
+        task_dir: Directory holding task.json and the repo fixture
+        root: Scratch directory for the checkout and project state
+        latency: Simulated provider latency overriding the scripts', seconds
+
+    Returns:
+        Dict[str, Any]: Per-stage measurements, database growth, RSS and the check result
+    """
+    from ra_aid.agents.implementation_agent import run_task_implementation_agent
+    from ra_aid.agents.planning_agent import run_planning_agent
+    from ra_aid.agents.research_agent import run_research_agent
+    from ra_aid.database.connection import DatabaseManager
+    from ra_aid.database.migrations import ensure_migrations_applied
+    from ra_aid.database.repositories.config_repository import ConfigRepositoryManager
+    from ra_aid.database.repositories.human_input_repository import HumanInputRepositoryManager
+    from ra_aid.database.repositories.key_fact_repository import KeyFactRepositoryManager
+    from ra_aid.database.repositories.key_snippet_repository import KeySnippetRepositoryManager
+    from ra_aid.database.repositories.related_files_repository import RelatedFilesRepositoryManager
+    from ra_aid.database.repositories.research_note_repository import ResearchNoteRepositoryManager
+    from ra_aid.database.repositories.session_repository import SessionRepositoryManager
+    from ra_aid.database.repositories.trajectory_repository import TrajectoryRepositoryManager
+    from ra_aid.database.repositories.work_log_repository import WorkLogRepositoryManager
+    from ra_aid.env_inv_context import EnvInvManager
+
+    spec = load_task(task_dir)
+    model = spec["model"]
+    task = spec["task"]
+    repo = checkout_fixture(task_dir, root)
+    state_dir = os.path.join(root, "state")
+    os.makedirs(state_dir)
+
+    # Start from a migrated database, so growth is the run's own data
+    with DatabaseManager(base_dir=state_dir):
+        ensure_migrations_applied()
+    db_before = db_size(state_dir)
+    start_rss = current_rss_mb()
+
+    stages: Dict[str, Any] = {}
+    cwd = os.getcwd()
+    os.chdir(repo)
+    start = time.perf_counter()
+    try:
+        with DatabaseManager(base_dir=state_dir) as db:
+            with (
+                SessionRepositoryManager(db) as session_repo,
+                KeyFactRepositoryManager(db),
+                KeySnippetRepositoryManager(db),
+                HumanInputRepositoryManager(db) as human_input_repo,
+                ResearchNoteRepositoryManager(db),
+                RelatedFilesRepositoryManager(),
+                TrajectoryRepositoryManager(db),
+                WorkLogRepositoryManager(),
+                ConfigRepositoryManager() as config_repo,
+                EnvInvManager({}),
+            ):
+                configure(config_repo, model)
+                session_repo.create_session()
+                human_input_repo.create(content=task, source="cli")
+
+                # Research ends with its notes, as a research-only run does; the
+                # implementation tasks come from the spec, as the planner's would
+                config_repo.set("research_only", True)
+                stages["research"] = measure_agent(
+                    "research",
+                    scripted_model(spec["research"], model, latency),
+                    lambda m: run_research_agent(task, m, research_only=True),
+                    tool_steps(spec["research"]),
+                )
+                config_repo.set("research_only", False)
+                stages["planning"] = measure_agent(
+                    "planning",
+                    scripted_model(spec["planning"], model, latency),
+                    lambda m: run_planning_agent(task, m),
+                    tool_steps(spec["planning"]),
+                )
+                tasks = [entry["task"] for entry in spec["implementation"]]
+                stages["implementation"] = combine(
+                    [
+                        measure_agent(
+                            "implementation",
+                            scripted_model(entry["script"], model, latency),
+                            lambda m, entry=entry: run_task_implementation_agent(
+                                task, tasks, entry["task"], spec.get("plan", ""), spec["related_files"], m
+                            ),
+                            tool_steps(entry["script"]),
+                        )
+                        for entry in spec["implementation"]
+                    ]
+                )
+    finally:
+        os.chdir(cwd)
+    wall = time.perf_counter() - start
+
+    check_passed = None
+    if spec.get("check"):
+        check_passed = subprocess.run(spec["check"], shell=True, cwd=repo, capture_output=True).returncode == 0
+
+    return {
+        "stages": stages,
+        "wall": wall,
+        "completed": all(stage["completed"] for stage in stages.values()),
+        "check_passed": check_passed,
+        "db_bytes": {"before": db_before, "after": db_size(state_dir)},
+        "rss_mb": {"start": start_rss, "peak": peak_rss_mb()},
+    }
+
+
+def run_task_quietly(task_dir: str, latency: Optional[float]) -> Dict[str, Any]:
+    """Run a task in a scratch directory, discarding its console output."""
+    with tempfile.TemporaryDirectory() as root, quiet():
+        return run_task(task_dir, root, latency)
+
+
+def run_isolated(task_dir: str, latency: Optional[float]) -> Dict[str, Any]:
+    """Run a task in a fresh process, so its peak RSS is its own."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_task_quietly, task_dir, latency).result()
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize repeated runs of a task."""
+    stages = {}
+    for name in STAGES:
+        samples = [run["stages"][name] for run in runs]
+        first = samples[0]
+        stages[name] = {
+            "completed": all(sample["completed"] for sample in samples),
+            "steps": first["steps"],
+            # Token counts and tool calls follow from the scripts, so they are the same every run
+            "input_tokens": first["input_tokens"],
+            "output_tokens": first["output_tokens"],
+            "tool_calls": first["tool_calls"],
+            "tool_calls_by_name": first["tool_calls_by_name"],
+            "db_writes": first["db_writes"],
+            "wall": summarize_latencies([sample["wall"] for sample in samples]),
+            "tools": summarize_latencies([sample["tools"] for sample in samples]),
+            "overhead": summarize_latencies(
+                [sample["wall"] - sample["model_latency"] - sample["tools"] for sample in samples]
+            ),
+        }
+    return {
+        "completed": all(run["completed"] for run in runs),
+        "check_passed": all(run["check_passed"] is not False for run in runs),
+        "stages": stages,
+        "wall": summarize_latencies([run["wall"] for run in runs]),
+        "tokens": {
+            "input": sum(stage["input_tokens"] for stage in stages.values()),
+            "output": sum(stage["output_tokens"] for stage in stages.values()),
+        },
+        "tool_calls": sum(stage["tool_calls"] for stage in stages.values()),
+        "db_growth_kb": round(
+            max(run["db_bytes"]["after"] - run["db_bytes"]["before"] for run in runs) / 1024, 1
+        ),
+        "peak_rss_mb": max((run["rss_mb"]["peak"] for run in runs if run["rss_mb"]["peak"]), default=None),
+        "start_rss_mb": runs[0]["rss_mb"]["start"],
+    }
+
+
+def main() -> None:
+    parser = make_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of task directories")
+    parser.add_argument("--task", action="append", help="Only run this task (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per task")
+    parser.add_argument(
+        "--latency", type=float, default=None, help="Simulated provider latency per model call, overriding the scripts'"
+    )
+    args = parser.parse_args()
+
+    tasks = discover_tasks(args.corpus)
+    unknown = set(args.task or []) - set(tasks)
+    if unknown:
+        parser.error(f"Unknown tasks: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Any] = {"tasks": {}}
+    for name, task_dir in tasks.items():
+        if args.task and name not in args.task:
+            continue
+        runs = [run_isolated(task_dir, args.latency) for _ in range(args.repeat)]
+        results["tasks"][name] = summarize_runs(runs)
+
+    results["parameters"] = {
+        "corpus": os.path.relpath(args.corpus),
+        "tasks": sorted(results["tasks"]),
+        "repeat": args.repeat,
+        "latency": args.latency,
+    }
+    write_report("corpus", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
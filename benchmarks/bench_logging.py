@@ -0,0 +1,89 @@
+"""
+Per-step agent loop overhead at DEBUG and WARNING file logging.
+
+Runs the scripted agent loop of ``bench_agent_loop`` with file logging set up
+as the CLI does (``setup_logging(log_mode="file")``) at each requested level.
+Log records are written to the file by a queue listener thread, so the
+difference between levels is the cost of creating, formatting and queueing
+records on the agent thread. The report has the per-step framework overhead
+of each agent, and the records and bytes written per level.
+
+Usage:
+    python -m benchmarks.bench_logging --iterations 3 --levels debug warning
+"""
+
+import glob
+import logging
+import os
+import tempfile
+from typing import Any, Dict
+
+from benchmarks.bench_agent_loop import bench_backend, make_fixture_repo
+from benchmarks.common import make_parser, write_report
+from ra_aid.logging_config import setup_logging, stop_queue_listener
+
+
+def log_volume(base_dir: str) -> Dict[str, int]:
+    """Count the records and bytes in the log files under a directory."""
+    records = 0
+    size = 0
+    for path in glob.glob(os.path.join(base_dir, "logs", "*.log*")):
+        size += os.path.getsize(path)
+        with open(path, encoding="utf-8", errors="replace") as f:
+            # Records start with a timestamp; continuation lines do not
+            records += sum(1 for line in f if line[:2] == "20")
+    return {"records": records, "bytes": size}
+
+
+def main() -> None:
+    parser = make_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=3, help="Research/plan/implement cycles per level")
+    parser.add_argument("--files", type=int, default=50, help="Generated modules in the fixture repository")
+    parser.add_argument("--backend", choices=["ciayn", "react"], default="ciayn", help="Agent backend to measure")
+    parser.add_argument("--levels", nargs="+", default=["debug", "warning"], help="Log levels to compare")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_fixture_repo(tmp, args.files)
+
+        # Warm imports and caches so the first level measured is not penalized
+        warmup = os.path.join(tmp, "warmup")
+        os.makedirs(warmup)
+        setup_logging(log_mode="file", log_level="warning", base_dir=warmup)
+        bench_backend(warmup, repo, args.backend, 1, 0.0)
+
+        try:
+            for level in args.levels:
+                root = os.path.join(tmp, level)
+                os.makedirs(root)
+                setup_logging(log_mode="file", log_level=level, base_dir=root)
+                measured = bench_backend(root, repo, args.backend, args.iterations, 0.0)
+                # Flush the queue before counting what reached the file
+                stop_queue_listener()
+                results[level] = {
+                    "agents": {
+                        name: {
+                            "overhead_per_step": agent["overhead_per_step"],
+                            "steps": agent["steps"],
+                            "completed": agent["completed"],
+                        }
+                        for name, agent in measured["agents"].items()
+                    },
+                    "log": log_volume(root),
+                }
+        finally:
+            stop_queue_listener()
+            logging.getLogger().handlers.clear()
+
+    results["parameters"] = {
+        "iterations": args.iterations,
+        "files": args.files,
+        "backend": args.backend,
+        "levels": args.levels,
+    }
+    write_report("logging", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
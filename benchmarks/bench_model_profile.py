@@ -0,0 +1,106 @@
+"""
+Overhead of resolving model metadata at startup and per agent step.
+
+Measures, for a set of models, how long resolving a ``ModelProfile`` takes
+on first use (litellm lookups and models_params walks) and how long later
+lookups take once it is cached. It also times the call sites that consume
+the profile: ``get_model_token_limit`` (run on every agent creation) and
+cost initialization of the callback handler, each with a cold and a warm
+cache.
+
+Usage:
+    python -m benchmarks.bench_model_profile --iterations 200
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.common import make_parser, summarize_latencies, write_report
+from ra_aid.model_profile import (
+    build_model_profile,
+    clear_model_profile_cache,
+    get_model_profile,
+)
+
+MODELS: List[Tuple[str, str]] = [
+    ("anthropic", "claude-3-7-sonnet-20250219"),
+    ("openai", "gpt-4o"),
+    ("openrouter", "google/gemini-2.5-pro-preview"),
+    ("deepseek", "deepseek-reasoner"),
+    ("openai-compatible", "qwen-qwq-32b"),
+]
+
+
+def sample(fn: Callable[[], Any], iterations: int, cold: bool) -> List[float]:
+    """Time a call, optionally clearing the profile cache before each run."""
+    durations = []
+    for _ in range(iterations):
+        if cold:
+            clear_model_profile_cache()
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def bench_model(provider: str, model: str, iterations: int) -> Dict[str, Any]:
+    from ra_aid.anthropic_token_limiter import get_model_token_limit
+    from ra_aid.callbacks.default_callback_handler import DefaultCallbackHandler
+
+    config = {"provider": provider, "model": model}
+    handler = DefaultCallbackHandler.__new__(DefaultCallbackHandler)
+    handler.model_name = model
+    handler.provider = provider
+    profile = build_model_profile(provider, model)
+
+    return {
+        "max_input_tokens": profile.max_input_tokens,
+        "token_limit_source": profile.token_limit_source,
+        "cost_source": profile.cost_source,
+        "profile_cold": summarize_latencies(
+            sample(lambda: get_model_profile(provider, model), iterations, cold=True)
+        ),
+        "profile_cached": summarize_latencies(
+            sample(lambda: get_model_profile(provider, model), iterations, cold=False)
+        ),
+        "token_limit_cold": summarize_latencies(
+            sample(lambda: get_model_token_limit(config), iterations, cold=True)
+        ),
+        "token_limit_cached": summarize_latencies(
+            sample(lambda: get_model_token_limit(config), iterations, cold=False)
+        ),
+        "model_costs_cold": summarize_latencies(
+            sample(handler._initialize_model_costs, iterations, cold=True)
+        ),
+        "model_costs_cached": summarize_latencies(
+            sample(handler._initialize_model_costs, iterations, cold=False)
+        ),
+    }
+
+
+def main() -> None:
+    parser = make_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200, help="Samples per measurement")
+    args = parser.parse_args()
+    # Unknown models log a missing-cost warning on every sample
+    logging.getLogger("ra_aid").setLevel(logging.ERROR)
+
+    from ra_aid.database.repositories.config_repository import ConfigRepositoryManager
+
+    # show_cost off: unknown models would otherwise print a panel per sample
+    with ConfigRepositoryManager() as config_repo:
+        config_repo.set("show_cost", False)
+        # The first litellm lookup loads its model map; keep it out of the samples
+        build_model_profile(*MODELS[0])
+        results = {
+            f"{provider}/{model}": bench_model(provider, model, args.iterations)
+            for provider, model in MODELS
+        }
+
+    results["parameters"] = {"iterations": args.iterations}
+    write_report("model_profile", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Throughput of the API server under concurrent spawn-agent load.
+
+Boots the server in-process on a local port with the ``fake`` provider, so
+every spawned agent replays a short research script with simulated model
+latency. M websocket clients attach to ``/v1/ws``, then N ``POST
+/v1/spawn-agent`` requests are fired at once while ``GET /v1/session`` is
+probed at a fixed interval. The report has spawn and probe request latency,
+trajectory-to-broadcast latency (from a trajectory's ``created_at`` to its
+arrival at each websocket client), time to completion of the sessions,
+database write latency including the wait for the writer (lock waits),
+scheduler queue waits, CPU use and RSS.
+
+Usage:
+    python -m benchmarks.bench_server_load --agents 16 --clients 8 --latency 0.05
+"""
+
+import asyncio
+import contextvars
+import datetime
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+import websockets
+
+from benchmarks.bench_agent_loop import make_fixture_repo, research_steps, to_script
+from benchmarks.common import current_rss_mb, make_parser, peak_rss_mb, quiet, summarize_latencies, write_report
+from ra_aid.metrics import DB_WRITE_DURATION, get_metrics_registry
+
+TERMINAL_STATUSES = {"completed", "error", "halted"}
+
+
+class WebsocketClient:
+    """Websocket client that records when broadcasts arrive."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.broadcast_latencies: List[float] = []
+        self.messages = 0
+        self.finished_at: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        connection = await websockets.connect(self.url, max_size=None)
+        self._task = asyncio.create_task(self._receive(connection))
+
+    async def _receive(self, connection) -> None:
+        try:
+            async for raw in connection:
+                received = datetime.datetime.now()
+                self.messages += 1
+                message = json.loads(raw)
+                payload = message.get("payload") or {}
+                if message.get("type") == "trajectory" and payload.get("created_at"):
+                    created = datetime.datetime.fromisoformat(payload["created_at"])
+                    self.broadcast_latencies.append((received - created).total_seconds())
+                elif message.get("type") == "session_update" and payload.get("status") in TERMINAL_STATUSES:
+                    self.finished_at[payload["id"]] = time.perf_counter()
+        finally:
+            await connection.close()
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, websockets.ConnectionClosed):
+                pass
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> Tuple[uvicorn.Server, threading.Thread]:
+    """Run the app in a background thread that sees this thread's repositories."""
+    from ra_aid.server.server import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(server.run,), daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Server failed to start")
+        time.sleep(0.01)
+    return server, thread
+
+
+async def probe(client: httpx.AsyncClient, interval: float, stop: asyncio.Event, samples: Dict[str, List[float]]) -> None:
+    """Time list requests and sample RSS until stopped."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/v1/session")
+        response.raise_for_status()
+        samples["probe"].append(time.perf_counter() - start)
+        rss = current_rss_mb()
+        if rss is not None:
+            samples["rss_mb"].append(rss)
+        await asyncio.sleep(interval)
+
+
+async def run_load(port: int, agents: int, clients: int, interval: float, timeout: float) -> Dict[str, Any]:
+    """Attach the websocket clients, spawn the agents and wait for them to finish."""
+    base_url = f"http://127.0.0.1:{port}"
+    listeners = [WebsocketClient(f"ws://127.0.0.1:{port}/v1/ws") for _ in range(clients)]
+    for listener in listeners:
+        await listener.start()
+
+    samples: Dict[str, List[float]] = {"probe": [], "rss_mb": []}
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, interval, stop, samples))
+
+        async def spawn(index: int):
+            start = time.perf_counter()
+            response = await client.post(
+                "/v1/spawn-agent",
+                json={"message": f"Describe the fixture repository ({index})", "research_only": True},
+            )
+            return response, start, time.perf_counter() - start
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(spawn(index) for index in range(agents)))
+        spawned = {r.json()["session_id"]: start for r, start, _ in responses if r.status_code == 201}
+
+        # Wait for every session to reach a final status, as seen by the first client
+        deadline = time.perf_counter() + timeout
+        watcher = listeners[0] if listeners else None
+        while time.perf_counter() < deadline:
+            if watcher:
+                done = set(watcher.finished_at)
+            else:
+                done = set()
+                for session_id in spawned:
+                    session = (await client.get(f"/v1/session/{session_id}")).json()
+                    if session.get("status") in TERMINAL_STATUSES:
+                        done.add(session_id)
+            if set(spawned) <= done:
+                break
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await prober
+        statuses = {}
+        for session_id in spawned:
+            status = (await client.get(f"/v1/session/{session_id}")).json().get("status")
+            statuses[status] = statuses.get(status, 0) + 1
+
+    for listener in listeners:
+        await listener.stop()
+
+    completion = [
+        watcher.finished_at[session_id] - start
+        for session_id, start in spawned.items()
+        if watcher and session_id in watcher.finished_at
+    ]
+    broadcast = [latency for listener in listeners for latency in listener.broadcast_latencies]
+    return {
+        "elapsed": elapsed,
+        "spawn_requests": summarize_latencies([duration for _, _, duration in responses]),
+        "spawn_errors": sum(1 for response, _, _ in responses if response.status_code != 201),
+        "probe_requests": summarize_latencies(samples["probe"]),
+        "session_completion": summarize_latencies(completion),
+        "session_statuses": statuses,
+        "broadcast": summarize_latencies(broadcast),
+        "messages_per_client": round(sum(listener.messages for listener in listeners) / max(len(listeners), 1), 1),
+        "rss_mb": {
+            "max": max(samples["rss_mb"], default=None),
+            "end": samples["rss_mb"][-1] if samples["rss_mb"] else None,
+        },
+    }
+
+
+def db_write_summary() -> Dict[str, Any]:
+    """Summarize database write latency, which includes waiting for the writer."""
+    summary = {}
+    for key, histogram in get_metrics_registry().snapshot().get(DB_WRITE_DURATION, {}).items():
+        labels = ",".join(f"{label}={value}" for label, value in key) or "all"
+        summary[labels] = {
+            "count": histogram.count,
+            "mean_ms": round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0.0,
+            "p95_ms": round(histogram.quantile(0.95) * 1000, 3),
+            "max_ms": round(histogram.max * 1000, 3),
+        }
+    return summary
+
+
+def main() -> None:
+    parser = make_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=16, help="Concurrent spawn-agent requests")
+    parser.add_argument("--clients", type=int, default=8, help="Websocket clients attached during the run")
+    parser.add_argument("--max-agents", type=int, default=4, help="Agents the scheduler runs at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated provider latency per model call, seconds")
+    parser.add_argument("--files", type=int, default=50, help="Generated modules in the fixture repository")
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between probe requests")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for all sessions to finish")
+    args = parser.parse_args()
+
+    from ra_aid.database.connection import DatabaseManager
+    from ra_aid.database.migrations import ensure_migrations_applied
+    from ra_aid.database.repositories.config_repository import ConfigRepositoryManager
+    from ra_aid.database.repositories.session_repository import SessionRepositoryManager
+    from ra_aid.database.repositories.trajectory_repository import TrajectoryRepositoryManager
+    from ra_aid.server.agent_scheduler import AgentScheduler, set_agent_scheduler
+    from ra_aid.server.api_v1_spawn_agent import start_agent
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_fixture_repo(tmp, args.files)
+        script = os.path.join(tmp, "script.json")
+        with open(script, "w") as f:
+            json.dump(to_script(research_steps(), "ciayn", args.latency), f)
+        os.environ["FAKE_LLM_SCRIPT"] = script
+
+        # Spawned agents open the default project state directory of the working directory
+        os.chdir(repo)
+        try:
+            with DatabaseManager() as db, \
+                 SessionRepositoryManager(db), \
+                 TrajectoryRepositoryManager(db), \
+                 ConfigRepositoryManager() as config_repo:
+                ensure_migrations_applied()
+                config_repo.update(
+                    {
+                        "provider": "fake",
+                        "model": "ciayn",
+                        "expert_enabled": False,
+                        "web_research_enabled": False,
+                        "cowboy_mode": True,
+                        "show_cost": False,
+                        "track_cost": False,
+                        "research_cache": False,
+                    }
+                )
+                scheduler = AgentScheduler(start_agent, max_concurrent=args.max_agents)
+                scheduler.start()
+                set_agent_scheduler(scheduler)
+                get_metrics_registry().reset()
+
+                server, server_thread = start_server(free_port())
+                try:
+                    with quiet():
+                        cpu_start = time.process_time()
+                        results = asyncio.run(
+                            run_load(server.config.port, args.agents, args.clients, args.interval, args.timeout)
+                        )
+                        cpu = time.process_time() - cpu_start
+                    results["scheduler"] = scheduler.stats()
+                finally:
+                    server.should_exit = True
+                    server_thread.join(timeout=10)
+                    set_agent_scheduler(None)
+                    scheduler.shutdown()
+        finally:
+            os.chdir(cwd)
+
+    results["cpu"] = {
+        "seconds": round(cpu, 3),
+        # Percent of one core over the run
+        "percent": round(cpu / results["elapsed"] * 100, 1) if results["elapsed"] else 0.0,
+    }
+    results["rss_mb"]["peak"] = peak_rss_mb()
+    results["db_writes"] = db_write_summary()
+    results["throughput_sessions_per_s"] = round(args.agents / results["elapsed"], 3) if results["elapsed"] else 0.0
+    results["elapsed"] = round(results["elapsed"], 3)
+    results["parameters"] = {
+        "agents": args.agents,
+        "clients": args.clients,
+        "max_agents": args.max_agents,
+        "latency": args.latency,
+        "files": args.files,
+    }
+    write_report("server_load", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
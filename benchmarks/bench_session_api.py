@@ -0,0 +1,128 @@
+"""
+Latency of the session API while a large trajectory export is running.
+
+Populates a temporary file database with one session holding many large
+trajectories, then measures request latency of ``GET /v1/session`` twice:
+once on an idle server and once while ``GET /v1/session/{id}/trajectory``
+exports the large session in a loop. If database calls block the event loop,
+the p99 under load grows to the duration of a whole export.
+
+Usage:
+    python -m benchmarks.bench_session_api --trajectories 2000 --result-kb 32
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import make_parser, summarize_latencies, write_report
+from ra_aid.database.connection import DatabaseManager
+from ra_aid.database.models import HumanInput, Session, Trajectory
+from ra_aid.database.repositories.session_repository import SessionRepositoryManager
+from ra_aid.database.repositories.trajectory_repository import TrajectoryRepositoryManager
+
+
+def populate(num_sessions: int, num_trajectories: int, result_kb: int) -> int:
+    """
+    Fill the database with sessions and one large session to export.
+
+    Returns:
+        int: ID of the large session
+    """
+    for i in range(num_sessions):
+        Session.create(command_line=f"ra-aid bench {i}", status="completed")
+    big = Session.create(command_line="ra-aid bench export", status="completed")
+    result = json.dumps({"output": "x" * (result_kb * 1024)})
+    rows = [
+        {
+            "session": big.id,
+            "tool_name": "ripgrep_search",
+            "tool_parameters": json.dumps({"pattern": f"p{i}"}),
+            "tool_result": result,
+            "step_data": json.dumps({"display_title": "Search"}),
+            "record_type": "tool_execution",
+        }
+        for i in range(num_trajectories)
+    ]
+    with Trajectory._meta.database.atomic():
+        for start in range(0, len(rows), 500):
+            Trajectory.insert_many(rows[start:start + 500]).execute()
+    return big.id
+
+
+async def measure(client: httpx.AsyncClient, requests: int, interval: float) -> List[float]:
+    """Issue list requests at a fixed interval and record their latencies."""
+    latencies: List[float] = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/v1/session")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(session_id: int, requests: int, interval: float) -> Dict[str, Any]:
+    """Run the idle and under-export measurements."""
+    from ra_aid.server.server import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        idle = await measure(client, requests, interval)
+
+        exports: List[float] = []
+        stop = asyncio.Event()
+
+        async def export_loop() -> None:
+            while not stop.is_set():
+                start = time.perf_counter()
+                response = await client.get(f"/v1/session/{session_id}/trajectory")
+                response.raise_for_status()
+                exports.append(time.perf_counter() - start)
+
+        exporter = asyncio.create_task(export_loop())
+        # Let the first export get going before sampling
+        await asyncio.sleep(interval)
+        loaded = await measure(client, requests, interval)
+        stop.set()
+        await exporter
+
+    return {
+        "idle": summarize_latencies(idle),
+        "during_export": summarize_latencies(loaded),
+        "export": summarize_latencies(exports),
+    }
+
+
+def main() -> None:
+    parser = make_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="Number of small sessions")
+    parser.add_argument("--trajectories", type=int, default=2000, help="Trajectories in the exported session")
+    parser.add_argument("--result-kb", type=int, default=32, help="Size of each tool result in KB")
+    parser.add_argument("--requests", type=int, default=200, help="List requests per phase")
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between list requests")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(base_dir=tmp) as db, \
+             SessionRepositoryManager(db), \
+             TrajectoryRepositoryManager(db):
+            db.create_tables([Session, HumanInput, Trajectory], safe=True)
+            session_id = populate(args.sessions, args.trajectories, args.result_kb)
+            results = asyncio.run(run(session_id, args.requests, args.interval))
+
+    results["parameters"] = {
+        "sessions": args.sessions,
+        "trajectories": args.trajectories,
+        "result_kb": args.result_kb,
+        "requests": args.requests,
+    }
+    write_report("session_api", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
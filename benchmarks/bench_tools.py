@@ -0,0 +1,291 @@
+"""
+Latency and memory of the core file tools on synthetic repositories.
+
+Generates repositories of the requested sizes (``--files``, 10k to 500k files
+are typical) with a wide package tree, one deep directory chain, a few large
+binary files and nested ``.gitignore`` files that hide generated build
+output. Each tool is then timed against every repository: the first call is
+reported as ``cold`` (a fresh process state; the OS page cache is not
+dropped), the following ``--repeat`` calls as ``warm``. Peak memory is
+traced with ``tracemalloc`` in a separate call so tracing does not skew the
+latencies.
+
+Usage:
+    python -m benchmarks.bench_tools --files 10000 100000 --repeat 5
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import make_parser, quiet, summarize_latencies, write_report
+
+# Files per generated package directory
+FILES_PER_DIR = 100
+
+# Marker that a fixed fraction of generated modules contain, for searches
+MARKER = "BENCH_MARKER"
+
+# Name of the module file_str_replace edits back and forth
+EDIT_TARGET = "src/edit_target.py"
+
+
+def _write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def make_synthetic_repo(
+    root: str,
+    num_files: int,
+    depth: int = 20,
+    binary_mb: int = 8,
+    binaries: int = 2,
+    git: bool = True,
+) -> Dict[str, Any]:
+    """
+    Create a synthetic repository.
+
+    The tracked files are Python modules in ``src/pkg_N/`` directories of
+    ``FILES_PER_DIR`` files each, plus a chain of ``depth`` nested directories
+    under ``deep/`` and ``binaries`` random binary files under ``assets/``.
+    Every tenth package has a ``.gitignore`` hiding the ``generated/`` directory
+    and ``*.cache`` files next to it, and the root ``.gitignore`` hides ``*.tmp``.
+
+    Args:
+        root: Directory to create the repository in
+        num_files: Number of generated modules
+        depth: Depth of the deep directory chain
+        binary_mb: Size of each binary file in megabytes
+        binaries: Number of binary files
+        git: Whether to initialize a git repository and commit the files
+
+    Returns:
+        Dict[str, Any]: Repository path, a sample of module paths and the file counts
+    """
+    repo = os.path.join(root, f"repo-{num_files}")
+    os.makedirs(repo)
+    _write(os.path.join(repo, ".gitignore"), "*.tmp\nbuild/\n")
+
+    modules: List[str] = []
+    gitignores = 1
+    ignored = 0
+    for index in range(num_files):
+        package = f"src/pkg_{index // FILES_PER_DIR}"
+        module = f"{package}/module_{index}.py"
+        marker = f"# {MARKER}\n" if index % 97 == 0 else ""
+        _write(
+            os.path.join(repo, module),
+            f'"""Module {index}."""\n{marker}\n\ndef handler_{index}(event):\n    return event\n',
+        )
+        modules.append(module)
+        if index % FILES_PER_DIR == 0 and (index // FILES_PER_DIR) % 10 == 0:
+            # A nested .gitignore with ignored output next to it
+            _write(os.path.join(repo, package, ".gitignore"), "generated/\n*.cache\n")
+            gitignores += 1
+            for name in ("generated/out.py", "cache.cache", "scratch.tmp"):
+                _write(os.path.join(repo, package, name), "ignored\n")
+                ignored += 1
+
+    deep = os.path.join(repo, "deep", *(f"level_{level}" for level in range(depth)))
+    _write(os.path.join(deep, "leaf.py"), f"# {MARKER}\nLEAF = True\n")
+
+    for index in range(binaries):
+        path = os.path.join(repo, "assets", f"blob_{index}.bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            for _ in range(binary_mb):
+                f.write(os.urandom(1024 * 1024))
+
+    # A large text file, read and edited by the file tools
+    lines = [f"line_{index} = {index}\n" for index in range(200_000)]
+    _write(os.path.join(repo, "src", "large_module.py"), "".join(lines))
+    _write(os.path.join(repo, EDIT_TARGET), "VALUE = 'alpha'\n" + "".join(lines[:20_000]))
+
+    if git:
+        for args in (
+            ["init", "-q"],
+            ["add", "."],
+            ["-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-q", "-m", "fixture"],
+        ):
+            subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+    return {
+        "path": repo,
+        "modules": modules,
+        # Modules, binaries, .gitignore files, the deep leaf and the two large modules
+        "tracked_files": num_files + binaries + gitignores + 3,
+        "ignored_files": ignored,
+    }
+
+
+def measure(call: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Time a call cold and warm, then trace its peak memory.
+
+    Args:
+        call: The operation to measure
+        repeat: Number of warm calls
+
+    Returns:
+        Dict[str, Any]: Cold latency, warm latency summary and peak traced memory
+    """
+    start = time.perf_counter()
+    call()
+    cold = time.perf_counter() - start
+
+    warm: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        warm.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "cold_ms": round(cold * 1000, 3),
+        "warm": summarize_latencies(warm),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def tool_operations(fixture: Dict[str, Any]) -> Dict[str, Optional[Callable[[], Any]]]:
+    """
+    Build the measured operations for a repository.
+
+    Operations run with the repository as the working directory. An operation
+    is None when it cannot run here, e.g. without ripgrep installed.
+    """
+    from ra_aid.file_listing import get_all_project_files
+    from ra_aid.text.processing import truncate_output
+    from ra_aid.tools.file_str_replace import file_str_replace
+    from ra_aid.tools.fuzzy_find import fuzzy_find_project_files
+    from ra_aid.tools.list_directory import list_directory_tree
+    from ra_aid.tools.memory import emit_related_files
+    from ra_aid.tools.read_file import read_file_tool
+    from ra_aid.tools.ripgrep import ripgrep_search
+
+    modules = fixture["modules"]
+    related = modules[:: max(1, len(modules) // 50)][:50]
+    large_output = "".join(f"output line {index}\n" for index in range(100_000))
+    edit_state = {"value": "alpha"}
+
+    def replace():
+        # Flip the value back and forth so every call makes one replacement
+        old = edit_state["value"]
+        new = "beta" if old == "alpha" else "alpha"
+        result = file_str_replace.invoke(
+            {"filepath": EDIT_TARGET, "old_str": f"VALUE = '{old}'", "new_str": f"VALUE = '{new}'"}
+        )
+        if not result.get("success"):
+            raise RuntimeError(result.get("message"))
+        edit_state["value"] = new
+
+    return {
+        "get_all_project_files": lambda: get_all_project_files("."),
+        "fuzzy_find_project_files": lambda: fuzzy_find_project_files.invoke(
+            {"search_term": modules[len(modules) // 2], "max_results": 10}
+        ),
+        "list_directory_tree": lambda: list_directory_tree.invoke({"path": ".", "max_depth": 3}),
+        "list_directory_tree_deep": lambda: list_directory_tree.invoke({"path": "deep", "max_depth": 50}),
+        "ripgrep_search": (
+            (lambda: ripgrep_search.invoke({"pattern": MARKER, "fixed_string": True}))
+            if shutil.which("rg")
+            else None
+        ),
+        "read_file_tool": lambda: read_file_tool.invoke({"filepath": "src/large_module.py"}),
+        "read_file_tool_binary": lambda: read_file_tool.invoke({"filepath": "assets/blob_0.bin"}),
+        "emit_related_files": lambda: emit_related_files.invoke({"files": related}),
+        "file_str_replace": replace,
+        "truncate_output": lambda: truncate_output(large_output),
+    }
+
+
+def bench_repo(root: str, fixture: Dict[str, Any], repeat: int, only: Optional[List[str]]) -> Dict[str, Any]:
+    """Measure every tool against one repository in its own project state."""
+    from ra_aid.database.connection import DatabaseManager
+    from ra_aid.database.migrations import ensure_migrations_applied
+    from ra_aid.database.repositories.config_repository import ConfigRepositoryManager
+    from ra_aid.database.repositories.human_input_repository import HumanInputRepositoryManager
+    from ra_aid.database.repositories.related_files_repository import RelatedFilesRepositoryManager
+    from ra_aid.database.repositories.session_repository import SessionRepositoryManager
+    from ra_aid.database.repositories.trajectory_repository import TrajectoryRepositoryManager
+
+    state_dir = os.path.join(root, f"state-{os.path.basename(fixture['path'])}")
+    os.makedirs(state_dir)
+    results: Dict[str, Any] = {}
+    cwd = os.getcwd()
+    os.chdir(fixture["path"])
+    try:
+        with DatabaseManager(base_dir=state_dir) as db:
+            ensure_migrations_applied()
+            with (
+                SessionRepositoryManager(db) as session_repo,
+                HumanInputRepositoryManager(db) as human_input_repo,
+                RelatedFilesRepositoryManager(),
+                TrajectoryRepositoryManager(db),
+                ConfigRepositoryManager(),
+            ):
+                session_repo.create_session()
+                human_input_repo.create(content="Benchmark the file tools", source="cli")
+                for name, call in tool_operations(fixture).items():
+                    if only and name not in only:
+                        continue
+                    if call is None:
+                        results[name] = {"skipped": "not available in this environment"}
+                        continue
+                    with quiet():
+                        results[name] = measure(call, repeat)
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def main() -> None:
+    parser = make_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[10_000], help="Repository sizes in files")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm calls per tool")
+    parser.add_argument("--depth", type=int, default=20, help="Depth of the deep directory chain")
+    parser.add_argument("--binary-mb", type=int, default=8, help="Size of each large binary file, megabytes")
+    parser.add_argument("--no-git", action="store_true", help="Do not make the repositories git repositories")
+    parser.add_argument("--tool", action="append", help="Only measure this tool (repeatable)")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_files in args.files:
+            start = time.perf_counter()
+            fixture = make_synthetic_repo(
+                tmp, num_files, depth=args.depth, binary_mb=args.binary_mb, git=not args.no_git
+            )
+            generation = time.perf_counter() - start
+            results[str(num_files)] = {
+                "tools": bench_repo(tmp, fixture, args.repeat, args.tool),
+                "tracked_files": fixture["tracked_files"],
+                "ignored_files": fixture["ignored_files"],
+                "generation_seconds": round(generation, 3),
+            }
+            shutil.rmtree(fixture["path"])
+
+    results["parameters"] = {
+        "files": args.files,
+        "repeat": args.repeat,
+        "depth": args.depth,
+        "binary_mb": args.binary_mb,
+        "git": not args.no_git,
+    }
+    write_report("tools", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
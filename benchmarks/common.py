@@ -0,0 +1,194 @@
+"""
+Shared helpers for RA.Aid benchmarks.
+
+Every benchmark produces a JSON report with the same envelope (benchmark
+name, environment info and results) so reports from different commits can be
+compared directly.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from ra_aid.__version__ import __version__
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Compute a percentile using the nearest-rank method.
+
+    Args:
+        values: Sample values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty sample
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_latencies(seconds: Sequence[float]) -> Dict[str, Any]:
+    """
+    Summarize a list of durations in seconds as milliseconds.
+
+    Args:
+        seconds: Durations in seconds
+
+    Returns:
+        Dict[str, Any]: count, mean, p50, p95, p99 and max in milliseconds
+    """
+    ms = [s * 1000.0 for s in seconds]
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+@contextmanager
+def timed() -> Iterator[List[float]]:
+    """
+    Time a block of code.
+
+    Yields:
+        List[float]: A list that receives the elapsed seconds when the block exits
+    """
+    result: List[float] = []
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.append(time.perf_counter() - start)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Get the peak resident set size of this process.
+
+    Returns:
+        Optional[float]: Peak RSS in megabytes, or None where unsupported
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Get the current resident set size of this process.
+
+    Returns:
+        Optional[float]: RSS in megabytes, or None where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 2)
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """Discard console output, including output of subprocesses run by tools."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            with redirect_stdout(io.StringIO()):
+                yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def git_commit() -> Optional[str]:
+    """Get the current git commit of the RA.Aid checkout, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    """Describe the environment a benchmark ran in."""
+    return {
+        "ra_aid_version": __version__,
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def make_parser(description: str) -> argparse.ArgumentParser:
+    """
+    Create an argument parser with the options shared by all benchmarks.
+
+    Args:
+        description: Description of the benchmark
+
+    Returns:
+        argparse.ArgumentParser: Parser with an --output option
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Write the JSON report to this file instead of stdout",
+    )
+    return parser
+
+
+def write_report(name: str, results: Dict[str, Any], output: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write a benchmark report as JSON.
+
+    Args:
+        name: Benchmark name
+        results: Benchmark-specific results
+        output: File to write to, or None for stdout
+
+    Returns:
+        Dict[str, Any]: The full report
+    """
+    report = {
+        "benchmark": name,
+        "environment": environment_info(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
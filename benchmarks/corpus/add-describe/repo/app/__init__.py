@@ -0,0 +1 @@
+"""Fixture application."""
@@ -0,0 +1,7 @@
+"""Core helpers."""
+
+SUMMARY = "fixture"
+
+
+def run():
+    return SUMMARY
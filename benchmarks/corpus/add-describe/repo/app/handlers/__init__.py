@@ -0,0 +1 @@
+"""Request handlers."""
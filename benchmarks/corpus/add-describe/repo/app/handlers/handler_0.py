@@ -0,0 +1,7 @@
+"""Handler 0."""
+
+from app.core import run
+
+
+def handle_0(event):
+    return run(), event
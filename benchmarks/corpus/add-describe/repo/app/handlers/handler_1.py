@@ -0,0 +1,7 @@
+"""Handler 1."""
+
+from app.core import run
+
+
+def handle_1(event):
+    return run(), event
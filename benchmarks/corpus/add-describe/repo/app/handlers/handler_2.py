@@ -0,0 +1,7 @@
+"""Handler 2."""
+
+from app.core import run
+
+
+def handle_2(event):
+    return run(), event
@@ -0,0 +1,7 @@
+"""Handler 3."""
+
+from app.core import run
+
+
+def handle_3(event):
+    return run(), event
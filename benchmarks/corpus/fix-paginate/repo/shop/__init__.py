@@ -0,0 +1 @@
+"""Fixture shop catalogue."""
@@ -0,0 +1,14 @@
+"""Product catalogue."""
+
+PRODUCTS = [f"product-{index}" for index in range(25)]
+
+
+def paginate(items, page, per_page=10):
+    """Return the items of a page, counting pages from 1."""
+    start = page * per_page
+    return items[start : start + per_page]
+
+
+def page_count(items, per_page=10):
+    """Return the number of pages needed for the items."""
+    return len(items) // per_page
@@ -0,0 +1,7 @@
+"""Catalogue views."""
+
+from shop.catalogue import PRODUCTS, page_count, paginate
+
+
+def list_products(page=1):
+    return {"items": paginate(PRODUCTS, page), "pages": page_count(PRODUCTS)}
@@ -161,6 +161,9 @@ export const TrajectoryPanel: React.FC<TrajectoryPanelProps> = ({
         component = <FuzzyFindTrajectory key={trajectory.id} trajectory={trajectory} />;
         break;
       case 'model_usage': // Hide model usage trajectories
+      case 'tool_timing': // Hide tool timing trajectories
+      case 'agent_output': // Hide recorded console output of server agents
+      case 'rate_limit_wait': // Hide rate limit waits; they are in the session profile
         return null; // Return null directly to skip rendering
       case 'user_query':
         return <UserQueryTrajectory trajectory={trajectory} key={trajectory.id} />;
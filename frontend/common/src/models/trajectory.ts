@@ -12,6 +12,7 @@ import { z } from 'zod';
 
 
 const trajectoryRecordTypes = [
+  'agent_output',
   'emit_research_notes',
   'error',
   'file_str_replace',
@@ -22,6 +23,7 @@ const trajectoryRecordTypes = [
   'model_usage',
   'plan_completion',
   'project_status',
+  'rate_limit_wait',
   'read_file',
   'ripgrep_search',
   'stage_transition',
@@ -29,6 +31,7 @@ const trajectoryRecordTypes = [
   'task_display',
   'thinking',
   'tool_execution',
+  'tool_timing',
   'user_query',
 ] as const;
 /**
@@ -1,3 +1,9 @@
+import os
+
+# Keep litellm from downloading its model cost map on import; model data comes
+# from its bundled copy plus ra_aid.model_snapshot (see `ra-aid refresh-model-snapshot`)
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
 from .__version__ import __version__
 from .agent_utils import run_agent_with_retry
 from .console.formatting import (
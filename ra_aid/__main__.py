@@ -1,14 +1,15 @@
 import argparse
+import atexit
 import logging
 import os
 import sys
 import uuid
 from datetime import datetime
+from pathlib import Path
 
 import litellm
 import uvicorn
 
-from langgraph.checkpoint.memory import MemorySaver
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
@@ -17,6 +18,9 @@ from rich.prompt import Confirm
 from ra_aid import print_error, print_stage_header
 from ra_aid.__version__ import __version__
 from ra_aid.version_check import check_for_newer_version
+from ra_aid.checkpointer import CHECKPOINT_BACKENDS, create_checkpointer
+from ra_aid.metrics import dump_metrics
+from ra_aid.startup import StartupTaskRunner
 from ra_aid.agent_utils import (
     create_agent,
     run_agent_with_retry,
@@ -32,6 +36,7 @@ from ra_aid.config import (
     DEFAULT_PROVIDER,
     DEFAULT_RECURSION_LIMIT,
     DEFAULT_TEST_CMD_TIMEOUT,
+    DEFAULT_COMPACTION_WATERMARK,
     VALID_PROVIDERS,
     DEFAULT_EXPERT_ANTHROPIC_MODEL,
     DEFAULT_EXPERT_GEMINI_MODEL,
@@ -86,6 +91,7 @@ from ra_aid.llm import initialize_llm, get_model_default_temperature
 from ra_aid.logging_config import get_logger, setup_logging
 from ra_aid.models_params import models_params
 from ra_aid.project_info import format_project_info, get_project_info
+from ra_aid.rate_limiter import parse_rate_limit
 from ra_aid.prompts.chat_prompts import CHAT_PROMPT
 from ra_aid.prompts.web_research_prompts import WEB_RESEARCH_PROMPT_SECTION_CHAT
 from ra_aid.prompts.custom_tools_prompts import DEFAULT_CUSTOM_TOOLS_PROMPT
@@ -106,6 +112,34 @@ def store_limit_config(config_repo, args):
     config_repo.set("max_cost", args.max_cost)
     config_repo.set("max_tokens", args.max_tokens)
     config_repo.set("exit_at_limit", args.exit_at_limit)
+    config_repo.set("rate_limits", rate_limits_config(args.rate_limit))
+    config_repo.set("rate_limit_shared", args.rate_limit_shared)
+    config_repo.set("compaction_watermark", args.compaction_watermark)
+    config_repo.set("checkpointer", args.checkpointer)
+    config_repo.set("research_cache", not args.no_research_cache)
+
+
+def rate_limits_config(rate_limits):
+    """Convert parsed --rate-limit values to the config repository format.
+
+    Args:
+        rate_limits: List of (key, RateLimit) tuples
+
+    Returns:
+        Dict mapping limit keys to {"rpm": ..., "tpm": ...}
+    """
+    return {
+        key: {"rpm": limit.requests_per_minute, "tpm": limit.tokens_per_minute}
+        for key, limit in rate_limits
+    }
+
+
+def rate_limit_type(value):
+    """Argparse type for --rate-limit values."""
+    try:
+        return parse_rate_limit(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 # Configure litellm to suppress debug logs
 os.environ["LITELLM_LOG"] = "ERROR"
@@ -163,6 +197,7 @@ def launch_server(host: str, port: int, args):
         ]:
             # Set console handler to INFO level for better visibility in server mode
             handler.setLevel(logging.INFO)
+            root_logger.setLevel(min(root_logger.level, logging.INFO))
             logger.debug("Modified console logging level to INFO for server mode")
 
     # Apply any pending database migrations
@@ -269,10 +304,58 @@ def launch_server(host: str, port: int, args):
                 "max_cost": args.max_cost,
                 "max_tokens": args.max_tokens,
                 "exit_at_limit": args.exit_at_limit,
+                "rate_limits": rate_limits_config(args.rate_limit),
+                "rate_limit_shared": args.rate_limit_shared,
+                "compaction_watermark": args.compaction_watermark,
+                "checkpointer": args.checkpointer,
+                "research_cache": not args.no_research_cache,
+                "server_console_output": args.server_console_output,
             }
         )
 
-        uvicorn.run(fastapi_app, host=host, port=port, log_level="info")
+        # Optionally run spawned agents in worker processes instead of threads
+        worker_pool = None
+        if args.server_workers and args.server_workers > 0:
+            from ra_aid.server.agent_worker_pool import (
+                AgentWorkerPool,
+                set_agent_worker_pool,
+            )
+
+            worker_pool = AgentWorkerPool(
+                num_workers=args.server_workers, log_level=args.log_level
+            )
+            worker_pool.start()
+            set_agent_worker_pool(worker_pool)
+            print(f"Running agents in {args.server_workers} worker processes")
+
+        # Queue spawned agents and limit how many run at once
+        from ra_aid.server.agent_scheduler import (
+            DEFAULT_MAX_CONCURRENT_AGENTS,
+            AgentScheduler,
+            set_agent_scheduler,
+        )
+        from ra_aid.server.api_v1_spawn_agent import start_agent
+
+        max_agents = args.server_max_agents or args.server_workers or DEFAULT_MAX_CONCURRENT_AGENTS
+        scheduler = AgentScheduler(
+            start_agent,
+            max_concurrent=max_agents,
+            max_queue_size=args.server_max_queue,
+        )
+        scheduler.start()
+        recovered = scheduler.recover()
+        set_agent_scheduler(scheduler)
+        if recovered:
+            print(f"Re-queued {recovered} agents from a previous run")
+
+        try:
+            uvicorn.run(fastapi_app, host=host, port=port, log_level="info")
+        finally:
+            set_agent_scheduler(None)
+            scheduler.shutdown()
+            if worker_pool is not None:
+                set_agent_worker_pool(None)
+                worker_pool.shutdown()
 
 
 def parse_arguments(args=None):
@@ -437,6 +520,23 @@ def parse_arguments(args=None):
         action="store_false",
         help="Whether to disable token limiting for Anthropic Claude react agents. Token limiter removes older messages to prevent maximum token limit API errors.",
     )
+    parser.add_argument(
+        "--checkpointer",
+        choices=CHECKPOINT_BACKENDS,
+        default="memory",
+        help="Where agent message history checkpoints are kept: bounded in memory, or in SQLite files under .ra-aid/checkpoints (default: memory)",
+    )
+    parser.add_argument(
+        "--no-research-cache",
+        action="store_true",
+        help="Always research from scratch instead of reusing research cached in .ra-aid/research_cache for the same task and repository state",
+    )
+    parser.add_argument(
+        "--compaction-watermark",
+        type=float,
+        default=DEFAULT_COMPACTION_WATERMARK,
+        help=f"Fraction of the model's input token limit above which old tool outputs are replaced with compact stubs; 0 disables compaction (default: {DEFAULT_COMPACTION_WATERMARK})",
+    )
     parser.add_argument(
         "--experimental-fallback-handler",
         action="store_true",
@@ -478,6 +578,21 @@ def parse_arguments(args=None):
         default=DEFAULT_TEST_CMD_TIMEOUT,
         help=f"Timeout in seconds for test command execution (default: {DEFAULT_TEST_CMD_TIMEOUT})",
     )
+    parser.add_argument(
+        "--test-impact",
+        action="store_true",
+        help="Run the tests affected by modified files before the full test command",
+    )
+    parser.add_argument(
+        "--test-impact-cmd",
+        type=str,
+        help="Command template for running affected tests, with {tests} replaced by the test files (default: derived from --test-cmd for pytest)",
+    )
+    parser.add_argument(
+        "--no-test-cache",
+        action="store_true",
+        help="Always run the test command instead of reusing the result cached in .ra-aid/test_results.json when no file changed since it last ran (timed-out and errored runs always run again)",
+    )
     parser.add_argument(
         "--server",
         action="store_true",
@@ -495,6 +610,27 @@ def parse_arguments(args=None):
         default=1818,
         help="Port to listen on for web interface (default: 1818)",
     )
+    parser.add_argument(
+        "--server-workers",
+        type=int,
+        default=0,
+        help="Run server-spawned agents in this many worker processes instead of threads (default: 0, use threads)",
+    )
+    parser.add_argument(
+        "--server-max-agents",
+        type=int,
+        help="Maximum number of server-spawned agents running at once; further agents are queued (default: --server-workers, or 4)",
+    )
+    parser.add_argument(
+        "--server-max-queue",
+        type=int,
+        help="Maximum number of queued server-spawned agents; further requests are rejected (default: no limit)",
+    )
+    parser.add_argument(
+        "--server-console-output",
+        action="store_true",
+        help="Render the console output of server-spawned agents in the server's terminal (default: record it without rendering)",
+    )
     parser.add_argument(
         "--wipe-project-memory",
         action="store_true",
@@ -511,6 +647,14 @@ def parse_arguments(args=None):
         action="store_true",
         help="Display cost information as the agent works",
     )
+    parser.add_argument(
+        "--dump-metrics",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="At exit, print a summary of tool, model call, database write and subprocess latencies, or write them to FILE in Prometheus text format",
+    )
     parser.add_argument(
         "--track-cost",
         action="store_true",
@@ -540,6 +684,19 @@ def parse_arguments(args=None):
         action="store_true",
         help="Exit immediately without prompt when limits are reached",
     )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        type=rate_limit_type,
+        default=[],
+        metavar="PROVIDER[/MODEL]:rpm=N,tpm=N",
+        help="Limit requests and/or tokens per minute sent to a provider or model; may be given multiple times",
+    )
+    parser.add_argument(
+        "--rate-limit-shared",
+        action="store_true",
+        help="Share rate limits between all ra-aid processes of this project via the project database",
+    )
     parser.add_argument(
         "--reasoning-assistance",
         action="store_true",
@@ -581,6 +738,14 @@ def parse_arguments(args=None):
         help="Directory to store project state (database and logs). By default, a .ra-aid directory is created in the current working directory.",
     )
 
+    # session-profile
+    parser_session_profile = subparsers.add_parser("session-profile", help="Display the time a session spent per tool, agent stage and model. Defaults to the latest session.")
+    parser_session_profile.add_argument("session_id", type=int, nargs='?', default=None, help="The ID of the session. If omitted, the latest session is used.")
+    parser_session_profile.add_argument(
+        "--project-state-dir",
+        help="Directory to store project state (database and logs). By default, a .ra-aid directory is created in the current working directory.",
+    )
+
     # all-costs
     parser_all_costs = subparsers.add_parser("all-costs", help="Display cost and token usage for all sessions.")
     parser_all_costs.add_argument(
@@ -639,15 +804,28 @@ def parse_arguments(args=None):
     parser_extract_changelog = subparsers.add_parser("extract-changelog", help="Extract changelog entries for a specific version from CHANGELOG.md.")
     parser_extract_changelog.add_argument("version", type=str, help="The version string to extract (e.g., 0.30.0).")
 
+    # refresh-model-snapshot
+    parser_refresh_model_snapshot = subparsers.add_parser("refresh-model-snapshot", help="Download current model limits and pricing from litellm into the local model snapshot.")
+    parser_refresh_model_snapshot.add_argument(
+        "--source",
+        help="URL or local file of a litellm model_prices_and_context_window.json (default: litellm's GitHub copy).",
+    )
+    parser_refresh_model_snapshot.add_argument(
+        "--output",
+        help="Where to write the snapshot (default: RA_AID_MODEL_SNAPSHOT or the user cache directory, which is where RA.Aid reads it from).",
+    )
+
     # Update epilog with examples including new subcommands
     parser.epilog = """
 Examples:
   ra-aid -m "Add error handling to the database module"
   ra-aid --server
   ra-aid last-cost
+  ra-aid session-profile
   ra-aid extract-plan 123
   ra-aid create-migration add_new_feature
   ra-aid extract-changelog 0.25.0
+  ra-aid refresh-model-snapshot
     """
 
     if args is None:
@@ -668,9 +846,9 @@ Examples:
 
     # Validate message vs msg-file usage (only if not a script command that ignores messages)
     if not parsed_args.command or parsed_args.command not in [
-        "last-cost", "all-costs", "extract-plan", "extract-last-plan", 
+        "last-cost", "session-profile", "all-costs", "extract-plan", "extract-last-plan", 
         "extract-last-research-notes", "generate-openapi", "create-migration", 
-        "migrate", "migration-status", "extract-changelog"
+        "migrate", "migration-status", "extract-changelog", "refresh-model-snapshot"
     ]:
         if parsed_args.message and parsed_args.msg_file:
             parser.error("Cannot use both --message and --msg-file")
@@ -756,6 +934,9 @@ Examples:
     if parsed_args.auto_test and not parsed_args.test_cmd:
         parser.error("Test command is required when using --auto-test")
 
+    if parsed_args.test_impact and not parsed_args.test_cmd:
+        parser.error("Test command is required when using --test-impact")
+
     # If show_cost is true, we must also enable track_cost
     if parsed_args.show_cost:
         parsed_args.track_cost = True
@@ -764,6 +945,9 @@ Examples:
     if parsed_args.max_cost is not None and parsed_args.max_cost <= 0:
         parser.error("--max-cost must be a positive number")
 
+    if not 0.0 <= parsed_args.compaction_watermark <= 1.0:
+        parser.error("--compaction-watermark must be between 0.0 and 1.0")
+
     # Validate max_tokens is positive if provided
     if parsed_args.max_tokens is not None and parsed_args.max_tokens <= 0:
         parser.error("--max-tokens must be a positive integer")
@@ -792,6 +976,16 @@ def handle_last_cost(args):
     console.print(json.dumps(result, indent=2))
     sys.exit(status_code)
 
+def handle_session_profile(args):
+    import json
+    from ra_aid.scripts.session_profile import get_session_profile
+    result, status_code = get_session_profile(
+        session_id=args.session_id,
+        project_state_dir=args.project_state_dir,
+    )
+    console.print(json.dumps(result, indent=2))
+    sys.exit(status_code)
+
 def handle_all_costs(args):
     import json
     from ra_aid.scripts.all_sessions_usage import get_all_sessions_usage
@@ -950,11 +1144,26 @@ def handle_extract_changelog(args):
         sys.exit(1)
     sys.exit(0)
 
+def handle_refresh_model_snapshot(args):
+    from ra_aid.model_snapshot import (
+        SNAPSHOT_ENV_VAR,
+        refresh_model_snapshot,
+        refreshed_snapshot_path,
+    )
 
-# Create individual memory objects for each agent
-research_memory = MemorySaver()
-planning_memory = MemorySaver()
-implementation_memory = MemorySaver()
+    try:
+        result = refresh_model_snapshot(source=args.source, path=args.output)
+    except Exception as e:
+        print_error(f"Failed to refresh model snapshot: {e}")
+        sys.exit(1)
+    console.print(
+        f"Wrote {result['model_count']} models from {result['source']} to {result['path']}"
+    )
+    written = Path(result["path"]).resolve()
+    if written != refreshed_snapshot_path().resolve():
+        # RA.Aid only reads snapshots from the default location or RA_AID_MODEL_SNAPSHOT
+        console.print(f"To use it, set {SNAPSHOT_ENV_VAR}={written}")
+    sys.exit(0)
 
 
 def is_informational_query() -> bool:
@@ -969,7 +1178,7 @@ def is_stage_requested(stage: str) -> bool:
 
 
 def wipe_project_memory(custom_dir=None):
-    """Delete the project database file to wipe all stored memory.
+    """Delete the project database file and blob store to wipe all stored memory.
 
     Args:
         custom_dir: Optional custom directory to use instead of .ra-aid in current directory
@@ -978,8 +1187,11 @@ def wipe_project_memory(custom_dir=None):
         str: A message indicating the result of the operation
     """
     import os
+    import shutil
     from pathlib import Path
 
+    from ra_aid.database.blob_store import BLOBS_DIRNAME
+
     if custom_dir:
         ra_aid_dir = Path(custom_dir)
         db_path = os.path.join(custom_dir, "pk.db")
@@ -993,6 +1205,8 @@ def wipe_project_memory(custom_dir=None):
 
     try:
         os.remove(db_path)
+        # Blobs are only referenced from the database
+        shutil.rmtree(os.path.join(ra_aid_dir, BLOBS_DIRNAME), ignore_errors=True)
         return "Project memory wiped successfully."
     except PermissionError:
         return "Error: Could not wipe project memory due to permission issues."
@@ -1000,7 +1214,7 @@ def wipe_project_memory(custom_dir=None):
         return f"Error: Failed to wipe project memory: {str(e)}"
 
 
-def build_status():
+def build_status(version_check=None):
     """Build status panel with model and feature information.
 
     Includes memory statistics at the bottom with counts of key facts, snippets, and research notes.
@@ -1094,15 +1308,31 @@ def build_status():
     if fact_count > 0 or snippet_count > 0 or note_count > 0:
         status.append(" (use --wipe-project-memory to reset)")
 
-    # Check for newer version
-    version_message = check_for_newer_version()
-    if version_message:
-        status.append("\n\n")
-        status.append(version_message, style="yellow")
+    # Show the result of the background version check if it is already done
+    if version_check is not None and version_check.done():
+        version_message = version_check.result()
+        if version_message:
+            status.append("\n\n")
+            status.append(version_message, style="yellow")
 
     return status
 
 
+def print_version_message_when_ready(version_check):
+    """Print the version check result once the background check completes."""
+
+    def print_message(future):
+        try:
+            version_message = future.result()
+        except Exception as e:
+            logger.debug(f"Version check failed: {e}")
+            return
+        if version_message:
+            console.print(Text(version_message, style="yellow"))
+
+    version_check.add_done_callback(print_message)
+
+
 def main():
     """Main entry point for the ra-aid command line tool."""
     args = parse_arguments() # This now parses global args and subcommands
@@ -1120,6 +1350,8 @@ def main():
     if args.command:
         if args.command == "last-cost":
             handle_last_cost(args)
+        elif args.command == "session-profile":
+            handle_session_profile(args)
         elif args.command == "all-costs":
             handle_all_costs(args)
         elif args.command == "extract-plan":
@@ -1138,6 +1370,8 @@ def main():
             handle_migration_status(args)
         elif args.command == "extract-changelog":
             handle_extract_changelog(args)
+        elif args.command == "refresh-model-snapshot":
+            handle_refresh_model_snapshot(args)
         # Add other command dispatches here
         # If a command was handled, the handler function should sys.exit()
         # If we reach here after a command, it means it wasn't a script command or didn't exit.
@@ -1174,6 +1408,9 @@ def main():
         logger.info(result)
         print(f"📋 {result}")
 
+    if args.dump_metrics:
+        atexit.register(dump_metrics, args.dump_metrics)
+
     # Launch web interface if requested
     if args.server:
         if args.cowboy_mode:
@@ -1187,26 +1424,48 @@ def main():
         launch_server(args.server_host, args.server_port, args)
         return
 
+    # Check for a newer version in the background (cached for a day in the state directory)
+    startup = StartupTaskRunner()
+    version_check = startup.start_background(
+        "version_check",
+        lambda: check_for_newer_version(
+            cache_dir=args.project_state_dir or os.path.join(os.getcwd(), ".ra-aid")
+        ),
+    )
+
     try:
         with DatabaseManager(base_dir=args.project_state_dir) as db:
-            # Apply any pending database migrations
-            try:
-                migration_success, migration_error_msg = ensure_migrations_applied()
-                if not migration_success:
-                    logger.warning(
-                        f"Database migrations failed but execution will continue. Error: {migration_error_msg or 'No specific error detail provided.'}"
-                    )
-            except Exception as e:
-                logger.error(f"Unexpected database migration error: {str(e)}")
+            def apply_migrations():
+                # Apply any pending database migrations
+                try:
+                    migration_success, migration_error_msg = ensure_migrations_applied()
+                    if not migration_success:
+                        logger.warning(
+                            f"Database migrations failed but execution will continue. Error: {migration_error_msg or 'No specific error detail provided.'}"
+                        )
+                except Exception as e:
+                    logger.error(f"Unexpected database migration error: {str(e)}")
+
+            def discover_environment():
+                # Create environment inventory data
+                env_discovery = EnvDiscovery()
+                env_discovery.discover()
+                return env_discovery.format_markdown()
+
+            # Independent initialization steps run concurrently
+            startup_results = startup.run_concurrently(
+                {
+                    "migrations": apply_migrations,
+                    "environment_discovery": discover_environment,
+                    "dependencies": check_dependencies,
+                }
+            )
+            env_data = startup_results["environment_discovery"]
 
             # Initialize empty config dictionary to be populated later
             config = {}
 
             # Initialize repositories with database connection
-            # Create environment inventory data
-            env_discovery = EnvDiscovery()
-            env_discovery.discover()
-            env_data = env_discovery.format_markdown()
 
             with (
                 SessionRepositoryManager(db) as session_repo,
@@ -1233,18 +1492,18 @@ def main():
                 logger.debug("Initialized Environment Inventory")
 
                 logger.debug("Initializing new session")
-                session_repo.create_session()
-
-                check_dependencies()
-
-                (
-                    expert_enabled,
-                    expert_missing,
-                    web_research_enabled,
-                    web_research_missing,
-                ) = validate_environment(
-                    args
-                )  # Will exit if main env vars missing
+                with startup.step("create_session"):
+                    session_repo.create_session()
+
+                with startup.step("validate_environment"):
+                    (
+                        expert_enabled,
+                        expert_missing,
+                        web_research_enabled,
+                        web_research_missing,
+                    ) = validate_environment(
+                        args
+                    )  # Will exit if main env vars missing
                 logger.debug("Environment validation successful")
 
                 # Validate model configuration early
@@ -1307,11 +1566,13 @@ def main():
                 config_repo.set("cowboy_mode", args.cowboy_mode) # Also add here for non-server mode
 
                 # Validate custom tools function signatures
-                get_custom_tools()
+                with startup.step("custom_tools"):
+                    get_custom_tools()
                 custom_tools_enabled = config_repo.get("custom_tools_enabled", False)
 
                 # Build status panel with memory statistics
-                status = build_status()
+                with startup.step("status"):
+                    status = build_status(version_check)
 
                 console.print(
                     Panel(
@@ -1321,6 +1582,9 @@ def main():
                         padding=(0, 1),
                     )
                 )
+                if not version_check.done():
+                    print_version_message_when_ready(version_check)
+                startup.log_summary()
 
                 # Handle chat mode
                 if args.chat:
@@ -1444,7 +1708,7 @@ def main():
                             expert_enabled=expert_enabled,
                             web_research_enabled=web_research_enabled,
                         ),
-                        checkpointer=MemorySaver(),
+                        checkpointer=create_checkpointer(),
                     )
 
                     # Run chat agent and exit
@@ -1558,6 +1822,9 @@ def main():
                     "max_test_cmd_retries": args.max_test_cmd_retries,
                     "experimental_fallback_handler": args.experimental_fallback_handler,
                     "test_cmd_timeout": args.test_cmd_timeout,
+                    "test_impact": args.test_impact,
+                    "test_impact_cmd": args.test_impact_cmd,
+                    "test_result_cache": not args.no_test_cache,
                 }
 
                 # Store config in repository
@@ -1632,7 +1899,7 @@ def main():
                     expert_enabled=expert_enabled,
                     research_only=args.research_only,
                     hil=args.hil,
-                    memory=research_memory,
+                    memory=create_checkpointer(),
                 )
 
                 if args.research_and_plan_only:
@@ -1,28 +1,37 @@
 import re
 import ast
+import logging
 import string
 import random
+import time
 from dataclasses import dataclass
 from typing import Any, Dict, Generator, List, Optional, Union
 
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, BaseMessageChunk, HumanMessage
 from langchain_core.tools import BaseTool
 from requests import session
 
+from ra_aid.agent_backends.ciayn_stream import (
+    StepTiming,
+    StreamProgress,
+    ToolCallStreamParser,
+    THINK_CLOSE,
+    THINK_OPEN,
+    split_chunk_content,
+)
 from ra_aid.callbacks.default_callback_handler import (
     initialize_callback_handler,
 )
 from ra_aid.config import DEFAULT_MAX_TOOL_FAILURES
+from ra_aid.context_compaction import compact_and_trim
 from ra_aid.exceptions import ToolExecutionError
 from ra_aid.fallback_handler import FallbackHandler
 from ra_aid.logging_config import get_logger
 
 # ADDED IMPORT
-from ra_aid.models_params import (
-    models_params,
-    DEFAULT_TOKEN_LIMIT,
-)  # Need DEFAULT_TOKEN_LIMIT too
+from ra_aid.model_profile import get_model_profile
+from ra_aid.models_params import DEFAULT_TOKEN_LIMIT
 from ra_aid.prompts.ciayn_prompts import (
     CIAYN_AGENT_SYSTEM_PROMPT,
 )
@@ -180,6 +189,19 @@ class CiaynAgent:
         self.config = config
         self.provider = config.get("provider", "openai")
 
+        # Model capabilities are resolved once, not on every loop iteration
+        self.model_profile = get_model_profile(
+            config.get("provider", ""), config.get("model", "")
+        )
+        # supports_think_tag: prioritize config, then models_params (None if in neither)
+        if "supports_think_tag" in config:
+            self.supports_think_tag = config.get("supports_think_tag")
+        else:
+            self.supports_think_tag = self.model_profile.supports_think_tag
+        self.supports_thinking = self.model_profile.supports_thinking
+        # None lets process_thinking_content read show_thoughts from the config repository
+        self.show_thoughts = config.get("show_thoughts", None)
+
         self.model = model
         self.tools = tools
         self.session_id = session_id
@@ -215,6 +237,11 @@ class CiaynAgent:
         self.last_tool_call = None
         self.last_tool_params = None
 
+        # State of the most recent model call (see _invoke_model)
+        self.last_step_timing: Optional[StepTiming] = None
+        self.stream_abort_reason: Optional[str] = None
+        self.thoughts_displayed = False
+
     def _build_prompt(self, last_result: Optional[str] = None) -> str:
         """Build the prompt for the agent including available tools and context."""
         # Add last result section if provided
@@ -395,13 +422,8 @@ class CiaynAgent:
 
                     # Validate and fix each call if needed (using conditional extraction)
                     if validate_function_call_pattern(call):
-                        provider = self.config.get("provider", "")
-                        model_name = self.config.get("model", "")
-                        model_config = models_params.get(provider, {}).get(
-                            model_name, {}
-                        )
-                        attempt_extraction = model_config.get(
-                            "attempt_llm_tool_extraction", False
+                        attempt_extraction = (
+                            self.model_profile.attempt_llm_tool_extraction
                         )
 
                         if attempt_extraction:
@@ -443,18 +465,22 @@ class CiaynAgent:
                             ):
 
                                 # Debug - print full AST structure
-                                logger.debug(
-                                    f"AST structure for bundled call: {ast.dump(tree.body[0].value)}"
-                                )
+                                if logger.isEnabledFor(logging.DEBUG):
+                                    logger.debug(
+                                        "AST structure for bundled call: %s",
+                                        ast.dump(tree.body[0].value),
+                                    )
 
                                 # Extract and normalize parameter values
                                 param_pairs = []
 
                                 # Handle positional arguments
                                 if tree.body[0].value.args:
-                                    logger.debug(
-                                        f"Found positional args in bundled call: {[ast.unparse(arg) for arg in tree.body[0].value.args]}"
-                                    )
+                                    if logger.isEnabledFor(logging.DEBUG):
+                                        logger.debug(
+                                            "Found positional args in bundled call: %s",
+                                            [ast.unparse(arg) for arg in tree.body[0].value.args],
+                                        )
 
                                     for i, arg in enumerate(tree.body[0].value.args):
                                         arg_value = ast.unparse(arg)
@@ -478,7 +504,7 @@ class CiaynAgent:
 
                                     # Debug - print each parameter
                                     logger.debug(
-                                        f"Processing parameter: {param_name} = {param_value}"
+                                        "Processing parameter: %s = %s", param_name, param_value
                                     )
 
                                     # Normalize string literals by removing outer quotes
@@ -494,14 +520,17 @@ class CiaynAgent:
                                     param_pairs.append((param_name, param_value))
 
                                 # Debug - print extracted parameters
-                                logger.debug(f"Extracted parameters: {param_pairs}")
+                                logger.debug("Extracted parameters: %s", param_pairs)
 
                                 # Create a fingerprint of the call
                                 current_call = (tool_name, str(sorted(param_pairs)))
 
                                 # Debug information to help diagnose false positives
                                 logger.debug(
-                                    f"Tool call: {tool_name}\\nCurrent call fingerprint: {current_call}\\nLast call fingerprint: {self.last_tool_call}"
+                                    "Tool call: %s\\nCurrent call fingerprint: %s\\nLast call fingerprint: %s",
+                                    tool_name,
+                                    current_call,
+                                    self.last_tool_call,
                                 )
 
                                 # If this fingerprint matches the last tool call, reject it
@@ -545,12 +574,7 @@ class CiaynAgent:
             # Regular single tool call case
             if validate_function_call_pattern(code):
                 # Retrieve the configuration flag
-                provider = self.config.get("provider", "")
-                model_name = self.config.get("model", "")
-                model_config = models_params.get(provider, {}).get(model_name, {})
-                attempt_extraction = model_config.get(
-                    "attempt_llm_tool_extraction", False
-                )
+                attempt_extraction = self.model_profile.attempt_llm_tool_extraction
 
                 if attempt_extraction:
                     logger.warning(
@@ -595,18 +619,22 @@ class CiaynAgent:
                     ):
 
                         # Debug - print full AST structure
-                        logger.debug(
-                            f"AST structure for single call: {ast.dump(tree.body[0].value)}"
-                        )
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "AST structure for single call: %s",
+                                ast.dump(tree.body[0].value),
+                            )
 
                         # Extract and normalize parameter values
                         param_pairs = []
 
                         # Handle positional arguments
                         if tree.body[0].value.args:
-                            logger.debug(
-                                f"Found positional args in single call: {[ast.unparse(arg) for arg in tree.body[0].value.args]}"
-                            )
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug(
+                                    "Found positional args in single call: %s",
+                                    [ast.unparse(arg) for arg in tree.body[0].value.args],
+                                )
 
                             for i, arg in enumerate(tree.body[0].value.args):
                                 arg_value = ast.unparse(arg)
@@ -630,7 +658,7 @@ class CiaynAgent:
 
                             # Debug - print each parameter
                             logger.debug(
-                                f"Processing parameter: {param_name} = {param_value}"
+                                "Processing parameter: %s = %s", param_name, param_value
                             )
 
                             # Normalize string literals by removing outer quotes
@@ -646,9 +674,10 @@ class CiaynAgent:
                             param_pairs.append((param_name, param_value))
 
                         # Also check for positional arguments
-                        if tree.body[0].value.args:
+                        if tree.body[0].value.args and logger.isEnabledFor(logging.DEBUG):
                             logger.debug(
-                                f"Found positional args: {[ast.unparse(arg) for arg in tree.body[0].value.args]}"
+                                "Found positional args: %s",
+                                [ast.unparse(arg) for arg in tree.body[0].value.args],
                             )
 
                         # Create a fingerprint of the call
@@ -656,7 +685,10 @@ class CiaynAgent:
 
                         # Debug information to help diagnose false positives
                         logger.debug(
-                            f"Tool call: {tool_name}\\nCurrent call fingerprint: {current_call}\\nLast call fingerprint: {self.last_tool_call}"
+                            "Tool call: %s\\nCurrent call fingerprint: %s\\nLast call fingerprint: %s",
+                            tool_name,
+                            current_call,
+                            self.last_tool_call,
                         )
 
                         # If this fingerprint matches the last tool call, reject it
@@ -694,12 +726,10 @@ class CiaynAgent:
             if is_custom_tool:
                 custom_tool_output = f"Executing custom tool: {tool_name}\n"
                 custom_tool_output += f"\n\tResult: {result}"
-                ra_aid.console.formatting.console.print(
-                    ra_aid.console.formatting.Panel(
-                        ra_aid.console.formatting.Markdown(custom_tool_output.strip()),
-                        title=" Custom Tool",
-                        border_style="magenta",
-                    )
+                ra_aid.console.formatting.cpm(
+                    custom_tool_output.strip(),
+                    title=" Custom Tool",
+                    border_style="magenta",
                 )
                 # Coerce custom tool call responses to langchain BaseMessage
                 result = wrap_custom_tool_call_result(result)
@@ -875,7 +905,8 @@ class CiaynAgent:
         """Trim chat history based on message count and token limits while preserving initial messages.
 
         Applies both message count and token limits (if configured) to chat_history,
-        while preserving all initial_messages. Returns concatenated result.
+        while preserving all initial_messages. With a token limit, old tool results
+        are compacted before any message is dropped. Returns concatenated result.
 
         Args:
             initial_messages: List of initial messages to preserve
@@ -895,16 +926,24 @@ class CiaynAgent:
         # Calculate initial messages token count
         initial_tokens = sum(self._estimate_tokens(msg) for msg in initial_messages)
 
-        # Remove messages from start of chat_history until under token limit
-        while chat_history:
-            total_tokens = initial_tokens + sum(
-                self._estimate_tokens(msg) for msg in chat_history
-            )
-            if total_tokens <= self.max_tokens:
-                break
-            chat_history.pop(0)
-
-        return initial_messages + chat_history
+        def trim(messages: List[Any]) -> List[Any]:
+            compacted_history = messages[len(initial_messages) :]
+            # Remove messages from start of chat_history until under token limit
+            while compacted_history:
+                total_tokens = initial_tokens + sum(
+                    self._estimate_tokens(msg) for msg in compacted_history
+                )
+                if total_tokens <= self.max_tokens:
+                    break
+                compacted_history.pop(0)
+            return initial_messages + compacted_history
+
+        return compact_and_trim(
+            initial_messages + chat_history,
+            self.max_tokens,
+            lambda messages: sum(self._estimate_tokens(msg) for msg in messages),
+            trim,
+        )
 
     @staticmethod
     def _estimate_tokens(content: Optional[Union[str, BaseMessage]]) -> int:
@@ -926,6 +965,134 @@ class CiaynAgent:
 
         return len(text.encode("utf-8")) // 2.0
 
+    def _invoke_model(
+        self,
+        messages: List[BaseMessage],
+        supports_think_tag: Optional[bool] = None,
+        supports_thinking: bool = False,
+        show_thoughts: Optional[bool] = None,
+    ) -> BaseMessage:
+        """Call the model, streaming the response when the model supports it.
+
+        While the response streams in, a status line shows progress, complete
+        thinking is displayed right away and the head of the response is parsed
+        to find the called tool. If the head cannot be a call of an available
+        tool, generation is stopped early and stream_abort_reason is set, unless
+        the model relies on LLM-based tool call extraction.
+
+        Time to first token and throughput are stored in last_step_timing and
+        logged at debug level.
+
+        Args:
+            messages: Messages to send to the model
+            supports_think_tag: Whether to extract a leading <think> block
+            supports_thinking: Whether the model returns structured thinking
+            show_thoughts: Whether to display thinking (None reads the config)
+
+        Returns:
+            BaseMessage: The (possibly partial) model response
+        """
+        self.stream_abort_reason = None
+        self.thoughts_displayed = False
+        if not isinstance(self.model, BaseChatModel):
+            return self.model.invoke(messages, self.stream_config)
+
+        parser = ToolCallStreamParser(
+            [tool.func.__name__ for tool in self.tools], supports_think_tag
+        )
+        abort_on_invalid = not self.model_profile.attempt_llm_tool_extraction
+        timing = StepTiming(started_at=time.time())
+        self.last_step_timing = timing
+        message: Optional[BaseMessageChunk] = None
+        output_bytes = 0
+
+        chunks = self.model.stream(messages, self.stream_config)
+        try:
+            with StreamProgress() as progress:
+                for chunk in chunks:
+                    if timing.first_token_at is None:
+                        timing.first_token_at = time.time()
+                    message = chunk if message is None else message + chunk
+
+                    text, thinking = split_chunk_content(chunk.content)
+                    parser.feed_thinking(thinking)
+                    parser.feed(text)
+                    output_bytes += len(text.encode("utf-8")) + len(
+                        thinking.encode("utf-8")
+                    )
+                    timing.output_tokens = output_bytes // 2
+
+                    if parser.thinking_complete and not self.thoughts_displayed:
+                        self._display_streamed_thoughts(
+                            parser, supports_think_tag, supports_thinking, show_thoughts
+                        )
+                    progress.update(parser, timing)
+
+                    if should_exit(self.session_id):
+                        timing.aborted = True
+                        break
+                    if abort_on_invalid and parser.invalid_reason:
+                        logger.info(
+                            f"Stopping generation early: {parser.invalid_reason}"
+                        )
+                        self.stream_abort_reason = parser.invalid_reason
+                        timing.aborted = True
+                        break
+        finally:
+            chunks.close()
+            timing.finished_at = time.time()
+
+        if message is None:
+            logger.debug("Model step: no output (%s)", timing.describe())
+            return AIMessage(content="")
+
+        usage = message.usage_metadata or {}
+        if usage.get("output_tokens") and not timing.aborted:
+            timing.output_tokens = usage["output_tokens"]
+        logger.debug("Model step: %s", timing.describe())
+
+        content = message.content
+        if isinstance(content, list):
+            # Merged stream blocks carry their index; match invoke() output
+            content = [
+                (
+                    {k: v for k, v in block.items() if k != "index"}
+                    if isinstance(block, dict)
+                    else block
+                )
+                for block in content
+            ]
+        return AIMessage(
+            content=content,
+            additional_kwargs=message.additional_kwargs,
+            response_metadata=message.response_metadata,
+            usage_metadata=message.usage_metadata,
+            id=message.id,
+        )
+
+    def _display_streamed_thoughts(
+        self,
+        parser: ToolCallStreamParser,
+        supports_think_tag: Optional[bool],
+        supports_thinking: bool,
+        show_thoughts: Optional[bool],
+    ) -> None:
+        """Display thinking as soon as it is complete, before the tool call arrives."""
+        if parser.thinking_structured:
+            if not supports_thinking:
+                return
+            content = [{"type": "thinking", "text": parser.thinking}]
+        else:
+            content = f"{THINK_OPEN}{parser.thinking}{THINK_CLOSE}"
+        process_thinking_content(
+            content=content,
+            supports_think_tag=supports_think_tag,
+            supports_thinking=supports_thinking,
+            panel_title=" Thoughts",
+            show_thoughts=show_thoughts,
+        )
+        self.thoughts_displayed = True
+
     def stream(
         self, messages_dict: Dict[str, List[Any]], _config: Dict[str, Any] = None
     ) -> Generator[Dict[str, Any], None, None]:
@@ -953,11 +1120,18 @@ class CiaynAgent:
                 logger.debug("Agent should exit flag detected before model invocation")
                 break
 
-            response = self.model.invoke(
-                [self.sys_message] + full_history, self.stream_config
+            response = self._invoke_model(
+                [self.sys_message] + full_history,
+                supports_think_tag=self.supports_think_tag,
+                supports_thinking=self.supports_thinking,
+                show_thoughts=self.show_thoughts,
             )
             # print(f"response={response}")
 
+            if should_exit(self.session_id):
+                logger.debug("Agent should exit flag detected during model invocation")
+                break
+
             if isinstance(response.content, list):
                 if len(response.content) > 1:
                     response.content = response.content[1]
@@ -966,28 +1140,14 @@ class CiaynAgent:
                 else:  # If list is empty
                     response.content = ""  # Set to empty string or handle as an error
 
-            # Get settings from config and models_params
-            provider = self.config.get("provider", "")
-            model_name = self.config.get("model", "")
-            model_config_from_params = models_params.get(provider, {}).get(model_name, {})
-
-            # Determine supports_think_tag: prioritize self.config, then models_params
-            if "supports_think_tag" in self.config:
-                supports_think_tag = self.config.get("supports_think_tag")
-            else:
-                supports_think_tag = model_config_from_params.get("supports_think_tag") # Defaults to None if not in either
-
-            supports_thinking = model_config_from_params.get("supports_thinking", False)
-            # show_thoughts defaults to True if not specified (matching process_thinking_content default)
-            show_thoughts = self.config.get("show_thoughts", None)
-
             # Process thinking content if supported
             response.content, _ = process_thinking_content(
                 content=response.content,
-                supports_think_tag=supports_think_tag,
-                supports_thinking=supports_thinking,
+                supports_think_tag=self.supports_think_tag,
+                supports_thinking=self.supports_thinking,
                 panel_title=" Thoughts",
-                show_thoughts=show_thoughts,
+                # Thoughts surfaced while streaming are not shown twice
+                show_thoughts=False if self.thoughts_displayed else self.show_thoughts,
             )
 
             # Check if the response is empty or doesn't contain a valid tool call
@@ -1105,6 +1265,15 @@ class CiaynAgent:
                 break
 
             try:
+                if self.stream_abort_reason:
+                    error_msg = f"Invalid tool call: {self.stream_abort_reason}. The response must be a call of an available tool."
+                    ra_aid.console.formatting.print_warning(
+                        f"Stopped generation early: {self.stream_abort_reason}.",
+                        title="Tool Error",
+                    )
+                    raise ToolExecutionError(
+                        error_msg, base_message=response, tool_name="unknown_tool_format"
+                    )
                 last_result = self._execute_tool(response)
                 self.chat_history.append(response)
                 if hasattr(self.fallback_handler, "reset_fallback_handler"):
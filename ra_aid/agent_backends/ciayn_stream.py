@@ -0,0 +1,275 @@
+"""
+Incremental parsing of streamed CIAYN responses.
+
+CiaynAgent streams the model output instead of waiting for the complete
+generation. ``ToolCallStreamParser`` follows the text as it arrives so the
+agent can show progress, surface thinking as soon as it is complete, and
+give up on a response that cannot be a tool call long before the model has
+finished generating it.
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+from rich.errors import LiveError
+
+from ra_aid.console.common import console
+from ra_aid.console.sink import get_output_sink
+from ra_aid.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# Minimum seconds between progress line updates
+_PROGRESS_INTERVAL = 0.1
+
+_CALL_HEAD = re.compile(r"([A-Za-z_]\w*)(?!\w)\s*(\S)")
+_FENCE_HEAD = re.compile(r"```([\w+\-]*)(.?)", re.S)
+
+
+def split_chunk_content(content: Any) -> Tuple[str, str]:
+    """
+    Split the content of a streamed message chunk into text and thinking.
+
+    Args:
+        content: Chunk content, either a string or a list of content blocks
+
+    Returns:
+        Tuple[str, str]: The text delta and the structured thinking delta
+    """
+    if isinstance(content, str):
+        return content, ""
+
+    text, thinking = [], []
+    for block in content or []:
+        if isinstance(block, str):
+            text.append(block)
+        elif isinstance(block, dict):
+            if block.get("type") == "thinking":
+                thinking.append(block.get("thinking") or block.get("text") or "")
+            elif block.get("type") == "text":
+                text.append(block.get("text") or "")
+    return "".join(text), "".join(thinking)
+
+
+@dataclass
+class StepTiming:
+    """Timing of one streamed model call."""
+
+    started_at: float
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    output_tokens: int = 0
+    aborted: bool = False
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from sending the request to the first streamed token."""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Output tokens per second after the first token arrived."""
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        if elapsed <= 0:
+            return None
+        return self.output_tokens / elapsed
+
+    def describe(self) -> str:
+        """Short human-readable summary for logs."""
+        ttft = self.time_to_first_token
+        tps = self.tokens_per_second
+        return (
+            f"TTFT {ttft:.2f}s" if ttft is not None else "TTFT n/a"
+        ) + (
+            f", {self.output_tokens} tokens at {tps:.1f} tok/s"
+            if tps is not None
+            else f", {self.output_tokens} tokens"
+        ) + (" (aborted)" if self.aborted else "")
+
+
+class ToolCallStreamParser:
+    """
+    Incrementally parse a streamed CIAYN response.
+
+    Text is fed as it arrives. The parser extracts a leading ``<think>``
+    block (or accumulates structured thinking fed separately), then looks at
+    the head of the remaining text, skipping code fences, to find the name
+    of the called tool. A head that cannot start a call of one of the known
+    tools marks the response invalid.
+    """
+
+    def __init__(self, tool_names: Iterable[str], supports_think_tag: Optional[bool] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            tool_names: Names of the tools the agent can call
+            supports_think_tag: Whether to extract a leading <think> block
+                (None extracts it only if the response starts with one)
+        """
+        self.tool_names = set(tool_names)
+        self.supports_think_tag = supports_think_tag
+        self.thinking = ""
+        self.thinking_complete = False
+        self.thinking_structured = False
+        self.tool_name: Optional[str] = None
+        self.invalid_reason: Optional[str] = None
+        self._parts: List[str] = []
+        self._in_think_tag: Optional[bool] = None
+        self._think_tail = ""
+        self._body_offset = 0
+
+    @property
+    def text(self) -> str:
+        """All text received so far."""
+        return "".join(self._parts)
+
+    @property
+    def is_thinking(self) -> bool:
+        """Whether the model is still generating thinking."""
+        if self._in_think_tag:
+            return True
+        return self.thinking_structured and not self.thinking_complete
+
+    @property
+    def decided(self) -> bool:
+        """Whether the tool name is known or the response is invalid."""
+        return self.tool_name is not None or self.invalid_reason is not None
+
+    def feed_thinking(self, thinking: str) -> None:
+        """Add structured thinking content."""
+        if thinking:
+            self.thinking += thinking
+            self.thinking_structured = True
+
+    def feed(self, text: str) -> None:
+        """Add response text and update the parse state."""
+        if not text:
+            return
+        self._parts.append(text)
+        if self.thinking_structured and not self.thinking_complete:
+            # Structured thinking is complete once regular text arrives
+            self.thinking_complete = True
+        if self.decided:
+            return
+        if self._in_think_tag:
+            # Only rescan the text once the closing tag may have arrived
+            window = self._think_tail + text
+            self._think_tail = window[-len(THINK_CLOSE):]
+            if THINK_CLOSE not in window:
+                return
+        self._update()
+
+    def _update(self) -> None:
+        text = self.text.lstrip()
+
+        if self._in_think_tag is None:
+            if self.supports_think_tag is False:
+                self._in_think_tag = False
+            elif THINK_OPEN.startswith(text):
+                return  # Too short to tell
+            else:
+                self._in_think_tag = text.startswith(THINK_OPEN)
+                self._body_offset = len(THINK_OPEN) if self._in_think_tag else 0
+
+        if self._in_think_tag:
+            end = text.find(THINK_CLOSE, len(THINK_OPEN))
+            if end == -1:
+                self._think_tail = text[-len(THINK_CLOSE):]
+                return
+            self.thinking = text[len(THINK_OPEN):end].strip()
+            self.thinking_complete = True
+            self._in_think_tag = False
+            self._body_offset = end + len(THINK_CLOSE)
+
+        self._check_head(text[self._body_offset:].lstrip())
+
+    def _check_head(self, body: str) -> None:
+        if not body:
+            return
+
+        head = body
+        if "```".startswith(body):
+            return  # Possibly the start of a code fence
+        if body.startswith("```"):
+            match = _FENCE_HEAD.match(body)
+            language, delimiter = match.groups()
+            if not delimiter:
+                return  # Language specifier still streaming
+            head = body[3:] if delimiter == "(" else body[match.end(1):]
+        elif body.startswith("`"):
+            head = body[1:]
+        head = head.lstrip()
+        if not head:
+            return
+
+        if not (head[0].isalpha() or head[0] == "_"):
+            self.invalid_reason = "the response does not start with a tool call"
+            return
+        match = _CALL_HEAD.match(head)
+        if not match:
+            return  # Identifier still streaming
+        name, next_char = match.groups()
+        if next_char != "(":
+            self.invalid_reason = "the response does not start with a tool call"
+        elif name not in self.tool_names:
+            self.invalid_reason = f"'{name}' is not an available tool"
+        else:
+            self.tool_name = name
+
+
+class StreamProgress:
+    """
+    Transient console status line showing the progress of a streamed step.
+
+    Only one live display can be active per console, so when another agent
+    thread already shows one the progress is silently not displayed. Nothing
+    is displayed either when the current output sink does not render.
+    """
+
+    def __init__(self):
+        self._status = None
+        self._last_update = 0.0
+
+    def __enter__(self) -> "StreamProgress":
+        if not get_output_sink().renders:
+            return self
+        try:
+            self._status = console.status("Waiting for model...")
+            self._status.start()
+        except LiveError:
+            self._status = None
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._status is not None:
+            self._status.stop()
+            self._status = None
+
+    def update(self, parser: ToolCallStreamParser, timing: StepTiming, force: bool = False) -> None:
+        """Update the status line from the parser state and timing."""
+        if self._status is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_update < _PROGRESS_INTERVAL:
+            return
+        self._last_update = now
+
+        if parser.is_thinking:
+            activity = "Thinking"
+        elif parser.tool_name:
+            activity = f"Writing {parser.tool_name} call"
+        else:
+            activity = "Generating"
+        elapsed = time.time() - (timing.first_token_at or timing.started_at)
+        rate = f", {timing.output_tokens / elapsed:.0f} tok/s" if elapsed > 0 else ""
+        self._status.update(f"{activity}... {timing.output_tokens} tokens{rate}")
@@ -1,8 +1,9 @@
 """Context manager for tracking agent state and completion status."""
 
 import contextvars
+import os
 from contextlib import contextmanager
-from typing import Optional
+from typing import Optional, Set
 from ra_aid.logging_config import get_logger
 from ra_aid.utils import agent_thread_manager
 
@@ -32,6 +33,9 @@ class AgentContext:
         self.agent_crashed_message = None
         self.research_notes_emitted = False
 
+        # Files modified by this agent or its sub-agents, for test-impact selection
+        self.modified_files = set()
+
         # Note: Completion flags (task_completed, plan_completed, completion_message,
         # agent_should_exit) are no longer inherited from parent contexts
 
@@ -111,6 +115,19 @@ class AgentContext:
         """Mark that research notes have been emitted."""
         self.research_notes_emitted = True
 
+    def record_modified_file(self, path: str) -> None:
+        """Record a file modified by the agent.
+
+        A sub-agent's changes are changes of its parents' runs too, so the
+        file is recorded in every parent context.
+
+        Args:
+            path: Path of the modified file
+        """
+        self.modified_files.add(path)
+        if self.parent:
+            self.parent.record_modified_file(path)
+
     @property
     def depth(self) -> int:
         """Calculate the depth of this context based on parent chain.
@@ -234,13 +251,13 @@ def should_exit(session_id: Optional[int] = None) -> bool:
     """
 
     # Check if the agent has received a stop signal from the client
-    logger.info("SHOULD_EXIT: Checking if agent should exit for session_id: %s", session_id)
+    logger.debug("SHOULD_EXIT: Checking if agent should exit for session_id: %s", session_id)
 
     if session_id is not None and agent_thread_manager.has_received_stop_signal(session_id):
         logger.info("SHOULD_EXIT: Received stop signal from client, exiting agent for session_id: %s", session_id)
         return True
     else:
-        logger.info("SHOULD_EXIT: No stop signal received from client, continuing agent for session_id: %s", session_id)
+        logger.debug("SHOULD_EXIT: No stop signal received from client, continuing agent for session_id: %s", session_id)
 
     context = get_current_context()
     return context.agent_should_exit if context else False
@@ -307,3 +324,24 @@ def have_research_notes_been_emitted() -> bool:
     """
     context = get_current_context()
     return context.research_notes_emitted if context else False
+
+
+def record_modified_file(path: str) -> None:
+    """Record a file modified by the agent in the current context.
+
+    Args:
+        path: Path of the modified file, made relative to the working directory
+    """
+    context = get_current_context()
+    if context:
+        context.record_modified_file(os.path.relpath(os.path.abspath(path)))
+
+
+def get_modified_files() -> Set[str]:
+    """Get the files modified in the current context and its sub-agents.
+
+    Returns:
+        Set[str]: Paths relative to the working directory
+    """
+    context = get_current_context()
+    return set(context.modified_files) if context else set()
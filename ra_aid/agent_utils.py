@@ -42,6 +42,7 @@ from ra_aid.agent_context import (
 )
 from ra_aid.agent_backends.ciayn_agent import CiaynAgent
 from ra_aid.agents_alias import RAgents
+from ra_aid.checkpointer import PruningCheckpointer
 from ra_aid.config import DEFAULT_MAX_TEST_CMD_RETRIES, DEFAULT_MODEL
 
 # Import the new function
@@ -54,6 +55,7 @@ from ra_aid.exceptions import (
 )
 from ra_aid.fallback_handler import FallbackHandler
 from ra_aid.logging_config import get_logger
+from ra_aid.metrics import instrument_tools
 from ra_aid.models_params import (
     DEFAULT_TOKEN_LIMIT,
 )
@@ -154,6 +156,7 @@ def create_agent(
     while preserving system messages. It can be disabled by setting
     limit_tokens config value to False using get_config_repository().set('limit_tokens', False).
     """
+    instrument_tools(tools)
     try:
         # Try to get config from repository for production use
         try:
@@ -564,6 +567,22 @@ def _run_agent_stream(
     return True
 
 
+def _release_checkpoints(agent: RAgents) -> None:
+    """
+    Delete the checkpoints of a finished agent run.
+
+    Each agent gets its own checkpointer and is run once, so nothing resumes
+    its threads afterwards.
+
+    Args:
+        agent: The agent whose run has finished
+    """
+    checkpointer = getattr(agent, "checkpointer", None)
+    if isinstance(checkpointer, PruningCheckpointer):
+        for thread_id in list(checkpointer.storage):
+            checkpointer.delete_thread(thread_id)
+
+
 def run_agent_with_retry(
     agent: RAgents,
     prompt: str,
@@ -598,6 +617,9 @@ def run_agent_with_retry(
         "max_test_cmd_retries": max_test_cmd_retries,
         "test_cmd_timeout": test_cmd_timeout,
         "auto_test": auto_test,
+        "test_impact": get_config_repository().get("test_impact", False),
+        "test_impact_cmd": get_config_repository().get("test_impact_cmd", None),
+        "test_result_cache": get_config_repository().get("test_result_cache", True),
     }
 
     # Create a new agent context for this run
@@ -690,4 +712,5 @@ def run_agent_with_retry(
 
                     _handle_api_error(e, attempt, max_retries, base_delay)
         finally:
+            _release_checkpoints(agent)
             _restore_interrupt_handling(original_handler)
@@ -13,17 +13,17 @@ from datetime import datetime
 from typing import Any, Optional, List
 
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 
 from ra_aid.agent_context import agent_context, is_completed, reset_completion_flags, should_exit
 # Import agent_utils functions at runtime to avoid circular imports
 from ra_aid import agent_utils
+from ra_aid.console.formatting import cpm
 from ra_aid.database.repositories.key_fact_repository import get_key_fact_repository
 from ra_aid.database.repositories.key_snippet_repository import get_key_snippet_repository
 from ra_aid.database.repositories.human_input_repository import get_human_input_repository
 from ra_aid.database.repositories.research_note_repository import get_research_note_repository
 from ra_aid.database.repositories.config_repository import get_config_repository
+from ra_aid.database.repositories.trajectory_repository import get_trajectory_repository
 from ra_aid.database.repositories.work_log_repository import get_work_log_repository
 from ra_aid.env_inv_context import get_env_inv
 from ra_aid.exceptions import AgentInterrupt
@@ -88,9 +88,19 @@ def run_task_implementation_agent(
     logger.debug("Task details: base_task=%s, current_task=%s", base_task, task)
     logger.debug("Related files: %s", related_files)
 
+    # Record stage transition in trajectory
+    get_trajectory_repository().create(
+        step_data={
+            "stage": "implementation_stage",
+            "display_title": "Implementation Stage",
+        },
+        record_type="stage_transition",
+        human_input_id=get_human_input_repository().get_most_recent_id(),
+    )
+
     if memory is None:
-        from langgraph.checkpoint.memory import MemorySaver
-        memory = MemorySaver()
+        from ra_aid.checkpointer import create_checkpointer
+        memory = create_checkpointer()
 
     if thread_id is None:
         thread_id = str(uuid.uuid4())
@@ -207,14 +217,10 @@ def run_task_implementation_agent(
             )
 
             # Show the reasoning assist query in a panel
-            console.print(
-                Panel(
-                    Markdown(
-                        "Consulting with the reasoning model on the best implementation approach."
-                    ),
-                    title="📝 Thinking about implementation...",
-                    border_style="yellow",
-                )
+            cpm(
+                "Consulting with the reasoning model on the best implementation approach.",
+                title="📝 Thinking about implementation...",
+                border_style="yellow",
             )
 
             logger.debug("Invoking expert model for implementation reasoning assist")
@@ -245,13 +251,7 @@ def run_task_implementation_agent(
             )
 
             # Display the implementation guidance in a panel
-            console.print(
-                Panel(
-                    Markdown(content),
-                    title="Implementation Guidance",
-                    border_style="blue",
-                )
-            )
+            cpm(content, title="Implementation Guidance", border_style="blue")
 
             # Format the implementation guidance section for the prompt
             implementation_guidance_section = f"""<implementation guidance>
@@ -11,14 +11,12 @@ from typing import List
 
 from langchain_core.tools import tool
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 
 
 from ra_aid.agent_context import mark_should_exit
 # Import agent_utils functions at runtime to avoid circular imports
 from ra_aid import agent_utils
-from ra_aid.console.formatting import console_panel
+from ra_aid.console.formatting import console_panel, cpm
 from ra_aid.database.repositories.key_fact_repository import get_key_fact_repository
 from ra_aid.database.repositories.human_input_repository import get_human_input_repository
 from ra_aid.database.repositories.config_repository import get_config_repository
@@ -99,9 +97,7 @@ def delete_key_facts(fact_ids: List[int]) -> str:
         except Exception:
             pass  # Continue if trajectory recording fails
             
-        console.print(
-            Panel(Markdown(deleted_msg), title="Facts Deleted", border_style="green")
-        )
+        cpm(deleted_msg, title="Facts Deleted", border_style="green")
     
     if protected_facts:
         protected_msg = "Protected facts (associated with current request):\n" + "\n".join([f"- #{fact_id}: {content}" for fact_id, content in protected_facts])
@@ -122,9 +118,7 @@ def delete_key_facts(fact_ids: List[int]) -> str:
         except Exception:
             pass  # Continue if trajectory recording fails
             
-        console.print(
-            Panel(Markdown(protected_msg), title="Facts Protected", border_style="blue")
-        )
+        cpm(protected_msg, title="Facts Protected", border_style="blue")
     
     if not_found_facts:
         not_found_msg = f"Facts not found: {', '.join([f'#{fact_id}' for fact_id in not_found_facts])}"
@@ -10,12 +10,10 @@ from typing import List
 
 from langchain_core.tools import tool
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 
 # Import agent_utils functions at runtime to avoid circular imports
 from ra_aid import agent_utils
-from ra_aid.console.formatting import console_panel
+from ra_aid.console.formatting import console_panel, cpm
 from ra_aid.database.repositories.key_snippet_repository import get_key_snippet_repository
 from ra_aid.database.repositories.human_input_repository import get_human_input_repository
 from ra_aid.database.repositories.config_repository import get_config_repository
@@ -84,11 +82,7 @@ def delete_key_snippets(snippet_ids: List[int]) -> str:
                 except Exception:
                     pass  # Continue if trajectory recording fails
                 
-                console.print(
-                    Panel(
-                        Markdown(success_msg), title="Snippet Deleted", border_style="green"
-                    )
-                )
+                cpm(success_msg, title="Snippet Deleted", border_style="green")
                 results.append((snippet_id, filepath))
                 log_work_event(f"Deleted snippet {snippet_id}.")
             else:
@@ -121,9 +115,7 @@ def delete_key_snippets(snippet_ids: List[int]) -> str:
         except Exception:
             pass  # Continue if trajectory recording fails
             
-        console.print(
-            Panel(Markdown(protected_msg), title="Snippets Protected", border_style="blue")
-        )
+        cpm(protected_msg, title="Snippets Protected", border_style="blue")
     
     if not_found_snippets:
         not_found_msg = f"Snippets not found: {', '.join([f'#{snippet_id}' for snippet_id in not_found_snippets])}"
@@ -12,12 +12,10 @@ from datetime import datetime
 from typing import Any, Optional
 
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 
 # Import agent_utils functions at runtime to avoid circular imports
 from ra_aid import agent_utils
-from ra_aid.console.formatting import print_stage_header
+from ra_aid.console.formatting import cpm, print_stage_header
 from ra_aid.database.repositories.key_fact_repository import get_key_fact_repository
 from ra_aid.database.repositories.key_snippet_repository import (
     get_key_snippet_repository,
@@ -102,9 +100,9 @@ def run_planning_agent(
     logger.debug("Planning configuration: expert=%s, hil=%s", expert_enabled, hil)
 
     if memory is None:
-        from langgraph.checkpoint.memory import MemorySaver
+        from ra_aid.checkpointer import create_checkpointer
 
-        memory = MemorySaver()
+        memory = create_checkpointer()
 
     if thread_id is None:
         thread_id = str(uuid.uuid4())
@@ -244,14 +242,10 @@ def run_planning_agent(
             )
 
             # Show the reasoning assist query in a panel
-            console.print(
-                Panel(
-                    Markdown(
-                        "Consulting with the reasoning model on the best way to do this."
-                    ),
-                    title="📝 Thinking about the plan...",
-                    border_style="yellow",
-                )
+            cpm(
+                "Consulting with the reasoning model on the best way to do this.",
+                title="📝 Thinking about the plan...",
+                border_style="yellow",
             )
 
             logger.debug("Invoking expert model for reasoning assist")
@@ -296,13 +290,7 @@ def run_planning_agent(
                     logger.debug(
                         f"Displaying structured thinking content ({len(thinking_content)} chars)"
                     )
-                    console.print(
-                        Panel(
-                            Markdown(thinking_content),
-                            title="💭 Expert Thinking",
-                            border_style="yellow",
-                        )
-                    )
+                    cpm(thinking_content, title="💭 Expert Thinking", border_style="yellow")
 
                 # Use response_text if available, otherwise fall back to joining
                 if response_text:
@@ -325,11 +313,7 @@ def run_planning_agent(
                 )
 
             # Display the expert guidance in a panel
-            console.print(
-                Panel(
-                    Markdown(content), title="Reasoning Guidance", border_style="blue"
-                )
-            )
+            cpm(content, title="Reasoning Guidance", border_style="blue")
 
             # Use the content as expert guidance
             expert_guidance = (
@@ -39,6 +39,15 @@ from ra_aid.model_formatters.key_snippets_formatter import format_key_snippets_d
 from ra_aid.model_formatters.research_notes_formatter import format_research_notes_dict
 from ra_aid.text.processing import process_thinking_content
 from ra_aid.models_params import models_params
+from ra_aid.research_cache import (
+    collect_research,
+    format_cached_research_section,
+    get_research_cache,
+    repository_state,
+    research_baseline,
+    restore_research,
+    task_key,
+)
 from ra_aid.project_info import (
     display_project_status,
     format_project_info,
@@ -73,6 +82,71 @@ def _get_research_only_note(research_only: bool) -> str:
         return " Only request implementation if the user explicitly asked for changes to be made."
 
 
+def _lookup_research_cache(
+    base_task_or_query: str, research_only: bool, hil: bool, thread_id: str
+) -> Optional[dict]:
+    """Look up cached research for a task, restore it and report the outcome.
+
+    Returns:
+        Optional[dict]: The cache, key, repository state and lookup, or None when
+        caching is disabled or not possible (no git repository, human in the loop)
+    """
+    if hil:
+        return None
+    try:
+        cache = get_research_cache()
+        if cache is None:
+            return None
+        state = repository_state(exclude=[str(cache.root.parent)])
+        if state is None:
+            return None
+        key = task_key(base_task_or_query, research_only)
+        lookup = cache.lookup(key, state)
+        # Only results created from here on (including restored ones) belong to this task
+        baseline = research_baseline()
+        # A corrupt entry fails here and research runs from scratch
+        restored = restore_research(lookup.entry, state.root) if lookup.status != "miss" else None
+    except Exception as e:
+        logger.warning(f"[{thread_id}] Research cache lookup failed: {e}")
+        return None
+
+    stats = cache.stats()
+    totals = f"{stats['hit']} hits, {stats['stale']} stale, {stats['miss']} misses so far"
+    logger.info(f"[{thread_id}] Research cache {lookup.status} for task key {key[:12]} ({totals})")
+    if lookup.status == "miss":
+        cpm(f"No cached research for this task and repository state ({totals}).", title="🗄️ Research Cache")
+    else:
+        restored_summary = ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in restored.items())
+        if lookup.status == "hit":
+            message = f"Reusing research from a previous run against the same repository state: restored {restored_summary}."
+        else:
+            message = (
+                f"Found research from a previous run against another repository state "
+                f"({len(lookup.changed_files)} files changed since); restored {restored_summary} "
+                "for an incremental update."
+            )
+        cpm(f"{message}\n{totals}", title="🗄️ Research Cache", border_style="green")
+    return {"cache": cache, "key": key, "state": state, "lookup": lookup, "baseline": baseline}
+
+
+def _store_research_cache(cache_context: dict, base_task_or_query: str, result: Optional[str], thread_id: str) -> None:
+    """Store the research results of a completed run in the research cache."""
+    try:
+        # Keyed by the state research started from; if implementation changed the
+        # tree afterwards, the next run of the task finds the entry as stale
+        state = cache_context["state"]
+        entry = collect_research(
+            base_task_or_query,
+            state,
+            result if isinstance(result, str) else None,
+            cache_context["baseline"],
+        )
+        cache_context["cache"].store(cache_context["key"], entry)
+        logger.debug(f"[{thread_id}] Stored research results in the research cache.")
+    except Exception as e:
+        logger.warning(f"[{thread_id}] Failed to store research results in the cache: {e}")
+
+
 def run_research_agent(
     base_task_or_query: str,
     model,
@@ -121,9 +195,19 @@ def run_research_agent(
     )
 
     if memory is None:
-        from langgraph.checkpoint.memory import MemorySaver
+        from ra_aid.checkpointer import create_checkpointer
+
+        memory = create_checkpointer()
 
-        memory = MemorySaver()
+    cache_context = _lookup_research_cache(base_task_or_query, research_only, hil, thread_id)
+    if (
+        cache_context is not None
+        and research_only
+        and cache_context["lookup"].status == "hit"
+        and cache_context["lookup"].entry.result
+    ):
+        logger.info(f"[{thread_id}] Returning cached research result.")
+        return cache_context["lookup"].entry.result
 
     current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     working_directory = os.getcwd()
@@ -417,6 +501,8 @@ YOU MUST FOLLOW THE EXPERT'S GUIDANCE OR ELSE BE TERMINATED!
         env_inv=get_env_inv(),
         expert_guidance_section=expert_guidance_section,
     )
+    if cache_context is not None and cache_context["lookup"].status != "miss":
+        prompt += format_cached_research_section(cache_context["lookup"])
 
     # Log the prompt, trimming if it's too long
     prompt_log_limit = 1000
@@ -453,6 +539,8 @@ YOU MUST FOLLOW THE EXPERT'S GUIDANCE OR ELSE BE TERMINATED!
                 # Log research completion
                 logger.info(f"[{thread_id}] Research agent completed successfully.")
                 log_work_event(f"Completed research phase for: {base_task_or_query}")
+                if cache_context is not None:
+                    _store_research_cache(cache_context, base_task_or_query, _result, thread_id)
             else:
                  logger.info(f"[{thread_id}] Research agent finished without returning a final message.")
             return _result
@@ -516,9 +604,9 @@ def run_web_research_agent(
     )
 
     if memory is None:
-        from langgraph.checkpoint.memory import MemorySaver
+        from ra_aid.checkpointer import create_checkpointer
 
-        memory = MemorySaver()
+        memory = create_checkpointer()
 
     if thread_id is None:
         thread_id = str(uuid.uuid4())
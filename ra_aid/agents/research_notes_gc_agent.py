@@ -11,10 +11,8 @@ from typing import List
 
 from langchain_core.tools import tool
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 
-from ra_aid.console.formatting import console_panel
+from ra_aid.console.formatting import console_panel, cpm
 
 from ra_aid.agent_context import mark_should_exit
 
@@ -102,9 +100,7 @@ def delete_research_notes(note_ids: List[int]) -> str:
         except Exception:
             pass  # Continue if trajectory recording fails
             
-        console.print(
-            Panel(Markdown(deleted_msg), title="Research Notes Deleted", border_style="green")
-        )
+        cpm(deleted_msg, title="Research Notes Deleted", border_style="green")
     
     if protected_notes:
         protected_msg = "Protected research notes (associated with current request):\n" + "\n".join([f"- #{note_id}: {content[:100]}..." if len(content) > 100 else f"- #{note_id}: {content}" for note_id, content in protected_notes])
@@ -125,9 +121,7 @@ def delete_research_notes(note_ids: List[int]) -> str:
         except Exception:
             pass  # Continue if trajectory recording fails
             
-        console.print(
-            Panel(Markdown(protected_msg), title="Research Notes Protected", border_style="blue")
-        )
+        cpm(protected_msg, title="Research Notes Protected", border_style="blue")
     
     if not_found_notes:
         not_found_msg = f"Research notes not found: {', '.join([f'#{note_id}' for note_id in not_found_notes])}"
@@ -19,12 +19,14 @@ from ra_aid.anthropic_message_utils import (
     anthropic_trim_messages,
 )
 from langgraph.prebuilt.chat_agent_executor import AgentState
-from litellm import token_counter, get_model_info
+from litellm import token_counter
 
 from ra_aid.agent_backends.ciayn_agent import CiaynAgent
+from ra_aid.context_compaction import compact_and_trim
 from ra_aid.database.repositories.config_repository import get_config_repository
 from ra_aid.logging_config import get_logger
-from ra_aid.models_params import DEFAULT_TOKEN_LIMIT, models_params
+from ra_aid.model_profile import get_model_profile
+from ra_aid.models_params import DEFAULT_TOKEN_LIMIT
 
 logger = get_logger(__name__)
 
@@ -188,7 +190,8 @@ def state_modifier(
 ) -> list[BaseMessage]:
     """Given the agent state and max_tokens, return a trimmed list of messages.
 
-    This uses anthropic_trim_messages which always keeps the first 2 messages.
+    Old tool outputs are compacted first (see ra_aid.context_compaction), then
+    anthropic_trim_messages drops messages, always keeping the first 2.
 
     Args:
         state: The current agent state containing messages
@@ -206,15 +209,18 @@ def state_modifier(
     model_name = get_model_name_from_chat_model(model)
     wrapped_token_counter = create_token_counter_wrapper(model_name)
 
-    result = anthropic_trim_messages(
-        messages,
-        token_counter=wrapped_token_counter,
-        max_tokens=max_input_tokens,
-        strategy="last",
-        allow_partial=False,
-        include_system=True,
-        num_messages_to_keep=2,
-    )
+    def trim(compacted: list[BaseMessage]) -> list[BaseMessage]:
+        return anthropic_trim_messages(
+            compacted,
+            token_counter=wrapped_token_counter,
+            max_tokens=max_input_tokens,
+            strategy="last",
+            allow_partial=False,
+            include_system=True,
+            num_messages_to_keep=2,
+        )
+
+    result = compact_and_trim(messages, max_input_tokens, wrapped_token_counter, trim)
 
     if len(result) < len(messages):
         logger.debug(
@@ -229,6 +235,9 @@ def base_state_modifier(
 ) -> list[BaseMessage]:
     """Given the agent state and max_tokens, return a trimmed list of messages.
 
+    Old tool outputs are compacted first, then messages after the first one
+    are dropped.
+
     Args:
         state: The current agent state containing messages
         max_tokens: Maximum number of tokens to allow (default: DEFAULT_TOKEN_LIMIT)
@@ -241,21 +250,22 @@ def base_state_modifier(
     if not messages:
         return []
 
-    first_message = messages[0]
-    remaining_messages = messages[1:]
-    first_tokens = estimate_messages_tokens([first_message])
-    new_max_tokens = max_input_tokens - first_tokens
-
-    trimmed_remaining = trim_messages(
-        remaining_messages,
-        token_counter=estimate_messages_tokens,
-        max_tokens=new_max_tokens,
-        strategy="last",
-        allow_partial=False,
-        include_system=True,
-    )
+    def trim(compacted: list[BaseMessage]) -> list[BaseMessage]:
+        first_message = compacted[0]
+        first_tokens = estimate_messages_tokens([first_message])
+        new_max_tokens = max_input_tokens - first_tokens
+
+        trimmed_remaining = trim_messages(
+            compacted[1:],
+            token_counter=estimate_messages_tokens,
+            max_tokens=new_max_tokens,
+            strategy="last",
+            allow_partial=False,
+            include_system=True,
+        )
+        return [first_message] + trimmed_remaining
 
-    result = [first_message] + trimmed_remaining
+    result = compact_and_trim(messages, max_input_tokens, estimate_messages_tokens, trim)
 
     if len(result) < len(messages):
         logger.debug(
@@ -360,46 +370,8 @@ def get_model_token_limit(
             config, agent_type, use_repository=repository_available
         )
 
-        # Always attempt to get model info from litellm first
-        provider_model = model_name if not provider else f"{provider}/{model_name}"
-
-        try:
-            model_info = get_model_info(provider_model)
-            max_input_tokens = model_info.get("max_input_tokens")
-            if max_input_tokens:
-                logger.debug(
-                    f"Using litellm token limit for {model_name}: {max_input_tokens}"
-                )
-                return adjust_claude_37_token_limit(max_input_tokens, model)
-        except Exception as e:
-            logger.debug(
-                f"Error getting model info from litellm: {e}, falling back to models_params"
-            )
-
-        # Fallback to models_params dict
-        provider_tokens = models_params.get(provider, {})
-        max_input_tokens = None
-
-        # 1. Try the original model name first
-        if model_name in provider_tokens:
-            max_input_tokens = provider_tokens[model_name].get("token_limit")
-            if max_input_tokens:
-                logger.debug(
-                    f"Found token limit for {provider}/{model_name} (direct lookup): {max_input_tokens}"
-                )
-
-        # 2. If not found, try the normalized name (remove hyphens)
-        if max_input_tokens is None:
-            normalized_name = model_name.replace("-", "")
-            if normalized_name != model_name and normalized_name in provider_tokens:
-                max_input_tokens = provider_tokens[normalized_name].get("token_limit")
-                if max_input_tokens:
-                    logger.debug(
-                        f"Found token limit for {provider}/{model_name} (normalized lookup as {normalized_name}): {max_input_tokens}"
-                    )
-
-        if max_input_tokens is None:
-            logger.debug(f"Could not find token limit for {provider}/{model_name} in models_params")
+        # Resolved once per model (litellm first, then models_params) and cached
+        max_input_tokens = get_model_profile(provider, model_name).max_input_tokens
 
         return adjust_claude_37_token_limit(max_input_tokens, model)
 
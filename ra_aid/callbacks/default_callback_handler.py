@@ -2,7 +2,6 @@ import threading
 import time
 import sys
 from langchain.chat_models.base import BaseChatModel
-import litellm
 from contextlib import contextmanager
 from contextvars import ContextVar
 from typing import Dict, Optional, Union, Any, List
@@ -16,10 +15,12 @@ from ra_aid.model_detection import (
     get_model_name_from_chat_model,
     get_provider_from_chat_model,
 )
+from ra_aid.model_profile import ModelProfile, get_model_profile
 from ra_aid.utils.singleton import Singleton
 from ra_aid.database.repositories.trajectory_repository import get_trajectory_repository
 from ra_aid.database.repositories.session_repository import get_session_repository
 from ra_aid.logging_config import get_logger
+from ra_aid.metrics import LLM_CALL_DURATION, observe
 
 # Added imports
 from ra_aid.config import DEFAULT_SHOW_COST
@@ -161,6 +162,7 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
             self.model_name = model_name
             self.provider = provider
             self._last_request_time = None
+            self._last_prompts: List[str] = []
             self._cost_limit_user_decision_continue = None  # Initialize user's decision
             self.__post_init__()
 
@@ -177,6 +179,7 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
     tiered_costs: Optional[Dict[str, Union[Decimal, int]]] = (
         None  # Store tiered costs if applicable
     )
+    model_profile: Optional[ModelProfile] = None
     _cost_limit_user_decision_continue: Optional[bool] = (
         None  # Stores user's decision on cost limit
     )
@@ -211,52 +214,18 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
             logger.error(f"Failed to initialize callback handler: {e}", exc_info=True)
 
     def _initialize_model_costs(self) -> None:
-        try:
-            model_info = litellm.get_model_info(
-                model=self.model_name, custom_llm_provider=self.provider
-            )
-            if model_info:
-                input_cost = model_info.get("input_cost_per_token", 0.0)
-                output_cost = model_info.get("output_cost_per_token", 0.0)
-                self.input_cost_per_token = Decimal(str(input_cost))
-                self.output_cost_per_token = Decimal(str(output_cost))
-                if self.input_cost_per_token and self.output_cost_per_token:
-                    return
-        except Exception as e:
-            logger.debug(f"Could not get model info from litellm: {e}")
-            # Fallback logic will proceed
-
-        # Fallback logic: Check MODEL_COSTS dictionary
-        model_cost_info = MODEL_COSTS.get(self.model_name)
-        if model_cost_info:
-            if "tier_threshold" in model_cost_info:
-                # Store the tiered structure and set default rates (under threshold)
-                self.tiered_costs = model_cost_info
-                self.input_cost_per_token = model_cost_info.get(
-                    "input_under_200k", Decimal("0")
-                )
-                self.output_cost_per_token = model_cost_info.get(
-                    "output_under_200k", Decimal("0")
-                )
-            elif "input" in model_cost_info and "output" in model_cost_info:
-                # Standard non-tiered model
-                self.input_cost_per_token = model_cost_info["input"]
-                self.output_cost_per_token = model_cost_info["output"]
-                self.tiered_costs = None
-            else:
-                # Unknown structure, default to zero
-                logger.warning(
-                    f"Unknown cost structure for model {self.model_name} in MODEL_COSTS. Defaulting to 0."
-                )
-                self.input_cost_per_token = Decimal("0")
-                self.output_cost_per_token = Decimal("0")
-                self.tiered_costs = None
-        else:
+        # Costs are resolved once per model (litellm first, then MODEL_COSTS)
+        profile = get_model_profile(self.provider, self.model_name)
+        self.model_profile = profile
+        self.input_cost_per_token = profile.input_cost_per_token
+        self.output_cost_per_token = profile.output_cost_per_token
+        self.tiered_costs = dict(profile.tiered_costs) if profile.tiered_costs else None
+
+        if profile.cost_source is None:
             # Model not found, default to zero
             logger.warning(
                 f"Model {self.model_name} not found in litellm or MODEL_COSTS. Defaulting to 0 cost."
             )
-            # --- START MODIFICATION ---
             config_repo = get_config_repository()
             show_cost = config_repo.get("show_cost", DEFAULT_SHOW_COST)
             if show_cost:
@@ -264,10 +233,6 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
                     f"Could not find costs for model '{self.model_name}'. Defaulting to 0.0.",
                     border_style="yellow",
                 )
-            # --- END MODIFICATION ---
-            self.input_cost_per_token = Decimal("0")
-            self.output_cost_per_token = Decimal("0")
-            self.tiered_costs = None
 
     def _get_tiered_cost_rates(self, prompt_tokens: int) -> tuple[Decimal, Decimal]:
         """
@@ -320,6 +285,7 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
     ) -> None:
         try:
             self._last_request_time = time.time()
+            self._last_prompts = prompts
             if "name" in serialized:
                 self.model_name = serialized["name"]
         except Exception as e:
@@ -517,6 +483,13 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
             else:
                 duration = time.time() - self._last_request_time
                 self._last_request_time = None
+                observe(
+                    LLM_CALL_DURATION,
+                    duration,
+                    provider=self.provider or "unknown",
+                    model=self.model_name or "unknown",
+                    status="ok",
+                )
 
             token_usage = self._extract_token_usage(response)
 
@@ -525,6 +498,49 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
         except Exception as e:
             logger.error(f"Error in on_llm_end: {e}", exc_info=True)
 
+    def on_llm_error(self, error: BaseException, **kwargs) -> None:
+        try:
+            duration = 0.0
+            if self._last_request_time is not None:
+                duration = time.time() - self._last_request_time
+                observe(
+                    LLM_CALL_DURATION,
+                    duration,
+                    provider=self.provider or "unknown",
+                    model=self.model_name or "unknown",
+                    status="error",
+                )
+                self._last_request_time = None
+
+            # A stream closed early (see CiaynAgent._invoke_model) never reaches
+            # on_llm_end, but the tokens generated so far are still billed
+            if isinstance(error, GeneratorExit):
+                self._update_token_counts(
+                    self._estimate_aborted_usage(kwargs.get("response")), duration
+                )
+        except Exception as e:
+            logger.error(f"Error in on_llm_error: {e}", exc_info=True)
+
+    def _estimate_aborted_usage(self, response: Optional[LLMResult]) -> dict:
+        """Estimate the usage of a stream closed before it reported usage."""
+        from ra_aid.agent_backends.ciayn_agent import CiaynAgent
+
+        token_usage = dict(self._extract_token_usage(response)) if response else {}
+        if not token_usage.get("prompt_tokens"):
+            token_usage["prompt_tokens"] = int(
+                sum(CiaynAgent._estimate_tokens(prompt) for prompt in self._last_prompts)
+            )
+        if not token_usage.get("completion_tokens"):
+            token_usage["completion_tokens"] = int(
+                sum(
+                    CiaynAgent._estimate_tokens(getattr(generation, "message", None))
+                    for generations in (response.generations if response else [])
+                    for generation in generations
+                )
+            )
+        token_usage.pop("total_tokens", None)
+        return token_usage
+
     def _handle_callback_update(
         self,
         total_tokens: int,
@@ -557,6 +573,7 @@ class DefaultCallbackHandler(BaseCallbackHandler, metaclass=Singleton):
                 current_cost=cost_float,
                 input_tokens=self.prompt_tokens,
                 output_tokens=self.completion_tokens,
+                duration_ms=int(duration * 1000),
                 session_id=self.session_totals["session_id"],
                 step_data={
                     "duration": duration,
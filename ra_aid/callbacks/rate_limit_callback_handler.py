@@ -0,0 +1,141 @@
+"""
+Callback handler that applies the shared rate limiter to LLM calls.
+
+LangChain runs ``on_chat_model_start``/``on_llm_start`` right before the
+request is sent and waits for the handler (inline for sync calls, in an
+executor for async calls), so blocking there delays the request until the
+provider's limits allow it. Attaching the handler to the model client (see
+``attach_rate_limiter``) covers every caller of the model: agents, expert
+queries and GC agents alike.
+
+Each wait is recorded as a ``rate_limit_wait`` trajectory record of the
+current session, so the session profile shows the time lost to rate limits.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+from ra_aid.logging_config import get_logger
+from ra_aid.rate_limiter import RateLimiter, get_rate_limiter
+
+logger = get_logger(__name__)
+
+
+def _estimate_tokens(texts: List[Any]) -> int:
+    # Same heuristic as the agents' context estimates
+    from ra_aid.agent_backends.ciayn_agent import CiaynAgent
+
+    return int(sum(CiaynAgent._estimate_tokens(text) for text in texts))
+
+
+def _actual_tokens(response: LLMResult) -> Optional[int]:
+    """Total tokens reported by the provider, if any."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage and usage.get("total_tokens"):
+                return usage["total_tokens"]
+    llm_output = response.llm_output or {}
+    usage = llm_output.get("token_usage") or llm_output.get("usage") or {}
+    if usage.get("total_tokens"):
+        return usage["total_tokens"]
+    if "input_tokens" in usage or "output_tokens" in usage:
+        return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+    return None
+
+
+class RateLimitCallbackHandler(BaseCallbackHandler):
+    """Waits for the rate limiter before each call of one provider/model."""
+
+    def __init__(self, limiter: RateLimiter, provider: str, model_name: Optional[str]):
+        super().__init__()
+        self.limiter = limiter
+        self.provider = provider
+        self.model_name = model_name
+        self._estimates: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, run_id: UUID, tokens: int) -> None:
+        with self._lock:
+            self._estimates[run_id] = tokens
+        waited = self.limiter.acquire(self.provider, self.model_name, tokens=tokens)
+        if waited > 0:
+            self._record_wait(waited)
+
+    def _record_wait(self, waited: float) -> None:
+        try:
+            from ra_aid.database.repositories.trajectory_repository import (
+                get_trajectory_repository,
+            )
+
+            get_trajectory_repository().create(
+                record_type="rate_limit_wait",
+                duration_ms=int(waited * 1000),
+                step_data={
+                    "limit": self.limiter.resolve(self.provider, self.model_name),
+                    "model": self.model_name,
+                    "display_title": "Rate Limit Wait",
+                },
+            )
+        except Exception as e:
+            # No session outside agent runs; the wait is still in the metrics
+            logger.debug(f"Could not record rate limit wait: {e}")
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        self._acquire(run_id, _estimate_tokens([m for batch in messages for m in batch]))
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._acquire(run_id, _estimate_tokens(prompts))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            estimate = self._estimates.pop(run_id, 0)
+        actual = _actual_tokens(response)
+        if actual is not None:
+            self.limiter.record_usage(self.provider, self.model_name, estimate, actual)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._estimates.pop(run_id, None)
+
+
+def attach_rate_limiter(
+    client: BaseChatModel, provider: str, model_name: Optional[str]
+) -> BaseChatModel:
+    """
+    Attach the shared rate limiter to a model client if its provider/model is limited.
+
+    Args:
+        client: The model client
+        provider: The provider name
+        model_name: The model name
+
+    Returns:
+        BaseChatModel: The same client
+    """
+    limiter = get_rate_limiter()
+    if limiter is None or limiter.resolve(provider, model_name) is None:
+        return client
+
+    handler = RateLimitCallbackHandler(limiter, provider, model_name)
+    if isinstance(client.callbacks, BaseCallbackManager):
+        client.callbacks.add_handler(handler)
+    else:
+        client.callbacks = list(client.callbacks or []) + [handler]
+    logger.debug(f"Rate limiter attached to {provider}/{model_name}")
+    return client
@@ -0,0 +1,235 @@
+"""
+Chat model that replays a script of responses instead of calling a provider.
+
+Used by the ``fake`` provider so agent loops can be driven end to end
+offline, e.g. to measure RA.Aid's own per-step overhead. A script is a JSON
+file (or dict) of the form::
+
+    {
+        "latency": 0.05,
+        "usage": {"input_tokens": 1200, "output_tokens": 80},
+        "responses": [
+            "read_file_tool(filepath='app/core.py')",
+            {"tool_calls": [{"name": "task_completed", "args": {"message": "done"}}],
+             "latency": 0.2}
+        ]
+    }
+
+Plain strings are CIAYN responses; dicts may set ``content``,
+``tool_calls`` (for ReAct agents), ``latency`` and ``usage``. When
+``usage`` is not given, tokens are estimated from the message sizes.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+
+class ScriptExhaustedError(RuntimeError):
+    """Raised when a scripted model is called more often than its script allows."""
+
+
+def load_script(source: Union[str, Dict[str, Any], List[Any]]) -> Dict[str, Any]:
+    """
+    Load a response script.
+
+    Args:
+        source: Path to a JSON file, a script dict, or a bare list of responses
+
+    Returns:
+        Dict[str, Any]: The script with a ``responses`` list
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            source = json.load(f)
+    if isinstance(source, list):
+        source = {"responses": source}
+    if not isinstance(source.get("responses"), list):
+        raise ValueError("A model script needs a 'responses' list")
+    return source
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _message_text(message: BaseMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return json.dumps(message.content, default=str)
+
+
+class ChatScripted(BaseChatModel):
+    """Replays scripted responses with configurable latency and token usage."""
+
+    responses: List[Union[str, Dict[str, Any]]]
+    latency: float = 0.0
+    usage: Dict[str, int] = {}
+    chunk_size: int = 64
+    model_name: str = "scripted"
+
+    _cursor: int = PrivateAttr(default=0)
+    _simulated_latency: float = PrivateAttr(default=0.0)
+    _input_tokens: int = PrivateAttr(default=0)
+    _output_tokens: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_script(
+        cls, source: Union[str, Dict[str, Any], List[Any]], **kwargs: Any
+    ) -> "ChatScripted":
+        """
+        Create a model from a script.
+
+        Args:
+            source: See load_script
+            **kwargs: Other model fields, e.g. model_name or metadata
+
+        Returns:
+            ChatScripted: The model, positioned at the first response
+        """
+        script = load_script(source)
+        fields = {
+            key: script[key]
+            for key in ("latency", "usage", "chunk_size")
+            if key in script
+        }
+        return cls(responses=script["responses"], **fields, **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def calls(self) -> int:
+        """Number of responses replayed so far."""
+        return self._cursor
+
+    @property
+    def simulated_latency(self) -> float:
+        """Seconds spent sleeping to simulate provider latency."""
+        return self._simulated_latency
+
+    @property
+    def input_tokens(self) -> int:
+        """Input tokens reported across the responses replayed so far."""
+        return self._input_tokens
+
+    @property
+    def output_tokens(self) -> int:
+        """Output tokens reported across the responses replayed so far."""
+        return self._output_tokens
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, **kwargs)
+
+    def _next_response(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._cursor >= len(self.responses):
+                raise ScriptExhaustedError(
+                    f"Model script exhausted after {len(self.responses)} responses"
+                )
+            response = self.responses[self._cursor]
+            self._cursor += 1
+        if isinstance(response, str):
+            return {"content": response}
+        return response
+
+    def _build_message(
+        self, messages: List[BaseMessage], response: Dict[str, Any]
+    ) -> AIMessage:
+        latency = response.get("latency", self.latency)
+        if latency:
+            time.sleep(latency)
+            with self._lock:
+                self._simulated_latency += latency
+
+        content = response.get("content", "")
+        tool_calls = [
+            {
+                "name": call["name"],
+                "args": call.get("args", {}),
+                "id": call.get("id") or f"call_{self._cursor}_{index}",
+                "type": "tool_call",
+            }
+            for index, call in enumerate(response.get("tool_calls", []))
+        ]
+
+        usage = {**self.usage, **response.get("usage", {})}
+        input_tokens = usage.get(
+            "input_tokens",
+            _estimate_tokens("".join(_message_text(m) for m in messages)),
+        )
+        output_tokens = usage.get(
+            "output_tokens",
+            _estimate_tokens(content + json.dumps(tool_calls)),
+        )
+        with self._lock:
+            self._input_tokens += input_tokens
+            self._output_tokens += output_tokens
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._build_message(messages, self._next_response())
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._build_message(messages, self._next_response())
+        content = message.content
+        pieces = [
+            content[start : start + self.chunk_size]
+            for start in range(0, len(content), self.chunk_size)
+        ] or [""]
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            chunk = AIMessageChunk(
+                content=piece,
+                tool_call_chunks=(
+                    [
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": position,
+                        }
+                        for position, call in enumerate(message.tool_calls)
+                    ]
+                    if last
+                    else []
+                ),
+                usage_metadata=message.usage_metadata if last else None,
+                response_metadata=message.response_metadata if last else {},
+            )
+            if run_manager and piece:
+                run_manager.on_llm_new_token(piece, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
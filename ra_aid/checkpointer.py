@@ -0,0 +1,335 @@
+"""
+Checkpointers for agent message history.
+
+All agents get their checkpointer from ``create_checkpointer`` so that the
+checkpoint storage policy is decided in one place. LangGraph's
+``MemorySaver`` keeps every checkpoint of every thread for the life of the
+process; ``PruningCheckpointer`` keeps only the latest few checkpoints per
+thread and evicts threads that have been idle longest, so long chat sessions
+and the server do not grow without bound.
+
+Checkpoints keep large message contents in the project blob store (see
+``ra_aid.database.blob_store``). With ``--checkpointer sqlite`` the
+serialized channel values, which make up most of a checkpoint, are kept in a
+SQLite file under ``.ra-aid/checkpoints/`` instead of in memory.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ra_aid.database.blob_store import BlobRefSerializer
+from ra_aid.database.connection import get_db_dir
+from ra_aid.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Retention limits of agent checkpointers: latest checkpoints kept per thread, and
+# threads kept before the least recently used ones are evicted
+MAX_CHECKPOINTS_PER_THREAD = 4
+MAX_THREADS = 32
+CHECKPOINT_BACKENDS = ("memory", "sqlite")
+CHECKPOINTS_DIRNAME = "checkpoints"
+
+_checkpointers: "weakref.WeakSet[PruningCheckpointer]" = weakref.WeakSet()
+
+
+class SqliteChannelStore(MutableMapping):
+    """
+    Mapping of checkpoint channel values kept in a SQLite file.
+
+    Used as ``InMemorySaver.blobs``: keys are (thread_id, checkpoint_ns,
+    channel, version) tuples and values are serialized (type, bytes) pairs.
+    The file is deleted when the store is closed or garbage collected.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize the store.
+
+        Args:
+            path: The SQLite file to create
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS channel_values "
+            "(key TEXT PRIMARY KEY, thread_id TEXT, type TEXT, data BLOB)"
+        )
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, SqliteChannelStore._remove, self._conn, str(self.path))
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, path: str) -> None:
+        conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _key(key: Tuple[Any, ...]) -> str:
+        return json.dumps(list(key))
+
+    def __getitem__(self, key: Tuple[Any, ...]) -> Tuple[str, bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT type, data FROM channel_values WHERE key = ?", (self._key(key),)
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0], bytes(row[1])
+
+    def __setitem__(self, key: Tuple[Any, ...], value: Tuple[str, bytes]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO channel_values (key, thread_id, type, data) VALUES (?, ?, ?, ?)",
+                (self._key(key), str(key[0]), value[0], sqlite3.Binary(value[1])),
+            )
+
+    def __delitem__(self, key: Tuple[Any, ...]) -> None:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM channel_values WHERE key = ?", (self._key(key),))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, tuple):
+            return False
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "SELECT 1 FROM channel_values WHERE key = ?", (self._key(key),)
+                ).fetchone()
+                is not None
+            )
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM channel_values").fetchall()
+        return iter([tuple(json.loads(row[0])) for row in rows])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM channel_values").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        """Get the total size of the stored values."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM channel_values"
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the connection and delete the file."""
+        self._finalizer()
+
+
+class PruningCheckpointer(InMemorySaver):
+    """
+    In-memory checkpointer that bounds how much history it retains.
+
+    After every checkpoint, only the latest ``max_checkpoints_per_thread``
+    checkpoints of the thread are kept, together with their pending writes
+    and the channel values they reference. When more than ``max_threads``
+    threads are stored, the least recently used threads are evicted.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_checkpoints_per_thread: int = MAX_CHECKPOINTS_PER_THREAD,
+        max_threads: int = MAX_THREADS,
+        serde: Any = None,
+        channel_store: Optional[MutableMapping] = None,
+    ):
+        """
+        Initialize the checkpointer.
+
+        Args:
+            max_checkpoints_per_thread: Checkpoints kept per thread and namespace (at least 2)
+            max_threads: Threads kept before the least recently used ones are evicted
+            serde: Serializer for checkpoints (default: BlobRefSerializer)
+            channel_store: Mapping to keep serialized channel values in (default: a dict)
+        """
+        super().__init__(serde=serde or BlobRefSerializer())
+        if channel_store is not None:
+            self.blobs = channel_store
+        self.max_checkpoints_per_thread = max(2, max_checkpoints_per_thread)
+        self.max_threads = max(1, max_threads)
+        # (thread_id, checkpoint_ns) -> checkpoint_id -> channel versions
+        self._channel_versions: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+        self._thread_order: "OrderedDict[str, float]" = OrderedDict()
+        self._prune_lock = threading.RLock()
+        self.pruned_checkpoints = 0
+        self.evicted_threads = 0
+        _checkpointers.add(self)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._prune_lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            self._channel_versions.setdefault((thread_id, checkpoint_ns), {})[checkpoint["id"]] = dict(
+                checkpoint["channel_versions"]
+            )
+            self._prune_thread(thread_id, checkpoint_ns)
+            self._touch(thread_id)
+            return result
+
+    def _prune_thread(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Drop all but the latest checkpoints of a thread namespace."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+        # Checkpoint IDs are time-ordered, so sorting them orders the checkpoints
+        ordered = sorted(checkpoints)
+        stale = ordered[: -self.max_checkpoints_per_thread]
+        versions = self._channel_versions.get((thread_id, checkpoint_ns), {})
+        referenced = {
+            (channel, version)
+            for checkpoint_id in ordered[-self.max_checkpoints_per_thread :]
+            for channel, version in versions.get(checkpoint_id, {}).items()
+        }
+        for checkpoint_id in stale:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for channel, version in versions.pop(checkpoint_id, {}).items():
+                if (channel, version) not in referenced:
+                    self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+            self.pruned_checkpoints += 1
+
+    def _touch(self, thread_id: str) -> None:
+        """Mark a thread as recently used and evict the least recently used threads."""
+        self._thread_order[thread_id] = time.monotonic()
+        self._thread_order.move_to_end(thread_id)
+        while len(self._thread_order) > self.max_threads:
+            evicted, _ = self._thread_order.popitem(last=False)
+            logger.debug(f"Evicting checkpoints of idle thread {evicted}")
+            self.delete_thread(evicted)
+            self.evicted_threads += 1
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete all checkpoints of a thread, e.g. once its agent has finished.
+
+        Args:
+            thread_id: The thread ID to delete
+        """
+        with self._prune_lock:
+            super().delete_thread(thread_id)
+            for key in [key for key in self._channel_versions if key[0] == thread_id]:
+                del self._channel_versions[key]
+            self._thread_order.pop(thread_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the amount of checkpoint data retained.
+
+        Returns:
+            Dict[str, Any]: Thread, checkpoint, write and channel value counts and sizes
+        """
+        with self._prune_lock:
+            checkpoints = sum(len(ns) for thread in self.storage.values() for ns in thread.values())
+            checkpoint_bytes = sum(
+                len(c[0][1]) + len(c[1][1])
+                for thread in self.storage.values()
+                for ns in thread.values()
+                for c in ns.values()
+            )
+            writes = sum(len(w) for w in self.writes.values())
+            if isinstance(self.blobs, SqliteChannelStore):
+                channel_values = len(self.blobs)
+                channel_bytes = self.blobs.size_bytes()
+            else:
+                channel_values = len(self.blobs)
+                channel_bytes = sum(len(value[1]) for value in self.blobs.values())
+            return {
+                "backend": "sqlite" if isinstance(self.blobs, SqliteChannelStore) else "memory",
+                "threads": len(self.storage),
+                "checkpoints": checkpoints,
+                "writes": writes,
+                "channel_values": channel_values,
+                "bytes": checkpoint_bytes + channel_bytes,
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "evicted_threads": self.evicted_threads,
+            }
+
+
+def checkpointer_stats() -> Dict[str, Any]:
+    """
+    Get the combined stats of all live checkpointers in this process.
+
+    Returns:
+        Dict[str, Any]: Number of checkpointers and summed stats
+    """
+    totals: Dict[str, Any] = {
+        "checkpointers": 0,
+        "threads": 0,
+        "checkpoints": 0,
+        "writes": 0,
+        "channel_values": 0,
+        "bytes": 0,
+        "pruned_checkpoints": 0,
+        "evicted_threads": 0,
+    }
+    for checkpointer in list(_checkpointers):
+        totals["checkpointers"] += 1
+        for key, value in checkpointer.stats().items():
+            if key in totals:
+                totals[key] += value
+    return totals
+
+
+def _checkpoints_dir() -> Path:
+    """Get the directory for SQLite checkpoint files, next to the project database."""
+    db_dir = get_db_dir()
+    if db_dir is not None:
+        return db_dir / CHECKPOINTS_DIRNAME
+    return Path(os.getcwd()) / ".ra-aid" / CHECKPOINTS_DIRNAME
+
+
+def create_checkpointer(backend: Optional[str] = None) -> PruningCheckpointer:
+    """
+    Create a checkpointer for an agent's message history.
+
+    Reads the ``checkpointer`` backend from the config repository when
+    available. Checkpoints are bounded by MAX_CHECKPOINTS_PER_THREAD and
+    MAX_THREADS.
+
+    Args:
+        backend: "memory" or "sqlite" (default: the configured backend, or "memory")
+
+    Returns:
+        PruningCheckpointer: A bounded checkpointer
+    """
+    try:
+        from ra_aid.database.repositories.config_repository import get_config_repository
+
+        backend = backend or get_config_repository().get("checkpointer", "memory")
+    except RuntimeError:
+        pass
+
+    channel_store = None
+    if backend == "sqlite":
+        path = _checkpoints_dir() / f"{os.getpid()}-{uuid.uuid4().hex}.db"
+        try:
+            channel_store = SqliteChannelStore(path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not create SQLite checkpoint store at {path}, using memory: {e}")
+
+    return PruningCheckpointer(channel_store=channel_store)
@@ -11,6 +11,8 @@ DEFAULT_MAX_TOOL_FAILURES = 3
 FALLBACK_TOOL_MODEL_LIMIT = 5
 RETRY_FALLBACK_COUNT = 3
 DEFAULT_TEST_CMD_TIMEOUT = 60 * 5  # 5 minutes in seconds
+DEFAULT_COMPACTION_WATERMARK = 0.5  # Fraction of the input token limit
+DEFAULT_COMPACTION_KEEP_RECENT = 4  # Most recent tool outputs never compacted
 
 # Function to get the configuration file path
 def get_config_file_path(project_state_dir: Optional[str] = None) -> Path:
@@ -122,5 +124,6 @@ VALID_PROVIDERS = [
     "fireworks",
     "groq",
     "bedrock",
-    "makehub"
+    "makehub",
+    "fake",
 ]
@@ -1,11 +1,19 @@
+from .common import console
 from .formatting import (
-    console,
     print_error,
     print_interrupt,
     print_stage_header,
     print_task_header,
 )
 from .output import print_agent_output
+from .sink import (
+    ConsoleSink,
+    HeadlessSink,
+    OutputEvent,
+    OutputSink,
+    OutputSinkManager,
+    get_output_sink,
+)
 
 __all__ = [
     "print_stage_header",
@@ -14,4 +22,10 @@ __all__ = [
     "console",
     "print_error",
     "print_interrupt",
+    "ConsoleSink",
+    "HeadlessSink",
+    "OutputEvent",
+    "OutputSink",
+    "OutputSinkManager",
+    "get_output_sink",
 ]
@@ -1,8 +1,6 @@
-from rich.markdown import Markdown
-from rich.panel import Panel
 from typing import Optional
 
-from ra_aid.console.common import console
+from ra_aid.console.sink import get_output_sink
 
 
 def cpm(message: str, title: Optional[str] = None, border_style: str = "blue", subtitle: Optional[str] = None) -> None:
@@ -16,17 +14,18 @@ def cpm(message: str, title: Optional[str] = None, border_style: str = "blue", s
         subtitle (Optional[str]): An optional subtitle for the panel. If None, will try to get cost subtitle.
     """
     from ra_aid.console.output import get_cost_subtitle
-    
-    if subtitle is None:
+
+    sink = get_output_sink()
+    if subtitle is None and sink.renders:
         subtitle = get_cost_subtitle()
-        
-    console.print(Panel(
-        Markdown(message), 
-        title=title, 
+
+    sink.panel(
+        message,
+        title=title,
         border_style=border_style,
         subtitle=subtitle,
-        subtitle_align="right" if subtitle else None
-    ))
+        subtitle_align="right" if subtitle else None,
+    )
 
 
 def console_panel(
@@ -57,23 +56,23 @@ def console_panel(
         height (Optional[int]): Optional fixed height for the panel.
     """
     from ra_aid.console.output import get_cost_subtitle
-    
-    if subtitle is None:
+
+    sink = get_output_sink()
+    if subtitle is None and sink.renders:
         subtitle = get_cost_subtitle()
-        
-    console.print(
-        Panel(
-            message,
-            title=title,
-            border_style=border_style,
-            subtitle=subtitle,
-            subtitle_align=subtitle_align if subtitle else None,
-            padding=padding,
-            expand=expand,
-            safe_box=safe_box,
-            width=width,
-            height=height,
-        )
+
+    sink.panel(
+        message,
+        title=title,
+        border_style=border_style,
+        subtitle=subtitle,
+        markdown=False,
+        subtitle_align=subtitle_align if subtitle else None,
+        padding=padding,
+        expand=expand,
+        safe_box=safe_box,
+        width=width,
+        height=height,
     )
 
 
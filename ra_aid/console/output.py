@@ -1,14 +1,13 @@
 from typing import Any, Dict, Literal, Optional, Sequence
 
 from langchain_core.messages import AIMessage, BaseMessage
-from rich.markdown import Markdown
-from rich.panel import Panel
 
 from ra_aid.exceptions import ToolExecutionError
 # Removed top-level import: from ra_aid.callbacks.default_callback_handler import DefaultCallbackHandler
 from ra_aid.database.repositories.config_repository import get_config_repository
 from ra_aid.config import DEFAULT_SHOW_COST
 from ra_aid.console.common import console
+from ra_aid.console.sink import get_output_sink
 
 
 def get_cost_subtitle() -> Optional[str]:
@@ -42,6 +41,19 @@ def get_cost_subtitle() -> Optional[str]:
     return f"Cost: ${callback.total_cost:.2f} | Tokens: {callback.total_tokens}"
 
 
+def _print_assistant_panel(text: str) -> None:
+    sink = get_output_sink()
+    sink.panel(
+        text,
+        title="🤖 Assistant",
+        subtitle=get_cost_subtitle() if sink.renders else None,
+        subtitle_align="right",
+        border_style="none",
+        kind="assistant",
+        padding=(0, 1),  # Added horizontal padding
+    )
+
+
 def print_agent_output(
     chunk: Dict[str, Any],
     agent_type: Literal["CiaynAgent", "React"],
@@ -60,45 +72,24 @@ def print_agent_output(
                 if isinstance(msg.content, list):
                     for content in msg.content:
                         if content["type"] == "text" and content["text"].strip():
-                            subtitle = get_cost_subtitle()
-
-                            console.print(
-                                Panel(
-                                    Markdown(content["text"]),
-                                    title="🤖 Assistant",
-                                    subtitle=subtitle,
-                                    subtitle_align="right",
-                                    padding=(0, 1),  # Added horizontal padding
-                                )
-                            )
+                            _print_assistant_panel(content["text"])
                 else:
                     if msg.content.strip():
-                        subtitle = get_cost_subtitle()
-
-                        console.print(
-                            Panel(
-                                Markdown(msg.content.strip()),
-                                title="🤖 Assistant",
-                                subtitle=subtitle,
-                                subtitle_align="right",
-                                padding=(0, 1),  # Added horizontal padding
-                            )
-                        )
+                        _print_assistant_panel(msg.content.strip())
     elif "tools" in chunk and "messages" in chunk["tools"]:
         for msg in chunk["tools"]["messages"]:
             if msg.status == "error" and msg.content:
                 err_msg = msg.content.strip()
-                subtitle = get_cost_subtitle()
-
-                console.print(
-                    Panel(
-                        Markdown(err_msg),
-                        title="❌ Tool Error",
-                        subtitle=subtitle,
-                        subtitle_align="right",
-                        border_style="red bold",
-                        padding=(0, 1),  # Added horizontal padding
-                    )
+                sink = get_output_sink()
+
+                sink.panel(
+                    err_msg,
+                    title="❌ Tool Error",
+                    subtitle=get_cost_subtitle() if sink.renders else None,
+                    subtitle_align="right",
+                    border_style="red bold",
+                    kind="tool_error",
+                    padding=(0, 1),  # Added horizontal padding
                 )
                 tool_name = getattr(msg, "name", None)
 
@@ -0,0 +1,221 @@
+"""
+Output sinks for console output.
+
+Panels printed through ``cpm``, ``console_panel`` and ``print_agent_output``
+and the live output of commands run by ``run_interactive_command`` go to the
+current output sink. The default ``ConsoleSink`` renders them with Rich.
+``HeadlessSink`` records them as structured events without rendering, for
+agents whose console nobody reads (server-spawned agents) and where Markdown
+parsing of large tool outputs would only cost CPU. Server-spawned agents store
+the recorded events as an ``agent_output`` trajectory record of their session.
+
+The sink is held in a context variable, so each agent thread can have its own:
+
+    with OutputSinkManager(HeadlessSink()) as sink:
+        run_research_agent(...)
+        sink.events()
+"""
+
+import contextvars
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, List, Optional, Type
+
+from rich.markdown import Markdown
+from rich.panel import Panel
+
+from ra_aid.console.common import console
+
+# Content kept per recorded event; the tail of subprocess output is kept
+DEFAULT_MAX_EVENT_CHARS = 4000
+DEFAULT_MAX_EVENTS = 1000
+
+
+@dataclass
+class OutputEvent:
+    """A unit of output recorded by a headless sink."""
+
+    kind: str
+    content: str
+    title: Optional[str] = None
+    style: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+
+class OutputSink(ABC):
+    """Destination for console output."""
+
+    # Whether output is rendered; callers skip work that only feeds rendering
+    renders = True
+
+    @abstractmethod
+    def panel(
+        self,
+        content: str,
+        *,
+        title: Optional[str] = None,
+        border_style: str = "blue",
+        subtitle: Optional[str] = None,
+        markdown: bool = True,
+        kind: str = "panel",
+        **options: Any,
+    ) -> None:
+        """
+        Output a panel.
+
+        Args:
+            content: Panel content
+            title: Panel title
+            border_style: Rich border style
+            subtitle: Panel subtitle, e.g. the cost subtitle
+            markdown: Whether content is Markdown
+            kind: Kind of output, e.g. "assistant" or "tool_error"
+            **options: Other rich.panel.Panel options
+        """
+        pass
+
+    @abstractmethod
+    def subprocess_output(self, data: bytes, stderr: bool = False) -> None:
+        """
+        Output raw data read from a subprocess.
+
+        Args:
+            data: The bytes read
+            stderr: Whether the data came from the subprocess's stderr
+        """
+        pass
+
+
+class ConsoleSink(OutputSink):
+    """Renders output to the terminal with Rich."""
+
+    def panel(
+        self,
+        content: str,
+        *,
+        title: Optional[str] = None,
+        border_style: str = "blue",
+        subtitle: Optional[str] = None,
+        markdown: bool = True,
+        kind: str = "panel",
+        **options: Any,
+    ) -> None:
+        console.print(
+            Panel(
+                Markdown(content) if markdown else content,
+                title=title,
+                border_style=border_style,
+                subtitle=subtitle,
+                **options,
+            )
+        )
+
+    def subprocess_output(self, data: bytes, stderr: bool = False) -> None:
+        os.write(2 if stderr else 1, data)
+
+
+class HeadlessSink(OutputSink):
+    """Records output as events without rendering or echoing it."""
+
+    renders = False
+
+    def __init__(
+        self,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        max_event_chars: int = DEFAULT_MAX_EVENT_CHARS,
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            max_events: Events kept; older events are dropped
+            max_event_chars: Characters of content kept per event
+        """
+        self.max_event_chars = max_event_chars
+        self.subprocess_bytes = 0
+        self._events: Deque[OutputEvent] = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def panel(
+        self,
+        content: str,
+        *,
+        title: Optional[str] = None,
+        border_style: str = "blue",
+        subtitle: Optional[str] = None,
+        markdown: bool = True,
+        kind: str = "panel",
+        **options: Any,
+    ) -> None:
+        event = OutputEvent(
+            kind=kind,
+            content=str(content)[: self.max_event_chars],
+            title=title,
+            style=border_style,
+        )
+        with self._lock:
+            self._events.append(event)
+
+    def subprocess_output(self, data: bytes, stderr: bool = False) -> None:
+        text = data.decode("utf-8", errors="replace")
+        with self._lock:
+            self.subprocess_bytes += len(data)
+            # Consecutive reads of a command are one event with the tail of its output
+            last = self._events[-1] if self._events else None
+            if last is not None and last.kind == "subprocess_output":
+                last.content = (last.content + text)[-self.max_event_chars :]
+            else:
+                self._events.append(
+                    OutputEvent(kind="subprocess_output", content=text[-self.max_event_chars :])
+                )
+
+    def events(self) -> List[OutputEvent]:
+        """Get a copy of the recorded events, oldest first."""
+        with self._lock:
+            return list(self._events)
+
+
+_default_sink = ConsoleSink()
+
+output_sink_var = contextvars.ContextVar("output_sink", default=None)
+
+
+def get_output_sink() -> OutputSink:
+    """
+    Get the output sink of the current context.
+
+    Returns:
+        OutputSink: The sink set with OutputSinkManager, or the console sink
+    """
+    return output_sink_var.get() or _default_sink
+
+
+class OutputSinkManager:
+    """Context manager that sets the output sink for the current context."""
+
+    def __init__(self, sink: OutputSink):
+        """
+        Initialize the manager.
+
+        Args:
+            sink: The sink to use inside the context
+        """
+        self.sink = sink
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> OutputSink:
+        self._token = output_sink_var.set(self.sink)
+        return self.sink
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[object],
+    ) -> None:
+        output_sink_var.reset(self._token)
+        return False
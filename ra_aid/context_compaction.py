@@ -0,0 +1,294 @@
+"""
+Compaction of old tool outputs in the agent context.
+
+Token limiting drops the oldest messages once the context is full, but until
+then every step resends the complete raw output of every earlier tool call
+(ripgrep dumps, file contents, shell logs). Compaction runs before trimming:
+once the context grows above a watermark (a fraction of the input token
+limit), the oldest large tool outputs are replaced with short stubs, or with
+summaries from an optional summarizer, until it is below the watermark again.
+The most recent outputs are always kept verbatim.
+
+Only message contents are replaced. Each compacted ``ToolMessage`` keeps its
+``tool_call_id``, so every tool call in an ``AIMessage`` is still answered by
+its result. Compacted text is cached by content hash, which keeps it stable
+across steps (the rest of the prompt prefix stays cacheable by providers) and
+means a summarizer runs at most once per distinct output.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from ra_aid.config import DEFAULT_COMPACTION_KEEP_RECENT, DEFAULT_COMPACTION_WATERMARK
+from ra_aid.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Tool outputs shorter than this are not worth compacting
+COMPACTION_MIN_CHARS = 1200
+# How much of the original output a stub keeps
+STUB_HEAD_LINES = 8
+STUB_HEAD_CHARS = 600
+COMPACTION_CACHE_SIZE = 1024
+
+# CIAYN agents pass tool results back as human messages wrapped in this tag
+LAST_RESULT_OPEN = "<last result>"
+LAST_RESULT_CLOSE = "</last result>"
+
+Summarizer = Callable[[str, str], str]
+
+
+def make_stub(tool_name: str, text: str, digest: str) -> str:
+    """
+    Build the stub that replaces a compacted tool output.
+
+    Args:
+        tool_name: Name of the tool that produced the output
+        text: The original output
+        digest: sha256 hex digest of the output
+
+    Returns:
+        str: A short description of the output with its first lines
+    """
+    lines = text.splitlines()
+    head = "\n".join(lines[:STUB_HEAD_LINES])[:STUB_HEAD_CHARS]
+    return (
+        f"[Output of {tool_name} compacted to save context: {len(lines)} lines, "
+        f"{len(text)} chars, sha256:{digest[:12]}. Call the tool again if the full output is needed.]\n"
+        f"{head}\n..."
+    )
+
+
+class ToolOutputCompactor:
+    """Replaces old tool outputs with stubs or summaries, cached by content hash."""
+
+    def __init__(
+        self,
+        summarizer: Optional[Summarizer] = None,
+        min_chars: int = COMPACTION_MIN_CHARS,
+        cache_size: int = COMPACTION_CACHE_SIZE,
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            summarizer: Optional callable (tool_name, output) -> summary, e.g. a
+                call to a cheap model. Stubs are used when it is None or fails.
+            min_chars: Outputs shorter than this are left alone
+            cache_size: Maximum number of compacted outputs kept in the cache
+        """
+        self.summarizer = summarizer
+        self.min_chars = min_chars
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compact_text(self, tool_name: str, text: str) -> str:
+        """
+        Get the compacted form of a tool output.
+
+        Args:
+            tool_name: Name of the tool that produced the output
+            text: The original output
+
+        Returns:
+            str: The stub or summary
+        """
+        digest = hashlib.sha256(text.encode("utf-8", "replace")).hexdigest()
+        with self._lock:
+            cached = self._cache.get(digest)
+            if cached is not None:
+                self._cache.move_to_end(digest)
+                return cached
+
+        compacted = None
+        if self.summarizer is not None:
+            try:
+                summary = self.summarizer(tool_name, text)
+                if summary and len(summary) < len(text):
+                    compacted = (
+                        f"[Summary of {tool_name} output ({len(text)} chars, sha256:{digest[:12]})]\n{summary}"
+                    )
+            except Exception as e:
+                logger.debug(f"Summarizing {tool_name} output failed, using a stub: {e}")
+        if compacted is None:
+            compacted = make_stub(tool_name, text, digest)
+
+        with self._lock:
+            self._cache[digest] = compacted
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compacted
+
+    def _compactable(self, message: BaseMessage, tool_names: Dict[str, str]):
+        """Get (tool_name, output text) of a compactable tool output, or None."""
+        if isinstance(message, ToolMessage):
+            if not isinstance(message.content, str) or len(message.content) < self.min_chars:
+                return None
+            name = message.name or tool_names.get(message.tool_call_id, "tool")
+            return name, message.content
+        if isinstance(message, HumanMessage) and isinstance(message.content, str):
+            start = message.content.find(LAST_RESULT_OPEN)
+            end = message.content.rfind(LAST_RESULT_CLOSE)
+            if start == -1 or end == -1:
+                return None
+            text = message.content[start + len(LAST_RESULT_OPEN) : end]
+            if len(text) < self.min_chars:
+                return None
+            return "previous tool call", text
+        return None
+
+    def _replace(self, message: BaseMessage, tool_name: str, text: str) -> BaseMessage:
+        compacted = self.compact_text(tool_name, text)
+        if isinstance(message, ToolMessage):
+            return message.model_copy(update={"content": compacted})
+        content = message.content.replace(text, compacted, 1)
+        return message.model_copy(update={"content": content})
+
+    def compact_messages(
+        self,
+        messages: Sequence[BaseMessage],
+        max_input_tokens: Optional[int],
+        token_counter: Callable[[Sequence[BaseMessage]], int],
+        watermark: float = DEFAULT_COMPACTION_WATERMARK,
+        keep_recent: int = DEFAULT_COMPACTION_KEEP_RECENT,
+    ) -> List[BaseMessage]:
+        """
+        Compact the oldest tool outputs while the messages are above the watermark.
+
+        Args:
+            messages: The messages sent to the model
+            max_input_tokens: Input token limit; compaction is off when None
+            token_counter: Counts the tokens of a sequence of messages
+            watermark: Fraction of max_input_tokens above which outputs are compacted (0 disables)
+            keep_recent: Number of most recent tool outputs that are never compacted
+
+        Returns:
+            List[BaseMessage]: The messages, with compacted copies of old tool outputs
+        """
+        messages = list(messages)
+        if not messages or not max_input_tokens or watermark <= 0:
+            return messages
+
+        budget = int(max_input_tokens * watermark)
+        total_tokens = token_counter(messages)
+        if total_tokens <= budget:
+            return messages
+
+        tool_names = {
+            call["id"]: call["name"]
+            for message in messages
+            if isinstance(message, AIMessage)
+            for call in message.tool_calls
+        }
+        candidates = [
+            (index, found)
+            for index, message in enumerate(messages)
+            if (found := self._compactable(message, tool_names)) is not None
+        ]
+        if keep_recent > 0:
+            candidates = candidates[:-keep_recent]
+
+        compacted_count = 0
+        for index, (tool_name, text) in candidates:
+            if total_tokens <= budget:
+                break
+            original = messages[index]
+            replacement = self._replace(original, tool_name, text)
+            total_tokens += token_counter([replacement]) - token_counter([original])
+            messages[index] = replacement
+            compacted_count += 1
+
+        if compacted_count:
+            logger.debug(
+                f"Compacted {compacted_count} tool outputs; context now ~{total_tokens} tokens "
+                f"(watermark {budget} of {max_input_tokens})"
+            )
+        return messages
+
+
+_compactor: Optional[ToolOutputCompactor] = None
+_compactor_lock = threading.Lock()
+
+
+def get_tool_output_compactor() -> ToolOutputCompactor:
+    """Get the process-wide compactor, so its cache is shared between agents."""
+    global _compactor
+    with _compactor_lock:
+        if _compactor is None:
+            _compactor = ToolOutputCompactor()
+        return _compactor
+
+
+def set_tool_output_compactor(compactor: Optional[ToolOutputCompactor]) -> None:
+    """Replace the process-wide compactor, e.g. with one that has a summarizer."""
+    global _compactor
+    with _compactor_lock:
+        _compactor = compactor
+
+
+def compact_context(
+    messages: Sequence[BaseMessage],
+    max_input_tokens: Optional[int],
+    token_counter: Callable[[Sequence[BaseMessage]], int],
+) -> List[BaseMessage]:
+    """
+    Compact messages with the configured watermark and the shared compactor.
+
+    Reads ``compaction_watermark`` and ``compaction_keep_recent`` from the
+    config repository.
+
+    Args:
+        messages: The messages sent to the model
+        max_input_tokens: Input token limit; compaction is off when None
+        token_counter: Counts the tokens of a sequence of messages
+
+    Returns:
+        List[BaseMessage]: The messages, with compacted copies of old tool outputs
+    """
+    from ra_aid.database.repositories.config_repository import get_config_repository
+
+    try:
+        config_repo = get_config_repository()
+        watermark = config_repo.get("compaction_watermark", DEFAULT_COMPACTION_WATERMARK)
+        keep_recent = config_repo.get("compaction_keep_recent", DEFAULT_COMPACTION_KEEP_RECENT)
+    except RuntimeError:
+        watermark, keep_recent = DEFAULT_COMPACTION_WATERMARK, DEFAULT_COMPACTION_KEEP_RECENT
+    if watermark is None:
+        watermark = DEFAULT_COMPACTION_WATERMARK
+
+    return get_tool_output_compactor().compact_messages(
+        messages,
+        max_input_tokens,
+        token_counter,
+        watermark=watermark,
+        keep_recent=keep_recent,
+    )
+
+
+def compact_and_trim(
+    messages: Sequence[BaseMessage],
+    max_input_tokens: Optional[int],
+    token_counter: Callable[[Sequence[BaseMessage]], int],
+    trim: Callable[[List[BaseMessage]], List[BaseMessage]],
+) -> List[BaseMessage]:
+    """
+    Fit messages into the input limit: compact old tool outputs, then trim.
+
+    Compaction always runs first, so whole messages are only dropped once
+    replacing tool outputs with stubs is not enough.
+
+    Args:
+        messages: The messages sent to the model
+        max_input_tokens: Input token limit; compaction is off when None
+        token_counter: Counts the tokens of a sequence of messages
+        trim: Drops whole messages from the compacted list until it fits
+
+    Returns:
+        List[BaseMessage]: The compacted and trimmed messages
+    """
+    return trim(compact_context(messages, max_input_tokens, token_counter))
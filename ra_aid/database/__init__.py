@@ -5,7 +5,14 @@ This package provides database functionality for the ra_aid application,
 including connection management, models, utility functions, and migrations.
 """
 
-from ra_aid.database.connection import DatabaseManager, close_db, get_db, init_db
+from ra_aid.database.connection import (
+    DatabaseManager,
+    close_db,
+    get_db,
+    get_db_dir,
+    init_db,
+    read_snapshot,
+)
 from ra_aid.database.migrations import (
     MigrationManager,
     create_new_migration,
@@ -15,12 +22,18 @@ from ra_aid.database.migrations import (
 )
 from ra_aid.database.models import BaseModel, initialize_database
 from ra_aid.database.utils import ensure_tables_created, get_model_count, truncate_table
+from ra_aid.database.writer import DatabaseWriter, get_database_writer, run_write
 
 __all__ = [
     "init_db",
     "get_db",
+    "get_db_dir",
     "close_db",
     "DatabaseManager",
+    "read_snapshot",
+    "DatabaseWriter",
+    "get_database_writer",
+    "run_write",
     "BaseModel",
     "initialize_database",
     "get_model_count",
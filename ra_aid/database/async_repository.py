@@ -0,0 +1,138 @@
+"""
+Async access to the synchronous peewee repositories.
+
+The repositories in ra_aid.database.repositories are synchronous. Calling them
+directly from an ``async def`` FastAPI endpoint blocks the event loop for the
+duration of the query, which stalls websocket broadcasting and every other
+request. This module runs repository calls on a small, bounded pool of
+database threads instead, with a per-call timeout.
+
+Each pool thread gets its own SQLite connection (see ra_aid.database.connection),
+so this is intended for file-based databases; an in-memory database is only
+visible to the connection that created it.
+
+Example:
+    sessions = AsyncRepository(get_session_repository())
+    items, total = await sessions.get_all(offset=0, limit=10)
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from ra_aid.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Number of threads allowed to run database queries concurrently
+DEFAULT_DB_POOL_SIZE = 4
+
+# Default number of seconds a single database call may take before it times out
+DEFAULT_DB_TIMEOUT = 30.0
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class DatabaseTimeoutError(Exception):
+    """Raised when a database call does not complete within its timeout."""
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared database thread pool, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: The bounded pool used for database calls
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_DB_POOL_SIZE, thread_name_prefix="ra-aid-db"
+            )
+        return _executor
+
+
+def shutdown_db_executor(wait: bool = True) -> None:
+    """
+    Shut down the shared database thread pool.
+
+    Args:
+        wait: Whether to wait for running calls to finish
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_in_db_thread(
+    fn: Callable[..., T], *args: Any, timeout: Optional[float] = DEFAULT_DB_TIMEOUT, **kwargs: Any
+) -> T:
+    """
+    Run a synchronous database call on the database thread pool.
+
+    The caller's context variables (repositories, config, database) are
+    copied into the pool thread, so repository getters keep working there.
+
+    Args:
+        fn: The synchronous callable to run
+        *args: Positional arguments for the callable
+        timeout: Seconds to wait for the result, or None to wait forever
+        **kwargs: Keyword arguments for the callable
+
+    Returns:
+        The callable's return value
+
+    Raises:
+        DatabaseTimeoutError: If the call does not finish within the timeout
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    future = loop.run_in_executor(
+        get_db_executor(), functools.partial(ctx.run, fn, *args, **kwargs)
+    )
+    try:
+        return await asyncio.wait_for(future, timeout=timeout)
+    except asyncio.TimeoutError:
+        name = getattr(fn, "__name__", repr(fn))
+        logger.warning(f"Database call {name} timed out after {timeout}s")
+        raise DatabaseTimeoutError(f"Database call {name} timed out after {timeout}s")
+
+
+class AsyncRepository:
+    """
+    Async facade over a synchronous repository.
+
+    Every callable attribute of the wrapped repository is exposed as a
+    coroutine function that runs on the database thread pool.
+    """
+
+    def __init__(self, repo: Any, timeout: Optional[float] = DEFAULT_DB_TIMEOUT):
+        """
+        Initialize the facade.
+
+        Args:
+            repo: The synchronous repository to wrap
+            timeout: Per-call timeout in seconds, or None to wait forever
+        """
+        self._repo = repo
+        self._timeout = timeout
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._repo, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run_in_db_thread(attr, *args, timeout=self._timeout, **kwargs)
+
+        return call
@@ -0,0 +1,312 @@
+"""
+Content-addressed blob store for large tool outputs.
+
+Large tool results (ripgrep output, file contents, shell logs) used to be
+stored inline in every trajectory row and in every LangGraph checkpoint of
+the message history. They are now written once to ``blobs/`` next to the
+project database (``.ra-aid/blobs/``), zlib-compressed and named by the
+SHA-256 of their content, so identical outputs are stored once.
+
+Rows and checkpoints hold small references instead:
+
+- JSON values (trajectory ``tool_result``/``step_data``) replace large strings
+  with ``{"$blob": "<sha256>", "size": <chars>, "preview": "<first chars>"}``.
+  ``expand_blob_refs`` turns them back into the original strings; the API and
+  UI serializers do this only when a trajectory is actually sent.
+- Message contents in checkpoints become ``BLOB_MESSAGE_PREFIX + sha256``;
+  ``BlobRefSerializer`` swaps them in and out around the checkpointer's
+  serializer.
+
+In-memory databases have no directory for blobs, so values are kept inline.
+"""
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ra_aid.logging_config import get_logger
+from ra_aid.utils.file_utils import atomic_write
+
+logger = get_logger(__name__)
+
+# Strings at least this long (in characters) are moved to the blob store
+BLOB_MIN_CHARS = 4096
+BLOB_PREVIEW_CHARS = 200
+BLOB_REF_KEY = "$blob"
+BLOB_MESSAGE_PREFIX = "\x00ra-aid-blob:"
+BLOBS_DIRNAME = "blobs"
+# Decompressed blobs kept in memory for repeated expansion
+BLOB_CACHE_SIZE = 64
+
+
+class BlobStore:
+    """Stores compressed blobs in a directory, named by the SHA-256 of their content."""
+
+    def __init__(self, root: Path, cache_size: int = BLOB_CACHE_SIZE):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory of the blobs (created on first write)
+            cache_size: Number of decompressed blobs kept in memory
+        """
+        self.root = Path(root)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, text: str) -> str:
+        """
+        Store a string unless an identical one is already stored.
+
+        Args:
+            text: The content to store
+
+        Returns:
+            str: The SHA-256 hex digest that references the content
+        """
+        data = text.encode("utf-8", "surrogatepass")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            # Concurrent writers produce identical files, so the last rename wins harmlessly
+            atomic_write(path, zlib.compress(data, 6))
+        self._remember(digest, text)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """
+        Load a stored string.
+
+        Args:
+            digest: The SHA-256 hex digest returned by put()
+
+        Returns:
+            Optional[str]: The content, or None if the blob is missing or corrupt
+        """
+        with self._lock:
+            text = self._cache.get(digest)
+            if text is not None:
+                self._cache.move_to_end(digest)
+                return text
+        try:
+            text = zlib.decompress(self._path(digest).read_bytes()).decode("utf-8", "surrogatepass")
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Could not read blob {digest}: {e}")
+            return None
+        self._remember(digest, text)
+        return text
+
+    def _remember(self, digest: str, text: str) -> None:
+        with self._lock:
+            self._cache[digest] = text
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of stored blobs and their compressed size on disk.
+
+        Returns:
+            Dict[str, int]: {"blobs": count, "bytes": total size}
+        """
+        count = 0
+        size = 0
+        if self.root.is_dir():
+            for path in self.root.glob("??/*"):
+                if not path.name.startswith(".tmp-"):
+                    count += 1
+                    size += path.stat().st_size
+        return {"blobs": count, "bytes": size}
+
+
+_stores: Dict[Path, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """
+    Get the blob store of the current project database.
+
+    Returns:
+        Optional[BlobStore]: The store in the database directory, or None for
+        in-memory or uninitialized databases
+    """
+    from ra_aid.database.connection import get_db_dir
+
+    db_dir = get_db_dir()
+    if db_dir is None:
+        return None
+    root = db_dir / BLOBS_DIRNAME
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = BlobStore(root)
+        return store
+
+
+def externalize_large_values(value: Any, store: Optional[BlobStore] = None, min_chars: int = BLOB_MIN_CHARS) -> Any:
+    """
+    Replace large strings in a JSON-compatible value with blob references.
+
+    Args:
+        value: Dict, list, string or scalar
+        store: Blob store to write to (default: get_blob_store())
+        min_chars: Strings at least this long are moved to the store
+
+    Returns:
+        Any: A copy of the value with references, or the value itself if no store is available
+    """
+    store = store or get_blob_store()
+    if store is None:
+        return value
+
+    def convert(item: Any) -> Any:
+        if isinstance(item, str):
+            if len(item) < min_chars:
+                return item
+            return {
+                BLOB_REF_KEY: store.put(item),
+                "size": len(item),
+                "preview": item[:BLOB_PREVIEW_CHARS],
+            }
+        if isinstance(item, dict):
+            return {key: convert(val) for key, val in item.items()}
+        if isinstance(item, (list, tuple)):
+            return [convert(val) for val in item]
+        return item
+
+    try:
+        return convert(value)
+    except OSError as e:
+        logger.warning(f"Could not write to blob store {store.root}, storing value inline: {e}")
+        return value
+
+
+def is_blob_ref(value: Any) -> bool:
+    """Whether a value is a blob reference created by externalize_large_values()."""
+    return isinstance(value, dict) and isinstance(value.get(BLOB_REF_KEY), str) and "size" in value
+
+
+def expand_blob_refs(value: Any, store: Optional[BlobStore] = None) -> Any:
+    """
+    Replace blob references in a JSON-compatible value with the stored strings.
+
+    Missing blobs are left as references, whose preview still shows the start
+    of the content.
+
+    Args:
+        value: Dict, list or scalar, possibly containing references
+        store: Blob store to read from (default: get_blob_store())
+
+    Returns:
+        Any: A copy of the value with references expanded
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+    store = store or get_blob_store()
+    if store is None:
+        return value
+
+    def convert(item: Any) -> Any:
+        if is_blob_ref(item):
+            text = store.get(item[BLOB_REF_KEY])
+            return item if text is None else text
+        if isinstance(item, dict):
+            return {key: convert(val) for key, val in item.items()}
+        if isinstance(item, list):
+            return [convert(val) for val in item]
+        return item
+
+    return convert(value)
+
+
+class BlobRefSerializer:
+    """
+    Checkpoint serializer that keeps large message contents in the blob store.
+
+    Wraps another LangGraph serializer. Before serializing, string contents of
+    messages above ``min_chars`` are replaced by references; after loading,
+    they are restored, so agents always see the original messages.
+    """
+
+    def __init__(self, serde: Any = None, min_chars: int = BLOB_MIN_CHARS):
+        """
+        Initialize the serializer.
+
+        Args:
+            serde: The wrapped serializer (default: LangGraph's JsonPlusSerializer)
+            min_chars: Message contents at least this long are moved to the store
+        """
+        if serde is None:
+            from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+            serde = JsonPlusSerializer()
+        self.serde = serde
+        self.min_chars = min_chars
+
+    def _map_messages(self, value: Any, convert) -> Any:
+        from langchain_core.messages import BaseMessage
+
+        if isinstance(value, BaseMessage):
+            return convert(value)
+        if isinstance(value, list):
+            mapped = [self._map_messages(item, convert) for item in value]
+            return mapped if any(a is not b for a, b in zip(mapped, value)) else value
+        if isinstance(value, dict):
+            mapped = {key: self._map_messages(item, convert) for key, item in value.items()}
+            return mapped if any(mapped[key] is not value[key] for key in value) else value
+        return value
+
+    def _externalize(self, value: Any) -> Any:
+        store = get_blob_store()
+        if store is None:
+            return value
+
+        def convert(message):
+            content = message.content
+            if not isinstance(content, str) or len(content) < self.min_chars:
+                return message
+            try:
+                digest = store.put(content)
+            except OSError as e:
+                logger.debug(f"Keeping message content inline: {e}")
+                return message
+            return message.model_copy(update={"content": BLOB_MESSAGE_PREFIX + digest})
+
+        return self._map_messages(value, convert)
+
+    def _expand(self, value: Any) -> Any:
+        store = None
+
+        def convert(message):
+            nonlocal store
+            content = message.content
+            if not isinstance(content, str) or not content.startswith(BLOB_MESSAGE_PREFIX):
+                return message
+            store = store or get_blob_store()
+            text = store.get(content[len(BLOB_MESSAGE_PREFIX) :]) if store else None
+            if text is None:
+                text = "[Content unavailable: blob missing from the blob store]"
+            return message.model_copy(update={"content": text})
+
+        return self._map_messages(value, convert)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.serde.dumps(self._externalize(obj))
+
+    def loads(self, data: bytes) -> Any:
+        return self._expand(self.serde.loads(data))
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        return self.serde.dumps_typed(self._externalize(obj))
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        return self._expand(self.serde.loads_typed(data))
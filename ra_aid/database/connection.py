@@ -3,12 +3,21 @@ Database connection management for ra_aid.
 
 This module provides functions to initialize, get, and close database connections.
 It also provides a context manager for database connections.
+
+File-based databases are shared process-wide: every thread that initializes a
+database for the same path gets the same ``peewee.SqliteDatabase`` object, and
+peewee keeps a separate connection per thread. Connections wait up to
+``BUSY_TIMEOUT_SECONDS`` for SQLite locks instead of failing immediately with
+``database is locked``.
 """
 
+import contextlib
 import contextvars
+import logging
 import os
+import threading
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Iterator, Optional
 
 import peewee
 
@@ -21,6 +30,15 @@ from ra_aid.logging_config import get_logger
 db_var = contextvars.ContextVar("db", default=None)
 logger = get_logger(__name__)
 
+# How long a connection waits on a locked database before raising
+BUSY_TIMEOUT_SECONDS = 30
+
+# Process-wide registry of file-based databases keyed by absolute path.
+# peewee tracks connection state per thread, so sharing the database object
+# gives each thread its own connection to the same file.
+_file_databases: Dict[str, peewee.SqliteDatabase] = {}
+_file_databases_lock = threading.Lock()
+
 
 class DatabaseManager:
     """
@@ -217,14 +235,15 @@ def init_db(in_memory: bool = False, base_dir: Optional[str] = None) -> peewee.S
         )
 
         # Check parent directory permissions and contents for debugging
-        try:
-            parent_dir = os.path.dirname(ra_aid_dir_str)
-            parent_perms = oct(os.stat(parent_dir).st_mode)[-3:]
-            parent_contents = os.listdir(parent_dir)
-            logger.debug(f"Parent directory {parent_dir} permissions: {parent_perms}")
-            logger.debug(f"Parent directory contents: {parent_contents}")
-        except Exception as e:
-            logger.debug(f"Could not check parent directory: {str(e)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                parent_dir = os.path.dirname(ra_aid_dir_str)
+                parent_perms = oct(os.stat(parent_dir).st_mode)[-3:]
+                parent_contents = os.listdir(parent_dir)
+                logger.debug("Parent directory %s permissions: %s", parent_dir, parent_perms)
+                logger.debug("Parent directory contents: %s", parent_contents)
+            except Exception as e:
+                logger.debug("Could not check parent directory: %s", e)
 
         if not os_exists or not is_dir:
             error_msg = f"Directory does not exist or is not a directory after creation attempts: {ra_aid_dir_str}"
@@ -234,17 +253,18 @@ def init_db(in_memory: bool = False, base_dir: Optional[str] = None) -> peewee.S
             raise FileNotFoundError(f"Failed to create directory: {ra_aid_dir_str}")
 
         # Check directory permissions
-        try:
-            permissions = oct(os.stat(ra_aid_dir_str).st_mode)[-3:]
-            logger.debug(
-                f"Directory created/verified: {ra_aid_dir_str} with permissions {permissions}"
-            )
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                permissions = oct(os.stat(ra_aid_dir_str).st_mode)[-3:]
+                logger.debug(
+                    "Directory created/verified: %s with permissions %s", ra_aid_dir_str, permissions
+                )
 
-            # List directory contents for debugging
-            dir_contents = os.listdir(ra_aid_dir_str)
-            logger.debug(f"Directory contents: {dir_contents}")
-        except Exception as e:
-            logger.debug(f"Could not check directory details: {str(e)}")
+                # List directory contents for debugging
+                dir_contents = os.listdir(ra_aid_dir_str)
+                logger.debug("Directory contents: %s", dir_contents)
+            except Exception as e:
+                logger.debug("Could not check directory details: %s", e)
 
         # Database path for file-based database - use os.path.join for maximum compatibility
         db_path = os.path.join(ra_aid_dir_str, "pk.db")
@@ -275,14 +295,15 @@ def init_db(in_memory: bool = False, base_dir: Optional[str] = None) -> peewee.S
 
         # Initialize the database connection
         logger.debug(f"Initializing SQLite database at: {db_path}")
-        db = peewee.SqliteDatabase(
-            db_path,
-            pragmas={
-                "journal_mode": "wal",  # Write-Ahead Logging for better concurrency
-                "foreign_keys": 1,  # Enforce foreign key constraints
-                "cache_size": -1024 * 32,  # 32MB cache
-            },
-        )
+        if db_path == ":memory:":
+            # Every in-memory connection is a distinct database, so never share them
+            db = _create_sqlite_database(db_path)
+        else:
+            with _file_databases_lock:
+                db = _file_databases.get(db_path)
+                if db is None:
+                    db = _create_sqlite_database(db_path)
+                    _file_databases[db_path] = db
 
         # Always explicitly connect to ensure the connection is established
         if db.is_closed():
@@ -331,6 +352,50 @@ def init_db(in_memory: bool = False, base_dir: Optional[str] = None) -> peewee.S
         raise
 
 
+def _create_sqlite_database(db_path: str) -> peewee.SqliteDatabase:
+    """
+    Create a peewee SQLite database configured for concurrent access.
+
+    Args:
+        db_path: Path of the database file, or ":memory:"
+
+    Returns:
+        peewee.SqliteDatabase: The configured (unconnected) database
+    """
+    return peewee.SqliteDatabase(
+        db_path,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        pragmas={
+            "journal_mode": "wal",  # Write-Ahead Logging for better concurrency
+            "foreign_keys": 1,  # Enforce foreign key constraints
+            "cache_size": -1024 * 32,  # 32MB cache
+            "busy_timeout": BUSY_TIMEOUT_SECONDS * 1000,  # Wait on locks (ms)
+            "synchronous": "normal",  # Safe with WAL and avoids an fsync per commit
+        },
+    )
+
+
+@contextlib.contextmanager
+def read_snapshot(db: Optional[peewee.SqliteDatabase] = None) -> Iterator[peewee.SqliteDatabase]:
+    """
+    Run a group of reads against a single consistent WAL snapshot.
+
+    All queries inside the block see the database as of the first read, even
+    while the writer thread keeps committing. Readers never block the writer
+    in WAL mode, so this is safe to use for long exports.
+
+    Args:
+        db: Database to read from. If None, uses the current connection.
+
+    Yields:
+        peewee.SqliteDatabase: The database the snapshot was opened on
+    """
+    if db is None:
+        db = get_db()
+    with db.atomic("DEFERRED"):
+        yield db
+
+
 def get_db(base_dir: Optional[str] = None) -> peewee.SqliteDatabase:
     """
     Get the current database connection.
@@ -372,6 +437,24 @@ def get_db(base_dir: Optional[str] = None) -> peewee.SqliteDatabase:
     return db
 
 
+def get_db_dir() -> Optional[Path]:
+    """
+    Get the directory of the current project database file.
+
+    Caches kept next to the project database (e.g. in ``.ra-aid/``) live here.
+
+    Returns:
+        Optional[Path]: The directory, or None when no database is initialized
+        or it is in memory
+    """
+    from ra_aid.database.models import database_proxy
+
+    db_path = getattr(getattr(database_proxy, "obj", None), "database", None)
+    if not isinstance(db_path, str) or not db_path or db_path == ":memory:" or db_path.startswith("file:"):
+        return None
+    return Path(os.path.abspath(db_path)).parent
+
+
 def close_db() -> None:
     """
     Close the current database connection if it exists.
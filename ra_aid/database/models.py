@@ -49,10 +49,11 @@ def initialize_database():
             ResearchNote,
             Trajectory,
             Session,
+            RateLimitBucket,
         )
 
         db.create_tables(
-            [KeyFact, KeySnippet, HumanInput, ResearchNote, Trajectory, Session],
+            [KeyFact, KeySnippet, HumanInput, ResearchNote, Trajectory, Session, RateLimitBucket],
             safe=True,
         )
         logger.debug("Ensured database tables exist")
@@ -129,7 +130,7 @@ class Session(BaseModel):
     )
     status = peewee.CharField(
         max_length=20, default="pending", index=True
-    )  # e.g., 'pending', 'running', 'completed', 'error', 'halting', 'halted'
+    )  # e.g., 'pending', 'queued', 'running', 'completed', 'error', 'halting', 'halted'
     plan = peewee.TextField(null=True)
 
     class Meta:
@@ -227,6 +228,7 @@ class Trajectory(BaseModel):
     - UI rendering data for displaying the tool execution
     - Cost and token usage metrics for tracking resource utilization
     - Detailed token usage breakdown (input_tokens and output_tokens)
+    - How long the tool call, model call or agent stage took (duration_ms)
     - Error information (when a tool execution fails)
     """
 
@@ -245,6 +247,9 @@ class Trajectory(BaseModel):
     output_tokens = peewee.IntegerField(
         null=True, help_text="Completion/output token usage for last message"
     )
+    duration_ms = peewee.IntegerField(
+        null=True, help_text="Duration of the tool call, model call or agent stage in milliseconds"
+    )
     is_error = peewee.BooleanField(
         default=False, help_text="Flag indicating if this record represents an error"
     )
@@ -258,3 +263,21 @@ class Trajectory(BaseModel):
 
     class Meta:
         table_name = "trajectory"
+
+
+class RateLimitBucket(BaseModel):
+    """
+    Model representing the state of one LLM rate limit token bucket.
+
+    Buckets are only stored in the database when rate limits are shared
+    between processes (see ra_aid.rate_limiter). Each row holds the current
+    level of a request or token bucket and the time it was last refilled.
+    """
+
+    key = peewee.TextField(unique=True, help_text="Limit key and bucket kind, e.g. 'anthropic:requests'")
+    level = peewee.FloatField(help_text="Current bucket level; negative while callers wait")
+    refreshed_at = peewee.FloatField(help_text="Unix time of the last refill")
+    # created_at and updated_at are inherited from BaseModel
+
+    class Meta:
+        table_name = "rate_limit_bucket"
@@ -11,6 +11,8 @@ from typing import Dict, Any, Optional
 
 from pydantic import BaseModel, ConfigDict, field_serializer, field_validator
 
+from ra_aid.database.blob_store import expand_blob_refs
+
 
 class SessionModel(BaseModel):
     """
@@ -28,7 +30,7 @@ class SessionModel(BaseModel):
         command_line: Command line arguments used to start the program
         program_version: Version of the program
         machine_info: Dictionary containing machine-specific metadata
-        status: The current lifecycle state of the session (e.g., 'pending', 'running', 'completed', 'error', 'halting', 'halted')
+        status: The current lifecycle state of the session (e.g., 'pending', 'queued', 'running', 'completed', 'error', 'halting', 'halted')
         display_name: Display name for the session (derived from human input or command line)
         plan: The execution plan for the session
     """
@@ -224,6 +226,7 @@ class TrajectoryModel(BaseModel):
         current_cost: Optional cost of the last LLM message
         input_tokens: Optional input/prompt token usage
         output_tokens: Optional output/completion token usage
+        duration_ms: Optional duration of the tool call, model call or agent stage in milliseconds
         is_error: Flag indicating if this record represents an error
         error_message: The error message if is_error is True
         error_type: The type/class of the error if is_error is True
@@ -242,6 +245,7 @@ class TrajectoryModel(BaseModel):
     current_cost: Optional[float] = None
     input_tokens: Optional[int] = None
     output_tokens: Optional[int] = None
+    duration_ms: Optional[int] = None
     is_error: bool = False
     error_message: Optional[str] = None
     error_type: Optional[str] = None
@@ -354,7 +358,7 @@ class TrajectoryModel(BaseModel):
     @field_serializer("tool_result")
     def serialize_tool_result(self, tool_result: Optional[Any]) -> Optional[str]:
         """
-        Serialize the tool_result object to a JSON string for storage.
+        Serialize the tool_result object to a JSON string, expanding blob references.
 
         Args:
             tool_result: Object to serialize
@@ -365,12 +369,12 @@ class TrajectoryModel(BaseModel):
         if tool_result is None:
             return None
 
-        return json.dumps(tool_result)
+        return json.dumps(expand_blob_refs(tool_result))
 
     @field_serializer("step_data")
     def serialize_step_data(self, step_data: Optional[Dict[str, Any]]) -> Optional[str]:
         """
-        Serialize the step_data dictionary to a JSON string for storage.
+        Serialize the step_data dictionary to a JSON string, expanding blob references.
 
         Args:
             step_data: Dictionary to serialize
@@ -381,4 +385,4 @@ class TrajectoryModel(BaseModel):
         if step_data is None:
             return None
 
-        return json.dumps(step_data)
+        return json.dumps(expand_blob_refs(step_data))
@@ -12,6 +12,7 @@ import peewee
 
 from ra_aid.database.models import HumanInput, Session
 from ra_aid.database.pydantic_models import HumanInputModel
+from ra_aid.database.writer import run_write
 from ra_aid.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -159,7 +160,10 @@ class HumanInputRepository:
                 except peewee.DoesNotExist:
                     logger.warning(f"Session with ID {session_id} not found, creating human input without session")
             
-            input_record = HumanInput.create(content=content, source=source, session=session)
+            input_record = run_write(
+                HumanInput._meta.database,
+                lambda: HumanInput.create(content=content, source=source, session=session),
+            )
             logger.debug(f"Created human input ID {input_record.id} from {source}" + 
                         (f" for session {session_id}" if session_id else ""))
             return self._to_model(input_record)
@@ -215,7 +219,7 @@ class HumanInputRepository:
             if source is not None:
                 input_record.source = source
                 
-            input_record.save()
+            run_write(HumanInput._meta.database, input_record.save)
             logger.debug(f"Updated human input ID {input_id}")
             return self._to_model(input_record)
         except peewee.DatabaseError as e:
@@ -243,7 +247,7 @@ class HumanInputRepository:
                 return False
             
             # Delete the record
-            input_record.delete_instance()
+            run_write(HumanInput._meta.database, input_record.delete_instance)
             logger.debug(f"Deleted human input ID {input_id}")
             return True
         except peewee.DatabaseError as e:
@@ -351,7 +355,7 @@ class HumanInputRepository:
                 
                 # Delete records not in the keep_ids list
                 delete_query = HumanInput.delete().where(HumanInput.id.not_in(keep_ids))
-                deleted_count = delete_query.execute()
+                deleted_count = run_write(HumanInput._meta.database, delete_query.execute)
                 
                 logger.info(f"Garbage collected {deleted_count} old human input records")
                 return deleted_count
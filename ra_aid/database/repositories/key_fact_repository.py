@@ -13,6 +13,7 @@ import peewee
 
 from ra_aid.database.models import KeyFact
 from ra_aid.database.pydantic_models import KeyFactModel
+from ra_aid.database.writer import run_write
 from ra_aid.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -151,7 +152,10 @@ class KeyFactRepository:
             peewee.DatabaseError: If there's an error creating the fact
         """
         try:
-            fact = KeyFact.create(content=content, human_input_id=human_input_id)
+            fact = run_write(
+                KeyFact._meta.database,
+                lambda: KeyFact.create(content=content, human_input_id=human_input_id),
+            )
             logger.debug(f"Created key fact ID {fact.id}: {content}")
             return self._to_model(fact)
         except peewee.DatabaseError as e:
@@ -201,7 +205,7 @@ class KeyFactRepository:
             
             # Update the fact
             fact.content = content
-            fact.save()
+            run_write(KeyFact._meta.database, fact.save)
             logger.debug(f"Updated key fact ID {fact_id}: {content}")
             return self._to_model(fact)
         except peewee.DatabaseError as e:
@@ -229,7 +233,7 @@ class KeyFactRepository:
                 return False
             
             # Delete the fact
-            fact.delete_instance()
+            run_write(KeyFact._meta.database, fact.delete_instance)
             logger.debug(f"Deleted key fact ID {fact_id}")
             return True
         except peewee.DatabaseError as e:
@@ -12,6 +12,7 @@ import peewee
 
 from ra_aid.database.models import KeySnippet
 from ra_aid.database.pydantic_models import KeySnippetModel
+from ra_aid.database.writer import run_write
 from ra_aid.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -166,13 +167,13 @@ class KeySnippetRepository:
             peewee.DatabaseError: If there's an error creating the snippet
         """
         try:
-            key_snippet = KeySnippet.create(
+            key_snippet = run_write(KeySnippet._meta.database, lambda: KeySnippet.create(
                 filepath=filepath,
                 line_number=line_number,
                 snippet=snippet,
                 description=description,
                 human_input_id=human_input_id
-            )
+            ))
             logger.debug(f"Created key snippet ID {key_snippet.id}: {filepath}:{line_number}")
             return self._to_model(key_snippet)
         except peewee.DatabaseError as e:
@@ -235,7 +236,7 @@ class KeySnippetRepository:
             key_snippet.line_number = line_number
             key_snippet.snippet = snippet
             key_snippet.description = description
-            key_snippet.save()
+            run_write(KeySnippet._meta.database, key_snippet.save)
             logger.debug(f"Updated key snippet ID {snippet_id}: {filepath}:{line_number}")
             return self._to_model(key_snippet)
         except peewee.DatabaseError as e:
@@ -263,7 +264,7 @@ class KeySnippetRepository:
                 return False
             
             # Delete the snippet
-            key_snippet.delete_instance()
+            run_write(KeySnippet._meta.database, key_snippet.delete_instance)
             logger.debug(f"Deleted key snippet ID {snippet_id}")
             return True
         except peewee.DatabaseError as e:
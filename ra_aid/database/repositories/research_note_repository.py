@@ -13,6 +13,7 @@ import peewee
 
 from ra_aid.database.models import ResearchNote
 from ra_aid.database.pydantic_models import ResearchNoteModel
+from ra_aid.database.writer import run_write
 from ra_aid.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -153,9 +154,9 @@ class ResearchNoteRepository:
             peewee.DatabaseError: If there's an error creating the note
         """
         try:
-            note = ResearchNote.create(
+            note = run_write(ResearchNote._meta.database, lambda: ResearchNote.create(
                 content=content, human_input_id=human_input_id, session_id=session_id
-            )
+            ))
             logger.debug(f"Created research note ID {note.id}: {content[:50]}...")
             return self._to_model(note)
         except peewee.DatabaseError as e:
@@ -205,7 +206,7 @@ class ResearchNoteRepository:
             
             # Update the note
             note.content = content
-            note.save()
+            run_write(ResearchNote._meta.database, note.save)
             logger.debug(f"Updated research note ID {note_id}: {content[:50]}...")
             return self._to_model(note)
         except peewee.DatabaseError as e:
@@ -233,7 +234,7 @@ class ResearchNoteRepository:
                 return False
             
             # Delete the note
-            note.delete_instance()
+            run_write(ResearchNote._meta.database, note.delete_instance)
             logger.debug(f"Deleted research note ID {note_id}")
             return True
         except peewee.DatabaseError as e:
@@ -14,8 +14,10 @@ import sys
 
 import peewee
 
+from ra_aid.database.connection import read_snapshot
 from ra_aid.database.models import Session, HumanInput
 from ra_aid.database.pydantic_models import SessionModel
+from ra_aid.database.writer import run_write
 from ra_aid.exceptions import SessionNotFoundError
 from ra_aid.__version__ import __version__
 from ra_aid.logging_config import get_logger
@@ -233,12 +235,12 @@ class SessionRepository:
             machine_info = json.dumps(metadata) if metadata is not None else None
 
             # Create session - status defaults to 'pending' from the model definition
-            session = Session.create(
+            session = run_write(Session._meta.database, lambda: Session.create(
                 start_time=datetime.datetime.now(),
                 command_line=command_line,
                 program_version=program_version,
                 machine_info=machine_info,
-            )
+            ))
 
             # Store the current session
             self.current_session = session
@@ -267,7 +269,7 @@ class SessionRepository:
         try:
             session = Session.get_by_id(session_id)
             session.status = status
-            session.save()
+            run_write(Session._meta.database, session.save)
             logger.info(f"Updated session {session_id} status to '{status}'")
             # Fetch the updated session again to ensure consistency and include display_name
             updated_session_model = self.get(session_id)
@@ -412,35 +414,37 @@ class SessionRepository:
             tuple: (List[SessionModel], int) containing the list of sessions and the total count
         """
         try:
-            # Get total count for pagination info
-            total_count = Session.select().count()
-
-            # Get paginated sessions ordered by created_at in descending order (newest first)
-            sessions = list(
-                Session.select()
-                .order_by(Session.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-            )
-
-            # Process sessions and add display_name
-            result = []
-            for session in sessions:
-                model = self._to_model(session)
-                if model is None: continue # Skip if conversion fails
-
-                # Get display name directly
-                display_name = self._get_display_name_for_session(session.id)
-                if display_name:
-                    model.display_name = display_name
-                elif model.command_line:
-                    # Fallback to command line
-                    if len(model.command_line) > 80:
-                        model.display_name = model.command_line[:80] + "..."
-                    else:
-                        model.display_name = model.command_line
-
-                result.append(model)
+            # Count, page and display names all come from one WAL snapshot
+            with read_snapshot(self.db):
+                # Get total count for pagination info
+                total_count = Session.select().count()
+
+                # Get paginated sessions ordered by created_at in descending order (newest first)
+                sessions = list(
+                    Session.select()
+                    .order_by(Session.created_at.desc())
+                    .offset(offset)
+                    .limit(limit)
+                )
+
+                # Process sessions and add display_name
+                result = []
+                for session in sessions:
+                    model = self._to_model(session)
+                    if model is None: continue # Skip if conversion fails
+
+                    # Get display name directly
+                    display_name = self._get_display_name_for_session(session.id)
+                    if display_name:
+                        model.display_name = display_name
+                    elif model.command_line:
+                        # Fallback to command line
+                        if len(model.command_line) > 80:
+                            model.display_name = model.command_line[:80] + "..."
+                        else:
+                            model.display_name = model.command_line
+
+                    result.append(model)
 
             return result, total_count
 
@@ -489,6 +493,23 @@ class SessionRepository:
             logger.error(f"Failed to get recent sessions: {str(e)}")
             return []
 
+    def get_by_status(self, status: str) -> List[SessionModel]:
+        """
+        Get all sessions with a given status, oldest first.
+
+        Args:
+            status: The session status to match (e.g. 'queued')
+
+        Returns:
+            List[SessionModel]: Matching sessions ordered by ID
+        """
+        try:
+            sessions = Session.select().where(Session.status == status).order_by(Session.id)
+            return [model for model in (self._to_model(s) for s in sessions) if model is not None]
+        except peewee.DatabaseError as e:
+            logger.error(f"Failed to get sessions with status '{status}': {str(e)}")
+            return []
+
     def get_latest_session(self) -> Optional[SessionModel]:
         """
         Get the most recent session from the database.
@@ -6,17 +6,21 @@ following the repository pattern for data access abstraction. It handles
 operations for storing and retrieving agent action trajectories.
 """
 
-from typing import Dict, List, Optional, Any, Union, Callable
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any, Union, Callable
 import contextvars
 import json
 import logging
 import sys
+import time
 
 import peewee
 
+from ra_aid.database.blob_store import externalize_large_values
 from ra_aid.database.models import Trajectory, HumanInput
 from ra_aid.database.pydantic_models import TrajectoryModel
 from ra_aid.database.repositories.session_repository import get_session_repository
+from ra_aid.database.writer import run_write
 from ra_aid.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -24,6 +28,55 @@ logger = get_logger(__name__)
 # Create contextvar to hold the TrajectoryRepository instance
 trajectory_repo_var = contextvars.ContextVar("trajectory_repo", default=None)
 
+# The tool call currently being timed by track_tool_duration()
+_tool_call_scope = contextvars.ContextVar("trajectory_tool_call_scope", default=None)
+
+
+@contextmanager
+def track_tool_duration(tool_name: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Time a tool call and store the duration on the trajectory record it creates.
+
+    Tools create their trajectory record while they run, before their duration
+    is known. The first record with a tool name created inside this block
+    (nested tool calls have their own block) is updated with the duration of
+    the whole call when the block exits. Tools that create no record of their
+    own get a ``tool_timing`` record for ``tool_name``, so every call shows up
+    in the session profile.
+
+    Args:
+        tool_name: Name of the timed tool, used for the ``tool_timing`` record
+
+    Yields:
+        Dict[str, Any]: The scope, holding the ID of the record once created
+    """
+    scope: Dict[str, Any] = {"record_id": None, "repository": None}
+    token = _tool_call_scope.set(scope)
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield scope
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        try:
+            if scope["record_id"] is not None:
+                scope["repository"].update(scope["record_id"], duration_ms=duration_ms)
+            elif tool_name:
+                # Created while this scope is still current, so an enclosing tool call does not claim it
+                get_trajectory_repository().create(
+                    tool_name=tool_name,
+                    record_type="tool_timing",
+                    duration_ms=duration_ms,
+                    is_error=failed,
+                )
+        except Exception as e:
+            logger.debug(f"Could not store the duration of tool call {tool_name}: {e}")
+        finally:
+            _tool_call_scope.reset(token)
+
 
 class TrajectoryRepositoryManager:
     """
@@ -184,6 +237,7 @@ class TrajectoryRepository:
         current_cost: Optional[float] = None,  # Cost of the last LLM message
         input_tokens: Optional[int] = None,
         output_tokens: Optional[int] = None,
+        duration_ms: Optional[int] = None,
         is_error: bool = False,
         error_message: Optional[str] = None,
         error_type: Optional[str] = None,
@@ -195,13 +249,16 @@ class TrajectoryRepository:
         Args:
             tool_name: Optional name of the tool that was executed
             tool_parameters: Optional parameters passed to the tool (will be JSON encoded)
-            tool_result: Result returned by the tool (will be JSON encoded)
-            step_data: UI rendering data (will be JSON encoded)
+            tool_result: Result returned by the tool (will be JSON encoded, large strings stored as blobs)
+            step_data: UI rendering data (will be JSON encoded, large strings stored as blobs)
             record_type: Type of trajectory record
             human_input_id: Optional ID of the associated human input
             current_cost: cost of last llm message
             input_tokens: Optional input/prompt token usage
             output_tokens: Optional output/completion token usage
+            duration_ms: Optional duration in milliseconds. Tool records created inside
+                track_tool_duration() get the duration of the tool call, and a stage
+                transition sets the duration of the session's previous stage.
             is_error: Flag indicating if this record represents an error (default: False)
             error_message: The error message (if is_error is True)
             error_type: The type/class of the error (if is_error is True)
@@ -219,10 +276,17 @@ class TrajectoryRepository:
             tool_parameters_json = (
                 json.dumps(tool_parameters) if tool_parameters is not None else None
             )
+            # Large strings go to the blob store; rows keep references
             tool_result_json = (
-                json.dumps(tool_result) if tool_result is not None else None
+                json.dumps(externalize_large_values(tool_result))
+                if tool_result is not None
+                else None
+            )
+            step_data_json = (
+                json.dumps(externalize_large_values(step_data))
+                if step_data is not None
+                else None
             )
-            step_data_json = json.dumps(step_data) if step_data is not None else None
 
             # Create human input reference if provided
             human_input = None
@@ -239,7 +303,8 @@ class TrajectoryRepository:
                 new_session_id = session_record.get_id()
                 
 
-            trajectory = Trajectory.create(
+            # Inserts go through the shared writer so concurrent agents batch commits
+            trajectory = run_write(Trajectory._meta.database, lambda: Trajectory.create(
                 human_input=human_input,
                 session=new_session_id,
                 tool_name=tool_name or "",  # Use empty string if tool_name is None
@@ -250,11 +315,19 @@ class TrajectoryRepository:
                 current_cost=current_cost,
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
+                duration_ms=duration_ms,
                 is_error=is_error,
                 error_message=error_message,
                 error_type=error_type,
                 error_details=error_details,
-            )
+            ))
+            if record_type == "stage_transition":
+                self._close_previous_stage(new_session_id, trajectory)
+            if tool_name:
+                scope = _tool_call_scope.get()
+                if scope is not None and scope["record_id"] is None:
+                    scope["record_id"] = trajectory.id
+                    scope["repository"] = self
             if tool_name:
                 logger.debug(
                     f"Created trajectory record ID {trajectory.id} for tool: {tool_name}"
@@ -285,6 +358,28 @@ class TrajectoryRepository:
             raise
 
 
+    def _close_previous_stage(self, session_id: Optional[int], trajectory: Trajectory) -> None:
+        """Set the duration of the session's previous stage, which ends where the new one starts."""
+        try:
+            previous = (
+                Trajectory.select()
+                .where(
+                    (Trajectory.session == session_id)
+                    & (Trajectory.record_type == "stage_transition")
+                    & (Trajectory.duration_ms.is_null())
+                    & (Trajectory.id < trajectory.id)
+                )
+                .order_by(Trajectory.id.desc())
+                .first()
+            )
+            if previous is None:
+                return
+            duration_ms = int((trajectory.created_at - previous.created_at).total_seconds() * 1000)
+            query = Trajectory.update(duration_ms=max(duration_ms, 0)).where(Trajectory.id == previous.id)
+            run_write(Trajectory._meta.database, query.execute)
+        except peewee.DatabaseError as e:
+            logger.warning(f"Failed to set the duration of the previous stage: {str(e)}")
+
     def get(self, trajectory_id: int) -> Optional[TrajectoryModel]:
         """
         Retrieve a trajectory record by its ID.
@@ -313,6 +408,7 @@ class TrajectoryRepository:
         current_cost: Optional[float] = None,
         input_tokens: Optional[int] = None,
         output_tokens: Optional[int] = None,
+        duration_ms: Optional[int] = None,
         is_error: Optional[bool] = None,
         error_message: Optional[str] = None,
         error_type: Optional[str] = None,
@@ -330,6 +426,7 @@ class TrajectoryRepository:
             current_cost: Cost of last llm message
             input_tokens: Updated input/prompt token usage
             output_tokens: Updated output/completion token usage
+            duration_ms: Duration in milliseconds
             is_error: Flag indicating if this record represents an error
             error_message: The error message
             error_type: The type/class of the error
@@ -354,10 +451,10 @@ class TrajectoryRepository:
             update_data = {}
 
             if tool_result is not None:
-                update_data["tool_result"] = json.dumps(tool_result)
+                update_data["tool_result"] = json.dumps(externalize_large_values(tool_result))
 
             if step_data is not None:
-                update_data["step_data"] = json.dumps(step_data)
+                update_data["step_data"] = json.dumps(externalize_large_values(step_data))
 
             if current_cost is not None:
                 update_data["current_cost"] = current_cost
@@ -368,6 +465,9 @@ class TrajectoryRepository:
             if output_tokens is not None:
                 update_data["output_tokens"] = output_tokens
 
+            if duration_ms is not None:
+                update_data["duration_ms"] = duration_ms
+
             if is_error is not None:
                 update_data["is_error"] = is_error
 
@@ -384,7 +484,7 @@ class TrajectoryRepository:
                 query = Trajectory.update(**update_data).where(
                     Trajectory.id == trajectory_id
                 )
-                query.execute()
+                run_write(Trajectory._meta.database, query.execute)
                 logger.debug(f"Updated trajectory record ID {trajectory_id}")
                 return self.get(trajectory_id)
 
@@ -535,6 +635,110 @@ class TrajectoryRepository:
             logger.error(f"Failed to calculate session usage totals: {str(e)}")
             raise
 
+    def get_session_profile(self, session_id: int) -> Dict[str, Any]:
+        """
+        Aggregate the recorded durations of a session by tool, agent stage, model
+        and rate limit.
+
+        The last stage of a session has no following stage transition; it is
+        counted until the session's last trajectory record.
+
+        Args:
+            session_id: The ID of the session to profile
+
+        Returns:
+            Dict[str, Any]: Wall time of the session and per-tool, per-stage,
+            per-model and per-rate-limit call counts and durations in
+            milliseconds, slowest first
+
+        Raises:
+            peewee.DatabaseError: If there's an error accessing the database
+        """
+        try:
+            records = list(
+                Trajectory.select(
+                    Trajectory.id,
+                    Trajectory.created_at,
+                    Trajectory.tool_name,
+                    Trajectory.record_type,
+                    Trajectory.step_data,
+                    Trajectory.duration_ms,
+                    Trajectory.is_error,
+                )
+                .where(Trajectory.session == session_id)
+                .order_by(Trajectory.id)
+            )
+        except peewee.DatabaseError as e:
+            logger.error(f"Failed to fetch trajectories for session profile {session_id}: {str(e)}")
+            raise
+
+        def step_field(record: Trajectory, key: str) -> Optional[str]:
+            try:
+                value = json.loads(record.step_data).get(key) if record.step_data else None
+            except (ValueError, AttributeError):
+                return None
+            return value if isinstance(value, str) else None
+
+        tools: Dict[str, List[int]] = {}
+        tool_errors: Dict[str, int] = {}
+        stages: Dict[str, List[int]] = {}
+        models: Dict[str, List[int]] = {}
+        rate_limit_waits: Dict[str, List[int]] = {}
+        untimed_tool_records = 0
+        session_end = records[-1].created_at if records else None
+
+        for record in records:
+            if record.record_type == "stage_transition":
+                duration_ms = record.duration_ms
+                if duration_ms is None:
+                    duration_ms = int((session_end - record.created_at).total_seconds() * 1000)
+                stage = step_field(record, "stage") or "unknown"
+                stages.setdefault(stage, []).append(duration_ms)
+            elif record.record_type == "model_usage":
+                if record.duration_ms is not None:
+                    model = step_field(record, "model") or "unknown"
+                    models.setdefault(model, []).append(record.duration_ms)
+            elif record.record_type == "rate_limit_wait":
+                if record.duration_ms is not None:
+                    limit = step_field(record, "limit") or "unknown"
+                    rate_limit_waits.setdefault(limit, []).append(record.duration_ms)
+            elif record.tool_name:
+                if record.duration_ms is None:
+                    untimed_tool_records += 1
+                    continue
+                tools.setdefault(record.tool_name, []).append(record.duration_ms)
+                if record.is_error:
+                    tool_errors[record.tool_name] = tool_errors.get(record.tool_name, 0) + 1
+
+        def summarize(groups: Dict[str, List[int]], count_key: str) -> List[Dict[str, Any]]:
+            rows = [
+                {
+                    "name": name,
+                    count_key: len(durations),
+                    "total_ms": sum(durations),
+                    "mean_ms": sum(durations) // len(durations),
+                    "max_ms": max(durations),
+                }
+                for name, durations in groups.items()
+            ]
+            return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+        tool_rows = summarize(tools, "calls")
+        for row in tool_rows:
+            row["errors"] = tool_errors.get(row["name"], 0)
+
+        return {
+            "session_id": session_id,
+            "wall_time_ms": (
+                int((session_end - records[0].created_at).total_seconds() * 1000) if records else 0
+            ),
+            "tools": tool_rows,
+            "stages": summarize(stages, "entries"),
+            "models": summarize(models, "calls"),
+            "rate_limit_waits": summarize(rate_limit_waits, "calls"),
+            "untimed_tool_records": untimed_tool_records,
+        }
+
     def get_trajectories_by_session(self, session_id: int) -> List[TrajectoryModel]:
         """
         Retrieve all trajectory records associated with a specific session.
@@ -0,0 +1,243 @@
+"""
+Dedicated database writer for ra_aid.
+
+SQLite allows a single writer at a time. When several agents run concurrently
+(for example under the API server), each committing its own small transaction,
+they queue up on the database lock and every commit pays for its own WAL sync.
+
+This module funnels writes for a file-based database through one writer thread.
+Writes submitted while a batch is being committed are grouped into the next
+transaction (group commit), so concurrent agents share commits instead of
+contending for the lock. Readers keep using their own per-thread connections
+and are never blocked by the writer in WAL mode.
+"""
+
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import peewee
+
+from ra_aid.logging_config import get_logger
+from ra_aid.metrics import DB_WRITE_DURATION, timed
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Upper bound on the number of writes committed in a single transaction
+DEFAULT_MAX_BATCH_SIZE = 64
+
+_WriteItem = Tuple[Callable[[], Any], Future]
+_STOP = object()
+
+
+class DatabaseWriter:
+    """
+    Single writer thread that batches database writes into shared commits.
+
+    Example:
+        writer = DatabaseWriter(db)
+        record = writer.execute(lambda: Trajectory.create(...))
+        writer.close()
+    """
+
+    def __init__(
+        self, db: peewee.SqliteDatabase, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ):
+        """
+        Initialize the writer and start its thread.
+
+        Args:
+            db: The file-based database to write to
+            max_batch_size: Maximum number of writes committed together
+        """
+        self.db = db
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self.batches_committed = 0
+        self.writes_committed = 0
+        self._thread = threading.Thread(
+            target=self._run, name="ra-aid-db-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, fn: Callable[[], T]) -> "Future[T]":
+        """
+        Queue a write to be executed on the writer thread.
+
+        Args:
+            fn: Callable performing the write; its return value resolves the future
+
+        Returns:
+            Future: Resolved with the callable's result once its batch commits
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DatabaseWriter is closed")
+            self._queue.put((fn, future))
+        return future
+
+    def execute(self, fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """
+        Execute a write on the writer thread and wait for it to commit.
+
+        Args:
+            fn: Callable performing the write
+            timeout: Optional number of seconds to wait for the commit
+
+        Returns:
+            The callable's return value
+        """
+        if threading.current_thread() is self._thread:
+            # Nested write from inside a batch; we are already in the transaction
+            return fn()
+        return self.submit(fn).result(timeout=timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Stop the writer thread after flushing all queued writes.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the thread to finish
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        """Writer thread main loop."""
+        stopping = False
+        try:
+            self.db.connect(reuse_if_open=True)
+        except peewee.DatabaseError as e:
+            logger.error(f"Database writer failed to connect: {str(e)}")
+
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch: List[_WriteItem] = [item]
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit_batch(batch)
+
+        if not self.db.is_closed():
+            self.db.close()
+
+    def _commit_batch(self, batch: List[_WriteItem]) -> None:
+        """
+        Execute a batch of writes inside a single transaction.
+
+        Each write runs in its own savepoint so that one failing write only
+        rolls back itself and fails its own future.
+
+        Args:
+            batch: The queued writes and their futures
+        """
+        results: List[Tuple[Future, bool, Any]] = []
+        try:
+            with self.db.atomic():
+                for fn, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with self.db.atomic():
+                            results.append((future, True, fn()))
+                    except Exception as e:
+                        results.append((future, False, e))
+        except Exception as e:
+            logger.error(f"Database writer failed to commit batch: {str(e)}")
+            for fn, future in batch:
+                if not future.done() and future.running():
+                    future.set_exception(e)
+            return
+
+        self.batches_committed += 1
+        for future, ok, value in results:
+            if ok:
+                self.writes_committed += 1
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+_writers: Dict[int, DatabaseWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def _is_in_memory(db: Any) -> bool:
+    """Check whether a database lives in memory and so cannot be shared across threads."""
+    return bool(getattr(db, "_is_in_memory", False)) or getattr(db, "database", None) == ":memory:"
+
+
+def get_database_writer(db: Any) -> Optional[DatabaseWriter]:
+    """
+    Get the process-wide writer for a database, creating it on first use.
+
+    Args:
+        db: The database (or database proxy) writes should go to
+
+    Returns:
+        Optional[DatabaseWriter]: The writer, or None for in-memory or
+        non-SQLite databases, which must be written from the calling thread
+    """
+    if isinstance(db, peewee.DatabaseProxy):
+        db = db.obj
+    if not isinstance(db, peewee.SqliteDatabase) or _is_in_memory(db):
+        return None
+    with _writers_lock:
+        writer = _writers.get(id(db))
+        if writer is None or writer._closed:
+            writer = DatabaseWriter(db)
+            _writers[id(db)] = writer
+        return writer
+
+
+def run_write(db: Any, fn: Callable[[], T]) -> T:
+    """
+    Run a database write through the dedicated writer when one applies.
+
+    Falls back to running the write inline for in-memory databases, whose
+    connections cannot be shared with another thread.
+
+    Args:
+        db: The database the write targets
+        fn: Callable performing the write
+
+    Returns:
+        The callable's return value
+    """
+    writer = get_database_writer(db)
+    if writer is None:
+        with timed(DB_WRITE_DURATION, mode="inline", status="ok"):
+            return fn()
+    with timed(DB_WRITE_DURATION, mode="writer", status="ok"):
+        return writer.execute(fn)
+
+
+def close_database_writers() -> None:
+    """Flush and stop all database writer threads."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_database_writers)
@@ -50,6 +50,7 @@ def copy_base_to_expert_vars(base_provider: str, expert_provider: str) -> None:
         "groq": {"GROQ_API_KEY": "EXPERT_GROQ_API_KEY"},
         "ollama": {"OLLAMA_BASE_URL": "EXPERT_OLLAMA_BASE_URL"},
         "makehub": {"MAKEHUB_API_KEY": "EXPERT_MAKEHUB_API_KEY"},
+        "fake": {"FAKE_LLM_SCRIPT": "EXPERT_FAKE_LLM_SCRIPT"},
     }
 
     # Get the variables to copy based on the expert provider
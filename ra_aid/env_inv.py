@@ -439,7 +439,8 @@ class EnvDiscovery:
                         ).strip()
                     except Exception:
                         libs_flags = None
-                except subprocess.CalledProcessError:
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                    # pkg-config can exceed its timeout when many agents start at once
                     found = False
             if not found and info.get("headers"):
                 for header in info["headers"]:
@@ -10,6 +10,7 @@ from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
 from openai import OpenAI
 
+from ra_aid.callbacks.rate_limit_callback_handler import attach_rate_limiter
 from ra_aid.chat_models.deepseek_chat import ChatDeepseekReasoner
 from ra_aid.console.formatting import cpm
 from ra_aid.logging_config import get_logger
@@ -120,6 +121,8 @@ def create_deepseek_client(
         "max_retries": int(
             get_env_var(name="LLM_MAX_RETRIES", default=LLM_MAX_RETRIES)
         ),
+        # Streamed responses carry no usage otherwise, so costs and limits see 0 tokens
+        "stream_usage": True,
         "metadata": {
             "model_name": model_name,
             "provider": "deepseek"
@@ -160,6 +163,7 @@ def create_openrouter_client(
             get_env_var(name="LLM_MAX_RETRIES", default=LLM_MAX_RETRIES)
         ),
         "default_headers": default_headers,
+        "stream_usage": True,
         "metadata": {
             "model_name": model_name,
             "provider": "openrouter"
@@ -342,6 +346,7 @@ def create_makehub_client(
             get_env_var(name="LLM_MAX_RETRIES", default=LLM_MAX_RETRIES)
         ),
         "default_headers": default_headers,
+        "stream_usage": True,
         "metadata": {
             "model_name": model_name,
             "provider": "makehub"
@@ -409,6 +414,36 @@ def create_bedrock_client(
     )
 
 
+def create_fake_client(
+    model_name: str,
+    script: str,
+    is_expert: bool = False,
+) -> BaseChatModel:
+    """Create a ChatScripted client that replays responses from a script file.
+
+    The model name selects the agent backend (see the "fake" entries in
+    models_params), so the same script format drives CIAYN and ReAct agents.
+
+    Args:
+        model_name: Name of the model to use
+        script: Path to the JSON response script
+        is_expert: Whether this is for an expert model
+
+    Returns:
+        ChatScripted instance
+    """
+    from ra_aid.chat_models.scripted_chat import ChatScripted
+
+    return ChatScripted.from_script(
+        script,
+        model_name=model_name,
+        metadata={
+            "model_name": model_name,
+            "provider": "fake"
+        },
+    )
+
+
 def get_provider_config(provider: str, is_expert: bool = False) -> Dict[str, Any]:
     """Get provider-specific configuration."""
     configs = {
@@ -462,13 +497,22 @@ def get_provider_config(provider: str, is_expert: bool = False) -> Dict[str, Any
             "api_key": get_env_var("MAKEHUB_API_KEY", is_expert),
             "base_url": "https://api.makehub.ai/v1",
         },
+        "fake": {
+            "script": get_env_var("FAKE_LLM_SCRIPT", is_expert),
+            "base_url": None,
+        },
     }
     config = configs.get(provider, {})
     if not config:
         raise ValueError(f"Unsupported provider: {provider}")
 
     # Ollama doesn't require an API key
-    if provider != "ollama" and provider != "bedrock" and not config.get("api_key"):
+    if provider == "fake":
+        if not config.get("script"):
+            raise ValueError(
+                "Missing required environment variable for provider: fake (FAKE_LLM_SCRIPT)"
+            )
+    elif provider != "ollama" and provider != "bedrock" and not config.get("api_key"):
         raise ValueError(
             f"Missing required environment variable for provider: {provider}"
         )
@@ -503,6 +547,9 @@ def create_llm_client(
 ) -> BaseChatModel:
     """Create a language model client with appropriate configuration.
 
+    If rate limits are configured for the provider or model, the shared
+    rate limiter is attached to the client.
+
     Args:
         provider: The LLM provider to use
         model_name: Name of the model to use
@@ -512,6 +559,17 @@ def create_llm_client(
     Returns:
         Configured language model client
     """
+    client = _create_llm_client(provider, model_name, temperature, is_expert)
+    return attach_rate_limiter(client, provider, model_name)
+
+
+def _create_llm_client(
+    provider: str,
+    model_name: str,
+    temperature: Optional[float] = None,
+    is_expert: bool = False,
+) -> BaseChatModel:
+    """Create a language model client for a provider without rate limiting."""
     config = get_provider_config(provider, is_expert)
     if not config:
         raise ValueError(f"Unsupported provider: {provider}")
@@ -657,6 +715,7 @@ def create_llm_client(
                 "max_retries": int(
                     get_env_var(name="LLM_MAX_RETRIES", default=LLM_MAX_RETRIES)
                 ),
+                "stream_usage": True,
                 "metadata": {
                     "model_name": model_name,
                     "provider": "openai"
@@ -692,6 +751,7 @@ def create_llm_client(
             max_retries=int(
                 get_env_var(name="LLM_MAX_RETRIES", default=LLM_MAX_RETRIES)
             ),
+            stream_usage=True,
             metadata={
                 "model_name": model_name,
                 "provider": "openai-compatible"
@@ -770,6 +830,12 @@ def create_llm_client(
             is_expert=is_expert,
             price_performance_ratio=price_performance_ratio,
         )
+    elif provider == "fake":
+        return create_fake_client(
+            model_name=model_name,
+            script=config.get("script"),
+            is_expert=is_expert,
+        )
     else:
         raise ValueError(f"Unsupported provider: {provider}")
 
@@ -800,6 +866,7 @@ def validate_provider_env(provider: str) -> bool:
         "groq": "GROQ_API_KEY",
         "bedrock": None,  # Bedrock requires AWS_PROFILE or AWS_ACCESS_KEY_ID
         "makehub": "MAKEHUB_API_KEY",
+        "fake": "FAKE_LLM_SCRIPT",
     }
 
     key = required_vars.get(provider.lower())
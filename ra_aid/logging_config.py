@@ -1,8 +1,10 @@
+import atexit
 import logging
 import os
+import queue
 import sys
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
@@ -12,6 +14,10 @@ from rich.markdown import Markdown
 from rich.panel import Panel
 
 
+# Writes queued log records to the log file on a background thread
+_queue_listener: Optional[QueueListener] = None
+
+
 class PrettyHandler(logging.Handler):
     def __init__(self, level=logging.NOTSET):
         super().__init__(level)
@@ -62,6 +68,11 @@ def setup_logging(log_mode: str = "file", pretty: bool = False, log_level: Optio
     File logging behavior:
     - Only active when log_mode="file".
     - Uses the requested log_level.
+    - Records are put on a queue and written by a QueueListener thread, so file
+      I/O does not happen on agent threads.
+
+    The root logger is set to the requested level, so logger.debug calls are
+    dropped before a record is created unless DEBUG logging is enabled.
     """
     # Create logs directory if it doesn't exist
     if base_dir:
@@ -99,12 +110,12 @@ def setup_logging(log_mode: str = "file", pretty: bool = False, log_level: Optio
     # Configure the root logger
     root_logger = logging.getLogger()
 
-    # Always set the root logger to DEBUG level
-    # This ensures all messages flow through to their respective handlers
-    # Best practice is to set root logger to lowest level and let handlers control message filtering
-    root_logger.setLevel(logging.DEBUG)
+    # There is a single handler, so its level is also the root level. Records
+    # below it are then never created, instead of being created and dropped.
+    root_logger.setLevel(specified_log_level)
 
     # Clear existing handlers from root logger to avoid duplicates
+    stop_queue_listener()
     if root_logger.handlers:
         root_logger.handlers.clear()
 
@@ -146,22 +157,55 @@ def setup_logging(log_mode: str = "file", pretty: bool = False, log_level: Optio
             # File handler always uses the specified log level
             file_handler.setLevel(specified_log_level)
 
-            # Add file handler to root logger
-            root_logger.addHandler(file_handler)
+            # Agent threads only enqueue records; the listener writes them
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setLevel(specified_log_level)
+            root_logger.addHandler(queue_handler)
+            start_queue_listener(QueueListener(log_queue, file_handler, respect_handler_level=True))
 
-            # Create an ra_aid logger for compatibility
+            # Create an ra_aid logger for compatibility; it inherits the root level
             logger = logging.getLogger("ra_aid")
-            logger.setLevel(logging.DEBUG)
+            logger.setLevel(logging.NOTSET)
             logger.propagate = True  # Let messages propagate to root handlers
 
             # Log configuration details for debugging (to the file)
-            logger.debug(f"Logging configuration: log_mode={log_mode}, log_level={log_level}, "                         f"root_level={root_logger.level}, logger_level={logger.level}, "                        f"file_level={file_handler.level}, "                        f"propagate={logger.propagate}")
+            logger.debug(
+                "Logging configuration: log_mode=%s, log_level=%s, root_level=%s, "
+                "file_level=%s, propagate=%s",
+                log_mode,
+                log_level,
+                root_logger.level,
+                file_handler.level,
+                logger.propagate,
+            )
 
-            logger.info(f"Log file created: {log_filename}")
+            logger.info("Log file created: %s", log_filename)
         except Exception as e:
             # If file logging fails, try to log to stderr as a fallback
             print(f"CRITICAL: Failed to set up file logging: {str(e)}", file=sys.stderr)
 
 
+def start_queue_listener(listener: QueueListener) -> None:
+    """Start the listener that writes queued records, stopping it at exit."""
+    global _queue_listener
+    stop_queue_listener()
+    listener.start()
+    _queue_listener = listener
+
+
+def stop_queue_listener() -> None:
+    """Write out queued log records and stop the listener thread, if running."""
+    global _queue_listener
+    listener, _queue_listener = _queue_listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop_queue_listener)
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     return logging.getLogger(f"ra_aid.{name}" if name else "ra_aid")
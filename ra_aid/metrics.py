@@ -0,0 +1,336 @@
+"""
+In-process latency histograms.
+
+Timings used to be reconstructed by diffing ``created_at`` on trajectory
+rows. The hot paths now record their durations directly:
+
+- ``ra_aid_tool_duration_seconds``: every tool call, by tool and status
+  (tools are instrumented when an agent is created, see ``instrument_tools``)
+- ``ra_aid_llm_call_duration_seconds``: model calls, by provider and model
+  (recorded by ``DefaultCallbackHandler``)
+- ``ra_aid_db_write_duration_seconds``: repository writes (sessions,
+  trajectories, human input, key facts, snippets and research notes, all of
+  which go through ``run_write``), including the wait for the writer thread
+- ``ra_aid_subprocess_duration_seconds``: commands run by
+  ``run_interactive_command``, by program and status
+- ``ra_aid_rate_limit_wait_seconds``: time model calls waited for a provider
+  rate limit, by limit key (recorded by ``RateLimiter.acquire`` for every
+  limited call, so the count is the number of limited calls)
+
+The server exports them in Prometheus text format at ``GET /v1/metrics``;
+the CLI can dump them at exit with ``--dump-metrics``.
+"""
+
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from ra_aid.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds in seconds, from fast memory tools to long model calls and test runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+TOOL_DURATION = "ra_aid_tool_duration_seconds"
+LLM_CALL_DURATION = "ra_aid_llm_call_duration_seconds"
+DB_WRITE_DURATION = "ra_aid_db_write_duration_seconds"
+SUBPROCESS_DURATION = "ra_aid_subprocess_duration_seconds"
+RATE_LIMIT_WAIT = "ra_aid_rate_limit_wait_seconds"
+
+METRIC_HELP = {
+    TOOL_DURATION: "Duration of tool invocations",
+    LLM_CALL_DURATION: "Duration of model calls",
+    DB_WRITE_DURATION: "Duration of repository database writes, including the wait for the writer thread",
+    SUBPROCESS_DURATION: "Duration of subprocesses run for tools",
+    RATE_LIMIT_WAIT: "Time model calls waited for a provider rate limit",
+}
+
+# Marks tool functions that already record their duration
+_INSTRUMENTED_ATTR = "__ra_aid_timed__"
+
+
+class Histogram:
+    """Cumulative histogram of observed durations."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets: Sorted upper bounds; an implicit +Inf bucket is added
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            float: The estimate, at most the largest observed value
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            upper = self.buckets[index] if index < len(self.buckets) else self.max
+            if count and seen + count >= rank:
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(estimate, self.max)
+            seen += count
+            lower = upper
+        return self.max
+
+    def copy(self) -> "Histogram":
+        copy = Histogram(self.buckets)
+        copy.counts = list(self.counts)
+        copy.count = self.count
+        copy.sum = self.sum
+        copy.max = self.max
+        return copy
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe collection of labelled histograms."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """
+        Record a duration.
+
+        Args:
+            name: Metric name, e.g. TOOL_DURATION
+            seconds: The observed duration
+            **labels: Label values; keep their cardinality low
+        """
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timed(self, name: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block and record it on exit.
+
+        Yields a dict of the labels; the block can update it, e.g. to set a
+        status. A block that raises is recorded with ``status="error"``.
+        """
+        labels = dict(labels)
+        start = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            labels["status"] = "error"
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Dict[LabelKey, Histogram]]:
+        """Get a consistent copy of all histograms."""
+        with self._lock:
+            return {
+                name: {key: histogram.copy() for key, histogram in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """
+        Render all histograms in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, ending with a newline
+        """
+        lines: List[str] = []
+        for name, series in sorted(self.snapshot().items()):
+            lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip([*histogram.buckets, math.inf], histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _format_float(bound)
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_float(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """
+        Summarize each series for display.
+
+        Returns:
+            List[Dict[str, Any]]: Metric, labels, count, mean, p50, p95 and max, slowest total first
+        """
+        rows = []
+        for name, series in self.snapshot().items():
+            for key, histogram in series.items():
+                rows.append(
+                    {
+                        "metric": name,
+                        "labels": ", ".join(f"{label}={value}" for label, value in key),
+                        "count": histogram.count,
+                        "total": histogram.sum,
+                        "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                        "max": histogram.max,
+                    }
+                )
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return rows
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape_label(value)}"' for label, value in key) + "}"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+
+def observe(name: str, seconds: float, **labels: Any) -> None:
+    """Record a duration in the process-wide registry."""
+    _registry.observe(name, seconds, **labels)
+
+
+def timed(name: str, **labels: Any):
+    """Time a block in the process-wide registry; see MetricsRegistry.timed."""
+    return _registry.timed(name, **labels)
+
+
+def instrument_function(func: Callable, tool_name: str) -> Callable:
+    """
+    Wrap a tool function so each call records its duration.
+
+    The duration goes into the tool histogram and onto the trajectory record
+    the tool creates, or a ``tool_timing`` record if it creates none (see
+    ``track_tool_duration``).
+
+    Args:
+        func: The tool's underlying function
+        tool_name: Value of the ``tool`` label
+
+    Returns:
+        Callable: The wrapper, or func itself if it is already instrumented
+    """
+    if getattr(func, _INSTRUMENTED_ATTR, False):
+        return func
+
+    from ra_aid.database.repositories.trajectory_repository import track_tool_duration
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _registry.timed(TOOL_DURATION, tool=tool_name, status="ok"), track_tool_duration(tool_name):
+            return func(*args, **kwargs)
+
+    setattr(wrapper, _INSTRUMENTED_ATTR, True)
+    return wrapper
+
+
+def instrument_tools(tools: Sequence[Any]) -> None:
+    """
+    Instrument the functions of LangChain tools in place.
+
+    Both agent backends end up calling ``tool.func`` (ReAct agents through
+    ``StructuredTool``, CIAYN agents directly), so wrapping it covers every
+    call. Tools are shared module-level objects; instrumenting is idempotent.
+
+    Args:
+        tools: Tools given to an agent; objects without a callable ``func`` are skipped
+    """
+    for tool in tools:
+        func = getattr(tool, "func", None)
+        if not callable(func) or getattr(func, _INSTRUMENTED_ATTR, False):
+            continue
+        name = getattr(tool, "name", None) or getattr(func, "__name__", "tool")
+        try:
+            tool.func = instrument_function(func, name)
+        except (AttributeError, TypeError, ValueError) as e:
+            logger.debug(f"Could not instrument tool {name}: {e}")
+
+
+def dump_metrics(destination: str = "-") -> None:
+    """
+    Dump the process-wide histograms, e.g. at exit.
+
+    Args:
+        destination: "-" prints a summary table to the console; anything else
+            is a file path that receives the Prometheus text exposition
+    """
+    if destination != "-":
+        try:
+            with open(destination, "w", encoding="utf-8") as f:
+                f.write(_registry.render_prometheus())
+        except OSError as e:
+            logger.error(f"Could not write metrics to {destination}: {e}")
+        return
+
+    rows = _registry.summary_rows()
+    if not rows:
+        return
+
+    from rich.table import Table
+
+    from ra_aid.console.common import console
+
+    table = Table(title="Latency metrics (seconds)")
+    for column in ("metric", "labels"):
+        table.add_column(column)
+    for column in ("count", "total", "mean", "p50", "p95", "max"):
+        table.add_column(column, justify="right")
+    for row in rows:
+        table.add_row(
+            row["metric"].removeprefix("ra_aid_").removesuffix("_duration_seconds"),
+            row["labels"],
+            str(row["count"]),
+            *(f"{row[column]:.3f}" for column in ("total", "mean", "p50", "p95", "max")),
+        )
+    console.print(table)
@@ -0,0 +1,25 @@
+import peewee
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: peewee.Database, fake=False, **kwargs):
+    """Create the rate_limit_bucket table for limits shared between processes."""
+    if database.table_exists("rate_limit_bucket"):
+        return
+
+    @migrator.create_model
+    class RateLimitBucket(peewee.Model):
+        id = peewee.AutoField()
+        created_at = peewee.DateTimeField()
+        updated_at = peewee.DateTimeField()
+        key = peewee.TextField(unique=True)
+        level = peewee.FloatField()
+        refreshed_at = peewee.FloatField()
+
+        class Meta:
+            table_name = "rate_limit_bucket"
+
+
+def rollback(migrator: Migrator, database: peewee.Database, fake=False, **kwargs):
+    """Remove the rate_limit_bucket table."""
+    migrator.remove_model("rate_limit_bucket")
@@ -0,0 +1,15 @@
+import peewee
+from peewee_migrate import Migrator
+
+
+def migrate(migrator: Migrator, database: peewee.Database, fake=False, **kwargs):
+    columns = [col.name for col in database.get_columns("trajectory")]
+    if "duration_ms" not in columns:
+        field = peewee.IntegerField(null=True)
+        migrator.add_fields("trajectory", duration_ms=field)
+
+
+def rollback(migrator: Migrator, database: peewee.Database, fake=False, **kwargs):
+    columns = [col.name for col in database.get_columns("trajectory")]
+    if "duration_ms" in columns:
+        migrator.remove_fields("trajectory", "duration_ms")
@@ -0,0 +1,219 @@
+"""
+Resolved model metadata, computed once per model and cached process-wide.
+
+Token limits, per-token costs and capability flags used to be looked up
+separately by the token limiter, the cost callback handler and the CIAYN
+agent, each calling ``litellm.get_model_info`` or walking ``models_params``
+again. ``get_model_profile`` resolves all of them once per
+(provider, model) and returns the same immutable ``ModelProfile``
+afterwards.
+
+Example:
+    profile = get_model_profile("anthropic", "claude-3-7-sonnet-20250219")
+    profile.max_input_tokens, profile.cost_rates(prompt_tokens=1200)
+"""
+
+import threading
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from litellm import get_model_info
+
+from ra_aid.logging_config import get_logger
+from ra_aid.model_snapshot import apply_model_snapshot
+from ra_aid.models_params import models_params
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """
+    Everything RA.Aid knows about a model.
+
+    Attributes:
+        provider: The provider name
+        model: The model name
+        max_input_tokens: Context window, from litellm or models_params
+        token_limit_source: "litellm", "models_params" or None if unknown
+        input_cost_per_token: Input cost (below the tier threshold if tiered)
+        output_cost_per_token: Output cost (below the tier threshold if tiered)
+        tiered_costs: MODEL_COSTS entry for models with tiered pricing
+        cost_source: "litellm", "model_costs" or None if unknown
+        params: The models_params entry of the model
+    """
+
+    provider: str
+    model: str
+    max_input_tokens: Optional[int] = None
+    token_limit_source: Optional[str] = None
+    input_cost_per_token: Decimal = Decimal("0")
+    output_cost_per_token: Decimal = Decimal("0")
+    tiered_costs: Optional[Mapping[str, Any]] = None
+    cost_source: Optional[str] = None
+    params: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+
+    @property
+    def supports_think_tag(self) -> Optional[bool]:
+        """Whether responses contain <think> tags (None: detect implicitly)."""
+        return self.params.get("supports_think_tag")
+
+    @property
+    def supports_thinking(self) -> bool:
+        """Whether the model returns structured thinking blocks."""
+        return self.params.get("supports_thinking", False)
+
+    @property
+    def attempt_llm_tool_extraction(self) -> bool:
+        """Whether invalid CIAYN tool calls should be repaired by an LLM."""
+        return self.params.get("attempt_llm_tool_extraction", False)
+
+    def cost_rates(self, prompt_tokens: int) -> Tuple[Decimal, Decimal]:
+        """
+        Get the input and output cost per token for a call.
+
+        Args:
+            prompt_tokens: Prompt tokens of the call, used for tiered pricing
+
+        Returns:
+            Tuple[Decimal, Decimal]: Input and output cost per token
+        """
+        if not self.tiered_costs:
+            return self.input_cost_per_token, self.output_cost_per_token
+        if prompt_tokens > self.tiered_costs.get("tier_threshold", 0):
+            return (
+                self.tiered_costs.get("input_over_200k", self.input_cost_per_token),
+                self.tiered_costs.get("output_over_200k", self.output_cost_per_token),
+            )
+        return (
+            self.tiered_costs.get("input_under_200k", self.input_cost_per_token),
+            self.tiered_costs.get("output_under_200k", self.output_cost_per_token),
+        )
+
+
+def _litellm_model_info(provider: str, model: str) -> Optional[Dict[str, Any]]:
+    """Look up a model in litellm's model map."""
+    provider_model = model if not provider else f"{provider}/{model}"
+    apply_model_snapshot()
+    try:
+        return get_model_info(provider_model)
+    except Exception as e:
+        logger.debug(f"Error getting model info from litellm for {provider_model}: {e}")
+        return None
+
+
+def _resolve_token_limit(
+    provider: str, model: str, model_info: Optional[Dict[str, Any]]
+) -> Tuple[Optional[int], Optional[str]]:
+    """Get the context window from litellm, falling back to models_params."""
+    max_input_tokens = (model_info or {}).get("max_input_tokens")
+    if max_input_tokens:
+        logger.debug(f"Using litellm token limit for {model}: {max_input_tokens}")
+        return max_input_tokens, "litellm"
+
+    provider_tokens = models_params.get(provider, {})
+    # Try the original model name first, then the name without hyphens
+    for name in dict.fromkeys([model, model.replace("-", "")]):
+        if name in provider_tokens:
+            max_input_tokens = provider_tokens[name].get("token_limit")
+            if max_input_tokens:
+                logger.debug(
+                    f"Found token limit for {provider}/{model} (lookup as {name}): {max_input_tokens}"
+                )
+                return max_input_tokens, "models_params"
+
+    logger.debug(f"Could not find token limit for {provider}/{model} in models_params")
+    return None, None
+
+
+def _resolve_costs(model: str, model_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Get per-token costs from litellm, falling back to MODEL_COSTS."""
+    if model_info:
+        input_cost = Decimal(str(model_info.get("input_cost_per_token") or 0.0))
+        output_cost = Decimal(str(model_info.get("output_cost_per_token") or 0.0))
+        if input_cost and output_cost:
+            return {
+                "input_cost_per_token": input_cost,
+                "output_cost_per_token": output_cost,
+                "cost_source": "litellm",
+            }
+
+    from ra_aid.callbacks.default_callback_handler import MODEL_COSTS
+
+    model_cost_info = MODEL_COSTS.get(model)
+    if not model_cost_info:
+        return {}
+    if "tier_threshold" in model_cost_info:
+        return {
+            "input_cost_per_token": model_cost_info.get("input_under_200k", Decimal("0")),
+            "output_cost_per_token": model_cost_info.get("output_under_200k", Decimal("0")),
+            "tiered_costs": MappingProxyType(dict(model_cost_info)),
+            "cost_source": "model_costs",
+        }
+    if "input" in model_cost_info and "output" in model_cost_info:
+        return {
+            "input_cost_per_token": model_cost_info["input"],
+            "output_cost_per_token": model_cost_info["output"],
+            "cost_source": "model_costs",
+        }
+    logger.warning(f"Unknown cost structure for model {model} in MODEL_COSTS. Defaulting to 0.")
+    return {}
+
+
+def build_model_profile(provider: Optional[str], model: Optional[str]) -> ModelProfile:
+    """
+    Resolve the profile of a model without using the cache.
+
+    Args:
+        provider: The provider name
+        model: The model name
+
+    Returns:
+        ModelProfile: The resolved profile
+    """
+    provider = provider or ""
+    model = model or ""
+    model_info = _litellm_model_info(provider, model)
+    max_input_tokens, token_limit_source = _resolve_token_limit(provider, model, model_info)
+    return ModelProfile(
+        provider=provider,
+        model=model,
+        max_input_tokens=max_input_tokens,
+        token_limit_source=token_limit_source,
+        params=MappingProxyType(dict(models_params.get(provider, {}).get(model, {}))),
+        **_resolve_costs(model, model_info),
+    )
+
+
+_profiles: Dict[Tuple[str, str], ModelProfile] = {}
+_profiles_lock = threading.Lock()
+
+
+def get_model_profile(provider: Optional[str], model: Optional[str]) -> ModelProfile:
+    """
+    Get the cached profile of a model, resolving it on first use.
+
+    Args:
+        provider: The provider name
+        model: The model name
+
+    Returns:
+        ModelProfile: The resolved profile
+    """
+    key = (provider or "", model or "")
+    profile = _profiles.get(key)
+    if profile is not None:
+        return profile
+
+    # Resolve outside the lock; a concurrent first lookup just does the work twice
+    profile = build_model_profile(provider, model)
+    with _profiles_lock:
+        return _profiles.setdefault(key, profile)
+
+
+def clear_model_profile_cache() -> None:
+    """Drop all cached profiles, e.g. after models_params or pricing data changed."""
+    with _profiles_lock:
+        _profiles.clear()
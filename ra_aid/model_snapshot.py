@@ -0,0 +1,245 @@
+"""
+Offline snapshot of litellm's model info and pricing data.
+
+On import, litellm downloads its model cost map from GitHub (with a five
+second timeout) unless ``LITELLM_LOCAL_MODEL_COST_MAP`` is set. RA.Aid sets
+that variable when the package is imported, so litellm only reads the copy
+bundled with the installed litellm version, and no network access happens on
+the startup path.
+
+litellm's bundled copy is the baseline, so RA.Aid ships no model data of its
+own. To keep limits and prices current without upgrading litellm, run
+``ra-aid refresh-model-snapshot``: it writes a snapshot of the chat models'
+entries to the user cache directory (or the path in ``RA_AID_MODEL_SNAPSHOT``),
+which is merged into ``litellm.model_cost`` before the first model lookup. A
+snapshot taken with an older litellm than the installed one is skipped, since
+the upgraded litellm bundles newer data.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from packaging.version import InvalidVersion, Version
+
+from ra_aid.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_ENV_VAR = "RA_AID_MODEL_SNAPSHOT"
+DEFAULT_SNAPSHOT_URL = (
+    "https://raw.githubusercontent.com/BerriAI/litellm/main/"
+    "model_prices_and_context_window.json"
+)
+
+# Model modes and fields RA.Aid uses; everything else is left out of the snapshot
+SNAPSHOT_MODES = {"chat", "completion", "responses"}
+SNAPSHOT_FIELDS = (
+    "litellm_provider",
+    "mode",
+    "max_tokens",
+    "max_input_tokens",
+    "max_output_tokens",
+    "input_cost_per_token",
+    "output_cost_per_token",
+    "input_cost_per_token_above_200k_tokens",
+    "output_cost_per_token_above_200k_tokens",
+    "cache_creation_input_token_cost",
+    "cache_read_input_token_cost",
+    "supports_function_calling",
+    "supports_reasoning",
+    "supports_vision",
+    "supports_prompt_caching",
+)
+
+_applied: Optional[Dict[str, Any]] = None
+_apply_lock = threading.Lock()
+
+
+def installed_litellm_version() -> Optional[str]:
+    """Get the version of the installed litellm package."""
+    try:
+        return metadata.version("litellm")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def refreshed_snapshot_path() -> Path:
+    """Get the path a refreshed snapshot is written to and read from."""
+    configured = os.environ.get(SNAPSHOT_ENV_VAR)
+    if configured:
+        return Path(configured).expanduser()
+    from platformdirs import user_cache_dir
+
+    return Path(user_cache_dir("ra-aid")) / "model_snapshot.json"
+
+
+def build_snapshot(model_cost: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """
+    Build a snapshot from a litellm model cost map.
+
+    Args:
+        model_cost: The model cost map (model name -> info)
+        source: Where the map came from, recorded in the snapshot
+
+    Returns:
+        Dict[str, Any]: The snapshot
+    """
+    models = {}
+    for name, info in model_cost.items():
+        if name == "sample_spec" or not isinstance(info, dict):
+            continue
+        if info.get("mode", "chat") not in SNAPSHOT_MODES:
+            continue
+        models[name] = {field: info[field] for field in SNAPSHOT_FIELDS if field in info}
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source,
+        "litellm_version": installed_litellm_version(),
+        "models": models,
+    }
+
+
+def load_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load a snapshot file.
+
+    Args:
+        path: The snapshot file
+
+    Returns:
+        Optional[Dict[str, Any]]: The snapshot, or None if missing or invalid
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable model snapshot {path}: {e}")
+        return None
+    if snapshot.get("format") != SNAPSHOT_FORMAT or not isinstance(snapshot.get("models"), dict):
+        logger.warning(f"Ignoring model snapshot {path} with unsupported format")
+        return None
+    snapshot["path"] = str(path)
+    return snapshot
+
+
+def _is_current(snapshot: Dict[str, Any]) -> bool:
+    """Whether a snapshot was taken with a litellm at least as new as the installed one."""
+    installed = installed_litellm_version()
+    if not installed or not snapshot.get("litellm_version"):
+        return True
+    try:
+        return Version(snapshot["litellm_version"]) >= Version(installed)
+    except InvalidVersion:
+        return True
+
+
+def active_snapshot() -> Optional[Dict[str, Any]]:
+    """
+    Get the refreshed snapshot to apply, if there is a current one.
+
+    Returns:
+        Optional[Dict[str, Any]]: The snapshot, or None to use litellm's own data
+    """
+    snapshot = load_snapshot(refreshed_snapshot_path())
+    if snapshot is not None and _is_current(snapshot):
+        return snapshot
+    return None
+
+
+def apply_model_snapshot() -> Optional[Dict[str, Any]]:
+    """
+    Merge the active snapshot into litellm's model map, once per process.
+
+    Returns:
+        Optional[Dict[str, Any]]: Metadata of the applied snapshot (without
+        the models), or None if no snapshot was applied
+    """
+    global _applied
+    if _applied is not None:
+        return _applied or None
+
+    with _apply_lock:
+        if _applied is not None:
+            return _applied or None
+        snapshot = active_snapshot()
+        if snapshot is None:
+            _applied = {}
+            return None
+
+        import litellm
+
+        for name, info in snapshot["models"].items():
+            litellm.model_cost.setdefault(name, {}).update(info)
+        _applied = {key: value for key, value in snapshot.items() if key != "models"}
+        _applied["model_count"] = len(snapshot["models"])
+        logger.debug(
+            f"Applied model snapshot from {_applied['path']} "
+            f"({_applied['model_count']} models, generated {_applied.get('generated_at')})"
+        )
+        return _applied
+
+
+def reset_applied_snapshot() -> None:
+    """Allow the snapshot to be applied again, e.g. after a refresh."""
+    global _applied
+    with _apply_lock:
+        _applied = None
+
+
+def refresh_model_snapshot(
+    source: Optional[str] = None, path: Optional[Path] = None, timeout: float = 30.0
+) -> Dict[str, Any]:
+    """
+    Download litellm's current model map and write it as the refreshed snapshot.
+
+    This is the only code path that accesses the network for model data.
+
+    Args:
+        source: URL or local file of a litellm model cost map (default: litellm's GitHub copy)
+        path: Where to write the snapshot (default: refreshed_snapshot_path())
+        timeout: Download timeout in seconds
+
+    Returns:
+        Dict[str, Any]: Metadata of the written snapshot
+
+    Raises:
+        httpx.HTTPError: If the download fails
+        ValueError: If the source is not a model map
+    """
+    source = source or DEFAULT_SNAPSHOT_URL
+    if source.startswith(("http://", "https://")):
+        import httpx
+
+        response = httpx.get(source, timeout=timeout, follow_redirects=True)
+        response.raise_for_status()
+        model_cost = response.json()
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            model_cost = json.load(f)
+    if not isinstance(model_cost, dict):
+        raise ValueError(f"{source} is not a litellm model map")
+
+    snapshot = build_snapshot(model_cost, source)
+    path = Path(path) if path else refreshed_snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp_path, path)
+    reset_applied_snapshot()
+
+    return {
+        "path": str(path),
+        "source": source,
+        "generated_at": snapshot["generated_at"],
+        "model_count": len(snapshot["models"]),
+    }
@@ -1418,4 +1418,19 @@ models_params = {
             "default_backend": AgentBackendType.CREATE_REACT_AGENT,
         },
     },
+    # Scripted responses for offline runs and benchmarks; the model name picks the backend
+    "fake": {
+        "ciayn": {
+            "token_limit": DEFAULT_TOKEN_LIMIT,
+            "supports_temperature": False,
+            "latency_coefficient": DEFAULT_BASE_LATENCY,
+            "default_backend": AgentBackendType.CIAYN,
+        },
+        "react": {
+            "token_limit": DEFAULT_TOKEN_LIMIT,
+            "supports_temperature": False,
+            "latency_coefficient": DEFAULT_BASE_LATENCY,
+            "default_backend": AgentBackendType.CREATE_REACT_AGENT,
+        },
+    },
 }
@@ -6,7 +6,8 @@ with full raw input passthrough for interactive commands.
 It uses a pseudo-tty and integrates pyte's HistoryScreen to simulate
 a terminal and capture the final scrollback history (non-blank lines).
 The interface remains compatible with external callers expecting a tuple (output, return_code),
-where output is a bytes object (UTF-8 encoded).
+where output is a bytes object (UTF-8 encoded); the tuple also tells whether the
+process was stopped for exceeding its timeout.
 """
 
 import errno
@@ -22,6 +23,9 @@ from typing import List, Optional, Tuple
 import pyte
 from pyte.screens import HistoryScreen
 
+from ra_aid.console.sink import get_output_sink
+from ra_aid.metrics import SUBPROCESS_DURATION, observe
+
 # Platform-specific imports
 if sys.platform == "win32":
     import msvcrt
@@ -32,6 +36,21 @@ else:
     import tty
 
 
+class CommandOutput(tuple):
+    """
+    The (output, return_code) of a command, with whether it timed out.
+
+    Unpacks like a plain (output, return_code) tuple.
+    """
+
+    timed_out: bool
+
+    def __new__(cls, output: bytes, return_code: int, timed_out: bool = False) -> "CommandOutput":
+        result = super().__new__(cls, (output, return_code))
+        result.timed_out = timed_out
+        return result
+
+
 def create_process(
     cmd: List[str],
     env: Optional[dict] = None,
@@ -135,13 +154,13 @@ def render_line(line, columns: int) -> str:
 
 def run_interactive_command(
     cmd: List[str], expected_runtime_seconds: int = 30
-) -> Tuple[bytes, int]:
+) -> CommandOutput:
     """
     Runs an interactive command with output capture, capturing final scrollback history.
 
     This function provides a cross-platform way to run interactive commands with:
     - Full terminal emulation using pyte's HistoryScreen
-    - Real-time display of command output
+    - Real-time display of command output through the current output sink
     - Input forwarding when running in an interactive terminal
     - Timeout handling to prevent runaway processes
     - Comprehensive output capture including ANSI escape sequences
@@ -169,6 +188,7 @@ def run_interactive_command(
     Returns:
       A tuple of (captured_output, return_code), where captured_output is a UTF-8 encoded
       bytes object containing the trimmed non-empty history lines from the terminal session.
+      Its timed_out attribute is True when the process was stopped for exceeding the timeout.
 
     Raises:
       ValueError: If no command is provided.
@@ -206,6 +226,9 @@ def run_interactive_command(
         }
     )
 
+    # Live output goes to the output sink; a headless sink records it instead of echoing
+    sink = get_output_sink()
+
     # Create process based on platform
     proc, master_fd = create_process(cmd, env, cols, rows)
 
@@ -242,8 +265,7 @@ def run_interactive_command(
                     if not data:
                         break
                     captured_data.append(data)
-                    sys.stdout.buffer.write(data)
-                    sys.stdout.buffer.flush()
+                    sink.subprocess_output(data)
                 except (OSError, IOError):
                     break
                 except Exception as e:
@@ -258,8 +280,7 @@ def run_interactive_command(
                     if not data:
                         break
                     captured_data.append(data)
-                    sys.stderr.buffer.write(data)
-                    sys.stderr.buffer.flush()
+                    sink.subprocess_output(data, stderr=True)
                 except (OSError, IOError):
                     break
                 except Exception as e:
@@ -289,7 +310,7 @@ def run_interactive_command(
         stderr_thread.start()
 
         # Only start stdin thread if we're in an interactive terminal
-        if sys.stdin.isatty():
+        if sys.stdin.isatty() and sink.renders:
             stdin_thread = threading.Thread(target=handle_input)
             stdin_thread.daemon = True
             stdin_thread.start()
@@ -325,8 +346,8 @@ def run_interactive_command(
         except (AttributeError, io.UnsupportedOperation):
             stdin_fd = None
 
-        # Interactive mode: forward input if running in a TTY.
-        if stdin_fd is not None and sys.stdin.isatty():
+        # Interactive mode: forward input if running in a TTY and output is shown.
+        if stdin_fd is not None and sys.stdin.isatty() and sink.renders:
             old_settings = termios.tcgetattr(stdin_fd)
             tty.setraw(stdin_fd)
             try:
@@ -347,7 +368,7 @@ def run_interactive_command(
                         if not data:  # EOF detected.
                             break
                         captured_data.append(data)
-                        os.write(1, data)
+                        sink.subprocess_output(data)
                     if stdin_fd in rlist:
                         try:
                             input_data = os.read(stdin_fd, 1024)
@@ -379,7 +400,7 @@ def run_interactive_command(
                     if not data:  # EOF detected.
                         break
                     captured_data.append(data)
-                    os.write(1, data)
+                    sink.subprocess_output(data)
             except KeyboardInterrupt:
                 proc.terminate()
 
@@ -462,7 +483,13 @@ def run_interactive_command(
         # Handle any unexpected type
         final_output = str(final_output)[-8000:].encode("utf-8")
 
-    return final_output, proc.returncode
+    observe(
+        SUBPROCESS_DURATION,
+        time.time() - start_time,
+        program=os.path.basename(cmd[0]),
+        status="timeout" if was_terminated else ("ok" if proc.returncode == 0 else "error"),
+    )
+    return CommandOutput(final_output, proc.returncode, timed_out=was_terminated)
 
 
 if __name__ == "__main__":
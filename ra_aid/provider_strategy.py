@@ -520,6 +520,27 @@ class MakehubStrategy(ProviderStrategy):
         return ValidationResult(valid=len(missing) == 0, missing_vars=missing)
 
 
+class FakeStrategy(ProviderStrategy):
+    """Scripted fake provider validation strategy."""
+
+    def validate(self, args: Optional[Any] = None) -> ValidationResult:
+        """Validate that a response script is configured."""
+        missing = []
+
+        if args and hasattr(args, "expert_provider") and args.expert_provider == "fake":
+            script = os.environ.get("EXPERT_FAKE_LLM_SCRIPT") or os.environ.get(
+                "FAKE_LLM_SCRIPT"
+            )
+            if not script:
+                missing.append(
+                    "EXPERT_FAKE_LLM_SCRIPT environment variable is not set"
+                )
+        elif not os.environ.get("FAKE_LLM_SCRIPT"):
+            missing.append("FAKE_LLM_SCRIPT environment variable is not set")
+
+        return ValidationResult(valid=len(missing) == 0, missing_vars=missing)
+
+
 class ProviderFactory:
     """Factory for creating provider validation strategies."""
 
@@ -546,6 +567,7 @@ class ProviderFactory:
             "groq": GroqStrategy(),
             "bedrock": BedrockStrategy(),
             "makehub": MakehubStrategy(),
+            "fake": FakeStrategy(),
         }
         strategy = strategies.get(provider)
         return strategy
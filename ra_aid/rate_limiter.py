@@ -0,0 +1,367 @@
+"""
+Shared rate limiting for LLM providers.
+
+Without a limiter, concurrent agents, expert calls and GC agents all call the
+provider independently and only slow down after receiving 429 errors, which
+are then retried with exponential backoff. This module enforces the limits
+before a request is sent instead.
+
+Limits are configured per provider (``anthropic``) or per provider and model
+(``anthropic/claude-3-7-sonnet-20250219``) as requests and tokens per minute.
+Each limit is a token bucket holding one minute's worth of capacity that
+refills continuously. A call reserves one request and its estimated input
+tokens up front; when the call finishes, the reservation is corrected by the
+actual token usage reported by the provider.
+
+Reservations may drive a bucket negative: the caller then sleeps until the
+bucket is back at zero. This keeps callers roughly in arrival order without
+polling.
+
+By default bucket state is held in memory and shared by all threads of the
+process. With ``shared=True`` it is stored in the project database, so all
+ra-aid processes working in the same project (CLI runs, server worker
+processes) share the same limits.
+
+Example:
+    limiter = RateLimiter({"anthropic": RateLimit(requests_per_minute=50)})
+    waited = limiter.acquire("anthropic", "claude-3-7-sonnet-20250219", tokens=1200)
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from ra_aid.logging_config import get_logger
+from ra_aid.metrics import RATE_LIMIT_WAIT, observe
+
+logger = get_logger(__name__)
+
+# Waits longer than this are logged at info level
+_LOG_WAIT_THRESHOLD = 1.0
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Requests and tokens allowed per minute; None means unlimited."""
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+def parse_rate_limit(spec: str) -> Tuple[str, RateLimit]:
+    """
+    Parse a rate limit specification.
+
+    The format is ``PROVIDER[/MODEL]:rpm=N,tpm=N``, where either of rpm and
+    tpm may be omitted.
+
+    Args:
+        spec: The specification, e.g. ``anthropic:rpm=50,tpm=40000``
+
+    Returns:
+        Tuple[str, RateLimit]: The limit key and the parsed limit
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    key, sep, values = spec.partition(":")
+    key = key.strip()
+    if not key or not sep or not values.strip():
+        raise ValueError(f"Invalid rate limit '{spec}', expected PROVIDER[/MODEL]:rpm=N,tpm=N")
+
+    parsed: Dict[str, float] = {}
+    for part in values.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip().lower()
+        if name not in ("rpm", "tpm"):
+            raise ValueError(f"Invalid rate limit '{spec}': unknown limit '{name}'")
+        try:
+            parsed[name] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid rate limit '{spec}': '{value}' is not a number")
+        if parsed[name] <= 0:
+            raise ValueError(f"Invalid rate limit '{spec}': {name} must be positive")
+
+    return key, RateLimit(
+        requests_per_minute=parsed.get("rpm"), tokens_per_minute=parsed.get("tpm")
+    )
+
+
+def _take(
+    level: Optional[float], refreshed_at: float, now: float, per_minute: float, amount: float
+) -> Tuple[float, float]:
+    """
+    Refill a bucket and take an amount from it.
+
+    Args:
+        level: Current bucket level, or None for a new (full) bucket
+        refreshed_at: Time of the last update
+        now: Current time
+        per_minute: Bucket capacity and refill rate per minute
+        amount: Amount to take (negative to give back)
+
+    Returns:
+        Tuple[float, float]: The new level and the seconds until it is back at zero
+    """
+    rate = per_minute / 60.0
+    if level is None:
+        level = per_minute
+    else:
+        level = min(per_minute, level + max(0.0, now - refreshed_at) * rate)
+    # A single call never needs more than a full bucket
+    level = min(per_minute, level - min(amount, per_minute))
+    wait = -level / rate if level < 0 else 0.0
+    return level, wait
+
+
+class MemoryBucketStore:
+    """Token bucket state shared by the threads of this process."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, amounts: Dict[str, Tuple[float, float]]) -> float:
+        """
+        Atomically take amounts from several buckets.
+
+        Args:
+            amounts: Bucket name -> (per-minute limit, amount to take)
+
+        Returns:
+            float: Seconds until all buckets are back at zero
+        """
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for name, (per_minute, amount) in amounts.items():
+                level, refreshed_at = self._buckets.get(name, (None, now))
+                level, bucket_wait = _take(level, refreshed_at, now, per_minute, amount)
+                self._buckets[name] = (level, now)
+                wait = max(wait, bucket_wait)
+        return wait
+
+
+class SqliteBucketStore:
+    """Token bucket state stored in the project database, shared across processes."""
+
+    def take(self, amounts: Dict[str, Tuple[float, float]]) -> float:
+        """
+        Atomically take amounts from several buckets.
+
+        Args:
+            amounts: Bucket name -> (per-minute limit, amount to take)
+
+        Returns:
+            float: Seconds until all buckets are back at zero
+        """
+        from ra_aid.database.models import RateLimitBucket
+
+        db = RateLimitBucket._meta.database
+        wait = 0.0
+        # IMMEDIATE takes the write lock up front, so concurrent processes
+        # cannot read the same bucket level
+        with db.atomic("IMMEDIATE"):
+            now = time.time()
+            rows = {
+                row.key: row
+                for row in RateLimitBucket.select().where(RateLimitBucket.key.in_(list(amounts)))
+            }
+            for name, (per_minute, amount) in amounts.items():
+                row = rows.get(name)
+                level, bucket_wait = _take(
+                    row.level if row else None,
+                    row.refreshed_at if row else now,
+                    now,
+                    per_minute,
+                    amount,
+                )
+                RateLimitBucket.insert(key=name, level=level, refreshed_at=now).on_conflict(
+                    conflict_target=[RateLimitBucket.key],
+                    update={RateLimitBucket.level: level, RateLimitBucket.refreshed_at: now},
+                ).execute()
+                wait = max(wait, bucket_wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Per-provider/model rate limiter with request and token buckets.
+
+    Lookup prefers a ``provider/model`` limit over a ``provider`` limit; a
+    provider-wide limit is shared by all models of that provider.
+    """
+
+    def __init__(self, limits: Dict[str, RateLimit], store: Optional[Any] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            limits: Limit key (``provider`` or ``provider/model``) -> limit
+            store: Bucket store (default: in-memory)
+        """
+        self.limits = dict(limits)
+        self._store = store or MemoryBucketStore()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    def resolve(self, provider: str, model: Optional[str]) -> Optional[str]:
+        """
+        Find the limit key that applies to a provider and model.
+
+        Returns:
+            Optional[str]: The limit key, or None if the model is not limited
+        """
+        if model and f"{provider}/{model}" in self.limits:
+            return f"{provider}/{model}"
+        if provider in self.limits:
+            return provider
+        return None
+
+    def acquire(self, provider: str, model: Optional[str], tokens: float = 0) -> float:
+        """
+        Reserve one request and an estimated number of tokens, waiting if needed.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            tokens: Estimated tokens of the request
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        key = self.resolve(provider, model)
+        if key is None:
+            return 0.0
+
+        with self._stats_lock:
+            stats = self._stats_for(key)
+            stats["waiting"] += 1
+        wait = 0.0
+        try:
+            wait = self._store.take(self._amounts(key, requests=1, tokens=tokens))
+            if wait > 0:
+                log = logger.info if wait >= _LOG_WAIT_THRESHOLD else logger.debug
+                log(f"Rate limit {key}: waiting {wait:.2f}s before the next request")
+                time.sleep(wait)
+        finally:
+            with self._stats_lock:
+                stats["waiting"] -= 1
+                stats["requests"] += 1
+                stats["estimated_tokens"] += tokens
+                if wait > 0:
+                    stats["waited_requests"] += 1
+                    stats["total_wait_seconds"] += wait
+                    stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait)
+            observe(RATE_LIMIT_WAIT, wait, limit=key)
+        return wait
+
+    def record_usage(
+        self, provider: str, model: Optional[str], estimated_tokens: float, actual_tokens: float
+    ) -> None:
+        """
+        Correct a reservation by the actual token usage of a finished call.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            estimated_tokens: Tokens reserved by acquire
+            actual_tokens: Tokens reported by the provider
+        """
+        key = self.resolve(provider, model)
+        if key is None or self.limits[key].tokens_per_minute is None:
+            return
+        delta = actual_tokens - estimated_tokens
+        if delta:
+            self._store.take(self._amounts(key, requests=0, tokens=delta))
+        with self._stats_lock:
+            self._stats_for(key)["actual_tokens"] += actual_tokens
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Snapshot of queue-wait metrics per limit key.
+
+        The waits are also exported as the ``ra_aid_rate_limit_wait_seconds``
+        histogram (see ``ra_aid.metrics``).
+
+        Returns:
+            Dict[str, Dict[str, float]]: Requests, waits and token counts per key
+        """
+        with self._stats_lock:
+            return {key: dict(values) for key, values in self._stats.items()}
+
+    def _amounts(self, key: str, requests: float, tokens: float) -> Dict[str, Tuple[float, float]]:
+        limit = self.limits[key]
+        amounts = {}
+        if limit.requests_per_minute is not None and requests:
+            amounts[f"{key}:requests"] = (limit.requests_per_minute, requests)
+        if limit.tokens_per_minute is not None and tokens:
+            amounts[f"{key}:tokens"] = (limit.tokens_per_minute, tokens)
+        return amounts
+
+    def _stats_for(self, key: str) -> Dict[str, float]:
+        if key not in self._stats:
+            self._stats[key] = {
+                "requests": 0,
+                "waited_requests": 0,
+                "waiting": 0,
+                "total_wait_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+                "estimated_tokens": 0,
+                "actual_tokens": 0,
+            }
+        return self._stats[key]
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_config: Optional[Tuple[Any, ...]] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Get the process-wide rate limiter for the configured limits.
+
+    The limits are read from the config repository (``rate_limits``, a dict
+    of limit key -> ``{"rpm": N, "tpm": N}``, and ``rate_limit_shared``). The
+    limiter is created once and shared by all threads as long as the
+    configuration does not change.
+
+    Returns:
+        Optional[RateLimiter]: The limiter, or None if no limits are configured
+    """
+    global _rate_limiter, _rate_limiter_config
+    try:
+        from ra_aid.database.repositories.config_repository import get_config_repository
+
+        config_repo = get_config_repository()
+        limits = config_repo.get("rate_limits") or {}
+        shared = bool(config_repo.get("rate_limit_shared", False))
+    except RuntimeError:
+        return None
+    if not limits:
+        return None
+
+    config_key = (tuple(sorted((k, tuple(sorted(v.items()))) for k, v in limits.items())), shared)
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter_config != config_key:
+            _rate_limiter = RateLimiter(
+                {
+                    key: RateLimit(
+                        requests_per_minute=value.get("rpm"), tokens_per_minute=value.get("tpm")
+                    )
+                    for key, value in limits.items()
+                },
+                store=SqliteBucketStore() if shared else MemoryBucketStore(),
+            )
+            _rate_limiter_config = config_key
+        return _rate_limiter
+
+
+def reset_rate_limiter() -> None:
+    """Drop the process-wide limiter and its statistics."""
+    global _rate_limiter, _rate_limiter_config
+    with _rate_limiter_lock:
+        _rate_limiter = None
+        _rate_limiter_config = None
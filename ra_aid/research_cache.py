@@ -0,0 +1,535 @@
+"""
+Reuse of research results across runs.
+
+Research is the most token-expensive stage, and every invocation used to
+rerun it from scratch, even for a task that had just been researched against
+the same tree. When research completes, the resulting research notes, key
+facts, key snippets and related files are stored under ``research_cache/``
+next to the project database (``.ra-aid/research_cache/``), keyed by:
+
+- the normalized task text (case and whitespace insensitive), and
+- a fingerprint of the repository: the git HEAD plus the paths and contents of
+  all dirty and untracked files.
+
+A later run of the same task looks the entry up before the research agent
+starts:
+
+- **hit**: the fingerprint matches, so the tree is unchanged. The cached
+  results are restored into the repositories and offered to the agent as
+  complete research; research-only runs return the cached result directly.
+- **stale**: the task was researched against another tree state. The cached
+  results are restored and the agent is asked to update them incrementally,
+  checking only the files that changed since.
+- **miss**: nothing cached; research runs as usual.
+
+Caching needs a git repository and a database file; it is off for in-memory
+databases and with ``--no-research-cache``.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from ra_aid.logging_config import get_logger
+from ra_aid.utils.file_utils import atomic_write
+
+logger = get_logger(__name__)
+
+RESEARCH_CACHE_DIRNAME = "research_cache"
+RESEARCH_CACHE_FORMAT = 1
+# Entries kept per task; older tree states are removed first
+MAX_ENTRIES_PER_TASK = 4
+# Changed files listed in the incremental update prompt
+MAX_CHANGED_FILES_LISTED = 50
+GIT_TIMEOUT_SECONDS = 10
+
+
+def normalize_task(task: str) -> str:
+    """
+    Normalize task text so trivial edits map to the same cache key.
+
+    Args:
+        task: The task or query as given by the user
+
+    Returns:
+        str: Lowercased text with collapsed whitespace and no trailing punctuation
+    """
+    return re.sub(r"\s+", " ", task).strip().rstrip(".!?;:").strip().lower()
+
+
+def task_key(task: str, research_only: bool = False) -> str:
+    """
+    Get the cache key of a task.
+
+    Args:
+        task: The task or query
+        research_only: Research-only runs use a different prompt, so they are cached separately
+
+    Returns:
+        str: sha256 hex digest of the normalized task and mode
+    """
+    mode = "research-only" if research_only else "research"
+    return hashlib.sha256(f"{mode}\n{normalize_task(task)}".encode("utf-8")).hexdigest()
+
+
+def _git(args: List[str], cwd: str) -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            timeout=GIT_TIMEOUT_SECONDS,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"git {args[0]} failed: {e}")
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode("utf-8", "surrogateescape")
+
+
+@dataclass
+class RepositoryState:
+    """The git state a research result was produced against."""
+
+    root: str
+    head: str
+    fingerprint: str
+    dirty_files: List[str] = field(default_factory=list)
+
+
+def repository_state(cwd: Optional[str] = None, exclude: Optional[List[str]] = None) -> Optional[RepositoryState]:
+    """
+    Fingerprint the git repository containing a directory.
+
+    Args:
+        cwd: Directory inside the repository (default: the working directory)
+        exclude: Directories whose changes are ignored, e.g. the project state
+            directory itself (``.ra-aid`` is always ignored)
+
+    Returns:
+        Optional[RepositoryState]: The state, or None outside a git repository or
+        before the first commit
+    """
+    cwd = cwd or os.getcwd()
+    root = _git(["rev-parse", "--show-toplevel"], cwd)
+    head = _git(["rev-parse", "HEAD"], cwd)
+    status = _git(["status", "--porcelain", "-z"], cwd)
+    if root is None or head is None or status is None:
+        return None
+    root = root.strip()
+    head = head.strip()
+    excluded = [".ra-aid"] + [
+        os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/") for path in exclude or []
+    ]
+
+    # Entries are "XY path\0", renames are followed by "orig\0"
+    dirty_files = []
+    entries = status.split("\0")
+    index = 0
+    while index < len(entries):
+        entry = entries[index]
+        index += 1
+        if len(entry) < 4:
+            continue
+        if entry[0] in "RC":
+            index += 1
+        path = entry[3:].rstrip("/")
+        if any(path == prefix or path.startswith(prefix + "/") for prefix in excluded):
+            continue
+        dirty_files.append(entry[:3] + path)
+
+    digest = hashlib.sha256(head.encode())
+    for entry in sorted(dirty_files):
+        digest.update(b"\0" + entry.encode("utf-8", "surrogateescape"))
+        full_path = os.path.join(root, entry[3:])
+        if os.path.isfile(full_path):
+            try:
+                with open(full_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+            except OSError:
+                pass
+    return RepositoryState(
+        root=root,
+        head=head,
+        fingerprint=digest.hexdigest(),
+        dirty_files=[entry[3:] for entry in dirty_files],
+    )
+
+
+def changed_files_since(state: RepositoryState, head: str) -> List[str]:
+    """
+    List files that differ between a commit and the current working tree.
+
+    Args:
+        state: The current repository state
+        head: The commit a cached result was produced against
+
+    Returns:
+        List[str]: Paths relative to the repository root, including dirty files
+    """
+    changed = set(state.dirty_files)
+    diff = _git(["diff", "--name-only", head], state.root)
+    if diff is not None:
+        changed.update(line for line in diff.splitlines() if line)
+    return sorted(changed)
+
+
+@dataclass
+class CachedResearch:
+    """Research results stored for one task and tree state."""
+
+    task: str
+    head: str
+    fingerprint: str
+    result: Optional[str] = None
+    research_notes: List[str] = field(default_factory=list)
+    key_facts: List[str] = field(default_factory=list)
+    key_snippets: List[Dict[str, Any]] = field(default_factory=list)
+    related_files: List[str] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": RESEARCH_CACHE_FORMAT,
+            "task": self.task,
+            "head": self.head,
+            "fingerprint": self.fingerprint,
+            "result": self.result,
+            "research_notes": self.research_notes,
+            "key_facts": self.key_facts,
+            "key_snippets": self.key_snippets,
+            "related_files": self.related_files,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CachedResearch":
+        return cls(
+            task=data["task"],
+            head=data["head"],
+            fingerprint=data["fingerprint"],
+            result=data.get("result"),
+            research_notes=list(data.get("research_notes", [])),
+            key_facts=list(data.get("key_facts", [])),
+            key_snippets=list(data.get("key_snippets", [])),
+            related_files=list(data.get("related_files", [])),
+            created_at=data.get("created_at", 0.0),
+        )
+
+
+@dataclass
+class CacheLookup:
+    """Result of looking up a task in the research cache."""
+
+    status: str  # "hit", "stale" or "miss"
+    entry: Optional[CachedResearch] = None
+    changed_files: List[str] = field(default_factory=list)
+
+
+class ResearchCache:
+    """Stores research results as JSON files, one directory per task."""
+
+    def __init__(self, root: Path, max_entries_per_task: int = MAX_ENTRIES_PER_TASK):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Directory of the cache (created on first write)
+            max_entries_per_task: Number of tree states kept per task
+        """
+        self.root = Path(root)
+        self.max_entries_per_task = max_entries_per_task
+        self._lock = threading.Lock()
+
+    def _task_dir(self, key: str) -> Path:
+        return self.root / key
+
+    def _write_json(self, path: Path, data: Dict[str, Any]) -> None:
+        atomic_write(path, json.dumps(data))
+
+    def entries(self, key: str) -> List[CachedResearch]:
+        """
+        Load all entries of a task, newest first.
+
+        Args:
+            key: The task key from task_key()
+
+        Returns:
+            List[CachedResearch]: Readable entries; corrupt files are skipped
+        """
+        task_dir = self._task_dir(key)
+        if not task_dir.is_dir():
+            return []
+        entries = []
+        for path in task_dir.glob("*.json"):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("format") == RESEARCH_CACHE_FORMAT:
+                    entries.append(CachedResearch.from_dict(data))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable research cache entry {path}: {e}")
+        entries.sort(key=lambda entry: entry.created_at, reverse=True)
+        return entries
+
+    def lookup(self, key: str, state: RepositoryState) -> CacheLookup:
+        """
+        Look up research for a task against the current tree and count the outcome.
+
+        Args:
+            key: The task key from task_key()
+            state: The current repository state
+
+        Returns:
+            CacheLookup: A hit for the same tree, the newest entry as stale for
+            another tree, or a miss
+        """
+        entries = self.entries(key)
+        lookup = CacheLookup(status="miss")
+        for entry in entries:
+            if entry.fingerprint == state.fingerprint:
+                lookup = CacheLookup(status="hit", entry=entry)
+                break
+        else:
+            if entries:
+                lookup = CacheLookup(
+                    status="stale",
+                    entry=entries[0],
+                    changed_files=changed_files_since(state, entries[0].head),
+                )
+        self._count(lookup.status)
+        return lookup
+
+    def store(self, key: str, entry: CachedResearch) -> None:
+        """
+        Store research for a task, replacing any entry for the same tree state.
+
+        Args:
+            key: The task key from task_key()
+            entry: The research results
+        """
+        self._write_json(self._task_dir(key) / f"{entry.fingerprint}.json", entry.to_dict())
+        for old in self.entries(key)[self.max_entries_per_task :]:
+            try:
+                (self._task_dir(key) / f"{old.fingerprint}.json").unlink()
+            except OSError:
+                pass
+
+    def _count(self, status: str) -> None:
+        with self._lock:
+            stats = self.stats()
+            stats[status] = stats.get(status, 0) + 1
+            try:
+                self._write_json(self.root / "stats.json", stats)
+            except OSError as e:
+                logger.debug(f"Could not update research cache stats: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get lookup counts across all runs and the number of cached tasks.
+
+        Returns:
+            Dict[str, int]: {"hit": ..., "stale": ..., "miss": ..., "tasks": ...}
+        """
+        stats = {"hit": 0, "stale": 0, "miss": 0}
+        try:
+            saved = json.loads((self.root / "stats.json").read_text(encoding="utf-8"))
+            stats.update({name: int(saved.get(name, 0)) for name in stats})
+        except (OSError, ValueError):
+            pass
+        stats["tasks"] = sum(1 for path in self.root.iterdir() if path.is_dir()) if self.root.is_dir() else 0
+        return stats
+
+
+def get_research_cache() -> Optional[ResearchCache]:
+    """
+    Get the research cache of the current project database.
+
+    Returns:
+        Optional[ResearchCache]: The cache in the database directory, or None when
+        it is disabled with ``research_cache=False`` or the database is in memory
+    """
+    from ra_aid.database.connection import get_db_dir
+    from ra_aid.database.repositories.config_repository import get_config_repository
+
+    try:
+        if not get_config_repository().get("research_cache", True):
+            return None
+    except RuntimeError:
+        pass
+    db_dir = get_db_dir()
+    if db_dir is None:
+        return None
+    return ResearchCache(db_dir / RESEARCH_CACHE_DIRNAME)
+
+
+def _research_records() -> Dict[str, Dict[int, Any]]:
+    """Get the research results held by the repositories, by ID."""
+    from ra_aid.database.repositories.key_fact_repository import get_key_fact_repository
+    from ra_aid.database.repositories.key_snippet_repository import get_key_snippet_repository
+    from ra_aid.database.repositories.related_files_repository import get_related_files_repository
+    from ra_aid.database.repositories.research_note_repository import get_research_note_repository
+
+    return {
+        "research_notes": get_research_note_repository().get_notes_dict(),
+        "key_facts": get_key_fact_repository().get_facts_dict(),
+        "key_snippets": get_key_snippet_repository().get_snippets_dict(),
+        "related_files": get_related_files_repository().get_all(),
+    }
+
+
+def research_baseline() -> Dict[str, Set[int]]:
+    """
+    Record which research results exist before a research run.
+
+    Returns:
+        Dict[str, Set[int]]: IDs of the existing notes, facts, snippets and files
+    """
+    return {name: set(records) for name, records in _research_records().items()}
+
+
+def collect_research(
+    task: str,
+    state: RepositoryState,
+    result: Optional[str],
+    baseline: Optional[Dict[str, Set[int]]] = None,
+) -> CachedResearch:
+    """
+    Snapshot the research results created during a research run.
+
+    Project memory also holds results of earlier tasks; only records that are
+    not in ``baseline`` belong to this run.
+
+    Args:
+        task: The researched task
+        state: The repository state the research ran against
+        result: The final message of the research agent
+        baseline: IDs from research_baseline() before the run (None keeps everything)
+
+    Returns:
+        CachedResearch: The entry to store
+    """
+    baseline = baseline or {}
+    new = {
+        name: [value for record_id, value in records.items() if record_id not in baseline.get(name, ())]
+        for name, records in _research_records().items()
+    }
+
+    related_files = []
+    for path in new["related_files"]:
+        relative = os.path.relpath(path, state.root)
+        related_files.append(path if relative.startswith("..") else relative)
+
+    return CachedResearch(
+        task=task,
+        head=state.head,
+        fingerprint=state.fingerprint,
+        result=result,
+        research_notes=new["research_notes"],
+        key_facts=new["key_facts"],
+        key_snippets=new["key_snippets"],
+        related_files=related_files,
+    )
+
+
+def restore_research(entry: CachedResearch, root: str) -> Dict[str, int]:
+    """
+    Add cached research results to the repositories, skipping ones already present.
+
+    Args:
+        entry: The cached research
+        root: Repository root that relative related file paths are resolved against
+
+    Returns:
+        Dict[str, int]: Number of restored notes, facts, snippets and files
+    """
+    from ra_aid.database.repositories.key_fact_repository import get_key_fact_repository
+    from ra_aid.database.repositories.key_snippet_repository import get_key_snippet_repository
+    from ra_aid.database.repositories.related_files_repository import get_related_files_repository
+    from ra_aid.database.repositories.research_note_repository import get_research_note_repository
+
+    restored = {"research_notes": 0, "key_facts": 0, "key_snippets": 0, "related_files": 0}
+
+    note_repo = get_research_note_repository()
+    existing_notes = set(note_repo.get_notes_dict().values())
+    for note in entry.research_notes:
+        if note not in existing_notes:
+            note_repo.create(note)
+            existing_notes.add(note)
+            restored["research_notes"] += 1
+
+    fact_repo = get_key_fact_repository()
+    existing_facts = set(fact_repo.get_facts_dict().values())
+    for fact in entry.key_facts:
+        if fact not in existing_facts:
+            fact_repo.create(fact)
+            existing_facts.add(fact)
+            restored["key_facts"] += 1
+
+    snippet_repo = get_key_snippet_repository()
+    existing_snippets = {
+        (snippet["filepath"], snippet["line_number"], snippet["snippet"])
+        for snippet in snippet_repo.get_snippets_dict().values()
+    }
+    for snippet in entry.key_snippets:
+        identity = (snippet["filepath"], snippet["line_number"], snippet["snippet"])
+        if identity not in existing_snippets:
+            snippet_repo.create(
+                filepath=snippet["filepath"],
+                line_number=snippet["line_number"],
+                snippet=snippet["snippet"],
+                description=snippet.get("description"),
+            )
+            existing_snippets.add(identity)
+            restored["key_snippets"] += 1
+
+    files_repo = get_related_files_repository()
+    known_files = set(files_repo.get_all().values())
+    for path in entry.related_files:
+        full_path = os.path.abspath(os.path.join(root, path))
+        if full_path not in known_files and files_repo.add_file(full_path) is not None:
+            known_files.add(full_path)
+            restored["related_files"] += 1
+
+    return restored
+
+
+def format_cached_research_section(lookup: CacheLookup) -> str:
+    """
+    Build the prompt section that offers cached research to the research agent.
+
+    Args:
+        lookup: A hit or stale lookup
+
+    Returns:
+        str: Instructions for reusing or incrementally updating the research
+    """
+    if lookup.status == "hit":
+        return """
+<cached research>
+This task was already researched in a previous run against the current, unchanged repository state.
+The research notes, key facts, key snippets and related files above are the results of that research.
+Do not repeat it: verify only what is still unclear and then continue with the task.
+</cached research>
+"""
+    changed = lookup.changed_files[:MAX_CHANGED_FILES_LISTED]
+    listing = "\n".join(changed) if changed else "(no file changes detected; only the commit differs)"
+    if len(lookup.changed_files) > len(changed):
+        listing += f"\n... and {len(lookup.changed_files) - len(changed)} more"
+    return f"""
+<cached research>
+This task was researched in a previous run against an earlier repository state.
+The research notes, key facts, key snippets and related files above include the results of that research.
+Update them incrementally instead of starting over: re-check findings that involve the files changed since then, and investigate anything new.
+Files changed since the cached research:
+{listing}
+</cached research>
+"""
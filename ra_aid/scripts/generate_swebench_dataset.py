@@ -12,19 +12,34 @@ It:
 - Writes out predictions in JSON format
 
 No progress bar or spinner is used, allowing `ra-aid` output to stream directly.
+
+With --workers N, instances are processed by a pool of N workers instead:
+- Each repo is cloned once into a bare mirror (<projects-dir>/mirrors), and each
+  instance gets a `git worktree` checkout of its commit from that mirror
+- Virtual environments are built once per (repo, environment setup commit,
+  Python version) in a shared cache (<projects-dir>/venvs) and used by every
+  instance with that key; the instance checkout comes first on PYTHONPATH
+- `ra-aid` output of each instance goes to its own log file
+
+Finished instances are checkpointed to <output_dir>/predictions.jsonl, so an
+interrupted run resumes where it stopped. With --dataset and --offline, the
+script works entirely from a local dataset file, local mirrors and the uv cache.
 """
 
 import argparse
 import json
 import logging
+import os
 import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from git import Repo
+from git import GitCommandError, Repo
 from rich.logging import RichHandler
 
 # If you'd like to override Python versions for specific repos:
@@ -32,6 +47,9 @@ PYTHON_VERSION_OVERRIDES = {
     # "someorg/somerepo": "3.9",
 }
 
+# Root of the ra-aid source tree installed into each venv
+RA_AID_ROOT = Path(__file__).resolve().parents[2]
+
 
 def setup_logging(log_dir: Path, verbose: bool = False) -> None:
     """Configure logging with both file and console handlers."""
@@ -68,6 +86,23 @@ def load_dataset_safely() -> Optional[Any]:
         return None
 
 
+def load_local_dataset(path: Path) -> List[Dict[str, Any]]:
+    """
+    Load instances from a local dataset file.
+
+    The file is either JSON Lines with one instance per line, or JSON holding a
+    list of instances or a dict of splits (e.g. {"dev": [...], "test": [...]}),
+    whose instances are combined in split order.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    if isinstance(data, dict):
+        return [inst for split in data.values() for inst in split]
+    return data
+
+
 def create_output_dirs() -> Tuple[Path, Path]:
     """Create base/log directory structure."""
     date_str = datetime.now().strftime("%Y%m%d")
@@ -78,6 +113,11 @@ def create_output_dirs() -> Tuple[Path, Path]:
     return base_dir, log_dir
 
 
+def python_version_for(repo_name: str) -> str:
+    """Get the Python version to create a repo's venv with."""
+    return PYTHON_VERSION_OVERRIDES.get(repo_name, None) or "3.12"
+
+
 def uv_venv(repo_dir: Path, repo_name: str, force_venv: bool) -> None:
     """
     Create (or reuse) a .venv in 'repo_dir' using 'uv venv'.
@@ -91,7 +131,7 @@ def uv_venv(repo_dir: Path, repo_name: str, force_venv: bool) -> None:
         logging.info(f"Removing existing .venv at {venv_dir}")
         shutil.rmtree(venv_dir)
 
-    python_version = PYTHON_VERSION_OVERRIDES.get(repo_name, None) or "3.12"
+    python_version = python_version_for(repo_name)
     cmd = ["uv", "venv"]
     if python_version:
         cmd.append(f"--python={python_version}")
@@ -103,12 +143,25 @@ def uv_venv(repo_dir: Path, repo_name: str, force_venv: bool) -> None:
         logging.error(f"Failed to create venv in {repo_dir}: {e}")
 
 
-def uv_pip_install(repo_dir: Path, args: List[str]) -> None:
+def uv_pip_install(
+    repo_dir: Path,
+    args: List[str],
+    python: Optional[Path] = None,
+    offline: bool = False,
+) -> None:
     """
     Run 'uv pip install ...' in the specified repo_dir.
     Example: uv_pip_install(repo_dir, ["--upgrade", "pip"])
+
+    If python is given, install into the environment of that interpreter
+    instead of the repo's .venv. If offline is set, only the uv cache is used.
     """
-    cmd = ["uv", "pip", "install"] + args
+    cmd = ["uv", "pip", "install"]
+    if python:
+        cmd += ["--python", str(python)]
+    if offline:
+        cmd.append("--offline")
+    cmd += args
     try:
         subprocess.run(cmd, cwd=repo_dir, check=True)
     except Exception as e:
@@ -183,9 +236,7 @@ def setup_venv_and_deps(repo_dir: Path, repo_name: str, force_venv: bool) -> Non
     uv_pip_install(repo_dir, ["--upgrade", "setuptools", "wheel"])
 
     # 3) install ra-aid from local path
-    script_dir = Path(__file__).resolve().parent
-    ra_aid_root = script_dir.parent  # one level up from scripts
-    uv_pip_install(repo_dir, ["-e", str(ra_aid_root)])
+    uv_pip_install(repo_dir, ["-e", str(RA_AID_ROOT)])
 
     # 4) optional pyproject
     pyproject_path = repo_dir / "pyproject.toml"
@@ -228,6 +279,24 @@ def build_prompt(
     return prompt
 
 
+def repo_url_for(repo_name: str) -> str:
+    """Get the clone URL of a dataset repo name such as "django/django"."""
+    if "github.com" not in repo_name:
+        return f"https://github.com/{repo_name}.git"
+    return repo_name
+
+
+def instance_tests(instance: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Get the FAIL_TO_PASS and PASS_TO_PASS tests of an instance as lists."""
+    fail_tests = instance.get("FAIL_TO_PASS", [])
+    pass_tests = instance.get("PASS_TO_PASS", [])
+    if isinstance(fail_tests, str):
+        fail_tests = [fail_tests]
+    if isinstance(pass_tests, str):
+        pass_tests = [pass_tests]
+    return fail_tests, pass_tests
+
+
 def process_instance(
     instance: Dict[str, Any], projects_dir: Path, reuse_repo: bool, force_venv: bool
 ) -> Dict[str, Any]:
@@ -244,18 +313,9 @@ def process_instance(
     repo_name = instance["repo"]
     commit = instance["base_commit"]
     problem_statement = instance["problem_statement"]
-    fail_tests = instance.get("FAIL_TO_PASS", [])
-    pass_tests = instance.get("PASS_TO_PASS", [])
+    fail_tests, pass_tests = instance_tests(instance)
 
-    if isinstance(fail_tests, str):
-        fail_tests = [fail_tests]
-    if isinstance(pass_tests, str):
-        pass_tests = [pass_tests]
-
-    if "github.com" not in repo_name:
-        repo_url = f"https://github.com/{repo_name}.git"
-    else:
-        repo_url = repo_name
+    repo_url = repo_url_for(repo_name)
 
     checkout_dir = projects_dir / f"{inst_id}"
 
@@ -297,6 +357,364 @@ def process_instance(
         }
 
 
+def empty_prediction(inst_id: str) -> Dict[str, str]:
+    """Get the prediction of an instance that produced no patch."""
+    return {"instance_id": inst_id, "model_patch": "", "model_name_or_path": "ra-aid"}
+
+
+class PredictionCheckpoint:
+    """
+    Append-only JSON Lines record of finished instances.
+
+    Each prediction is flushed to disk as soon as its instance finishes, so a
+    resumed run skips the instances already in the file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.predictions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        text = self.path.read_text(encoding="utf-8")
+        if text and not text.endswith("\n"):
+            # Drop a record cut short by an interruption, so appends start on a new line
+            text = text[: text.rfind("\n") + 1]
+            self.path.write_text(text, encoding="utf-8")
+        for line in text.splitlines():
+            if line.strip():
+                prediction = json.loads(line)
+                self.predictions[prediction["instance_id"]] = prediction
+
+    def done(self, inst_id: str) -> bool:
+        """Check whether an instance already has a prediction."""
+        return inst_id in self.predictions
+
+    def record(self, prediction: Dict[str, Any]) -> None:
+        """Append a prediction and flush it to disk."""
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(prediction) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.predictions[prediction["instance_id"]] = prediction
+
+
+def write_predictions(
+    predictions_file: Path,
+    instances: Iterable[Dict[str, Any]],
+    checkpoint: PredictionCheckpoint,
+) -> None:
+    """Write the predictions of all instances, in dataset order, as JSON."""
+    predictions = [
+        checkpoint.predictions.get(inst["instance_id"])
+        or empty_prediction(inst["instance_id"])
+        for inst in instances
+    ]
+    with open(predictions_file, "w", encoding="utf-8") as f:
+        json.dump(predictions, f, indent=2)
+
+
+def mirror_dir_name(repo_name: str) -> str:
+    """Get the directory name of a repo's bare mirror, e.g. "django__django.git"."""
+    name = repo_name.split("github.com/")[-1].strip("/").removesuffix(".git")
+    return name.replace("/", "__") + ".git"
+
+
+def has_commit(repo: Repo, commit: str) -> bool:
+    """Check whether a repository has a commit."""
+    try:
+        repo.git.cat_file("-e", f"{commit}^{{commit}}")
+        return True
+    except GitCommandError:
+        return False
+
+
+class MirrorCache:
+    """
+    Bare mirrors of the dataset repos, with worktree checkouts from them.
+
+    Mirrors live in mirrors_dir as <owner>__<name>.git. In offline mode a
+    missing mirror or commit is an error instead of a clone or fetch. Git
+    operations are serialized per mirror, because concurrent `git worktree`
+    calls race on the repository's metadata.
+    """
+
+    def __init__(self, mirrors_dir: Path, offline: bool = False):
+        self.mirrors_dir = mirrors_dir
+        self.offline = offline
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, repo_name: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(repo_name, threading.Lock())
+
+    def mirror_path(self, repo_name: str) -> Path:
+        """Get the path of a repo's mirror."""
+        return self.mirrors_dir / mirror_dir_name(repo_name)
+
+    def _mirror(self, repo_name: str, commit: str) -> Repo:
+        """Get a repo's mirror, cloning or fetching it so it has the commit."""
+        path = self.mirror_path(repo_name)
+        if not path.exists():
+            if self.offline:
+                raise RuntimeError(f"No local mirror of {repo_name} at {path}")
+            logging.info(f"Mirroring {repo_name} -> {path}")
+            Repo.clone_from(repo_url_for(repo_name), path, mirror=True)
+        mirror = Repo(path)
+        if not has_commit(mirror, commit):
+            if self.offline:
+                raise RuntimeError(f"Mirror of {repo_name} does not have commit {commit}")
+            logging.info(f"Fetching {repo_name} for commit {commit}")
+            mirror.git.fetch("--prune", "origin")
+        return mirror
+
+    def add_worktree(self, repo_name: str, commit: str, path: Path) -> Path:
+        """Check out a commit of a repo into a new worktree at path."""
+        with self._lock(repo_name):
+            mirror = self._mirror(repo_name, commit)
+            self._remove(mirror, path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            mirror.git.worktree("add", "--detach", "--force", str(path), commit)
+        return path
+
+    def remove_worktree(self, repo_name: str, path: Path) -> None:
+        """Remove a worktree of a repo."""
+        with self._lock(repo_name):
+            self._remove(Repo(self.mirror_path(repo_name)), path)
+
+    @staticmethod
+    def _remove(mirror: Repo, path: Path) -> None:
+        if path.exists():
+            try:
+                mirror.git.worktree("remove", "--force", str(path))
+            except GitCommandError:
+                # Not a worktree of this mirror, e.g. left over from a legacy run
+                shutil.rmtree(path)
+        mirror.git.worktree("prune")
+
+
+def venv_key(repo_name: str, env_commit: str, python_version: str) -> str:
+    """Get the venv cache key of a (repo, environment setup commit, Python version)."""
+    repo = mirror_dir_name(repo_name).removesuffix(".git")
+    return f"{repo}-{env_commit[:12]}-py{python_version}"
+
+
+class VenvCache:
+    """
+    Virtual environments shared by instances with the same repo, environment
+    setup commit and Python version.
+
+    An environment is built from a checkout of its environment setup commit,
+    with ra-aid, the project's requirements files and the project itself. A
+    finished environment is marked with READY_FILE, so one left half-built by
+    an interruption is rebuilt.
+    """
+
+    READY_FILE = ".ra-aid-ready"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        mirrors: MirrorCache,
+        offline: bool = False,
+        force: bool = False,
+    ):
+        self.cache_dir = cache_dir
+        self.mirrors = mirrors
+        self.offline = offline
+        self.force = force
+        self._built: set = set()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, repo_name: str, env_commit: str) -> Path:
+        """Get the venv for a repo and environment setup commit, building it if needed."""
+        python_version = python_version_for(repo_name)
+        key = venv_key(repo_name, env_commit, python_version)
+        venv = self.cache_dir / key
+        with self._lock(key):
+            ready = (venv / self.READY_FILE).exists()
+            # With force, each venv is rebuilt once per run
+            if not ready or (self.force and key not in self._built):
+                self._build(repo_name, env_commit, python_version, venv)
+                self._built.add(key)
+        return venv
+
+    def _build(
+        self, repo_name: str, env_commit: str, python_version: str, venv: Path
+    ) -> None:
+        if venv.exists():
+            logging.info(f"Removing existing venv at {venv}")
+            shutil.rmtree(venv)
+        checkout = self.cache_dir / ".checkouts" / venv.name
+        self.mirrors.add_worktree(repo_name, env_commit, checkout)
+        try:
+            logging.info(f"Building venv {venv.name}")
+            cmd = ["uv", "venv", f"--python={python_version}", str(venv)]
+            if self.offline:
+                cmd.append("--offline")
+            subprocess.run(cmd, check=True)
+
+            python = venv / "bin" / "python"
+
+            def install(args: List[str]) -> None:
+                uv_pip_install(checkout, args, python=python, offline=self.offline)
+
+            install(["--upgrade", "pip"])
+            install(["--upgrade", "setuptools", "wheel"])
+            install(["-e", str(RA_AID_ROOT)])
+            for requirements in ("requirements.txt", "requirements-dev.txt"):
+                if (checkout / requirements).is_file():
+                    install(["-r", requirements])
+            if (checkout / "pyproject.toml").is_file() or (checkout / "setup.py").is_file():
+                # Pulls in the project's dependencies; instance checkouts shadow
+                # the installed project itself through PYTHONPATH
+                install(["."])
+            (venv / self.READY_FILE).touch()
+        finally:
+            self.mirrors.remove_worktree(repo_name, checkout)
+
+
+def run_raaid_in_venv(
+    checkout: Path, venv: Path, prompt: str, log_file: Path
+) -> Optional[str]:
+    """
+    Run ra-aid from a cached venv in a worktree checkout, writing its output to
+    log_file. Returns the patch if successful, else None.
+    """
+    env = os.environ.copy()
+    env["VIRTUAL_ENV"] = str(venv)
+    env["PATH"] = f"{venv / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+    # The checkout's sources take precedence over the project installed in the venv
+    source_roots = [str(checkout)]
+    if (checkout / "src").is_dir():
+        source_roots.insert(0, str(checkout / "src"))
+    if env.get("PYTHONPATH"):
+        source_roots.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(source_roots)
+
+    cmd = [str(venv / "bin" / "ra-aid"), "--cowboy-mode", "-m", prompt]
+    try:
+        with open(log_file, "w", encoding="utf-8") as log:
+            result = subprocess.run(
+                cmd,
+                cwd=checkout,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                check=False,
+            )
+    except Exception as e:
+        logging.error(f"ra-aid error: {e}")
+        return None
+    if result.returncode != 0:
+        logging.error(f"ra-aid returned non-zero exit code, see {log_file}")
+        return None
+
+    return get_git_patch(checkout)
+
+
+def process_instance_in_worktree(
+    instance: Dict[str, Any],
+    mirrors: MirrorCache,
+    venvs: VenvCache,
+    worktrees_dir: Path,
+    log_dir: Path,
+    keep_worktree: bool = False,
+) -> Dict[str, Any]:
+    """
+    Process a single dataset instance in a worker.
+    - Get the cached venv of the instance's environment setup commit
+    - Check out the instance's commit into a worktree of the repo's mirror
+    - Build prompt, run ra-aid (output written to <log_dir>/<instance_id>.log)
+    - Return prediction dict
+
+    Errors setting up the mirror, worktree or venv are raised.
+    """
+    inst_id = instance["instance_id"]
+    repo_name = instance["repo"]
+    commit = instance["base_commit"]
+    env_commit = instance.get("environment_setup_commit") or commit
+
+    venv = venvs.get(repo_name, env_commit)
+    checkout = mirrors.add_worktree(repo_name, commit, worktrees_dir / inst_id)
+    try:
+        fail_tests, pass_tests = instance_tests(instance)
+        prompt_text = build_prompt(instance["problem_statement"], fail_tests, pass_tests)
+        patch = run_raaid_in_venv(checkout, venv, prompt_text, log_dir / f"{inst_id}.log")
+    finally:
+        if not keep_worktree:
+            mirrors.remove_worktree(repo_name, checkout)
+
+    return {
+        "instance_id": inst_id,
+        "model_patch": patch if patch else "",
+        "model_name_or_path": "ra-aid",
+    }
+
+
+def run_worker_pool(
+    instances: List[Dict[str, Any]],
+    checkpoint: PredictionCheckpoint,
+    workers: int,
+    mirrors: MirrorCache,
+    venvs: VenvCache,
+    worktrees_dir: Path,
+    log_dir: Path,
+    keep_worktrees: bool = False,
+) -> None:
+    """
+    Process the instances without a checkpointed prediction with a pool of workers.
+
+    Instances that fail with an error are logged and not checkpointed, so a
+    resumed run retries them.
+    """
+    pending = [inst for inst in instances if not checkpoint.done(inst["instance_id"])]
+    logging.info(
+        f"{len(instances) - len(pending)} instances already done, "
+        f"processing {len(pending)} with {workers} workers."
+    )
+    instance_log_dir = log_dir / "instances"
+    instance_log_dir.mkdir(parents=True, exist_ok=True)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="swebench")
+    futures = {
+        executor.submit(
+            process_instance_in_worktree,
+            inst,
+            mirrors,
+            venvs,
+            worktrees_dir,
+            instance_log_dir,
+            keep_worktrees,
+        ): inst["instance_id"]
+        for inst in pending
+    }
+    try:
+        for future in as_completed(futures):
+            inst_id = futures[future]
+            try:
+                checkpoint.record(future.result())
+            except Exception as e:
+                logging.error(f"Failed to process {inst_id}: {e}")
+                continue
+            logging.info(
+                f"Finished {inst_id} ({len(checkpoint.predictions)}/{len(instances)})"
+            )
+    finally:
+        # On interruption, drop the instances no worker has started
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Generate predictions for SWE-bench Lite using uv + ra-aid (no progress bar)."
@@ -326,8 +744,46 @@ def main() -> None:
         action="store_true",
         help="If set, recreate the .venv even if it exists.",
     )
+    parser.add_argument(
+        "--dataset",
+        type=Path,
+        default=None,
+        help="Local dataset file (.json or .jsonl) to use instead of downloading SWE-bench Lite.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Process instances with this many workers, using worktrees of bare mirrors and cached venvs.",
+    )
+    parser.add_argument(
+        "--mirrors-dir",
+        type=Path,
+        default=None,
+        help="Directory of bare repo mirrors (default: <projects-dir>/mirrors).",
+    )
+    parser.add_argument(
+        "--venv-cache-dir",
+        type=Path,
+        default=None,
+        help="Directory of cached venvs (default: <projects-dir>/venvs).",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="With --workers, never clone or fetch mirrors and install packages from the uv cache only.",
+    )
+    parser.add_argument(
+        "--keep-worktrees",
+        action="store_true",
+        help="With --workers, keep each instance's worktree after it is processed.",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.offline and not (args.workers and args.dataset):
+        parser.error("--offline requires --workers and --dataset")
 
     # Create base/log dirs and set up logging
     base_dir, log_dir = create_output_dirs()
@@ -338,35 +794,62 @@ def main() -> None:
     args.projects_dir.mkdir(parents=True, exist_ok=True)
 
     # Load dataset
-    dataset = load_dataset_safely()
-    if dataset is None:
-        sys.exit(1)
+    if args.dataset:
+        all_data = load_local_dataset(args.dataset)
+    else:
+        dataset = load_dataset_safely()
+        if dataset is None:
+            sys.exit(1)
 
-    # Combine dev + test
-    all_data = list(dataset["dev"]) + list(dataset["test"])
+        # Combine dev + test
+        all_data = list(dataset["dev"]) + list(dataset["test"])
 
     # Ensure output dir
     args.output_dir.mkdir(parents=True, exist_ok=True)
     predictions_file = args.output_dir / "predictions.json"
-    predictions: List[Dict[str, str]] = []
+    checkpoint = PredictionCheckpoint(args.output_dir / "predictions.jsonl")
 
     limit = args.num_instances if args.num_instances else len(all_data)
+    instances = all_data[:limit]
 
-    # Just a simple for loop - no progress bar
-    logging.info(f"Processing up to {limit} instances.")
-    for i, inst in enumerate(all_data):
-        if i >= limit:
-            break
-
-        logging.info(f"=== Instance {i+1}/{limit}, ID={inst.get('instance_id')} ===")
-        pred = process_instance(
-            inst, args.projects_dir, args.reuse_repo, args.force_venv
-        )
-        predictions.append(pred)
-
-    # Save predictions
-    with open(predictions_file, "w", encoding="utf-8") as f:
-        json.dump(predictions, f, indent=2)
+    try:
+        if args.workers:
+            mirrors = MirrorCache(
+                args.mirrors_dir or args.projects_dir / "mirrors", offline=args.offline
+            )
+            venvs = VenvCache(
+                args.venv_cache_dir or args.projects_dir / "venvs",
+                mirrors,
+                offline=args.offline,
+                force=args.force_venv,
+            )
+            run_worker_pool(
+                instances,
+                checkpoint,
+                args.workers,
+                mirrors,
+                venvs,
+                args.projects_dir / "worktrees",
+                log_dir,
+                args.keep_worktrees,
+            )
+        else:
+            # Just a simple for loop - no progress bar
+            logging.info(f"Processing up to {limit} instances.")
+            for i, inst in enumerate(instances):
+                inst_id = inst.get("instance_id")
+                if checkpoint.done(inst_id):
+                    logging.info(f"Skipping instance {inst_id}, already done.")
+                    continue
+
+                logging.info(f"=== Instance {i+1}/{limit}, ID={inst_id} ===")
+                pred = process_instance(
+                    inst, args.projects_dir, args.reuse_repo, args.force_venv
+                )
+                checkpoint.record(pred)
+    finally:
+        # Save predictions, including those of an interrupted run
+        write_predictions(predictions_file, instances, checkpoint)
 
     logging.info("Done generating predictions.")
 
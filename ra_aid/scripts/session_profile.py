@@ -0,0 +1,50 @@
+"""
+Module to get the performance profile of a session.
+
+This module aggregates the recorded durations of a session's trajectory
+records by tool, agent stage and model.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from ..database import DatabaseManager, ensure_migrations_applied
+from ..database.repositories.session_repository import SessionRepositoryManager
+from ..database.repositories.trajectory_repository import TrajectoryRepositoryManager
+
+
+def get_session_profile(
+    session_id: Optional[int] = None, project_state_dir: Optional[str] = None
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Get the performance profile of a session.
+
+    Args:
+        session_id: The ID of the session to profile. Defaults to the latest session.
+        project_state_dir: Optional project state directory containing the database.
+
+    Returns:
+        Tuple[Dict[str, Any], int]: A tuple containing:
+            - Dictionary with the session profile, or an "error" entry
+            - Status code (0 for success, 1 for error)
+    """
+    try:
+        with DatabaseManager(base_dir=project_state_dir) as db:
+            success, error_message = ensure_migrations_applied()
+            if not success:
+                return {"error": f"Database migrations failed: {error_message}"}, 1
+
+            with SessionRepositoryManager(db) as session_repo:
+                if session_id is None:
+                    session = session_repo.get_latest_session()
+                    if session is None:
+                        return {"error": "No sessions found in database"}, 1
+                else:
+                    session = session_repo.get(session_id)
+                    if session is None:
+                        return {"error": f"Session with ID {session_id} not found"}, 1
+
+                with TrajectoryRepositoryManager(db) as trajectory_repo:
+                    profile = trajectory_repo.get_session_profile(session.id)
+                    return {"session_display_name": session.display_name, **profile}, 0
+    except Exception as e:
+        return {"error": str(e)}, 1
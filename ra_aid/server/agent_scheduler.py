@@ -0,0 +1,458 @@
+"""
+Scheduler for server-spawned agents.
+
+Without a scheduler, every spawn-agent request starts an agent immediately,
+so a burst of requests can overload the host and exhaust provider rate
+limits. The scheduler puts admission control in front of agent startup:
+
+- Accepted jobs are persisted as sessions with status ``queued``; the job
+  description is stored in the session's metadata, so queued jobs survive a
+  server restart (see ``AgentScheduler.recover``).
+- At most ``max_concurrent`` agents run at once. Waiting jobs are kept in
+  per-priority lanes (``high``, ``normal``, ``low``); the dispatcher always
+  takes the oldest job of the highest non-empty lane.
+- When ``max_queue_size`` jobs are already waiting, new jobs are rejected
+  with ``SchedulerQueueFullError``.
+- Queue depth and wait times are available from ``stats()`` and are
+  broadcast to websocket clients as ``queue_update`` messages.
+
+While a job waits, it is registered with ``agent_thread_manager`` through
+thread/event-like handles, so stopping a queued session removes it from the
+queue and marks it ``halted``.
+"""
+
+import collections
+import contextvars
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from ra_aid.logging_config import get_logger
+from ra_aid.utils.agent_thread_manager import register_agent, stop_agent, unregister_agent
+
+logger = get_logger(__name__)
+
+# Priority lanes, highest first
+PRIORITIES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+# Default number of agents allowed to run at the same time
+DEFAULT_MAX_CONCURRENT_AGENTS = 4
+
+# Session status of jobs waiting in the queue
+QUEUED_STATUS = "queued"
+
+# Key under which the job is stored in the session metadata
+JOB_METADATA_KEY = "job"
+
+# Seconds between checks for finished agents
+_POLL_INTERVAL = 0.2
+
+# Number of recent dispatch wait times used for the average
+_WAIT_HISTORY_SIZE = 100
+
+_agent_scheduler: Optional["AgentScheduler"] = None
+
+
+def get_agent_scheduler() -> Optional["AgentScheduler"]:
+    """
+    Get the scheduler used for spawned agents.
+
+    Returns:
+        Optional[AgentScheduler]: The scheduler, or None when agents start immediately
+    """
+    return _agent_scheduler
+
+
+def set_agent_scheduler(scheduler: Optional["AgentScheduler"]) -> None:
+    """
+    Set the scheduler used for spawned agents.
+
+    Args:
+        scheduler: The scheduler to use, or None to start agents immediately
+    """
+    global _agent_scheduler
+    _agent_scheduler = scheduler
+
+
+class SchedulerQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is full."""
+
+
+@dataclass
+class AgentJob:
+    """Description of an agent run waiting to be started."""
+
+    message: str
+    research_only: bool = False
+    priority: str = DEFAULT_PRIORITY
+    temperature: Optional[float] = None
+    thread_config: Dict[str, Any] = field(default_factory=dict)
+    queued_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for storage in the session metadata."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentJob":
+        """Rebuild a job from its stored form, ignoring unknown keys."""
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**known)
+
+
+class QueuedAgentHandle:
+    """Thread-like handle for a job that has not started yet."""
+
+    def __init__(self, scheduler: "AgentScheduler", session_id: int):
+        self._scheduler = scheduler
+        self.name = str(session_id)
+        self.daemon = True
+        self._session_id = session_id
+
+    def is_alive(self) -> bool:
+        """Whether the job is still waiting in the queue."""
+        return self._scheduler.is_queued(self._session_id)
+
+
+class QueuedStopEvent:
+    """Event-like handle that removes a queued job from the queue."""
+
+    def __init__(self, scheduler: "AgentScheduler", session_id: int):
+        self._scheduler = scheduler
+        self._session_id = session_id
+        self._flag = threading.Event()
+
+    def set(self) -> None:
+        """Cancel the job, or stop its agent if it was dispatched meanwhile."""
+        if self._flag.is_set():
+            return
+        self._flag.set()
+        self._scheduler.stop(self._session_id)
+
+    def is_set(self) -> bool:
+        """Whether a stop has been requested."""
+        return self._flag.is_set()
+
+
+class AgentScheduler:
+    """
+    Priority queue with a concurrency limit in front of agent startup.
+
+    The launcher is called on the scheduler thread with the session ID and
+    the job, must start the agent without blocking and return a thread-like
+    handle whose ``is_alive()`` reports whether the agent is still running.
+
+    Example:
+        scheduler = AgentScheduler(start_agent, max_concurrent=4)
+        scheduler.start()
+        scheduler.recover()
+        set_agent_scheduler(scheduler)
+        ...
+        scheduler.shutdown()
+    """
+
+    def __init__(
+        self,
+        launcher: Callable[[int, AgentJob], Any],
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_AGENTS,
+        max_queue_size: Optional[int] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            launcher: Function that starts an agent for a job
+            max_concurrent: Maximum number of agents running at once
+            max_queue_size: Maximum number of waiting jobs, or None for no limit
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.max_queue_size = max_queue_size
+        self._launcher = launcher
+        self._lanes: Dict[str, Deque[int]] = {p: collections.deque() for p in PRIORITIES}
+        self._jobs: Dict[int, AgentJob] = {}
+        self._running: Dict[int, Any] = {}
+        self._stop_after_launch: Set[int] = set()
+        self._recent_waits: Deque[float] = collections.deque(maxlen=_WAIT_HISTORY_SIZE)
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._shutdown = False
+
+    def start(self) -> None:
+        """Start the dispatcher thread."""
+        # Run the dispatcher in the caller's context so it can reach the repositories
+        ctx = contextvars.copy_context()
+        self._thread = threading.Thread(
+            target=ctx.run, args=(self._dispatch_loop,), name="ra-aid-agent-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Started agent scheduler with {self.max_concurrent} concurrent agents")
+
+    def submit(self, session_id: int, job: AgentJob) -> int:
+        """
+        Queue a job for an existing session.
+
+        The session is marked ``queued``; the job itself must already be
+        stored in the session metadata under ``JOB_METADATA_KEY`` for it to
+        survive a restart.
+
+        Args:
+            session_id: The session the agent runs for
+            job: The job to queue
+
+        Returns:
+            int: Number of jobs ahead of this one in the queue
+
+        Raises:
+            SchedulerQueueFullError: If the queue is full
+            ValueError: If the job's priority is unknown
+        """
+        if job.priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{job.priority}', expected one of {', '.join(PRIORITIES)}")
+        with self._condition:
+            if self.is_full():
+                raise SchedulerQueueFullError(
+                    f"Agent queue is full ({self.max_queue_size} jobs waiting)"
+                )
+            # Mark the session before the dispatcher can pick it up, so the
+            # agent's own 'running' update is never overwritten
+            self._update_session_status(session_id, QUEUED_STATUS)
+            self._enqueue(session_id, job)
+            position = self.position(session_id)
+
+        self._broadcast_stats()
+        return position
+
+    def recover(self) -> int:
+        """
+        Re-queue jobs of sessions left in ``queued`` status by a previous run.
+
+        Returns:
+            int: Number of recovered jobs
+        """
+        from ra_aid.database.repositories.session_repository import get_session_repository
+
+        recovered = 0
+        for session in get_session_repository().get_by_status(QUEUED_STATUS):
+            job_data = (session.machine_info or {}).get(JOB_METADATA_KEY)
+            if not job_data:
+                logger.warning(f"Queued session {session.id} has no stored job; marking it as error")
+                self._update_session_status(session.id, "error")
+                continue
+            job = AgentJob.from_dict(job_data)
+            if job.priority not in PRIORITIES:
+                job.priority = DEFAULT_PRIORITY
+            with self._condition:
+                if session.id not in self._jobs and session.id not in self._running:
+                    self._enqueue(session.id, job)
+                    recovered += 1
+        if recovered:
+            logger.info(f"Recovered {recovered} queued agent jobs")
+            self._broadcast_stats()
+        return recovered
+
+    def cancel(self, session_id: int) -> bool:
+        """
+        Remove a job from the queue and mark its session ``halted``.
+
+        Args:
+            session_id: The session whose job should be cancelled
+
+        Returns:
+            bool: True if the job was waiting and has been removed
+        """
+        with self._condition:
+            job = self._jobs.pop(session_id, None)
+            if job is None:
+                return False
+            self._lanes[job.priority].remove(session_id)
+        unregister_agent(session_id)
+        logger.info(f"Cancelled queued agent job for session {session_id}")
+        self._update_session_status(session_id, "halted")
+        self._broadcast_stats()
+        return True
+
+    def stop(self, session_id: int) -> None:
+        """
+        Stop a session: cancel its job if it is waiting, otherwise stop its agent.
+
+        Args:
+            session_id: The session to stop
+        """
+        if self.cancel(session_id):
+            return
+        with self._condition:
+            if isinstance(self._running.get(session_id), _StartingHandle):
+                # The launcher has not registered the agent yet
+                self._stop_after_launch.add(session_id)
+                return
+        # The agent is registered under the same session ID by now
+        stop_agent(session_id)
+
+    def is_full(self) -> bool:
+        """Whether new jobs would currently be rejected."""
+        with self._condition:
+            return self.max_queue_size is not None and len(self._jobs) >= self.max_queue_size
+
+    def is_queued(self, session_id: int) -> bool:
+        """Whether a session's job is waiting in the queue."""
+        with self._condition:
+            return session_id in self._jobs
+
+    def position(self, session_id: int) -> int:
+        """
+        Number of jobs that will be dispatched before a queued job.
+
+        Args:
+            session_id: The queued session
+
+        Returns:
+            int: Jobs ahead of it, or -1 if the session is not queued
+        """
+        with self._condition:
+            job = self._jobs.get(session_id)
+            if job is None:
+                return -1
+            ahead = 0
+            for priority in PRIORITIES:
+                lane = self._lanes[priority]
+                if priority == job.priority:
+                    return ahead + lane.index(session_id)
+                ahead += len(lane)
+            return -1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of queue depth and wait times.
+
+        Returns:
+            Dict[str, Any]: Running and queued counts, per-lane depth, the
+            age of the oldest waiting job and the average wait of recently
+            dispatched jobs (in seconds)
+        """
+        now = time.time()
+        with self._condition:
+            oldest = min((job.queued_at for job in self._jobs.values()), default=None)
+            average = (
+                sum(self._recent_waits) / len(self._recent_waits) if self._recent_waits else 0.0
+            )
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue_size": self.max_queue_size,
+                "running": len(self._running),
+                "queued": len(self._jobs),
+                "lanes": {priority: len(lane) for priority, lane in self._lanes.items()},
+                "oldest_wait_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+                "average_wait_seconds": round(average, 3),
+            }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        Stop dispatching jobs.
+
+        Waiting jobs keep their ``queued`` status and are picked up again by
+        ``recover`` on the next start.
+
+        Args:
+            timeout: Seconds to wait for the dispatcher thread
+        """
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info("Agent scheduler shut down")
+
+    def _enqueue(self, session_id: int, job: AgentJob) -> None:
+        self._jobs[session_id] = job
+        self._lanes[job.priority].append(session_id)
+        register_agent(
+            session_id, QueuedAgentHandle(self, session_id), QueuedStopEvent(self, session_id)
+        )
+        self._condition.notify_all()
+
+    def _next_job(self) -> Optional[Tuple[int, AgentJob]]:
+        for priority in PRIORITIES:
+            lane = self._lanes[priority]
+            if lane:
+                session_id = lane.popleft()
+                return session_id, self._jobs.pop(session_id)
+        return None
+
+    def _reap_finished(self) -> bool:
+        finished = [sid for sid, handle in self._running.items() if not handle.is_alive()]
+        for session_id in finished:
+            del self._running[session_id]
+        return bool(finished)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            dispatched: List[Tuple[int, AgentJob]] = []
+            with self._condition:
+                if self._shutdown:
+                    return
+                changed = self._reap_finished()
+                while len(self._running) < self.max_concurrent:
+                    next_job = self._next_job()
+                    if next_job is None:
+                        break
+                    dispatched.append(next_job)
+                    # Reserve the slot before the launcher runs
+                    self._running[next_job[0]] = _StartingHandle()
+                if not dispatched and not changed:
+                    self._condition.wait(_POLL_INTERVAL)
+                    continue
+
+            for session_id, job in dispatched:
+                self._launch(session_id, job)
+            self._broadcast_stats()
+
+    def _launch(self, session_id: int, job: AgentJob) -> None:
+        wait = time.time() - job.queued_at
+        logger.info(f"Dispatching agent for session {session_id} after {wait:.1f}s in queue")
+        try:
+            handle = self._launcher(session_id, job)
+        except Exception as e:
+            logger.exception(f"Failed to start agent for session {session_id}: {str(e)}")
+            unregister_agent(session_id)
+            self._update_session_status(session_id, "error")
+            handle = None
+        with self._condition:
+            self._recent_waits.append(wait)
+            if handle is None:
+                self._running.pop(session_id, None)
+            else:
+                self._running[session_id] = handle
+            stop_now = session_id in self._stop_after_launch
+            self._stop_after_launch.discard(session_id)
+            self._condition.notify_all()
+        if stop_now and handle is not None:
+            stop_agent(session_id)
+
+    def _update_session_status(self, session_id: int, status: str) -> None:
+        try:
+            from ra_aid.database.repositories.session_repository import get_session_repository
+            from ra_aid.server.broadcast_sender import send_broadcast
+
+            session = get_session_repository().update_session_status(session_id, status)
+            send_broadcast({"type": "session_update", "payload": session.model_dump(mode="json")})
+        except Exception as e:
+            logger.error(f"Failed to set session {session_id} status to '{status}': {str(e)}")
+
+    def _broadcast_stats(self) -> None:
+        from ra_aid.server.broadcast_sender import send_broadcast
+
+        try:
+            send_broadcast({"type": "queue_update", "payload": self.stats()})
+        except RuntimeError:
+            logger.debug("Skipping queue update broadcast; broadcast queue not initialized")
+
+
+class _StartingHandle:
+    """Placeholder for a job whose launcher is still running."""
+
+    def is_alive(self) -> bool:
+        return True
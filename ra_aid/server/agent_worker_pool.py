@@ -0,0 +1,439 @@
+"""
+Process-based worker pool for server-spawned agents.
+
+By default the server runs each spawned agent in a thread of the server
+process, so every agent shares one GIL with the FastAPI event loop. With a
+worker pool, agents run in long-lived worker processes instead:
+
+- Jobs are pulled from a shared queue, so at most one agent runs per worker
+  and throughput scales with the number of cores.
+- Inside a worker the agent still runs via ``run_agent_thread`` in a local
+  thread registered with ``agent_thread_manager``, so the agent's own stop
+  checks work unchanged.
+- Each worker has a duplex pipe to the server. Stop requests are sent down
+  the pipe to the worker running the session; broadcast messages
+  (trajectories, session updates) and job lifecycle events are sent back up
+  and re-published on the server's broadcast queue. Pipe sends are
+  synchronous, so a worker that crashes cannot lose its "started" event.
+
+In the server process each job is registered with ``agent_thread_manager``
+through handles that behave like a thread and a stop event, so
+``stop_agent``, ``is_agent_running`` and ``has_received_stop_signal`` keep
+their semantics.
+"""
+
+import contextvars
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ra_aid.logging_config import get_logger
+from ra_aid.utils.agent_thread_manager import register_agent, unregister_agent
+
+logger = get_logger(__name__)
+
+# Seconds between checks of worker health and control messages
+_POLL_INTERVAL = 0.2
+
+_agent_worker_pool: Optional["AgentWorkerPool"] = None
+
+
+def get_agent_worker_pool() -> Optional["AgentWorkerPool"]:
+    """
+    Get the worker pool used for spawned agents.
+
+    Returns:
+        Optional[AgentWorkerPool]: The pool, or None when agents run in threads
+    """
+    return _agent_worker_pool
+
+
+def set_agent_worker_pool(pool: Optional["AgentWorkerPool"]) -> None:
+    """
+    Set the worker pool used for spawned agents.
+
+    Args:
+        pool: The pool to use, or None to run agents in threads
+    """
+    global _agent_worker_pool
+    _agent_worker_pool = pool
+
+
+class RemoteAgentHandle:
+    """Thread-like handle for an agent running in a worker process."""
+
+    def __init__(self, pool: "AgentWorkerPool", session_id: int):
+        self._pool = pool
+        self.session_id = session_id
+        self.name = str(session_id)
+        self.daemon = True
+
+    def is_alive(self) -> bool:
+        """Whether the job is still queued or running."""
+        return self._pool.is_active(self.session_id)
+
+
+class RemoteStopEvent:
+    """Event-like handle that forwards stop requests to the worker process."""
+
+    def __init__(self, pool: "AgentWorkerPool", session_id: int):
+        self._pool = pool
+        self._session_id = session_id
+        self._flag = threading.Event()
+
+    def set(self) -> None:
+        """Request the agent to stop."""
+        self._flag.set()
+        self._pool.stop(self._session_id)
+
+    def is_set(self) -> bool:
+        """Whether a stop has been requested."""
+        return self._flag.is_set()
+
+
+class _WorkerChannel:
+    """Thread-safe sender for the worker side of the pipe to the server."""
+
+    def __init__(self, conn: Any):
+        self._conn = conn
+        self._lock = threading.Lock()
+
+    def send(self, message: Any) -> None:
+        with self._lock:
+            self._conn.send(message)
+
+    def put(self, item: Any) -> None:
+        """Queue interface so the channel can be installed as the broadcast queue."""
+        self.send(("broadcast", item))
+
+
+def _receive_stops(conn: Any, timeout: float) -> List[int]:
+    """Wait up to timeout for control messages and return the sessions to stop."""
+    stops = []
+    while conn.poll(timeout):
+        message = conn.recv()
+        if message and message[0] == "stop":
+            stops.append(message[1])
+        timeout = 0
+    return stops
+
+
+def _worker_main(
+    worker_id: int,
+    job_queue: Any,
+    conn: Any,
+    log_level: Optional[str],
+    target: Optional[Callable[..., None]],
+) -> None:
+    """
+    Entry point of a worker process.
+
+    Args:
+        worker_id: Index of this worker in the pool
+        job_queue: Shared queue of jobs (None means shut down)
+        conn: Worker end of the duplex pipe to the server
+        log_level: Log level for the worker's log file
+        target: Function that runs the agent, defaults to run_agent_thread
+    """
+    from ra_aid.database.repositories.config_repository import ConfigRepository
+    from ra_aid.logging_config import setup_logging
+    from ra_aid.server.broadcast_sender import set_broadcast_queue
+
+    setup_logging(log_mode="file", log_level=log_level)
+    channel = _WorkerChannel(conn)
+    set_broadcast_queue(channel)
+
+    if target is None:
+        from ra_aid.server.api_v1_spawn_agent import run_agent_thread
+
+        target = run_agent_thread
+
+    while True:
+        try:
+            job = job_queue.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        if job is None:
+            break
+
+        session_id = job["session_id"]
+        channel.send(("started", session_id))
+
+        config_repo = ConfigRepository()
+        config_repo.update(job["config"])
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=target,
+            args=(job["message"], session_id, config_repo, job["research_only"]),
+            kwargs={
+                "temperature": job["temperature"],
+                "thread_config": job["thread_config"],
+                "stop_event": stop_event,
+            },
+            name=str(session_id),
+            daemon=True,
+        )
+        register_agent(session_id, thread, stop_event)
+        thread.start()
+
+        while thread.is_alive():
+            if session_id in _receive_stops(conn, _POLL_INTERVAL):
+                logger.info(f"Worker {worker_id} received stop for session {session_id}")
+                stop_event.set()
+            thread.join(0)
+
+        unregister_agent(session_id)
+        channel.send(("finished", session_id))
+
+
+class AgentWorkerPool:
+    """
+    Pool of worker processes that run spawned agents.
+
+    Example:
+        pool = AgentWorkerPool(num_workers=4)
+        pool.start()
+        set_agent_worker_pool(pool)
+        ...
+        pool.shutdown()
+    """
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        log_level: Optional[str] = None,
+        target: Optional[Callable[..., None]] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            num_workers: Number of worker processes (default: number of CPUs)
+            log_level: Log level for worker log files
+            target: Module-level function run for each job instead of
+                run_agent_thread (mainly for tests and benchmarks)
+        """
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.log_level = log_level
+        self._target = target
+        self._ctx = multiprocessing.get_context("spawn")
+        self._job_queue = self._ctx.Queue()
+        self._workers: List[Any] = []
+        self._conns: List[Any] = []
+        self._running: Dict[int, int] = {}  # worker_id -> session_id
+        self._active: Set[int] = set()
+        self._pending_stops: Set[int] = set()
+        self._lock = threading.RLock()
+        self._relay: Optional[threading.Thread] = None
+        self._closing = False
+        self._shutdown = threading.Event()
+
+    def start(self) -> None:
+        """Start the worker processes and the event relay thread."""
+        for worker_id in range(self.num_workers):
+            process, conn = self._start_worker(worker_id)
+            self._workers.append(process)
+            self._conns.append(conn)
+
+        # Run the relay in the caller's context so it can reach the repositories
+        ctx = contextvars.copy_context()
+        self._relay = threading.Thread(
+            target=ctx.run, args=(self._relay_events,), name="ra-aid-worker-relay", daemon=True
+        )
+        self._relay.start()
+        logger.info(f"Started agent worker pool with {self.num_workers} workers")
+
+    def _start_worker(self, worker_id: int) -> Tuple[Any, Any]:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._job_queue, child_conn, self.log_level, self._target),
+            name=f"ra-aid-agent-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        # Close our copy of the child end so a dead worker shows up as EOF
+        child_conn.close()
+        return process, parent_conn
+
+    def _send_stop(self, worker_id: int, session_id: int) -> None:
+        try:
+            self._conns[worker_id].send(("stop", session_id))
+        except (OSError, EOFError) as e:
+            logger.warning(f"Could not send stop to worker {worker_id}: {str(e)}")
+
+    def submit(
+        self,
+        session_id: int,
+        message: str,
+        config: Dict[str, Any],
+        research_only: bool = False,
+        temperature: Optional[float] = None,
+        thread_config: Optional[Dict[str, Any]] = None,
+    ) -> RemoteAgentHandle:
+        """
+        Queue an agent job and register it with the agent thread manager.
+
+        Args:
+            session_id: The session the agent runs for
+            message: The message or task for the agent
+            config: Picklable snapshot of the server's configuration values
+            research_only: Whether to use research-only mode
+            temperature: Model temperature
+            thread_config: Thread-specific configuration values
+
+        Returns:
+            RemoteAgentHandle: Thread-like handle for the job
+        """
+        handle = RemoteAgentHandle(self, session_id)
+        with self._lock:
+            self._active.add(session_id)
+        register_agent(session_id, handle, RemoteStopEvent(self, session_id))
+        self._job_queue.put(
+            {
+                "session_id": session_id,
+                "message": message,
+                "config": config,
+                "research_only": research_only,
+                "temperature": temperature,
+                "thread_config": thread_config or {},
+            }
+        )
+        return handle
+
+    def stop(self, session_id: int) -> None:
+        """
+        Deliver a stop request to the worker running a session.
+
+        If the job has not started yet, the request is delivered as soon as a
+        worker picks it up.
+
+        Args:
+            session_id: The session to stop
+        """
+        with self._lock:
+            for worker_id, running_session in self._running.items():
+                if running_session == session_id:
+                    self._send_stop(worker_id, session_id)
+                    return
+            if session_id in self._active:
+                self._pending_stops.add(session_id)
+
+    def is_active(self, session_id: int) -> bool:
+        """Whether a session's job is queued or running."""
+        with self._lock:
+            return session_id in self._active
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool utilisation."""
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "alive_workers": sum(1 for w in self._workers if w.is_alive()),
+                "running": len(self._running),
+                "active": len(self._active),
+            }
+
+    def _relay_events(self) -> None:
+        """Forward worker events to the server until shutdown."""
+        while not self._shutdown.is_set():
+            conns = {
+                conn: worker_id for worker_id, conn in enumerate(self._conns) if not conn.closed
+            }
+            if not conns:
+                self._shutdown.wait(_POLL_INTERVAL)
+                continue
+            for conn in multiprocessing.connection.wait(list(conns), timeout=_POLL_INTERVAL):
+                worker_id = conns[conn]
+                try:
+                    event = conn.recv()
+                except (EOFError, OSError):
+                    self._handle_dead_worker(worker_id)
+                    continue
+                self._handle_event(worker_id, event)
+
+    def _handle_event(self, worker_id: int, event: Any) -> None:
+        from ra_aid.server.broadcast_sender import send_broadcast
+
+        kind = event[0]
+        if kind == "broadcast":
+            try:
+                send_broadcast(event[1])
+            except RuntimeError:
+                logger.debug("Dropping worker broadcast; broadcast queue not initialized")
+        elif kind == "started":
+            session_id = event[1]
+            with self._lock:
+                self._running[worker_id] = session_id
+                stop_pending = session_id in self._pending_stops
+                self._pending_stops.discard(session_id)
+            if stop_pending:
+                self._send_stop(worker_id, session_id)
+        elif kind == "finished":
+            self._finish(worker_id, event[1])
+
+    def _finish(self, worker_id: int, session_id: int) -> None:
+        with self._lock:
+            if self._running.get(worker_id) == session_id:
+                del self._running[worker_id]
+            self._active.discard(session_id)
+            self._pending_stops.discard(session_id)
+        unregister_agent(session_id)
+
+    def _handle_dead_worker(self, worker_id: int) -> None:
+        """Replace a worker that died and fail the session it was running."""
+        process = self._workers[worker_id]
+        process.join(1.0)
+        self._conns[worker_id].close()
+        with self._lock:
+            session_id = self._running.get(worker_id)
+        if self._closing:
+            return
+        logger.error(
+            f"Agent worker {worker_id} exited with code {process.exitcode}"
+            + (f" while running session {session_id}" if session_id is not None else "")
+        )
+        if session_id is not None:
+            self._finish(worker_id, session_id)
+            self._mark_session_failed(session_id)
+        self._workers[worker_id], self._conns[worker_id] = self._start_worker(worker_id)
+
+    def _mark_session_failed(self, session_id: int) -> None:
+        try:
+            from ra_aid.database.repositories.session_repository import get_session_repository
+            from ra_aid.server.broadcast_sender import send_broadcast
+
+            session = get_session_repository().update_session_status(session_id, "error")
+            send_broadcast({"type": "session_update", "payload": session.model_dump(mode="json")})
+        except Exception as e:
+            logger.error(f"Failed to mark session {session_id} as failed: {str(e)}")
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """
+        Stop all workers.
+
+        Running agents are asked to stop first; workers that do not exit
+        within the timeout are terminated.
+
+        Args:
+            timeout: Seconds to wait for workers to exit
+        """
+        self._closing = True
+        with self._lock:
+            running = list(self._running.items())
+        for worker_id, session_id in running:
+            self._send_stop(worker_id, session_id)
+        for _ in self._workers:
+            self._job_queue.put(None)
+        for process in self._workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+        self._shutdown.set()
+        if self._relay is not None:
+            self._relay.join(timeout)
+        logger.info("Agent worker pool shut down")
@@ -0,0 +1,111 @@
+'''API router for inspecting the agent scheduler queue.'''
+
+from typing import Dict, Optional
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+
+from ra_aid.server.agent_scheduler import get_agent_scheduler
+
+router = APIRouter(
+    prefix="/v1/agent-queue",
+    tags=["agent"],
+    responses={
+        status.HTTP_404_NOT_FOUND: {"description": "Agent scheduler not enabled"},
+    },
+)
+
+
+class AgentQueueResponse(BaseModel):
+    '''
+    Pydantic model for the agent queue status.
+
+    The same payload is broadcast over the websocket as ``queue_update``
+    messages whenever the queue changes.
+
+    Attributes:
+        max_concurrent: Maximum number of agents running at once
+        max_queue_size: Maximum number of waiting jobs (None for no limit)
+        running: Number of running agents
+        queued: Number of waiting jobs
+        lanes: Number of waiting jobs per priority
+        oldest_wait_seconds: Age of the oldest waiting job
+        average_wait_seconds: Average queue wait of recently started agents
+    '''
+    max_concurrent: int = Field(description="Maximum number of agents running at once")
+    max_queue_size: Optional[int] = Field(default=None, description="Maximum number of waiting jobs")
+    running: int = Field(description="Number of running agents")
+    queued: int = Field(description="Number of waiting jobs")
+    lanes: Dict[str, int] = Field(description="Number of waiting jobs per priority")
+    oldest_wait_seconds: float = Field(description="Age of the oldest waiting job in seconds")
+    average_wait_seconds: float = Field(description="Average queue wait of recently started agents in seconds")
+
+
+class QueuePositionResponse(BaseModel):
+    '''
+    Pydantic model for the queue position of a session.
+
+    Attributes:
+        session_id: The session ID
+        position: Number of jobs ahead of the session's job
+    '''
+    session_id: int = Field(description="The session ID")
+    position: int = Field(description="Number of jobs ahead of the session's job")
+
+
+def _get_scheduler():
+    scheduler = get_agent_scheduler()
+    if scheduler is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agent scheduler is not enabled",
+        )
+    return scheduler
+
+
+@router.get(
+    "",
+    response_model=AgentQueueResponse,
+    summary="Get agent queue status",
+    description="Get queue depth, per-priority lanes and wait times of the agent scheduler",
+)
+async def get_agent_queue() -> AgentQueueResponse:
+    '''
+    Get the agent queue status.
+
+    Returns:
+        AgentQueueResponse: Queue depth and wait times
+
+    Raises:
+        HTTPException: With a 404 status code if no scheduler is configured
+    '''
+    return AgentQueueResponse(**_get_scheduler().stats())
+
+
+@router.get(
+    "/{session_id}",
+    response_model=QueuePositionResponse,
+    summary="Get queue position",
+    description="Get the number of jobs ahead of a queued session",
+)
+async def get_queue_position(session_id: int) -> QueuePositionResponse:
+    '''
+    Get the queue position of a session.
+
+    Args:
+        session_id: The ID of the queued session
+
+    Returns:
+        QueuePositionResponse: The session's position in the queue
+
+    Raises:
+        HTTPException: With a 404 status code if no scheduler is configured
+            or the session is not queued
+    '''
+    position = _get_scheduler().position(session_id)
+    if position < 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session {session_id} is not queued",
+        )
+    return QueuePositionResponse(session_id=session_id, position=position)
@@ -0,0 +1,54 @@
+'''API router for inspecting agent checkpoint memory.'''
+
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+
+from ra_aid.checkpointer import checkpointer_stats
+
+router = APIRouter(
+    prefix="/v1/checkpoints",
+    tags=["agent"],
+)
+
+
+class CheckpointStatsResponse(BaseModel):
+    '''
+    Pydantic model for the checkpoint memory of the server process.
+
+    Agents running in worker processes (``--server-workers``) keep their
+    checkpoints in those processes and are not included.
+
+    Attributes:
+        checkpointers: Number of live checkpointers
+        threads: Number of threads with retained checkpoints
+        checkpoints: Number of retained checkpoints
+        writes: Number of retained pending writes
+        channel_values: Number of retained serialized channel values
+        bytes: Size of the retained serialized data
+        pruned_checkpoints: Checkpoints dropped because newer ones replaced them
+        evicted_threads: Idle threads evicted to bound memory
+    '''
+    checkpointers: int = Field(description="Number of live checkpointers")
+    threads: int = Field(description="Number of threads with retained checkpoints")
+    checkpoints: int = Field(description="Number of retained checkpoints")
+    writes: int = Field(description="Number of retained pending writes")
+    channel_values: int = Field(description="Number of retained serialized channel values")
+    bytes: int = Field(description="Size of the retained serialized data in bytes")
+    pruned_checkpoints: int = Field(description="Checkpoints dropped because newer ones replaced them")
+    evicted_threads: int = Field(description="Idle threads evicted to bound memory")
+
+
+@router.get(
+    "",
+    response_model=CheckpointStatsResponse,
+    summary="Get checkpoint memory stats",
+    description="Get how much agent message history the server process retains in checkpoints",
+)
+async def get_checkpoint_stats() -> CheckpointStatsResponse:
+    '''
+    Get the checkpoint memory stats.
+
+    Returns:
+        CheckpointStatsResponse: Retained threads, checkpoints and bytes
+    '''
+    return CheckpointStatsResponse(**checkpointer_stats())
@@ -0,0 +1,38 @@
+'''API router exporting latency metrics in Prometheus format.'''
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ra_aid.metrics import get_metrics_registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(
+    prefix="/v1/metrics",
+    tags=["metrics"],
+)
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    summary="Get latency metrics",
+    description=(
+        "Get histograms of tool, model call, database write and subprocess durations "
+        "in the Prometheus text exposition format"
+    ),
+)
+async def get_metrics() -> PlainTextResponse:
+    '''
+    Get the latency histograms of the server process.
+
+    Agents running in worker processes (``--server-workers``) record their
+    metrics in those processes and are not included.
+
+    Returns:
+        PlainTextResponse: The Prometheus text exposition
+    '''
+    return PlainTextResponse(
+        get_metrics_registry().render_prometheus(),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
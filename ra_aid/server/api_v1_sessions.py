@@ -12,6 +12,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 import peewee
 from pydantic import BaseModel, Field
 
+from ra_aid.database.async_repository import AsyncRepository, DatabaseTimeoutError, run_in_db_thread
 from ra_aid.database.repositories.session_repository import SessionRepository, get_session_repository
 from ra_aid.database.repositories.trajectory_repository import TrajectoryRepository, get_trajectory_repository
 from ra_aid.database.pydantic_models import SessionModel, TrajectoryModel
@@ -25,10 +26,19 @@ router = APIRouter(
         status.HTTP_404_NOT_FOUND: {"description": "Session not found"},
         status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
         status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Database error"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"description": "Database timeout"},
     },
 )
 
 
+def _timeout_exception(e: DatabaseTimeoutError) -> HTTPException:
+    """Convert a database timeout into a 504 response."""
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=f"Database timeout: {str(e)}",
+    )
+
+
 class PaginatedResponse(BaseModel):
     """
     Pydantic model for paginated API responses.
@@ -75,6 +85,61 @@ class PaginatedSessionResponse(PaginatedResponse):
     items: List[SessionModel]
 
 
+class ProfileEntry(BaseModel):
+    """
+    Pydantic model for the time spent on one tool, stage, model or rate limit in a session.
+
+    Attributes:
+        name: Tool name, stage name, model name or rate limit key
+        calls: Number of timed calls (tools and models) or waits (rate limits)
+        entries: Number of times the stage was entered (stages)
+        errors: Number of calls that recorded an error (tools)
+        total_ms: Total duration in milliseconds
+        mean_ms: Mean duration in milliseconds
+        max_ms: Longest duration in milliseconds
+    """
+    name: str = Field(description="Tool name, stage name, model name or rate limit key")
+    calls: Optional[int] = Field(
+        default=None, description="Number of timed calls (tools and models) or waits (rate limits)"
+    )
+    entries: Optional[int] = Field(default=None, description="Number of times the stage was entered (stages)")
+    errors: Optional[int] = Field(default=None, description="Number of calls that recorded an error (tools)")
+    total_ms: int = Field(description="Total duration in milliseconds")
+    mean_ms: int = Field(description="Mean duration in milliseconds")
+    max_ms: int = Field(description="Longest duration in milliseconds")
+
+
+class SessionProfileResponse(BaseModel):
+    """
+    Pydantic model for the performance profile of a session.
+
+    Durations come from the ``duration_ms`` of the session's trajectory
+    records. Tool time includes nested work, e.g. the agent run by a
+    ``request_research`` call, so tool totals can add up to more than the
+    session's wall time.
+
+    Attributes:
+        session_id: The ID of the profiled session
+        wall_time_ms: Time between the first and last trajectory record
+        tools: Time per tool, slowest total first
+        stages: Time per agent stage, slowest total first
+        models: Time per model, slowest total first
+        rate_limit_waits: Time model calls waited per rate limit, longest total first
+        untimed_tool_records: Tool records without a duration, e.g. from before durations were recorded
+    """
+    session_id: int = Field(description="The ID of the profiled session")
+    wall_time_ms: int = Field(description="Time between the first and last trajectory record in milliseconds")
+    tools: List[ProfileEntry] = Field(description="Time per tool, slowest total first")
+    stages: List[ProfileEntry] = Field(description="Time per agent stage, slowest total first")
+    models: List[ProfileEntry] = Field(description="Time per model, slowest total first")
+    rate_limit_waits: List[ProfileEntry] = Field(
+        default_factory=list, description="Time model calls waited per rate limit, longest total first"
+    )
+    untimed_tool_records: int = Field(
+        description="Tool records without a duration, e.g. from before durations were recorded"
+    )
+
+
 # Dependency to get the session repository
 def get_repository() -> SessionRepository:
     """
@@ -115,13 +180,15 @@ async def list_sessions(
         HTTPException: With a 500 status code if there's a database error
     """
     try:
-        sessions, total = repo.get_all(offset=offset, limit=limit)
+        sessions, total = await AsyncRepository(repo).get_all(offset=offset, limit=limit)
         return PaginatedSessionResponse(
             total=total,
             items=sessions,
             limit=limit,
             offset=offset,
         )
+    except DatabaseTimeoutError as e:
+        raise _timeout_exception(e)
     except peewee.DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -154,13 +221,15 @@ async def get_session(
         HTTPException: With a 500 status code if there's a database error
     """
     try:
-        session = repo.get(session_id)
+        session = await AsyncRepository(repo).get(session_id)
         if not session:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Session with ID {session_id} not found",
             )
         return session
+    except DatabaseTimeoutError as e:
+        raise _timeout_exception(e)
     except peewee.DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -194,7 +263,9 @@ async def create_session(
     """
     try:
         metadata = request.metadata if request else None
-        return repo.create_session(metadata=metadata)
+        return await AsyncRepository(repo).create_session(metadata=metadata)
+    except DatabaseTimeoutError as e:
+        raise _timeout_exception(e)
     except peewee.DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -224,6 +295,37 @@ async def get_session_trajectories(
     Returns:
         List[TrajectoryModel]: List of trajectory records associated with the session
         
+    Raises:
+        HTTPException: With a 404 status code if the session is not found
+        HTTPException: With a 500 status code if there's a database error
+    """
+    try:
+        return await run_in_db_thread(
+            _load_session_trajectories, session_id, session_repo, trajectory_repo
+        )
+    except DatabaseTimeoutError as e:
+        raise _timeout_exception(e)
+
+
+def _load_session_trajectories(
+    session_id: int,
+    session_repo: SessionRepository,
+    trajectory_repo: TrajectoryRepository,
+) -> List[TrajectoryModel]:
+    """
+    Load all trajectory records for a session.
+
+    This runs on a database thread so the event loop stays free while
+    large sessions are serialized.
+
+    Args:
+        session_id: The ID of the session to get trajectories for
+        session_repo: SessionRepository to look the session up in
+        trajectory_repo: TrajectoryRepository to read trajectories from
+
+    Returns:
+        List[TrajectoryModel]: List of trajectory records associated with the session
+
     Raises:
         HTTPException: With a 404 status code if the session is not found
         HTTPException: With a 500 status code if there's a database error
@@ -289,6 +391,50 @@ async def get_session_trajectories(
         )
 
 
+@router.get(
+    "/{session_id}/profile",
+    response_model=SessionProfileResponse,
+    summary="Get session profile",
+    description="Get the time a session spent per tool, agent stage and model",
+)
+async def get_session_profile(
+    session_id: int,
+    session_repo: SessionRepository = Depends(get_repository),
+    trajectory_repo: TrajectoryRepository = Depends(get_trajectory_repository),
+) -> SessionProfileResponse:
+    """
+    Get the performance profile of a session.
+
+    Args:
+        session_id: The ID of the session to profile
+        session_repo: SessionRepository dependency injection
+        trajectory_repo: TrajectoryRepository dependency injection
+
+    Returns:
+        SessionProfileResponse: Time per tool, stage and model
+
+    Raises:
+        HTTPException: With a 404 status code if the session is not found
+        HTTPException: With a 500 status code if there's a database error
+    """
+    try:
+        session = await AsyncRepository(session_repo).get(session_id)
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Session with ID {session_id} not found",
+            )
+        profile = await AsyncRepository(trajectory_repo).get_session_profile(session_id)
+        return SessionProfileResponse(**profile)
+    except DatabaseTimeoutError as e:
+        raise _timeout_exception(e)
+    except peewee.DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}",
+        )
+
+
 @router.delete(
     "/{session_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -310,7 +456,11 @@ async def delete_session(
         HTTPException: With a 404 status code if the session is not found
         HTTPException: With a 500 status code if there's a database error
     """
-    session = session_repo.get(session_id)
+    async_session_repo = AsyncRepository(session_repo)
+    try:
+        session = await async_session_repo.get(session_id)
+    except DatabaseTimeoutError as e:
+        raise _timeout_exception(e)
 
     if not session:
         raise HTTPException(
@@ -332,4 +482,11 @@ async def delete_session(
             detail=f"Failed to stop agent for session {session_id}"
         )
 
-    session_repo.update_session_status(session_id, 'halting')
\ No newline at end of file
+    # A queued session is removed from the queue and already marked 'halted'
+    if session.status == 'queued':
+        return
+
+    try:
+        await async_session_repo.update_session_status(session_id, 'halting')
+    except DatabaseTimeoutError as e:
+        raise _timeout_exception(e)
\ No newline at end of file
@@ -4,9 +4,14 @@ import threading
 import logging
 import json # Added for step_data serialization
 
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Literal, Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 
+from ra_aid.database.async_repository import AsyncRepository, run_in_db_thread
 from ra_aid.database.repositories.session_repository import SessionRepository, get_session_repository
 from ra_aid.database.connection import DatabaseManager
 from ra_aid.database.repositories.session_repository import SessionRepositoryManager
@@ -15,13 +20,21 @@ from ra_aid.database.repositories.key_snippet_repository import KeySnippetReposi
 from ra_aid.database.repositories.human_input_repository import HumanInputRepositoryManager, get_human_input_repository
 from ra_aid.database.repositories.research_note_repository import ResearchNoteRepositoryManager
 from ra_aid.database.repositories.related_files_repository import RelatedFilesRepositoryManager
-from ra_aid.database.repositories.trajectory_repository import TrajectoryRepositoryManager
+from ra_aid.database.repositories.trajectory_repository import TrajectoryRepositoryManager, get_trajectory_repository
 from ra_aid.database.repositories.work_log_repository import WorkLogRepositoryManager
 from ra_aid.database.repositories.config_repository import ConfigRepositoryManager, get_config_repository
 from ra_aid.database.pydantic_models import SessionModel # Added for broadcasting
+from ra_aid.console.sink import ConsoleSink, HeadlessSink, OutputSinkManager
 from ra_aid.env_inv_context import EnvInvManager
 from ra_aid.env_inv import EnvDiscovery
 from ra_aid.llm import initialize_llm, get_model_default_temperature
+from ra_aid.server.agent_scheduler import (
+    JOB_METADATA_KEY,
+    AgentJob,
+    SchedulerQueueFullError,
+    get_agent_scheduler,
+)
+from ra_aid.server.agent_worker_pool import get_agent_worker_pool
 from ra_aid.server.broadcast_sender import send_broadcast
 from ra_aid.utils.agent_thread_manager import agent_thread_registry, has_received_stop_signal, register_agent, \
     unregister_agent
@@ -36,6 +49,7 @@ router = APIRouter(
     responses={
         status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
         status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Agent spawn error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Agent queue is full"},
     },
 )
 
@@ -48,6 +62,7 @@ class SpawnAgentRequest(BaseModel):
     Attributes:
         message: The message or task for the agent to process
         research_only: Whether to use research-only mode (default: False)
+        priority: Scheduling priority when agents are queued (default: normal)
     '''
     message: str = Field(
         description="The message or task for the agent to process"
@@ -56,6 +71,10 @@ class SpawnAgentRequest(BaseModel):
         default=False,
         description="Whether to use research-only mode"
     )
+    priority: Literal["high", "normal", "low"] = Field(
+        default="normal",
+        description="Scheduling priority when agents are queued"
+    )
 
 class SpawnAgentResponse(BaseModel):
     '''
@@ -65,10 +84,44 @@ class SpawnAgentResponse(BaseModel):
 
     Attributes:
         session_id: The ID of the created session
+        queue_position: Number of jobs ahead of this one, if the agent was queued
     '''
     session_id: int = Field(
         description="The ID of the created session"
     )
+    queue_position: Optional[int] = Field(
+        default=None,
+        description="Number of jobs ahead of this one, if the agent was queued"
+    )
+
+@contextmanager
+def record_agent_output(output_sink, session_id: int):
+    '''
+    Store the output recorded by a headless sink as an agent_output
+    trajectory record of the session when the agent finishes.
+
+    Args:
+        output_sink: The output sink the agent runs under
+        session_id: The ID of the session the agent runs for
+    '''
+    try:
+        yield
+    finally:
+        if isinstance(output_sink, HeadlessSink):
+            events = output_sink.events()
+            if events:
+                try:
+                    get_trajectory_repository().create(
+                        session_id=session_id,
+                        record_type="agent_output",
+                        step_data={
+                            "display_title": "Agent Output",
+                            "events": [asdict(event) for event in events],
+                            "subprocess_bytes": output_sink.subprocess_bytes,
+                        },
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to record agent output for session {session_id}: {e}")
 
 def run_agent_thread(
     message: str,
@@ -89,6 +142,9 @@ def run_agent_thread(
     Note:
         Values for expert_enabled and web_research_enabled are retrieved from the
         config repository, which stores the values set during server startup.
+        Console output of the agent is recorded by a headless output sink
+        and stored as an agent_output trajectory record of the session,
+        unless server_console_output is set.
     '''
     logger = logging.getLogger(__name__)
     # Log entry point information
@@ -108,7 +164,14 @@ def run_agent_thread(
         # Get the thread configuration from kwargs
         thread_config = kwargs.get("thread_config", {})
 
-        with DatabaseManager() as db, \
+        # Nobody reads the console of a spawned agent, so skip rendering by default
+        if source_config_repo.get("server_console_output", False):
+            output_sink = ConsoleSink()
+        else:
+            output_sink = HeadlessSink()
+
+        with OutputSinkManager(output_sink), \
+             DatabaseManager() as db, \
              SessionRepositoryManager(db) as session_repo, \
              KeyFactRepositoryManager(db) as key_fact_repo, \
              KeySnippetRepositoryManager(db) as key_snippet_repo, \
@@ -118,7 +181,8 @@ def run_agent_thread(
              TrajectoryRepositoryManager(db) as trajectory_repo, \
              WorkLogRepositoryManager() as work_log_repo, \
              ConfigRepositoryManager(source_repo=source_config_repo) as config_repo, \
-             EnvInvManager(env_data) as env_inv:
+             EnvInvManager(env_data) as env_inv, \
+             record_agent_output(output_sink, session_id):
 
             # Log context manager initialization
             logger.debug(f"Context managers initialized for session_id={session_id}")
@@ -234,8 +298,6 @@ def run_agent_thread(
                         tool_name=None,
                         tool_parameters=None,
                         tool_result=None,
-                        prompt_tokens=None,  # Stage transitions don't involve LLM calls directly
-                        response_tokens=None,
                     )
                     logger.info(f"Created research stage transition trajectory for session {session_id}.")
                 except Exception as e:
@@ -296,6 +358,61 @@ def run_agent_thread(
         logger.info(f"Agent thread cleanup finished for session {session_id}.")
         # ---> Update status to final state and broadcast <--- END
 
+def start_agent(session_id: int, job: AgentJob):
+    '''
+    Start an agent for a job, in a worker process if a worker pool is
+    configured and in a thread of this process otherwise.
+
+    Args:
+        session_id: The ID of the session to run the agent for
+        job: The job describing the agent run
+
+    Returns:
+        A thread-like handle whose is_alive() reports whether the agent is running
+    '''
+    config_repo = get_config_repository()
+    thread_config = dict(job.thread_config)
+    thread_config["thread_id"] = str(session_id)
+
+    # Run the agent in a worker process when a worker pool is configured
+    worker_pool = get_agent_worker_pool()
+    if worker_pool is not None:
+        return worker_pool.submit(
+            session_id,
+            job.message,
+            config=config_repo.to_dict(),
+            research_only=job.research_only,
+            temperature=job.temperature,
+            thread_config=thread_config,
+        )
+
+    # Create stop event for thread termination
+    stop_event = threading.Event()
+
+    # Start the agent thread
+    thread = threading.Thread(
+        target=run_agent_thread,
+        args=(
+            job.message,
+            session_id,
+            config_repo,
+            job.research_only,
+        ),
+        kwargs={
+            "temperature": job.temperature,
+            "thread_config": thread_config,
+            "stop_event": stop_event,
+        }
+    )
+    thread.name = str(session_id)
+    thread.daemon = True  # Thread will terminate when main process exits
+
+    # Register the thread in the global registry
+    register_agent(session_id, thread, stop_event)
+
+    thread.start()
+    return thread
+
 @router.post(
     "",
     response_model=SpawnAgentResponse,
@@ -310,14 +427,18 @@ async def spawn_agent(
     '''
     Spawn a new RA.Aid agent to process a message or task.
 
+    When an agent scheduler is configured, the agent is queued and started
+    once a slot is free; otherwise it is started immediately.
+
     Args:
         request: Request body with message and agent configuration.
         repo: SessionRepository dependency injection
 
     Returns:
-        SpawnAgentResponse: Response with session ID
+        SpawnAgentResponse: Response with session ID and queue position
 
     Raises:
+        HTTPException: With a 503 status code if the agent queue is full
         HTTPException: With a 500 status code if there's an error spawning the agent
     '''
     try:
@@ -334,6 +455,27 @@ async def spawn_agent(
         if temperature is None:
             temperature = get_model_default_temperature(provider, model_name)
 
+        job = AgentJob(
+            message=request.message,
+            research_only=request.research_only,
+            priority=request.priority,
+            temperature=temperature,
+            thread_config={
+                "provider": provider,
+                "model": model_name,
+                "temperature": temperature,
+                "expert_enabled": expert_enabled,
+                "web_research_enabled": web_research_enabled,
+            },
+        )
+
+        scheduler = get_agent_scheduler()
+        if scheduler is not None and scheduler.is_full():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Agent queue is full, try again later",
+            )
+
         # Create a new session with config values (not request parameters)
         metadata = {
             "agent_type": "research-only" if request.research_only else "research",
@@ -341,50 +483,32 @@ async def spawn_agent(
             "web_research_enabled": web_research_enabled,
             "status": "pending" # Set initial status
         }
-        session = repo.create_session(metadata=metadata)
+        if scheduler is not None:
+            # Store the job with the session so it can be re-queued after a restart
+            metadata[JOB_METADATA_KEY] = job.to_dict()
+        session = await AsyncRepository(repo).create_session(metadata=metadata)
         session_id_int = session.id # Store the integer ID
 
         # Set the thread_id in the config repository (using string representation)
         config_repo.set("thread_id", str(session_id_int))
 
-        # Get the current config values
-        thread_config = {
-            "provider": provider,
-            "model": model_name,
-            "temperature": temperature,
-            "expert_enabled": expert_enabled,
-            "web_research_enabled": web_research_enabled,
-            "thread_id": str(session_id_int),
-        }
-
-        # Create stop event for thread termination
-        stop_event = threading.Event()
-
-        # Start the agent thread
-        thread = threading.Thread(
-            target=run_agent_thread,
-            args=(
-                request.message,
-                session_id_int, # Pass the integer ID
-                config_repo,
-                request.research_only,
-            ),
-            kwargs={
-                "temperature": temperature,
-                "thread_config": thread_config,
-                "stop_event": stop_event,
-            }
-        )
-        thread.name = str(session_id_int)
-        thread.daemon = True  # Thread will terminate when main process exits
-
-        # Register the thread in the global registry
-        register_agent(session_id_int, thread, stop_event)
-
-        thread.start()
+        if scheduler is None:
+            start_agent(session_id_int, job)
+            return SpawnAgentResponse(session_id=session_id_int)
+
+        try:
+            position = await run_in_db_thread(scheduler.submit, session_id_int, job)
+        except SchedulerQueueFullError as e:
+            await AsyncRepository(repo).update_session_status(session_id_int, "error")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+            )
 
         # Return the session ID as int
-        return SpawnAgentResponse(session_id=session_id_int)
+        return SpawnAgentResponse(session_id=session_id_int, queue_position=position)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error spawning agent: {e}") # Use logger.exception for stacktrace
         raise HTTPException(
@@ -29,10 +29,14 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from ra_aid.server.api_v1_agent_queue import router as agent_queue_router
+from ra_aid.server.api_v1_checkpoints import router as checkpoints_router
+from ra_aid.server.api_v1_metrics import router as metrics_router
 from ra_aid.server.api_v1_sessions import router as sessions_router
 from ra_aid.server.api_v1_spawn_agent import router as spawn_agent_router
 from ra_aid.server.connection_manager import ConnectionManager
 from ra_aid.server.broadcast_sender import set_broadcast_queue
+from ra_aid.database.async_repository import shutdown_db_executor
 
 _app_instance: FastAPI = None
 
@@ -102,6 +106,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         except Exception:
             logger.exception("Error during broadcast consumer task cancellation.")
 
+    shutdown_db_executor(wait=False)
+
     _app_instance = None
     logger.info("Application shutdown complete.")
 
@@ -122,6 +128,9 @@ app.add_middleware(
 
 app.include_router(sessions_router)
 app.include_router(spawn_agent_router)
+app.include_router(agent_queue_router)
+app.include_router(checkpoints_router)
+app.include_router(metrics_router)
 
 CURRENT_DIR = Path(__file__).parent
 PREBUILT_DIR = CURRENT_DIR / "prebuilt"
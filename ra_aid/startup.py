@@ -0,0 +1,145 @@
+"""
+Startup task runner for the ra-aid CLI.
+
+Initialization steps that do not depend on each other (database migrations,
+environment discovery, dependency checks) run concurrently, and slow optional
+steps such as the version check run in the background while the agent starts.
+Every step is timed; the timings are logged at debug level
+(``--log-level debug``).
+
+Example:
+    startup = StartupTaskRunner()
+    version_check = startup.start_background("version_check", check_for_newer_version)
+    results = startup.run_concurrently({"migrations": ensure_migrations_applied, "env": discover})
+    with startup.step("validate_environment"):
+        validate_environment(args)
+    startup.log_summary()
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from ra_aid.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class StartupTaskRunner:
+    """Runs and times startup steps, concurrently where they are independent."""
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Initialize the runner.
+
+        Args:
+            max_workers: Maximum number of steps run at the same time
+        """
+        self.max_workers = max_workers
+        self.timings: Dict[str, float] = {}
+        self._started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, started_at: float) -> None:
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            self.timings[name] = elapsed
+        logger.debug(f"Startup step '{name}' took {elapsed * 1000:.1f} ms")
+
+    def _timed(self, name: str, fn: Callable[[], Any]) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            self._record(name, started_at)
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """
+        Time a step that runs inline on the calling thread.
+
+        Args:
+            name: Name of the step in the timings
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, started_at)
+
+    def run_concurrently(self, tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """
+        Run independent steps concurrently and wait for all of them.
+
+        Each step runs in a copy of the caller's context, so context-bound
+        state such as the database connection is visible to it. If a step
+        raises (including ``SystemExit``), the remaining steps still finish
+        and the first exception is re-raised on the calling thread.
+
+        Args:
+            tasks: Step names mapped to callables without arguments
+
+        Returns:
+            Dict[str, Any]: Step names mapped to their return values
+        """
+        if not tasks:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(len(tasks), self.max_workers),
+            thread_name_prefix="ra-aid-startup",
+        ) as executor:
+            futures = {
+                name: executor.submit(contextvars.copy_context().run, self._timed, name, fn)
+                for name, fn in tasks.items()
+            }
+
+        results: Dict[str, Any] = {}
+        first_error: Optional[BaseException] = None
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except BaseException as e:
+                logger.debug(f"Startup step '{name}' failed: {e!r}")
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+        return results
+
+    def start_background(self, name: str, fn: Callable[[], Any]) -> "Future[Any]":
+        """
+        Start a step on a daemon thread without waiting for it.
+
+        The process does not wait for background steps on exit, so they must
+        be optional (e.g. the version check).
+
+        Args:
+            name: Name of the step in the timings
+            fn: Callable without arguments
+
+        Returns:
+            Future[Any]: Completes with the step's result or exception
+        """
+        future: "Future[Any]" = Future()
+        future.set_running_or_notify_cancel()
+        context = contextvars.copy_context()
+
+        def run() -> None:
+            try:
+                future.set_result(context.run(self._timed, name, fn))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"ra-aid-startup-{name}", daemon=True).start()
+        return future
+
+    def log_summary(self) -> None:
+        """Log the total startup time and the slowest steps at debug level."""
+        total = time.perf_counter() - self._started_at
+        with self._lock:
+            steps = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        breakdown = ", ".join(f"{name}={elapsed * 1000:.1f}ms" for name, elapsed in steps)
+        logger.debug(f"Startup finished in {total * 1000:.1f} ms ({breakdown})")
@@ -0,0 +1,358 @@
+"""
+Test-impact selection for user-defined test commands.
+
+Running the whole test command after every implementation attempt is slow on
+large projects. With ``--test-impact``, an attempt first runs only the test
+files affected by the files modified in the current agent run, and the full
+test command runs only once that subset passes.
+
+Modified files are recorded in the agent context by ``file_str_replace``,
+``put_complete_file_contents`` and ``run_programming_task`` (the related files
+handed to aider). A test file is affected when it was modified itself or
+imports a modified module, directly or through other project modules. The
+import map is cached in ``test_impact.json`` next to the project database
+(``.ra-aid/``); a file's imports are parsed again only when its size or
+modification time changes.
+
+The subset runs through the ``--test-impact-cmd`` template when it is set,
+with ``{tests}`` replaced by the test files, and otherwise through the test
+command itself when it is a pytest invocation, with its path arguments
+replaced by the test files. No subset is selected, so the full test command
+runs directly, when:
+
+- a modified file is not a Python module (e.g. configuration or data), is a
+  ``conftest.py``, no longer exists or lies outside the project,
+- no test file is affected, or
+- no subset command can be built from the test command.
+"""
+
+import ast
+import json
+import os
+import shlex
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ra_aid.logging_config import get_logger
+from ra_aid.utils.file_utils import atomic_write
+
+logger = get_logger(__name__)
+
+IMPACT_MAP_FILENAME = "test_impact.json"
+IMPACT_MAP_FORMAT = 1
+
+# Directories whose contents are importable without the directory name
+SOURCE_ROOTS = ("src", "lib")
+
+PYTEST_EXECUTABLES = ("pytest", "py.test")
+# pytest options followed by a path value that must be kept
+PYTEST_PATH_OPTIONS = {
+    "-c",
+    "--rootdir",
+    "--confcutdir",
+    "--basetemp",
+    "--ignore",
+    "--ignore-glob",
+    "--deselect",
+    "--junitxml",
+    "--junit-xml",
+    "--cov",
+    "--cov-config",
+}
+SHELL_OPERATORS = {"&&", "||", ";", "|", "&", ">", ">>", "<"}
+
+# (level, module, imported names) of one import statement
+ImportSpec = Tuple[int, str, List[str]]
+
+
+def is_test_file(path: str) -> bool:
+    """Check whether a path is a pytest test module (test_*.py or *_test.py)."""
+    name = os.path.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def parse_imports(source: str) -> List[ImportSpec]:
+    """
+    Get the import statements of a module.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        List[ImportSpec]: (level, module, names) per statement; level is 0 for absolute imports
+    """
+    imports: List[ImportSpec] = []
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            imports.extend((0, alias.name, []) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.level, node.module or "", [alias.name for alias in node.names]))
+    return imports
+
+
+def module_names(path: str) -> List[str]:
+    """Get the dotted names a project file can be imported as, from the root and from src/."""
+    parts = path[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts:
+        return []
+    names = [".".join(parts)]
+    if len(parts) > 1 and parts[0] in SOURCE_ROOTS:
+        names.append(".".join(parts[1:]))
+    return names
+
+
+class ImportGraph:
+    """Which project modules import which, over the project's Python files."""
+
+    def __init__(self, files: Dict[str, List[ImportSpec]]):
+        """
+        Build the graph.
+
+        Args:
+            files: Imports of each Python file, by path relative to the project root
+        """
+        self.paths = set(files)
+        self.modules = {name: path for path in sorted(files) for name in module_names(path)}
+        self.dependents: Dict[str, Set[str]] = defaultdict(set)
+        for path, imports in files.items():
+            for dependency in self.resolve(path, imports):
+                if dependency != path:
+                    self.dependents[dependency].add(path)
+
+    def _module_file(self, parts: List[str]) -> Optional[str]:
+        base = "/".join(parts)
+        for candidate in (f"{base}.py", f"{base}/__init__.py"):
+            if candidate in self.paths:
+                return candidate
+        return None
+
+    def _absolute(self, path: str, module: str) -> Set[str]:
+        """Files executed by importing a dotted module: the module and its packages."""
+        parts = module.split(".")
+        prefixes = (".".join(parts[:end]) for end in range(1, len(parts) + 1))
+        found = {self.modules[name] for name in prefixes if name in self.modules}
+        if not found:
+            # Not a project module by name; pytest puts the directories of test
+            # modules outside packages on sys.path, so try a sibling module
+            sibling = self._module_file(path.split("/")[:-1] + parts)
+            if sibling:
+                found.add(sibling)
+        return found
+
+    def resolve(self, path: str, imports: List[ImportSpec]) -> Set[str]:
+        """
+        Resolve the imports of a file to project files.
+
+        Args:
+            path: The importing file
+            imports: Its import statements
+
+        Returns:
+            Set[str]: The project files the imports execute
+        """
+        resolved: Set[str] = set()
+        for level, module, names in imports:
+            if level:
+                package = path.split("/")[:-1]
+                if level > 1:
+                    package = package[: len(package) - (level - 1)]
+                parts = package + (module.split(".") if module else [])
+                target = self._module_file(parts)
+                if target:
+                    resolved.add(target)
+                for name in names:
+                    submodule = self._module_file(parts + [name])
+                    if submodule:
+                        resolved.add(submodule)
+            else:
+                resolved |= self._absolute(path, module)
+                for name in names:
+                    submodule = f"{module}.{name}"
+                    if submodule in self.modules:
+                        resolved.add(self.modules[submodule])
+        return resolved
+
+    def affected_tests(self, modified: Iterable[str]) -> Set[str]:
+        """
+        Get the test files affected by modified files.
+
+        Args:
+            modified: Modified files, relative to the project root
+
+        Returns:
+            Set[str]: Test files that were modified or depend on a modified file
+        """
+        seen = set(modified)
+        queue = list(seen)
+        while queue:
+            for dependent in self.dependents.get(queue.pop(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    queue.append(dependent)
+        return {path for path in seen if is_test_file(path)}
+
+
+class TestImpactMap:
+    """The imports of a project's Python files, cached on disk between runs."""
+
+    def __init__(self, root: str, cache_path: Optional[Path] = None):
+        """
+        Initialize the map.
+
+        Args:
+            root: Project root that file paths are relative to
+            cache_path: JSON file to cache parsed imports in; None keeps them in memory
+        """
+        self.root = root
+        self.cache_path = cache_path
+        self._files: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.cache_path is None or not self.cache_path.is_file():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if data.get("format") == IMPACT_MAP_FORMAT:
+                return data["files"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable test impact map {self.cache_path}: {e}")
+        return {}
+
+    def _save(self) -> None:
+        try:
+            atomic_write(self.cache_path, json.dumps({"format": IMPACT_MAP_FORMAT, "files": self._files}))
+        except OSError as e:
+            logger.debug(f"Could not save test impact map: {e}")
+
+    def update(self, paths: List[str]) -> Dict[str, List[ImportSpec]]:
+        """
+        Bring the map up to date with the project's Python files.
+
+        Args:
+            paths: Python files, relative to the project root
+
+        Returns:
+            Dict[str, List[ImportSpec]]: Imports of each file
+        """
+        changed = set(self._files) - set(paths)
+        for path in changed:
+            del self._files[path]
+
+        for path in paths:
+            try:
+                stat = os.stat(os.path.join(self.root, path))
+            except OSError:
+                continue
+            entry = self._files.get(path)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            try:
+                with open(os.path.join(self.root, path), encoding="utf-8") as f:
+                    imports = parse_imports(f.read())
+            except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as e:
+                logger.debug(f"Could not parse imports of {path}: {e}")
+                imports = []
+            self._files[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "imports": imports}
+            changed.add(path)
+
+        if changed and self.cache_path is not None:
+            self._save()
+        return {
+            path: [(level, module, names) for level, module, names in entry["imports"]]
+            for path, entry in self._files.items()
+        }
+
+
+def _impact_map_path() -> Optional[Path]:
+    from ra_aid.database.connection import get_db_dir
+
+    db_dir = get_db_dir()
+    return db_dir / IMPACT_MAP_FILENAME if db_dir else None
+
+
+def select_affected_tests(modified_files: Iterable[str], root: str = ".") -> Optional[List[str]]:
+    """
+    Select the test files affected by modified files.
+
+    Args:
+        modified_files: Paths of the modified files
+        root: Project root
+
+    Returns:
+        Optional[List[str]]: Affected test files relative to root, or None when
+        the full test command should run instead
+    """
+    from ra_aid.file_listing import FileListerError, get_all_project_files
+
+    root = os.path.abspath(root)
+    modified = set()
+    for path in modified_files:
+        relative = os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/")
+        if (
+            relative.startswith("../")
+            or not relative.endswith(".py")
+            or os.path.basename(relative) == "conftest.py"
+            or not os.path.isfile(os.path.join(root, relative))
+        ):
+            logger.debug(f"No test selection: {path} cannot be mapped to tests")
+            return None
+        modified.add(relative)
+    if not modified:
+        return None
+
+    try:
+        files = [path for path in get_all_project_files(root) if path.endswith(".py")]
+    except FileListerError as e:
+        logger.debug(f"No test selection: could not list project files: {e}")
+        return None
+
+    graph = ImportGraph(TestImpactMap(root, _impact_map_path()).update(files))
+    tests = sorted(graph.affected_tests(modified))
+    logger.debug(f"Test selection for {sorted(modified)}: {tests}")
+    return tests or None
+
+
+def subset_test_command(test_cmd: str, tests: List[str], template: Optional[str] = None) -> Optional[str]:
+    """
+    Build a command that runs only some test files.
+
+    Args:
+        test_cmd: The full test command
+        tests: Test files to run
+        template: Command template with a ``{tests}`` placeholder
+
+    Returns:
+        Optional[str]: The command, or None when test_cmd is not a plain pytest
+        invocation and no template is given
+    """
+    quoted = [shlex.quote(test) for test in tests]
+    if template:
+        return template.replace("{tests}", " ".join(quoted))
+
+    try:
+        tokens = shlex.split(test_cmd)
+    except ValueError:
+        return None
+    if any(token in SHELL_OPERATORS for token in tokens):
+        return None
+
+    start = None
+    for index, token in enumerate(tokens):
+        if os.path.basename(token) in PYTEST_EXECUTABLES or (
+            token == "pytest" and index > 0 and tokens[index - 1] == "-m"
+        ):
+            start = index
+            break
+    if start is None:
+        return None
+
+    args = []
+    keep_next = False
+    for token in tokens[start + 1 :]:
+        if keep_next or token.startswith("-") or not os.path.exists(token.split("::")[0]):
+            args.append(token)
+        keep_next = token in PYTEST_PATH_OPTIONS
+    return shlex.join(tokens[: start + 1] + args) + " " + " ".join(quoted)
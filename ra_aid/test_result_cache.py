@@ -0,0 +1,184 @@
+"""
+Reuse of test command results for an unchanged tree.
+
+When the agent retries or re-verifies without touching any file, the test
+command would run again against identical code. Results are stored in
+``test_results.json`` next to the project database (``.ra-aid/``), keyed by
+the test command and a content hash of the project files: all tracked and
+untracked, non-ignored files as listed by ``get_all_project_files``.
+
+The content hash is maintained incrementally. Each file's sha256 is kept
+with its size and modification time, and a file is read again only when
+either changes, so checking an unchanged tree costs a listing and a stat per
+file.
+
+Runs that finished are stored, whether they passed or failed: against the
+same files the same command gives the same result, so a failure is replayed
+just like a pass. Runs that did not finish (timed out, failed to start, or
+were declined at the approval prompt) are never stored. A result is stored
+only when the tree hash after the run matches the one before it, so runs that
+changed files (or raced with an edit) are never reused. Failures caused by
+something outside the hashed files (ignored or generated files, the
+environment, services the tests talk to) would be replayed too; turn the
+cache off with ``--no-test-cache`` for such projects. Caching needs a
+database file; it is off for in-memory databases.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ra_aid.logging_config import get_logger
+from ra_aid.utils.file_utils import atomic_write
+
+logger = get_logger(__name__)
+
+TEST_RESULTS_FILENAME = "test_results.json"
+TEST_RESULTS_FORMAT = 1
+# Results kept across test commands and tree states; the oldest are removed first
+MAX_RESULTS = 32
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Get the sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def result_key(test_cmd: str, tree_hash: str) -> str:
+    """Get the cache key of a test command run against a tree state."""
+    return hashlib.sha256(f"{test_cmd}\n{tree_hash}".encode("utf-8")).hexdigest()
+
+
+class TestResultCache:
+    """Test command results by command and project content hash, kept on disk."""
+
+    def __init__(self, path: Path, root: str = "."):
+        """
+        Initialize the cache.
+
+        Args:
+            path: JSON file holding file hashes and results
+            root: Project root whose files are hashed
+        """
+        self.path = path
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.is_file():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("format") == TEST_RESULTS_FORMAT:
+                self._files = data["files"]
+                self._results = data["results"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable test result cache {self.path}: {e}")
+
+    def _save(self) -> None:
+        data = {"format": TEST_RESULTS_FORMAT, "files": self._files, "results": self._results}
+        atomic_write(self.path, json.dumps(data))
+
+    def tree_hash(self) -> str:
+        """
+        Hash the contents of the project files, rehashing only changed files.
+
+        Returns:
+            str: sha256 hex digest over the sorted paths and file hashes
+        """
+        from ra_aid.file_listing import get_all_project_files
+
+        paths = sorted(get_all_project_files(self.root, include_hidden=True))
+        with self._lock:
+            files = {}
+            changed = len(paths) != len(self._files)
+            digest = hashlib.sha256()
+            for path in paths:
+                full_path = os.path.join(self.root, path)
+                try:
+                    stat = os.stat(full_path)
+                    entry = self._files.get(path)
+                    if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                        entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_sha256(full_path)}
+                        changed = True
+                except OSError:
+                    # Listed but gone or unreadable; it still differs from a readable file
+                    entry = {"mtime_ns": 0, "size": -1, "sha256": "unreadable"}
+                files[path] = entry
+                digest.update(f"{path}\0{entry['sha256']}\n".encode("utf-8"))
+            self._files = files
+            if changed:
+                self._try_save()
+            return digest.hexdigest()
+
+    def lookup(self, test_cmd: str, tree_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the result of a test command for a tree state.
+
+        Args:
+            test_cmd: The test command
+            tree_hash: The tree hash from tree_hash()
+
+        Returns:
+            Optional[Dict[str, Any]]: The run_shell_command result and when it
+            was recorded, or None when the command has not run against this tree
+        """
+        with self._lock:
+            entry = self._results.get(result_key(test_cmd, tree_hash))
+            return dict(entry) if entry else None
+
+    def store(self, test_cmd: str, tree_hash: str, result: Dict[str, Any]) -> None:
+        """
+        Store the result of a test command run against a tree state.
+
+        Args:
+            test_cmd: The test command
+            tree_hash: The tree hash from tree_hash(), taken before the run
+            result: The run_shell_command result
+        """
+        with self._lock:
+            self._results[result_key(test_cmd, tree_hash)] = {
+                "success": bool(result["success"]),
+                "return_code": result.get("return_code"),
+                "output": result.get("output", ""),
+                "created_at": time.time(),
+            }
+            if len(self._results) > MAX_RESULTS:
+                oldest = sorted(self._results, key=lambda key: self._results[key]["created_at"])
+                for key in oldest[: len(self._results) - MAX_RESULTS]:
+                    del self._results[key]
+            self._try_save()
+
+    def _try_save(self) -> None:
+        try:
+            self._save()
+        except OSError as e:
+            logger.debug(f"Could not save test result cache: {e}")
+
+
+def get_test_result_cache() -> Optional[TestResultCache]:
+    """
+    Get the test result cache of the current project database.
+
+    Returns:
+        Optional[TestResultCache]: The cache in the database directory, or None
+        when the database is in memory
+    """
+    from ra_aid.database.connection import get_db_dir
+
+    db_dir = get_db_dir()
+    if db_dir is None:
+        return None
+    return TestResultCache(db_dir / TEST_RESULTS_FILENAME)
@@ -2,9 +2,7 @@ import importlib.util
 from typing import List
 
 from langchain_core.tools import BaseTool
-from ra_aid.console import console
-from rich.markdown import Markdown
-from rich.panel import Panel
+from ra_aid.console.formatting import cpm
 from ra_aid.tools import (
     ask_expert,
     ask_human,
@@ -104,12 +102,10 @@ def get_custom_tools() -> List[BaseTool]:
 """
             for tool in tools:
                 custom_tool_output += f"* {tool.name}: {tool.description}\n"
-            console.print(
-                Panel(
-                    Markdown(custom_tool_output.strip()),
-                    title="🛠️ Custom Tools Available",
-                    border_style="magenta",
-                )
+            cpm(
+                custom_tool_output.strip(),
+                title="🛠️ Custom Tools Available",
+                border_style="magenta",
             )
 
         # Set global
@@ -467,6 +467,19 @@ def request_task_implementation(task_spec: str) -> str:
         success = False
         reason = f"error: {str(e)}"
 
+    # Back in the planning stage until the next task starts
+    try:
+        get_trajectory_repository().create(
+            step_data={
+                "stage": "planning_stage",
+                "display_title": "Planning Stage",
+            },
+            record_type="stage_transition",
+            human_input_id=get_human_input_repository().get_most_recent_id(),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to record stage transition: {str(e)}")
+
     # Get completion message if available
     completion_message = get_completion_message() or (
         "Task was completed successfully." if success else None
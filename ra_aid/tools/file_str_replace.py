@@ -3,6 +3,7 @@ from typing import Dict
 
 from langchain_core.tools import tool
 
+from ra_aid.agent_context import record_modified_file
 from ra_aid.console import console
 from ra_aid.console.formatting import print_error
 from ra_aid.console.formatting import console_panel
@@ -151,6 +152,7 @@ def file_str_replace(filepath: str, old_str: str, new_str: str, *, replace_all:
 
         new_content = content.replace(old_str, new_str)
         path.write_text(new_content)
+        record_modified_file(filepath)
 
         replacement_msg = f"Replaced in {filepath}:"
         if count > 1 and replace_all:
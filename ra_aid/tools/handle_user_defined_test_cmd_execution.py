@@ -2,15 +2,20 @@
 
 import subprocess
 from dataclasses import dataclass
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 from ra_aid.console.formatting import console_panel, cpm
 
+from ra_aid.agent_context import get_modified_files
 from ra_aid.config import DEFAULT_TEST_CMD_TIMEOUT
+from ra_aid.database.repositories.human_input_repository import get_human_input_repository
+from ra_aid.database.repositories.trajectory_repository import get_trajectory_repository
 from ra_aid.logging_config import get_logger
+from ra_aid.test_impact import select_affected_tests, subset_test_command
+from ra_aid.test_result_cache import TestResultCache, get_test_result_cache
 from ra_aid.tools.human import ask_human
 from ra_aid.tools.shell import run_shell_command
 
@@ -54,6 +59,9 @@ class TestCommandExecutor:
             should_break=False,
         )
         self.max_retries = config.get("max_test_cmd_retries", 5)
+        self._result_cache: Optional[TestResultCache] = None
+        if config.get("test_result_cache"):
+            self._result_cache = get_test_result_cache()
 
     def display_test_failure(self) -> None:
         """Display test failure message."""
@@ -76,17 +84,126 @@ class TestCommandExecutor:
         self.display_test_failure()
         self.state.should_break = False
 
+    def affected_test_command(self, cmd: str) -> Optional[str]:
+        """Get a command running only the tests affected by this run's file changes.
+
+        Args:
+            cmd: Full test command
+
+        Returns:
+            The subset command, or None when the full command should run directly
+        """
+        if not self.config.get("test_impact"):
+            return None
+        try:
+            tests = select_affected_tests(get_modified_files())
+        except Exception as e:
+            logger.warning(f"Test impact selection failed: {str(e)}")
+            return None
+        if not tests:
+            return None
+        return subset_test_command(cmd, tests, self.config.get("test_impact_cmd"))
+
+    def record_cached_result(self, cmd: str, timeout: int, result: Dict[str, Any]) -> None:
+        """Show and record a test command run skipped for a cached result.
+
+        Args:
+            cmd: Test command that was skipped
+            timeout: Timeout the command would have run with
+            result: The cached result
+        """
+        outcome = "passed" if result["success"] else "failed"
+        cpm(
+            f"No files changed since `{cmd}` last {outcome}; reusing its result instead of running it again.",
+            title="🔎 User Defined Test",
+            border_style="green" if result["success"] else "yellow",
+        )
+        logger.info(f"Skipped test command with cached {outcome} result: {cmd}")
+        try:
+            get_trajectory_repository().create(
+                tool_name="run_shell_command",
+                tool_parameters={"command": cmd, "timeout": timeout},
+                tool_result={
+                    "success": result["success"],
+                    "return_code": result.get("return_code"),
+                    "output": result["output"],
+                },
+                step_data={
+                    "command": cmd,
+                    "success": result["success"],
+                    "cached_at": result.get("created_at"),
+                    "display_title": "Cached Test Result",
+                },
+                record_type="test_result_cache_hit",
+                human_input_id=get_human_input_repository().get_most_recent_id(),
+            )
+        except Exception as e:
+            logger.warning(f"Could not record cached test result in trajectory: {str(e)}")
+
+    def run_shell(self, cmd: str, timeout: int) -> Dict[str, Any]:
+        """Run a test command, reusing its result when no file changed since it last ran.
+
+        Args:
+            cmd: Test command to execute
+            timeout: Timeout in seconds
+
+        Returns:
+            The run_shell_command result
+        """
+        cache = self._result_cache
+        tree_hash = None
+        if cache is not None:
+            try:
+                tree_hash = cache.tree_hash()
+                cached = cache.lookup(cmd, tree_hash)
+            except Exception as e:
+                logger.warning(f"Test result cache lookup failed: {str(e)}")
+                cache = None
+            else:
+                if cached:
+                    self.record_cached_result(cmd, timeout, cached)
+                    return cached
+
+        result = run_shell_command.invoke({"command": cmd, "timeout": timeout})
+
+        # Runs that did not finish say nothing about the tree and run again
+        finished = not any(result.get(key) for key in ("timed_out", "error", "cancelled"))
+        if cache is not None and finished:
+            try:
+                # A run that changed files is not a result for the tree it started from
+                if cache.tree_hash() == tree_hash:
+                    cache.store(cmd, tree_hash, result)
+            except Exception as e:
+                logger.warning(f"Test result cache update failed: {str(e)}")
+        return result
+
     def run_test_command(self, cmd: str, original_prompt: str) -> None:
         """Run test command and handle result.
 
+        With test impact selection enabled, the tests affected by the modified
+        files run first and the full command only runs once they pass.
+
         Args:
             cmd: Test command to execute
             original_prompt: Original prompt text
         """
         timeout = self.config.get("test_cmd_timeout", DEFAULT_TEST_CMD_TIMEOUT)
         try:
+            subset_cmd = self.affected_test_command(cmd)
+            if subset_cmd:
+                cpm(
+                    f"Running affected tests first: `{subset_cmd}`",
+                    title="🔎 User Defined Test",
+                )
+                logger.info(f"Executing affected tests: {subset_cmd} with timeout {timeout}s")
+                test_result = self.run_shell(subset_cmd, timeout)
+                if not test_result["success"]:
+                    self.state.test_attempts += 1
+                    self.handle_test_failure(original_prompt, test_result)
+                    return
+
             logger.info(f"Executing test command: {cmd} with timeout {timeout}s")
-            test_result = run_shell_command(cmd, timeout=timeout)
+            test_result = self.run_shell(cmd, timeout)
             self.state.test_attempts += 1
 
             if not test_result["success"]:
@@ -2,9 +2,8 @@ from langchain_core.tools import tool
 from prompt_toolkit import PromptSession
 from prompt_toolkit.key_binding import KeyBindings
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 
+from ra_aid.console.formatting import cpm
 from ra_aid.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -33,15 +32,11 @@ def ask_human(question: str) -> str:
     Returns:
         The user's response as a string
     """
-    console.print(
-        Panel(
-            Markdown(
-                question
-                + "\n\n*Multiline input is supported; use Ctrl+D to submit. Use Ctrl+C to exit the program.*"
-            ),
-            title="💭 Question for Human",
-            border_style="yellow bold",
-        )
+    cpm(
+        question
+        + "\n\n*Multiline input is supported; use Ctrl+D to submit. Use Ctrl+C to exit the program.*",
+        title="💭 Question for Human",
+        border_style="yellow bold",
     )
 
     session = PromptSession(
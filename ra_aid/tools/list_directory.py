@@ -1,19 +1,23 @@
 import datetime
 import fnmatch
+import os
+import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional, Pattern, Set, Tuple, Union
 
 import pathspec
 from langchain_core.tools import tool
-from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.tree import Tree
 
 from ra_aid.console.formatting import cpm
+from ra_aid.file_listing import FileListerError, get_all_project_files, is_git_repo
 
-console = Console()
+# Deep or wide trees produce huge output; list this many entries before summarizing
+DEFAULT_MAX_ENTRIES_PER_DIR = 200
+DEFAULT_MAX_TOTAL_ENTRIES = 2000
 
 
 @dataclass
@@ -25,6 +29,8 @@ class DirScanConfig:
     show_size: bool
     show_modified: bool
     exclude_patterns: List[str]
+    max_entries_per_dir: int = DEFAULT_MAX_ENTRIES_PER_DIR
+    max_total_entries: int = DEFAULT_MAX_TOTAL_ENTRIES
 
 
 def format_size(size_bytes: int) -> str:
@@ -63,48 +69,45 @@ DEFAULT_EXCLUDE_PATTERNS = [
 ]
 
 
-def load_gitignore_patterns(path: Path) -> pathspec.PathSpec:
+def read_ignore_file(path: Path) -> List[str]:
+    """Read the patterns of a .gitignore style file.
+
+    Args:
+        path: The ignore file; a missing file has no patterns
+
+    Returns:
+        Patterns with trailing slashes removed
+    """
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return []
+    # Python pathspec doesn't treat `blah/` as a ignore folder, but `blah`. So we strip them
+    return [
+        line.strip().rstrip("/")
+        for line in lines
+        if line.strip() and not line.startswith("#")
+    ]
+
+
+def load_gitignore_patterns(
+    path: Path, include_defaults: bool = True
+) -> pathspec.PathSpec:
     """Load gitignore patterns from .gitignore file or use defaults.
 
     Args:
         path: Directory path to search for .gitignore
+        include_defaults: Whether to add DEFAULT_EXCLUDE_PATTERNS
 
     Returns:
         PathSpec object configured with the loaded patterns
     """
-    gitignore_path = path / ".gitignore"
-    patterns = []
-
-    def modify_path(p: str) -> str:
-        # Python pathspec doesn't treat `blah/` as a ignore folder, but `blah`. So we strip them
-        p = p.strip()
-        if p.endswith("/"):
-            return p[:-1]
-        return p
-
-    # Load patterns from .gitignore if it exists
-    if gitignore_path.exists():
-        with open(gitignore_path) as f:
-            patterns.extend(
-                modify_path(line)
-                for line in f
-                if line.strip() and not line.startswith("#")
-            )
+    patterns = read_ignore_file(path / ".gitignore")
+    patterns.extend(read_ignore_file(path / ".aiderignore"))
 
-    # add patterns from .aiderignore if it exists
-    aiderignore_path = path / ".aiderignore"
-
-    # Load patterns from .gitignore if it exists
-    if aiderignore_path.exists():
-        with open(aiderignore_path) as f:
-            patterns.extend(
-                modify_path(line)
-                for line in f
-                if line.strip() and not line.startswith("#")
-            )
-
-    # Add default patterns
-    patterns.extend(DEFAULT_EXCLUDE_PATTERNS)
+    if include_defaults:
+        patterns.extend(DEFAULT_EXCLUDE_PATTERNS)
 
     return pathspec.PathSpec.from_lines(pathspec.patterns.GitWildMatchPattern, patterns)
 
@@ -119,61 +122,204 @@ def should_exclude(name: str, patterns: List[str]) -> bool:
     return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
 
 
-def build_tree(
-    path: Path,
-    tree: Tree,
-    config: DirScanConfig,
-    current_depth: int = 0,
-    spec: Optional[pathspec.PathSpec] = None,
-) -> None:
-    """Recursively build a Rich tree representation of the directory"""
-    if current_depth >= config.max_depth:
-        return
+class TextTree:
+    """Plain-text tree with the same guides as rich.tree.Tree.
 
-    try:
-        # Get sorted list of directory contents
-        entries = sorted(path.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
+    Rendering thousands of nodes through Rich dominated the cost of a listing;
+    labels here are also never parsed as console markup.
+    """
 
-        for entry in entries:
-            # Get relative path from root for pattern matching
-            rel_path = entry.relative_to(path)
+    def __init__(self, label: str):
+        self.label = label
+        self.children: List["TextTree"] = []
+
+    def add(self, label: str) -> "TextTree":
+        node = TextTree(label)
+        self.children.append(node)
+        return node
+
+    def render(self) -> str:
+        lines = [self.label]
+        self._render_children("", lines)
+        return "\n".join(lines) + "\n"
+
+    def _render_children(self, prefix: str, lines: List[str]) -> None:
+        for index, child in enumerate(self.children):
+            last = index == len(self.children) - 1
+            lines.append(f"{prefix}{'└── ' if last else '├── '}{child.label}")
+            child._render_children(prefix + ("    " if last else "│   "), lines)
+
+
+def compile_name_patterns(patterns: List[str]) -> Optional[Pattern[str]]:
+    """Compile fnmatch patterns into one regex matched against entry names."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+class DirectoryScanner:
+    """Walks a directory tree with os.scandir and adds visible entries to a Rich tree.
 
-            # Skip if path matches exclude patterns
-            if spec and should_ignore(str(rel_path), spec):
+    Ignore rules are compiled once per listing: exclude patterns become a
+    single regex on entry names, and the root .gitignore plus any nested
+    .gitignore files are matched with paths relative to their own directory.
+    Given a file index (paths relative to the root, e.g. from
+    get_all_project_files), entries are filtered by the index instead.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        config: DirScanConfig,
+        spec: Optional[pathspec.PathSpec] = None,
+        file_index: Optional[Iterable[str]] = None,
+    ):
+        self.root = root
+        self.config = config
+        self.spec = spec
+        self.name_pattern = compile_name_patterns(config.exclude_patterns)
+        self.shown = 0
+        self.omitted = 0
+        self.index_files: Optional[Set[str]] = None
+        self.index_dirs: Optional[Set[str]] = None
+        if file_index is not None:
+            self.index_files = set(file_index)
+            self.index_dirs = set()
+            for file in self.index_files:
+                parent = file.rpartition("/")[0]
+                while parent and parent not in self.index_dirs:
+                    self.index_dirs.add(parent)
+                    parent = parent.rpartition("/")[0]
+
+    @property
+    def truncated(self) -> bool:
+        return self.omitted > 0
+
+    def scan(self, tree: Union[Tree, TextTree], current_depth: int = 0) -> None:
+        specs = ((("", self.spec),) if self.spec else ())
+        self._scan(str(self.root), "", tree, current_depth, specs)
+
+    def _ignored(
+        self, rel_path: str, is_dir: bool, specs: Tuple[Tuple[str, pathspec.PathSpec], ...]
+    ) -> bool:
+        if self.index_files is not None:
+            return rel_path not in (self.index_dirs if is_dir else self.index_files)
+        for base, spec in specs:
+            if spec.match_file(rel_path[len(base) + 1 :] if base else rel_path):
+                return True
+        return False
+
+    def _scan(
+        self,
+        path: str,
+        rel: str,
+        tree: Union[Tree, TextTree],
+        current_depth: int,
+        specs: Tuple[Tuple[str, pathspec.PathSpec], ...],
+    ) -> None:
+        config = self.config
+        if current_depth >= config.max_depth:
+            return
+
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except PermissionError:
+            tree.add("🔒 (Permission denied)")
+            return
+        except OSError:
+            return
+
+        # The root .gitignore is already part of the root spec
+        if rel and self.index_files is None and any(e.name == ".gitignore" for e in entries):
+            nested = read_ignore_file(Path(path) / ".gitignore")
+            if nested:
+                specs = specs + (
+                    (rel, pathspec.PathSpec.from_lines(pathspec.patterns.GitWildMatchPattern, nested)),
+                )
+
+        visible = []
+        for entry in entries:
+            if self.name_pattern and self.name_pattern.match(entry.name):
                 continue
-            if should_exclude(entry.name, config.exclude_patterns):
+            try:
+                is_link = entry.is_symlink()
+                is_dir = entry.is_dir()
+            except OSError:
                 continue
-
             # Skip if symlink and not following links
-            if entry.is_symlink() and not config.follow_links:
+            if is_link and not config.follow_links:
+                continue
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            if self._ignored(entry_rel, is_dir, specs):
                 continue
+            visible.append((entry, is_dir, is_link, entry_rel))
+
+        visible.sort(key=lambda item: (not item[1], item[0].name.lower()))
+        per_dir = config.max_entries_per_dir
+        listed = visible[:per_dir] if per_dir else visible
 
+        for position, (entry, is_dir, is_link, entry_rel) in enumerate(listed):
+            if config.max_total_entries and self.shown >= config.max_total_entries:
+                self.omitted += len(visible) - position
+                return
+            self.shown += 1
             try:
-                if entry.is_dir():
+                if is_dir:
                     # Add directory node
                     branch = tree.add(f"📁 {entry.name}/")
-
-                    # Recursively process subdirectory
-                    build_tree(entry, branch, config, current_depth + 1, spec)
+                    if is_link and _links_to_ancestor(entry.path, path):
+                        continue
+                    self._scan(entry.path, entry_rel, branch, current_depth + 1, specs)
                 else:
                     # Add file node with optional metadata
-                    meta = []
-                    if config.show_size:
-                        meta.append(format_size(entry.stat().st_size))
-                    if config.show_modified:
-                        meta.append(format_time(entry.stat().st_mtime))
-
                     label = entry.name
-                    if meta:
+                    if config.show_size or config.show_modified:
+                        stat = entry.stat()
+                        meta = []
+                        if config.show_size:
+                            meta.append(format_size(stat.st_size))
+                        if config.show_modified:
+                            meta.append(format_time(stat.st_mtime))
                         label = f"{label} ({', '.join(meta)})"
-
                     tree.add(label)
-
             except PermissionError:
                 tree.add(f"🔒 {entry.name} (Permission denied)")
 
-    except PermissionError:
-        tree.add("🔒 (Permission denied)")
+        hidden = visible[len(listed):]
+        if hidden:
+            dirs = sum(1 for item in hidden if item[1])
+            tree.add(
+                f"… {len(hidden)} more entries ({dirs} directories, {len(hidden) - dirs} files)"
+            )
+
+
+def _links_to_ancestor(link: str, parent: str) -> bool:
+    """Check if a directory symlink points at one of its ancestors."""
+    target = os.path.realpath(link)
+    current = os.path.realpath(parent)
+    return current == target or current.startswith(target.rstrip(os.sep) + os.sep)
+
+
+def build_tree(
+    path: Path,
+    tree: Union[Tree, TextTree],
+    config: DirScanConfig,
+    current_depth: int = 0,
+    spec: Optional[pathspec.PathSpec] = None,
+) -> None:
+    """Build a Rich tree representation of the directory, see DirectoryScanner"""
+    DirectoryScanner(path, config, spec).scan(tree, current_depth)
+
+
+def _project_file_index(root_path: Path) -> Optional[List[str]]:
+    """Get the git file index of a directory, or None outside git repositories."""
+    try:
+        if not is_git_repo(str(root_path)):
+            return None
+        return get_all_project_files(str(root_path))
+    except FileListerError:
+        return None
 
 
 @tool
@@ -185,6 +331,9 @@ def list_directory_tree(
     show_size: bool = False,  # Default to not showing size
     show_modified: bool = False,  # Default to not showing modified time
     exclude_patterns: List[str] = None,
+    max_entries_per_dir: int = DEFAULT_MAX_ENTRIES_PER_DIR,
+    max_total_entries: int = DEFAULT_MAX_TOTAL_ENTRIES,
+    use_file_index: bool = False,
 ) -> str:
     """List directory contents in a tree format with optional metadata.
     If a file path is provided, returns information about just that file.
@@ -196,6 +345,9 @@ def list_directory_tree(
         show_size: Show file sizes (default: False)
         show_modified: Show last modified times (default: False)
         exclude_patterns: List of patterns to exclude (uses gitignore syntax)
+        max_entries_per_dir: Entries listed per directory before summarizing the rest (0 for no limit)
+        max_total_entries: Entries listed in total before stopping (0 for no limit)
+        use_file_index: In git repositories, list only files git reports (tracked or untracked, not ignored)
 
     Returns:
         Rendered tree string
@@ -205,23 +357,32 @@ def list_directory_tree(
         return f"Error: Path does not exist: {path}"
     
     # Load .gitignore patterns if present (only needed for directories)
-    spec = None
     if root_path.is_dir():
-        spec = load_gitignore_patterns(root_path)
+        file_index = _project_file_index(root_path) if use_file_index else None
+        # Default patterns are matched by name through exclude_patterns
+        spec = None if file_index is not None else load_gitignore_patterns(root_path, include_defaults=False)
         # Create tree for directory
-        tree = Tree(f"📁 {root_path}/")
+        tree = TextTree(f"📁 {root_path}/")
         config = DirScanConfig(
             max_depth=max_depth,
             follow_links=follow_links,
             show_size=show_size,
             show_modified=show_modified,
             exclude_patterns=DEFAULT_EXCLUDE_PATTERNS + (exclude_patterns or []),
+            max_entries_per_dir=max_entries_per_dir,
+            max_total_entries=max_total_entries,
         )
         # Build tree
-        build_tree(root_path, tree, config, 0, spec)
+        scanner = DirectoryScanner(root_path, config, spec, file_index)
+        scanner.scan(tree)
+        if scanner.truncated:
+            tree.add(
+                f"… listing stopped after {scanner.shown} entries; "
+                f"{scanner.omitted} more not shown. Narrow the path or lower max_depth."
+            )
     else:
         # Create a simple tree for a single file
-        tree = Tree(f"🗋 {root_path.parent}/")
+        tree = TextTree(f"🗋 {root_path.parent}/")
         file_text = root_path.name
         
         # Add size information if requested
@@ -236,10 +397,7 @@ def list_directory_tree(
             
         tree.add(file_text)
 
-    # Capture tree output
-    with console.capture() as capture:
-        console.print(tree)
-    tree_str = capture.get()
+    tree_str = tree.render()
 
     # Display panel
     cpm(
@@ -5,10 +5,10 @@ from typing import Dict, List, Union
 
 from langchain_core.tools import tool
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 from rich.text import Text
 
+from ra_aid.agent_context import record_modified_file
+from ra_aid.console.formatting import cpm
 from ra_aid.logging_config import get_logger
 from ra_aid.models_params import DEFAULT_BASE_LATENCY, models_params
 from ra_aid.proc.interactive import run_interactive_command
@@ -109,13 +109,7 @@ def run_programming_task(
         )
 
     markdown_content = "".join(task_display)
-    console.print(
-        Panel(
-            Markdown(markdown_content),
-            title="🤖 Aider Task",
-            border_style="bright_blue",
-        )
-    )
+    cpm(markdown_content, title="🤖 Aider Task", border_style="bright_blue")
     logger.debug(f"command: {command}")
 
     try:
@@ -131,6 +125,9 @@ def run_programming_task(
         )
 
         result = run_interactive_command(command, expected_runtime_seconds=latency)
+        # Aider may edit any of the files it was given
+        for file in files_to_use:
+            record_modified_file(file)
         print()
 
         # Log the programming task
@@ -114,7 +114,7 @@ def read_file_tool(filepath: str, encoding: str = "utf-8") -> Dict[str, str]:
             )
             return {"error": "read_file failed because we cannot read binary files"}
 
-        logging.debug(f"Starting to read file: {filepath}")
+        logging.debug("Starting to read file: %s", filepath)
         content = []
         line_count = 0
         total_bytes = 0
@@ -130,14 +130,14 @@ def read_file_tool(filepath: str, encoding: str = "utf-8") -> Dict[str, str]:
                 line_count += chunk.count("\n")
 
                 logging.debug(
-                    f"Read chunk: {len(chunk)} bytes, running total: {total_bytes} bytes"
+                    "Read chunk: %d bytes, running total: %d bytes", len(chunk), total_bytes
                 )
 
         full_content = "".join(content)
         elapsed = time.time() - start_time
 
-        logging.debug(f"File read complete: {total_bytes} bytes in {elapsed:.2f}s")
-        logging.debug(f"Pre-truncation stats: {total_bytes} bytes, {line_count} lines")
+        logging.debug("File read complete: %d bytes in %.2fs", total_bytes, elapsed)
+        logging.debug("Pre-truncation stats: %d bytes, %d lines", total_bytes, line_count)
 
         # Record successful file read in trajectory
         record_trajectory(
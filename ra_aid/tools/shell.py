@@ -102,6 +102,7 @@ def run_shell_command(
                 "output": "Command execution cancelled by user",
                 "return_code": 1,
                 "success": False,
+                "cancelled": True,
             }
         elif response == "c":
             get_config_repository().set("cowboy_mode", True)
@@ -112,15 +113,17 @@ def run_shell_command(
     try:
         print()
         shell_cmd = _detect_shell()
-        output, return_code = run_interactive_command(
+        command_output = run_interactive_command(
             shell_cmd + [command],
             expected_runtime_seconds=timeout,
         )
+        output, return_code = command_output
         print()
         result = {
             "output": truncate_output(output.decode()) if output else "",
             "return_code": return_code,
             "success": return_code == 0,
+            "timed_out": getattr(command_output, "timed_out", False),
         }
         log_work_event(f"Executed shell command: {_truncate_for_log(command)}")
         return result
@@ -145,4 +148,4 @@ def run_shell_command(
         )
         
         console_panel(str(e), title="❌ Error", border_style="red")
-        return {"output": str(e), "return_code": 1, "success": False}
+        return {"output": str(e), "return_code": 1, "success": False, "error": True}
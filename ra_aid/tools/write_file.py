@@ -6,6 +6,7 @@ from typing import Dict
 from langchain_core.tools import tool
 from rich.console import Console
 from rich.panel import Panel
+from ra_aid.agent_context import record_modified_file
 from ra_aid.console.formatting import console_panel
 from ra_aid.database.repositories.trajectory_repository import get_trajectory_repository  # Added import
 from ra_aid.tools.memory import emit_related_files
@@ -53,6 +54,7 @@ def put_complete_file_contents(
             logging.debug(f"Writing {len(complete_file_contents)} bytes to {filepath}")
             f.write(complete_file_contents)
             result["bytes_written"] = len(complete_file_contents.encode(encoding))
+        record_modified_file(filepath)
 
         elapsed = time.time() - start_time
         bytes_written = result["bytes_written"]
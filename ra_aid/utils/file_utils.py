@@ -2,6 +2,9 @@
 
 import os
 import re
+import tempfile
+from pathlib import Path
+from typing import Union
 
 try:
     import magic
@@ -164,4 +167,32 @@ def _is_binary_content(filepath):
                 
     except Exception:
         # If any error occurs, assume binary to be safe
-        return True
\ No newline at end of file
+        return True
+
+
+def atomic_write(path: Union[str, Path], data: Union[bytes, str]) -> None:
+    """
+    Write a file atomically: readers see either the old or the new content.
+
+    The data goes to a temporary file in the same directory, which then
+    replaces the target. Parent directories are created as needed.
+
+    Args:
+        path: The file to write
+        data: The content; str is written as UTF-8
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
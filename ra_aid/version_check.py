@@ -1,6 +1,12 @@
 """Version check module for RA.Aid."""
 
+import json
 import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
 import requests
 from packaging import version
 
@@ -9,33 +15,82 @@ from ra_aid.__version__ import __version__ as current_version
 # URL for the latest version information
 VERSION_URL = "https://docs.ra-aid.ai/version.json"
 
+# Cache file (inside the project state directory) and how long its result is reused
+VERSION_CACHE_FILENAME = "version_check.json"
+VERSION_CACHE_MAX_AGE_SECONDS = 24 * 60 * 60
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
-def check_for_newer_version() -> str:
+
+def _read_cached_version(cache_path: Path, max_age: float) -> Optional[str]:
+    """Get the latest version from the cache file if it is fresh enough."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if time.time() - float(cached["checked_at"]) < max_age:
+            return cached["latest_version"]
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.debug(f"Ignoring invalid version check cache {cache_path}: {e}")
+    return None
+
+
+def _write_cached_version(cache_path: Path, latest_version: str) -> None:
+    """Store the latest version in the cache file, ignoring write errors."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"checked_at": time.time(), "latest_version": latest_version}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug(f"Could not write version check cache {cache_path}: {e}")
+
+
+def check_for_newer_version(
+    cache_dir: Optional[str] = None,
+    max_age: float = VERSION_CACHE_MAX_AGE_SECONDS,
+) -> str:
     """
     Check if a newer version of RA.Aid is available.
     
     Makes an HTTP request to the docs site to retrieve the latest version information,
     then compares it to the current version. If a newer version is available, returns
     a message suggesting to upgrade.
+
+    With a cache directory, the latest version is stored there and reused for
+    ``max_age`` seconds instead of making a request on every start.
     
+    Args:
+        cache_dir: Directory for the version check cache (e.g. .ra-aid), or None to always fetch
+        max_age: How long a cached result is reused, in seconds
+
     Returns:
         str: Update message if a newer version is available, otherwise an empty string
     """
     try:
-        # Get the latest version from the docs site
-        logger.debug(f"Checking for newer version at {VERSION_URL}")
-        response = requests.get(VERSION_URL, timeout=5)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        
-        # Parse the response JSON
-        version_info = response.json()
-        latest_version = version_info.get("version")
-        
-        if not latest_version:
-            logger.warning("No version found in the version.json file")
-            return ""
+        cache_path = Path(cache_dir) / VERSION_CACHE_FILENAME if cache_dir else None
+        latest_version = _read_cached_version(cache_path, max_age) if cache_path else None
+
+        if latest_version:
+            logger.debug(f"Using cached latest version from {cache_path}")
+        else:
+            # Get the latest version from the docs site
+            logger.debug(f"Checking for newer version at {VERSION_URL}")
+            response = requests.get(VERSION_URL, timeout=5)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+
+            # Parse the response JSON
+            version_info = response.json()
+            latest_version = version_info.get("version")
+
+            if not latest_version:
+                logger.warning("No version found in the version.json file")
+                return ""
+            if cache_path:
+                _write_cached_version(cache_path, latest_version)
         
         logger.debug(f"Current version: {current_version}, Latest version: {latest_version}")
         
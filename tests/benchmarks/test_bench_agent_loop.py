@@ -0,0 +1,37 @@
+"""
+Smoke test for the agent-loop benchmark: it must keep running offline end to end.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_agent_loop_benchmark_runs_with_fake_provider(tmp_path):
+    output = tmp_path / "agent_loop.json"
+    pythonpath = os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))
+    env = {**os.environ, "PYTHONPATH": pythonpath}
+
+    subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.bench_agent_loop",
+            "--iterations", "1", "--files", "2", "--output", str(output),
+        ],
+        cwd=tmp_path,
+        env=env,
+        check=True,
+        capture_output=True,
+        timeout=300,
+    )
+
+    report = json.loads(output.read_text())
+    assert report["benchmark"] == "agent_loop"
+    for backend in ("ciayn", "react"):
+        agents = report["results"][backend]["agents"]
+        assert set(agents) == {"research", "planning", "implementation"}
+        for name, agent in agents.items():
+            assert agent["completed"], f"{backend} {name} agent did not complete"
+            assert agent["steps"] > 0
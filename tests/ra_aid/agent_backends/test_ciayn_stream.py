@@ -0,0 +1,188 @@
+"""
+Tests for streamed CiaynAgent model calls and the incremental tool call parser.
+"""
+
+from typing import List
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from pydantic import Field
+
+from ra_aid.agent_backends.ciayn_agent import CiaynAgent
+from ra_aid.agent_backends.ciayn_stream import ToolCallStreamParser, split_chunk_content
+from ra_aid.callbacks.default_callback_handler import DefaultCallbackHandler
+
+
+@pytest.fixture(autouse=True)
+def mock_callback_repositories():
+    """Keep the cost callback handler away from the database."""
+    with patch("ra_aid.callbacks.default_callback_handler.get_trajectory_repository"), patch(
+        "ra_aid.callbacks.default_callback_handler.get_session_repository"
+    ) as session_repo:
+        session_repo.return_value.get_current_session_record.return_value = MagicMock(
+            get_id=lambda: 1
+        )
+        yield
+
+
+class RecordingFakeChatModel(GenericFakeChatModel):
+    """Fake chat model that records the chunks it actually produced."""
+
+    streamed: List[str] = Field(default_factory=list)
+
+    def _stream(self, *args, **kwargs):
+        for chunk in super()._stream(*args, **kwargs):
+            self.streamed.append(chunk.message.content)
+            yield chunk
+
+
+notes = []
+
+
+@tool
+def emit_note(note: str) -> str:
+    """Record a note."""
+    notes.append(note)
+    return "noted"
+
+
+def _feed_words(parser, text):
+    for word in text.split(" "):
+        parser.feed(word + " ")
+
+
+def test_parser_detects_tool_name_after_think_tag_and_fence():
+    parser = ToolCallStreamParser(["emit_note"])
+    for piece in ["<thi", "nk>first ", "thoughts</th", "ink>\n``", "`pyth", "on\nemit_", "note(", "'x')"]:
+        parser.feed(piece)
+        if piece == "nk>first ":
+            assert parser.is_thinking
+            assert parser.tool_name is None
+
+    assert parser.thinking == "first thoughts"
+    assert parser.thinking_complete
+    assert parser.tool_name == "emit_note"
+    assert parser.invalid_reason is None
+
+
+@pytest.mark.parametrize(
+    "text,reason",
+    [
+        ("I will call the tool now", "does not start with a tool call"),
+        ("delete_everything(path='/')", "'delete_everything' is not an available tool"),
+        ("{'tool': 'emit_note'}", "does not start with a tool call"),
+    ],
+)
+def test_parser_rejects_invalid_heads(text, reason):
+    parser = ToolCallStreamParser(["emit_note"], supports_think_tag=False)
+    _feed_words(parser, text)
+    assert reason in parser.invalid_reason
+    assert parser.tool_name is None
+
+
+def test_parser_structured_thinking():
+    parser = ToolCallStreamParser(["emit_note"])
+    text, thinking = split_chunk_content([{"type": "thinking", "thinking": "hmm", "index": 0}])
+    parser.feed_thinking(thinking)
+    parser.feed(text)
+    assert parser.is_thinking
+
+    text, thinking = split_chunk_content([{"type": "text", "text": "emit_note('a')", "index": 1}])
+    parser.feed(text)
+    assert parser.thinking == "hmm"
+    assert parser.thinking_complete
+    assert parser.tool_name == "emit_note"
+
+
+def test_stream_executes_streamed_tool_call():
+    notes.clear()
+    model = RecordingFakeChatModel(
+        messages=iter([AIMessage(content="<think>Note it down</think>\nemit_note(note=\"streamed note\")")])
+    )
+    agent = CiaynAgent(model, [emit_note], config={"provider": "openai", "model": "gpt-4o", "show_thoughts": False})
+
+    next(agent.stream({"messages": [HumanMessage(content="go")]}))
+
+    assert notes == ["streamed note"]
+    assert len(model.streamed) > 1
+    timing = agent.last_step_timing
+    assert timing.time_to_first_token is not None
+    assert timing.output_tokens > 0
+    assert not timing.aborted
+
+
+def test_stream_aborts_early_on_invalid_call():
+    notes.clear()
+    words = "I think the best approach here is to explain at great length " * 20
+    model = RecordingFakeChatModel(messages=iter([AIMessage(content=words)]))
+    agent = CiaynAgent(model, [emit_note], config={"provider": "openai", "model": "gpt-4o", "show_thoughts": False})
+
+    with patch("ra_aid.console.formatting.print_warning") as print_warning:
+        next(agent.stream({"messages": [HumanMessage(content="go")]}))
+
+    # Generation stopped after the first words instead of the whole response
+    assert len(model.streamed) < 10
+    assert agent.last_step_timing.aborted
+    assert agent.stream_abort_reason == "the response does not start with a tool call"
+    assert "Invalid tool call" in agent.chat_history[-1].content
+    assert print_warning.called
+    assert notes == []
+
+
+@pytest.fixture
+def fresh_callback_handler():
+    DefaultCallbackHandler._instances = {}
+    yield
+    DefaultCallbackHandler._instances = {}
+
+
+class UsageFakeChatModel(GenericFakeChatModel):
+    """Fake chat model that reports usage on its last chunk, like stream_usage=True."""
+
+    usage: dict = Field(default_factory=dict)
+
+    def _stream(self, *args, **kwargs):
+        chunks = list(super()._stream(*args, **kwargs))
+        chunks[-1].message.usage_metadata = self.usage
+        yield from chunks
+
+
+def test_streamed_call_records_usage_and_cost(fresh_callback_handler):
+    model = UsageFakeChatModel(
+        messages=iter([AIMessage(content='emit_note(note="counted")')]),
+        usage={"input_tokens": 1200, "output_tokens": 80, "total_tokens": 1280},
+        metadata={"model_name": "claude-3-7-sonnet-20250219", "provider": "anthropic"},
+    )
+    agent = CiaynAgent(model, [emit_note], config={"provider": "anthropic", "model": "claude-3-7-sonnet-20250219", "show_thoughts": False})
+    handler = agent.callback_handler
+    handler.reset_all_totals()
+    handler.session_totals["session_id"] = 1
+    handler.trajectory_repo = MagicMock()
+
+    agent._invoke_model([HumanMessage(content="go")])
+
+    totals = handler.session_totals
+    assert (totals["input_tokens"], totals["output_tokens"]) == (1200, 80)
+    assert totals["cost"] > 0
+    record = handler.trajectory_repo.create.call_args.kwargs
+    assert record["record_type"] == "model_usage"
+    assert (record["input_tokens"], record["output_tokens"]) == (1200, 80)
+    assert record["current_cost"] > 0
+
+
+def test_aborted_stream_records_estimated_usage(fresh_callback_handler):
+    words = "I think the best approach here is to explain at great length " * 20
+    model = RecordingFakeChatModel(messages=iter([AIMessage(content=words)]))
+    agent = CiaynAgent(model, [emit_note], config={"provider": "openai", "model": "gpt-4o", "show_thoughts": False})
+    agent.callback_handler.reset_all_totals()
+
+    with patch("ra_aid.console.formatting.print_warning"):
+        next(agent.stream({"messages": [HumanMessage(content="go")]}))
+
+    assert agent.last_step_timing.aborted
+    totals = agent.callback_handler.session_totals
+    assert totals["input_tokens"] > 0
+    assert 0 < totals["output_tokens"] < len(words) // 2
@@ -0,0 +1,82 @@
+"""
+Tests for applying the shared rate limiter to model clients.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ra_aid.callbacks.rate_limit_callback_handler import (
+    RateLimitCallbackHandler,
+    attach_rate_limiter,
+)
+from ra_aid.rate_limiter import reset_rate_limiter
+
+
+def _fake_model(total_tokens=None):
+    message = AIMessage(content="done")
+    if total_tokens is not None:
+        message.usage_metadata = {
+            "input_tokens": total_tokens - 10,
+            "output_tokens": 10,
+            "total_tokens": total_tokens,
+        }
+    return FakeMessagesListChatModel(responses=[message] * 5)
+
+
+def test_attach_is_noop_without_limits():
+    reset_rate_limiter()
+    model = _fake_model()
+    assert attach_rate_limiter(model, "anthropic", "claude") is model
+    assert not model.callbacks
+
+
+def test_invocations_go_through_the_limiter(mock_config_repository):
+    """Each call reserves a request and its estimate, then records actual usage."""
+    mock_config_repository.set("rate_limits", {"anthropic": {"rpm": 1, "tpm": 100000}})
+    reset_rate_limiter()
+    try:
+        model = attach_rate_limiter(_fake_model(total_tokens=500), "anthropic", "claude")
+        assert any(isinstance(cb, RateLimitCallbackHandler) for cb in model.callbacks)
+
+        with (
+            patch("ra_aid.rate_limiter.time.sleep") as sleep,
+            patch(
+                "ra_aid.database.repositories.trajectory_repository.get_trajectory_repository",
+                return_value=MagicMock(),
+            ) as get_trajectory_repository,
+        ):
+            model.invoke([HumanMessage(content="x" * 200)])
+            model.invoke([HumanMessage(content="hello")])
+
+        # The second request had to wait for the 1 rpm bucket
+        assert sleep.call_count == 1
+        kwargs = get_trajectory_repository.return_value.create.call_args.kwargs
+        assert kwargs["record_type"] == "rate_limit_wait"
+        assert kwargs["duration_ms"] == int(sleep.call_args.args[0] * 1000)
+        assert kwargs["step_data"]["limit"] == "anthropic"
+        limiter = model.callbacks[-1].limiter
+        stats = limiter.stats()["anthropic"]
+        assert stats["requests"] == 2
+        assert stats["estimated_tokens"] > 0
+        assert stats["actual_tokens"] == 1000
+    finally:
+        reset_rate_limiter()
+
+
+def test_bound_models_keep_the_limiter(mock_config_repository):
+    """Agents bind tools to the model; the bound runnable must still be limited."""
+    mock_config_repository.set("rate_limits", {"anthropic": {"rpm": 1, "tpm": None}})
+    reset_rate_limiter()
+    try:
+        model = attach_rate_limiter(_fake_model(), "anthropic", "claude")
+        bound = model.bind(stop=["\n\n"])
+
+        with patch("ra_aid.rate_limiter.time.sleep") as sleep:
+            bound.invoke("one")
+            bound.invoke("two")
+
+        assert sleep.call_count == 1
+    finally:
+        reset_rate_limiter()
@@ -0,0 +1,93 @@
+"""Tests for the output sinks."""
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from ra_aid.agent_backends.ciayn_stream import StreamProgress
+from ra_aid.console.formatting import console_panel, cpm
+from ra_aid.console.output import print_agent_output
+from ra_aid.console.sink import (
+    ConsoleSink,
+    HeadlessSink,
+    OutputSink,
+    OutputSinkManager,
+    get_output_sink,
+)
+from ra_aid.proc.interactive import run_interactive_command
+
+
+def test_default_sink_renders_to_console():
+    assert isinstance(get_output_sink(), ConsoleSink)
+
+
+def test_headless_sink_records_panels_without_rendering(capsys):
+    with OutputSinkManager(HeadlessSink()) as sink:
+        cpm("**bold** text", title="Note", border_style="green")
+        console_panel("plain", title="Panel")
+        print_agent_output(
+            {"agent": {"messages": [AIMessage(content="Thinking out loud")]}},
+            "CiaynAgent",
+        )
+
+    assert capsys.readouterr().out == ""
+    events = sink.events()
+    assert [(e.kind, e.title, e.content) for e in events] == [
+        ("panel", "Note", "**bold** text"),
+        ("panel", "Panel", "plain"),
+        ("assistant", "🤖 Assistant", "Thinking out loud"),
+    ]
+    assert events[0].style == "green"
+    assert isinstance(get_output_sink(), ConsoleSink)
+
+
+def test_headless_sink_bounds_events():
+    sink = HeadlessSink(max_events=2, max_event_chars=5)
+    for index in range(3):
+        sink.panel(f"message {index}")
+
+    assert [e.content for e in sink.events()] == ["messa", "messa"]
+
+
+def test_headless_sink_records_subprocess_output(capfd):
+    with OutputSinkManager(HeadlessSink()) as sink:
+        output, return_code = run_interactive_command(["echo", "hello"])
+
+    assert return_code == 0
+    assert b"hello" in output
+    assert "hello" not in capfd.readouterr().out
+    (event,) = sink.events()
+    assert event.kind == "subprocess_output"
+    assert "hello" in event.content
+    assert sink.subprocess_bytes > 0
+
+
+def test_output_sink_is_abstract():
+    with pytest.raises(TypeError):
+        OutputSink()
+
+
+def test_stream_progress_is_not_displayed_headless():
+    with patch("ra_aid.agent_backends.ciayn_stream.console.status") as status:
+        with OutputSinkManager(HeadlessSink()):
+            with StreamProgress() as progress:
+                assert progress._status is None
+        status.assert_not_called()
+
+        with StreamProgress() as progress:
+            assert progress._status is status.return_value
+        status.return_value.start.assert_called_once()
+
+
+def test_tool_panels_go_to_the_sink():
+    from ra_aid.tools.human import ask_human
+
+    with patch("ra_aid.tools.human.PromptSession") as session:
+        session.return_value.prompt.return_value = "yes"
+        with OutputSinkManager(HeadlessSink()) as sink:
+            assert ask_human.invoke({"question": "Proceed?"}) == "yes"
+
+    (event,) = sink.events()
+    assert event.title == "💭 Question for Human"
+    assert event.content.startswith("Proceed?")
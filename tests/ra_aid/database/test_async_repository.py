@@ -0,0 +1,83 @@
+"""
+Tests for the async repository facade.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ra_aid.database.async_repository import (
+    AsyncRepository,
+    DatabaseTimeoutError,
+    run_in_db_thread,
+)
+
+test_var = contextvars.ContextVar("test_var", default=None)
+
+
+def test_calls_run_off_the_event_loop_thread():
+    """Repository calls should execute on a database pool thread."""
+    repo = MagicMock()
+    repo.get.side_effect = lambda session_id: (session_id, threading.current_thread().name)
+
+    async def main():
+        return await AsyncRepository(repo).get(7), threading.current_thread().name
+
+    (session_id, worker_name), loop_name = asyncio.run(main())
+    assert session_id == 7
+    assert worker_name != loop_name
+    assert worker_name.startswith("ra-aid-db")
+
+
+def test_context_variables_are_propagated():
+    """Repository getters rely on contextvars, so they must reach the pool thread."""
+
+    async def main():
+        test_var.set("repo")
+        return await run_in_db_thread(test_var.get)
+
+    assert asyncio.run(main()) == "repo"
+
+
+def test_timeout_raises_database_timeout_error():
+    """Slow calls should fail with DatabaseTimeoutError instead of hanging the request."""
+    repo = MagicMock()
+    repo.get_all.side_effect = lambda: time.sleep(0.5)
+
+    async def main():
+        await AsyncRepository(repo, timeout=0.05).get_all()
+
+    with pytest.raises(DatabaseTimeoutError):
+        asyncio.run(main())
+
+
+def test_slow_query_does_not_block_other_requests():
+    """A slow call must not stall other coroutines on the event loop."""
+    repo = MagicMock()
+    repo.get_trajectories_by_session.side_effect = lambda session_id: time.sleep(0.3)
+    repo.get.return_value = "session"
+
+    async def main():
+        facade = AsyncRepository(repo)
+        slow = asyncio.ensure_future(facade.get_trajectories_by_session(1))
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        result = await facade.get(1)
+        elapsed = time.monotonic() - start
+        await slow
+        return result, elapsed
+
+    result, elapsed = asyncio.run(main())
+    assert result == "session"
+    assert elapsed < 0.2
+
+
+def test_non_callable_attributes_pass_through():
+    """Plain attributes of the wrapped repository should be returned as-is."""
+    repo = MagicMock()
+    repo.db = "database"
+    assert AsyncRepository(repo).db == "database"
@@ -0,0 +1,99 @@
+"""
+Tests for the content-addressed blob store.
+"""
+
+import datetime
+import json
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from ra_aid.database.blob_store import (
+    BLOB_MESSAGE_PREFIX,
+    BlobRefSerializer,
+    BlobStore,
+    expand_blob_refs,
+    externalize_large_values,
+    is_blob_ref,
+)
+from ra_aid.database.pydantic_models import TrajectoryModel
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    with patch("ra_aid.database.blob_store.get_blob_store", return_value=store):
+        yield store
+
+
+def test_put_deduplicates_and_compresses(store):
+    text = "match line\n" * 2000
+    digest = store.put(text)
+    assert store.put(text) == digest
+
+    stats = store.stats()
+    assert stats["blobs"] == 1
+    assert stats["bytes"] < len(text) / 10
+
+    # A fresh store reads the blob from disk
+    assert BlobStore(store.root).get(digest) == text
+    assert BlobStore(store.root).get("0" * 64) is None
+
+
+def test_externalize_and_expand_json_values(store):
+    big = "x" * 10000
+    value = {"output": big, "return_code": 0, "lines": ["short", big]}
+
+    stored = externalize_large_values(value)
+
+    assert stored["return_code"] == 0
+    assert stored["lines"][0] == "short"
+    assert is_blob_ref(stored["output"]) and stored["output"]["size"] == 10000
+    assert len(json.dumps(stored)) < 1000
+    assert expand_blob_refs(stored) == value
+
+
+def test_values_stay_inline_without_store():
+    with patch("ra_aid.database.blob_store.get_blob_store", return_value=None):
+        value = {"output": "x" * 10000}
+        assert externalize_large_values(value) is value
+
+
+def test_trajectory_model_expands_references_when_serialized(store):
+    big = "result\n" * 2000
+    model = TrajectoryModel(
+        created_at=datetime.datetime.now(),
+        updated_at=datetime.datetime.now(),
+        tool_name="ripgrep_search",
+        tool_result=json.dumps(externalize_large_values({"output": big})),
+        step_data=json.dumps(externalize_large_values({"display": big})),
+    )
+
+    # The model holds the reference; serialization for the API/UI expands it
+    assert is_blob_ref(model.tool_result["output"])
+    dumped = model.model_dump()
+    assert json.loads(dumped["tool_result"]) == {"output": big}
+    assert json.loads(dumped["step_data"]) == {"display": big}
+
+
+def test_checkpoint_serializer_round_trip(store):
+    serde = BlobRefSerializer()
+    big = "file contents\n" * 1000
+    messages = [
+        HumanMessage(content="task"),
+        AIMessage(content="", tool_calls=[{"id": "call_1", "name": "read_file_tool", "args": {}}]),
+        ToolMessage(content=big, tool_call_id="call_1"),
+    ]
+
+    type_, data = serde.dumps_typed(messages)
+
+    assert len(data) < len(big) / 4
+    assert BLOB_MESSAGE_PREFIX.encode() in data
+    # The originals are untouched
+    assert messages[2].content == big
+
+    loaded = serde.loads_typed((type_, data))
+    assert loaded[2].content == big
+    assert loaded[2].tool_call_id == "call_1"
+    assert loaded[0].content == "task"
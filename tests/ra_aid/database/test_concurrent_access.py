@@ -0,0 +1,151 @@
+"""
+Stress tests for concurrent database access from many agent threads.
+"""
+
+import threading
+import pytest
+
+from ra_aid.database.connection import DatabaseManager, db_var, read_snapshot
+from ra_aid.database.models import (
+    HumanInput,
+    KeyFact,
+    Session,
+    Trajectory,
+    database_proxy,
+)
+from ra_aid.database.repositories.key_fact_repository import KeyFactRepository
+from ra_aid.database.repositories.session_repository import SessionRepository
+from ra_aid.database.repositories.trajectory_repository import (
+    TrajectoryRepositoryManager,
+    trajectory_repo_var,
+)
+from ra_aid.database.writer import DatabaseWriter, close_database_writers
+
+NUM_AGENTS = 20
+WRITES_PER_AGENT = 25
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """Set up a file-based database shared by all threads in the test."""
+    db_var.set(None)
+    previous = database_proxy.obj
+    with DatabaseManager(base_dir=str(tmp_path)) as db:
+        database_proxy.initialize(db)
+        try:
+            db.create_tables([Session, HumanInput, Trajectory, KeyFact], safe=True)
+            yield db
+        finally:
+            close_database_writers()
+            database_proxy.initialize(previous)
+    db_var.set(None)
+    trajectory_repo_var.set(None)
+
+
+def test_concurrent_agents_write_trajectories(file_db, tmp_path):
+    """Twenty fake agents writing trajectories at once should not hit lock errors."""
+    session_ids = [Session.create().id for _ in range(NUM_AGENTS)]
+    errors = []
+    start = threading.Barrier(NUM_AGENTS)
+
+    def fake_agent(session_id):
+        try:
+            # Each agent thread opens its own manager, like run_agent_thread does
+            with DatabaseManager(base_dir=str(tmp_path)) as db, \
+                 TrajectoryRepositoryManager(db) as repo:
+                assert db is file_db
+                start.wait()
+                for step in range(WRITES_PER_AGENT):
+                    record = repo.create(
+                        tool_name="fake_tool",
+                        tool_parameters={"step": step},
+                        tool_result={"output": "x" * 256},
+                        session_id=session_id,
+                    )
+                    repo.update(record.id, step_data={"done": True})
+                    with read_snapshot(db):
+                        Trajectory.select().where(Trajectory.session == session_id).count()
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=fake_agent, args=(sid,)) for sid in session_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert not errors, errors
+    assert Trajectory.select().count() == NUM_AGENTS * WRITES_PER_AGENT
+    for session_id in session_ids:
+        assert (
+            Trajectory.select().where(Trajectory.session == session_id).count()
+            == WRITES_PER_AGENT
+        )
+
+
+def test_repository_writes_go_through_writer(file_db, tmp_path):
+    """Session and key fact writes from agent threads share the writer thread."""
+    writer_threads = set()
+    errors = []
+    start = threading.Barrier(NUM_AGENTS)
+    original_create = KeyFact.create.__func__
+
+    def recording_create(cls, **kwargs):
+        writer_threads.add(threading.current_thread().name)
+        return original_create(cls, **kwargs)
+
+    def fake_agent():
+        try:
+            with DatabaseManager(base_dir=str(tmp_path)) as db:
+                start.wait()
+                session = SessionRepository(db).create_session()
+                SessionRepository(db).update_session_status(session.id, "running")
+                facts = KeyFactRepository(db)
+                for step in range(WRITES_PER_AGENT):
+                    fact = facts.create(f"fact {step}")
+                    facts.update(fact.id, f"fact {step} updated")
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    KeyFact.create = classmethod(recording_create)
+    try:
+        threads = [threading.Thread(target=fake_agent) for _ in range(NUM_AGENTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+    finally:
+        KeyFact.create = classmethod(original_create)
+
+    assert not errors, errors
+    assert writer_threads == {"ra-aid-db-writer"}
+    assert KeyFact.select().count() == NUM_AGENTS * WRITES_PER_AGENT
+    assert Session.select().where(Session.status == "running").count() == NUM_AGENTS
+
+
+def test_writer_isolates_failing_writes(file_db):
+    """A failing write must not roll back the other writes in its batch."""
+    writer = DatabaseWriter(file_db)
+    try:
+        existing_id = writer.execute(lambda: Session.create().id)
+        bad = writer.submit(lambda: Session.create(id=existing_id))
+        other = writer.submit(lambda: Session.create().id)
+
+        with pytest.raises(Exception):
+            bad.result(timeout=10)
+        assert Session.get_or_none(Session.id == other.result(timeout=10)) is not None
+    finally:
+        writer.close()
+
+    with pytest.raises(RuntimeError):
+        writer.submit(lambda: None)
+
+
+def test_in_memory_databases_are_not_shared():
+    """In-memory databases cannot be shared across threads and get no writer."""
+    from ra_aid.database.writer import get_database_writer
+
+    db_var.set(None)
+    with DatabaseManager(in_memory=True) as db:
+        assert get_database_writer(db) is None
+    db_var.set(None)
@@ -287,4 +287,20 @@ def test_to_model_method(setup_db):
     assert pydantic_fact.updated_at == peewee_fact.updated_at
     
     # Test with None input
-    assert repo._to_model(None) is None
\ No newline at end of file
+    assert repo._to_model(None) is None
+
+def test_writes_record_db_write_latency(setup_db):
+    """Key fact writes are timed like every other repository write."""
+    from ra_aid.metrics import DB_WRITE_DURATION, get_metrics_registry
+
+    registry = get_metrics_registry()
+    registry.reset()
+    repo = KeyFactRepository(db=setup_db)
+
+    fact = repo.create("Test key fact")
+    repo.update(fact.id, "Updated key fact")
+    repo.delete(fact.id)
+
+    series = registry.snapshot()[DB_WRITE_DURATION]
+    assert series[(("mode", "inline"), ("status", "ok"))].count == 3
+    registry.reset()
@@ -669,3 +669,19 @@ def test_display_name_in_get_recent(setup_db):
     session2_result = next((s for s in sessions if s.id == session2.id), None)
     assert session2_result is not None
     assert session2_result.display_name == "This is a human input for session 2"
+
+
+def test_get_by_status(setup_db):
+    """Test that get_by_status returns matching sessions oldest first."""
+    queued_first = Session.create(command_line="ra-aid one", status="queued")
+    Session.create(command_line="ra-aid two", status="running")
+    queued_second = Session.create(
+        command_line="ra-aid three", status="queued", machine_info=json.dumps({"job": {"message": "hi"}})
+    )
+
+    repo = SessionRepository(setup_db)
+    sessions = repo.get_by_status("queued")
+
+    assert [s.id for s in sessions] == [queued_first.id, queued_second.id]
+    assert sessions[1].machine_info == {"job": {"message": "hi"}}
+    assert repo.get_by_status("completed") == []
@@ -14,6 +14,7 @@ from ra_aid.database.repositories.trajectory_repository import (
     TrajectoryRepository,
     TrajectoryRepositoryManager,
     get_trajectory_repository,
+    track_tool_duration,
     trajectory_repo_var,
 )
 from ra_aid.database.pydantic_models import TrajectoryModel
@@ -782,3 +783,79 @@ def test_create_hook_error_handling_instance(setup_db, cleanup_repo, mock_sessio
         assert trajectory_model.tool_name == "hook_error_test"
 
 # --- End Tests for Hook Mechanism ---
+
+
+def test_track_tool_duration_sets_first_tool_record(setup_db, cleanup_repo):
+    """Test that a timed tool call stores its duration on the first record it creates."""
+    repo = TrajectoryRepository(db=setup_db)
+
+    with track_tool_duration():
+        first = repo.create(tool_name="ripgrep_search", session_id=1)
+        with track_tool_duration():
+            nested = repo.create(tool_name="read_file_tool", session_id=1)
+        second = repo.create(tool_name="ripgrep_search", record_type="error", session_id=1)
+    untracked = repo.create(tool_name="emit_key_facts", session_id=1)
+
+    assert repo.get(first.id).duration_ms is not None
+    assert repo.get(nested.id).duration_ms is not None
+    assert repo.get(second.id).duration_ms is None
+    assert repo.get(untracked.id).duration_ms is None
+
+
+def test_session_profile(setup_db, cleanup_repo):
+    """Test aggregation of durations by tool, stage and model."""
+    import datetime
+
+    repo = TrajectoryRepository(db=setup_db)
+    start = datetime.datetime.now() - datetime.timedelta(seconds=10)
+
+    research = repo.create(record_type="stage_transition", step_data={"stage": "research_stage"}, session_id=1)
+    Trajectory.update(created_at=start).where(Trajectory.id == research.id).execute()
+    repo.create(tool_name="ripgrep_search", duration_ms=300, session_id=1)
+    repo.create(tool_name="ripgrep_search", duration_ms=100, is_error=True, session_id=1)
+    repo.create(tool_name="read_file_tool", duration_ms=50, session_id=1)
+    repo.create(tool_name="emit_key_facts", session_id=1)
+    repo.create(record_type="model_usage", duration_ms=2000, step_data={"model": "claude"}, session_id=1)
+    repo.create(record_type="rate_limit_wait", duration_ms=1500, step_data={"limit": "anthropic"}, session_id=1)
+    planning = repo.create(record_type="stage_transition", step_data={"stage": "planning_stage"}, session_id=1)
+
+    assert 9000 <= repo.get(research.id).duration_ms <= 11000
+    assert repo.get(planning.id).duration_ms is None
+
+    profile = repo.get_session_profile(1)
+
+    assert profile["session_id"] == 1
+    assert profile["wall_time_ms"] >= 9000
+    assert profile["tools"][0] == {
+        "name": "ripgrep_search", "calls": 2, "total_ms": 400, "mean_ms": 200, "max_ms": 300, "errors": 1
+    }
+    assert [row["name"] for row in profile["tools"]] == ["ripgrep_search", "read_file_tool"]
+    assert profile["untimed_tool_records"] == 1
+    assert profile["models"] == [{"name": "claude", "calls": 1, "total_ms": 2000, "mean_ms": 2000, "max_ms": 2000}]
+    assert profile["rate_limit_waits"] == [
+        {"name": "anthropic", "calls": 1, "total_ms": 1500, "mean_ms": 1500, "max_ms": 1500}
+    ]
+    assert [row["name"] for row in profile["stages"]] == ["research_stage", "planning_stage"]
+
+
+def test_session_profile_includes_tools_without_trajectory(setup_db, cleanup_repo, tmp_path):
+    """Tools that record no trajectory of their own still appear in the profile."""
+    from ra_aid.metrics import instrument_tools
+    from ra_aid.tools.list_directory import list_directory_tree
+
+    repo = TrajectoryRepository(db=setup_db)
+    (tmp_path / "module.py").write_text("x = 1\n")
+    instrument_tools([list_directory_tree])
+
+    with patch(
+        "ra_aid.database.repositories.trajectory_repository.get_trajectory_repository",
+        return_value=repo,
+    ):
+        list_directory_tree.invoke({"path": str(tmp_path)})
+
+    records = repo.get_trajectories_by_session(1)
+    assert [(r.tool_name, r.record_type) for r in records] == [("list_directory_tree", "tool_timing")]
+    profile = repo.get_session_profile(1)
+    assert [row["name"] for row in profile["tools"]] == ["list_directory_tree"]
+    assert profile["tools"][0]["calls"] == 1
+    assert profile["untimed_tool_records"] == 0
@@ -34,6 +34,13 @@ def test_stderr_capture():
     assert retcode != 0  # ls returns non-zero on failure.
 
 
+def test_timeout_is_reported():
+    """Test that a process stopped for exceeding its timeout is flagged."""
+    result = run_interactive_command(["sleep", "5"], expected_runtime_seconds=1)
+    assert result.timed_out
+    assert not run_interactive_command(["echo", "done"]).timed_out
+
+
 def test_command_not_found():
     """Test handling of non-existent commands."""
     with pytest.raises(FileNotFoundError):
@@ -0,0 +1,201 @@
+"""
+Tests for the agent scheduler.
+
+The launcher is replaced by fake handles that the tests finish explicitly,
+and the session repository is the in-memory mock from conftest.
+"""
+
+import queue
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ra_aid.database.pydantic_models import SessionModel
+from ra_aid.server.agent_scheduler import (
+    AgentJob,
+    AgentScheduler,
+    SchedulerQueueFullError,
+    set_agent_scheduler,
+)
+from ra_aid.server.api_v1_agent_queue import router as agent_queue_router
+from ra_aid.server.broadcast_sender import set_broadcast_queue
+from ra_aid.utils.agent_thread_manager import is_agent_running, stop_agent
+
+
+class FakeAgent:
+    """Thread-like handle that stays alive until finished by the test."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+    def is_alive(self):
+        return not self.done.is_set()
+
+
+class FakeLauncher:
+    """Records launched sessions in order."""
+
+    def __init__(self):
+        self.started = []
+        self.agents = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, session_id, job):
+        agent = FakeAgent()
+        with self.lock:
+            self.started.append(session_id)
+            self.agents[session_id] = agent
+        return agent
+
+    def finish(self, session_id):
+        self.agents[session_id].done.set()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def session_statuses(mock_session_repository):
+    """Track status updates made through the mocked session repository."""
+    statuses = {}
+
+    def update_session_status(session_id, status):
+        statuses[session_id] = status
+        return MagicMock(model_dump=lambda mode=None: {"id": session_id, "status": status})
+
+    mock_session_repository.update_session_status.side_effect = update_session_status
+    return statuses
+
+
+@pytest.fixture
+def broadcasts():
+    q = queue.Queue()
+    set_broadcast_queue(q)
+    return q
+
+
+@pytest.fixture
+def launcher():
+    return FakeLauncher()
+
+
+@pytest.fixture
+def scheduler(launcher, session_statuses, broadcasts):
+    scheduler = AgentScheduler(launcher, max_concurrent=1, max_queue_size=4)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def test_concurrency_limit_and_priority_order(scheduler, launcher, session_statuses):
+    """Only max_concurrent agents run; waiting jobs start by priority, then FIFO."""
+    scheduler.start()
+    scheduler.submit(1, AgentJob(message="first"))
+    assert _wait_for(lambda: launcher.started == [1])
+
+    scheduler.submit(2, AgentJob(message="low", priority="low"))
+    scheduler.submit(3, AgentJob(message="normal"))
+    assert scheduler.submit(4, AgentJob(message="high", priority="high")) == 0
+    assert session_statuses == {1: "queued", 2: "queued", 3: "queued", 4: "queued"}
+    time.sleep(0.3)
+    assert launcher.started == [1]
+    assert scheduler.stats()["lanes"] == {"high": 1, "normal": 1, "low": 1}
+    assert scheduler.position(2) == 2
+
+    for expected in ([1, 4], [1, 4, 3], [1, 4, 3, 2]):
+        launcher.finish(expected[-2])
+        assert _wait_for(lambda: launcher.started == expected)
+
+
+def test_queue_full_is_rejected(scheduler):
+    """Jobs beyond max_queue_size are rejected."""
+    for session_id in range(1, 5):
+        scheduler.submit(session_id, AgentJob(message="job"))
+    assert scheduler.is_full()
+    with pytest.raises(SchedulerQueueFullError):
+        scheduler.submit(5, AgentJob(message="job"))
+
+
+def test_stop_removes_queued_job(scheduler, launcher, session_statuses):
+    """Stopping a queued session cancels it without starting an agent."""
+    scheduler.submit(1, AgentJob(message="job"))
+    assert is_agent_running(1)
+
+    assert stop_agent(1) is True
+    assert not is_agent_running(1)
+    assert session_statuses[1] == "halted"
+
+    scheduler.start()
+    time.sleep(0.3)
+    assert launcher.started == []
+
+
+def test_stats_and_queue_update_broadcast(scheduler, broadcasts):
+    """Queue changes are broadcast with depth and wait times."""
+    scheduler.submit(1, AgentJob(message="job", queued_at=time.time() - 10))
+
+    stats = scheduler.stats()
+    assert stats["queued"] == 1
+    assert stats["running"] == 0
+    assert stats["oldest_wait_seconds"] >= 10
+
+    messages = [broadcasts.get_nowait() for _ in range(broadcasts.qsize())]
+    queue_updates = [m for m in messages if m["type"] == "queue_update"]
+    assert queue_updates[-1]["payload"]["queued"] == 1
+
+
+def test_recover_requeues_stored_jobs(scheduler, launcher, mock_session_repository, session_statuses):
+    """Sessions left 'queued' are re-queued from their stored job."""
+    now = time.time()
+
+    def session(session_id, machine_info):
+        return SessionModel(
+            id=session_id,
+            created_at=now,
+            updated_at=now,
+            start_time=now,
+            machine_info=machine_info,
+            status="queued",
+        )
+
+    mock_session_repository.get_by_status.return_value = [
+        session(7, {"job": AgentJob(message="again", priority="high").to_dict()}),
+        session(8, {"agent_type": "research"}),
+    ]
+
+    assert scheduler.recover() == 1
+    mock_session_repository.get_by_status.assert_called_once_with("queued")
+    assert session_statuses == {8: "error"}
+
+    scheduler.start()
+    assert _wait_for(lambda: launcher.started == [7])
+
+
+def test_agent_queue_endpoint(scheduler):
+    """The queue endpoint reports stats and positions, or 404 without a scheduler."""
+    app = FastAPI()
+    app.include_router(agent_queue_router)
+    client = TestClient(app)
+
+    assert client.get("/v1/agent-queue").status_code == 404
+
+    set_agent_scheduler(scheduler)
+    try:
+        scheduler.submit(1, AgentJob(message="job"))
+        response = client.get("/v1/agent-queue")
+        assert response.status_code == 200
+        assert response.json()["queued"] == 1
+        assert response.json()["lanes"]["normal"] == 1
+        assert client.get("/v1/agent-queue/1").json() == {"session_id": 1, "position": 0}
+        assert client.get("/v1/agent-queue/2").status_code == 404
+    finally:
+        set_agent_scheduler(None)
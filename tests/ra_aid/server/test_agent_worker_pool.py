@@ -0,0 +1,111 @@
+"""
+Tests for the process-based agent worker pool.
+
+The worker processes run fake agent targets defined in this module, so no
+model provider is needed.
+"""
+
+import os
+import queue
+import time
+
+import pytest
+
+from ra_aid.server.agent_worker_pool import AgentWorkerPool
+from ra_aid.server.broadcast_sender import set_broadcast_queue
+from ra_aid.utils.agent_thread_manager import (
+    has_received_stop_signal,
+    is_agent_running,
+    stop_agent,
+)
+
+
+def fake_agent(message, session_id, source_config_repo, research_only=False, **kwargs):
+    """Fake agent that reports its config, waits for a stop, then reports why it ended."""
+    from ra_aid.server.broadcast_sender import send_broadcast
+
+    send_broadcast(
+        {
+            "type": "session_update",
+            "payload": {
+                "id": session_id,
+                "message": message,
+                "provider": source_config_repo.get("provider"),
+                "pid": os.getpid(),
+            },
+        }
+    )
+    if message == "crash":
+        os._exit(1)
+    deadline = time.time() + (30 if message == "wait" else 0)
+    while time.time() < deadline and not has_received_stop_signal(session_id):
+        time.sleep(0.05)
+    status = "halted" if has_received_stop_signal(session_id) else "completed"
+    send_broadcast({"type": "session_update", "payload": {"id": session_id, "status": status}})
+
+
+@pytest.fixture(scope="module")
+def broadcast_queue():
+    q = queue.Queue()
+    set_broadcast_queue(q)
+    return q
+
+
+@pytest.fixture(scope="module")
+def pool(broadcast_queue):
+    pool = AgentWorkerPool(num_workers=2, target=fake_agent)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def _wait_for(predicate, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _next_payload(q, session_id, key, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            message = q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        payload = message["payload"]
+        if payload.get("id") == session_id and key in payload:
+            return payload
+    raise AssertionError(f"No broadcast with {key!r} for session {session_id}")
+
+
+def test_job_runs_in_worker_and_broadcasts_are_relayed(pool, broadcast_queue):
+    pool.submit(101, "done", config={"provider": "fake"})
+
+    started = _next_payload(broadcast_queue, 101, "pid")
+    assert started["provider"] == "fake"
+    assert started["pid"] != os.getpid()
+    assert _next_payload(broadcast_queue, 101, "status")["status"] == "completed"
+    assert _wait_for(lambda: not is_agent_running(101))
+
+
+def test_stop_agent_reaches_worker(pool, broadcast_queue):
+    pool.submit(102, "wait", config={})
+    _next_payload(broadcast_queue, 102, "pid")
+    assert is_agent_running(102)
+
+    assert stop_agent(102) is True
+    assert has_received_stop_signal(102)
+    assert _next_payload(broadcast_queue, 102, "status")["status"] == "halted"
+    assert _wait_for(lambda: not is_agent_running(102))
+
+
+def test_dead_worker_is_replaced(pool, broadcast_queue):
+    pool.submit(103, "crash", config={})
+    assert _wait_for(lambda: not is_agent_running(103))
+    assert _wait_for(lambda: pool.stats()["alive_workers"] == 2)
+
+    pool.submit(104, "done", config={})
+    assert _next_payload(broadcast_queue, 104, "status")["status"] == "completed"
@@ -272,4 +272,59 @@ def test_delete_session_not_found(client, mock_repo):
     response = client.delete("/v1/session/999")
     assert response.status_code == 404
     assert "not found" in response.json()["detail"]
-    mock_repo.get.assert_called_once_with(999)
\ No newline at end of file
+    mock_repo.get.assert_called_once_with(999)
+
+def test_get_session_database_timeout(client, mock_repo, mock_session):
+    import functools
+    import time
+
+    from ra_aid.database.async_repository import AsyncRepository
+
+    def slow_get(session_id):
+        time.sleep(0.5)
+        return mock_session
+
+    mock_repo.get.side_effect = slow_get
+
+    with patch(
+        "ra_aid.server.api_v1_sessions.AsyncRepository",
+        functools.partial(AsyncRepository, timeout=0.05),
+    ):
+        response = client.get("/v1/session/1")
+
+    assert response.status_code == 504
+    assert "Database timeout" in response.json()["detail"]
+
+
+def test_get_session_profile(client, mock_repo, mock_trajectory_repo):
+    """Test retrieving the performance profile of a session."""
+    mock_trajectory_repo.get_session_profile.return_value = {
+        "session_id": 1,
+        "wall_time_ms": 12000,
+        "tools": [{"name": "ripgrep_search", "calls": 2, "total_ms": 400, "mean_ms": 200, "max_ms": 300, "errors": 0}],
+        "stages": [{"name": "research_stage", "entries": 1, "total_ms": 9000, "mean_ms": 9000, "max_ms": 9000}],
+        "models": [],
+        "rate_limit_waits": [{"name": "anthropic", "calls": 1, "total_ms": 1500, "mean_ms": 1500, "max_ms": 1500}],
+        "untimed_tool_records": 0,
+    }
+
+    response = client.get("/v1/session/1/profile")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["wall_time_ms"] == 12000
+    assert data["tools"][0]["name"] == "ripgrep_search"
+    assert data["tools"][0]["total_ms"] == 400
+    assert data["stages"][0]["entries"] == 1
+    assert data["rate_limit_waits"][0]["total_ms"] == 1500
+    mock_trajectory_repo.get_session_profile.assert_called_once_with(1)
+
+
+def test_get_session_profile_not_found(client, mock_repo, mock_trajectory_repo):
+    """Test profiling a session that does not exist."""
+    mock_repo.get.return_value = None
+
+    response = client.get("/v1/session/999/profile")
+
+    assert response.status_code == 404
+    mock_trajectory_repo.get_session_profile.assert_not_called()
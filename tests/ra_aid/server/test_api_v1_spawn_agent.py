@@ -6,12 +6,16 @@ This module contains tests for the spawn-agent API endpoint in ra_aid/server/api
 It tests the creation of agent threads and session handling for the spawn-agent endpoint.
 """
 
+import json
 import pytest
 from unittest.mock import MagicMock
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from ra_aid.database.repositories.session_repository import get_session_repository
+from ra_aid.database.repositories.session_repository import (
+    SessionRepository,
+    get_session_repository,
+)
 from ra_aid.server.api_v1_sessions import get_repository
 from ra_aid.server.api_v1_spawn_agent import router
 from ra_aid.database.pydantic_models import SessionModel
@@ -221,3 +225,173 @@ def test_temperature_handling_in_agent_spawn(client, mock_repository, mock_threa
     # Verify that Thread was called with the right temperature in kwargs
     _, kwargs = thread_spy.call_args
     assert kwargs.get('kwargs', {}).get('temperature') == 0.9,         f"Expected temperature 0.9, got {kwargs.get('kwargs', {}).get('temperature')}"
+
+
+def test_spawn_agent_uses_worker_pool(client, mock_repository, mock_thread, mock_config_repository, monkeypatch):
+    """When a worker pool is configured, agents are submitted to it instead of a thread."""
+    mock_config_repository.to_dict.return_value = {"provider": "anthropic"}
+    mock_pool = MagicMock()
+    monkeypatch.setattr(
+        ra_aid.server.api_v1_spawn_agent, "get_agent_worker_pool", lambda: mock_pool
+    )
+
+    response = client.post(
+        "/v1/spawn-agent",
+        json={"message": "Test message", "research_only": True}
+    )
+
+    assert response.status_code == 201
+    assert response.json()["session_id"] == 123
+    mock_pool.submit.assert_called_once()
+    args, kwargs = mock_pool.submit.call_args
+    assert args == (123, "Test message")
+    assert kwargs["research_only"] is True
+    assert kwargs["config"] == {"provider": "anthropic"}
+    mock_thread.start.assert_not_called()
+
+
+def test_spawn_agent_queues_job_with_scheduler(client, mock_repository, mock_thread, monkeypatch):
+    """With a scheduler, the job is stored with the session and queued instead of started."""
+    mock_scheduler = MagicMock()
+    mock_scheduler.is_full.return_value = False
+    mock_scheduler.submit.return_value = 2
+    monkeypatch.setattr(
+        ra_aid.server.api_v1_spawn_agent, "get_agent_scheduler", lambda: mock_scheduler
+    )
+
+    response = client.post(
+        "/v1/spawn-agent",
+        json={"message": "Test message", "priority": "high"}
+    )
+
+    assert response.status_code == 201
+    assert response.json() == {"session_id": 123, "queue_position": 2}
+    session_id, job = mock_scheduler.submit.call_args.args
+    assert session_id == 123
+    assert job.message == "Test message"
+    assert job.priority == "high"
+    metadata = mock_repository.create_session.call_args.kwargs["metadata"]
+    assert metadata["job"]["message"] == "Test message"
+    mock_thread.start.assert_not_called()
+
+
+def test_spawn_agent_rejected_when_queue_full(client, mock_repository, monkeypatch):
+    """A full queue rejects the request before a session is created."""
+    mock_scheduler = MagicMock()
+    mock_scheduler.is_full.return_value = True
+    monkeypatch.setattr(
+        ra_aid.server.api_v1_spawn_agent, "get_agent_scheduler", lambda: mock_scheduler
+    )
+
+    response = client.post("/v1/spawn-agent", json={"message": "Test message"})
+
+    assert response.status_code == 503
+    mock_repository.create_session.assert_not_called()
+
+
+def test_spawn_agent_invalid_priority(client):
+    """Unknown priorities are rejected by validation."""
+    response = client.post("/v1/spawn-agent", json={"message": "Test", "priority": "urgent"})
+    assert response.status_code == 422
+
+
+
+@pytest.fixture
+def own_database():
+    """Open this test's database instead of reusing one left behind by an earlier test."""
+    from ra_aid.database.connection import db_var
+    from ra_aid.database.models import HumanInput, Session, Trajectory, database_proxy
+
+    # Some repository tests bind these models to their own in-memory database
+    models = [Session, HumanInput, Trajectory]
+    previous = database_proxy.obj, [model._meta.database for model in models]
+    db_var.set(None)
+    database_proxy.initialize(None)
+    for model in models:
+        model.bind(database_proxy, bind_refs=False, bind_backrefs=False)
+    try:
+        yield
+    finally:
+        database_proxy.initialize(previous[0])
+        for model, database in zip(models, previous[1]):
+            model.bind(database, bind_refs=False, bind_backrefs=False)
+        db_var.set(None)
+
+
+def test_spawned_session_profile_has_stages(own_database, monkeypatch):
+    """The profile of a server-spawned session breaks its time down by stage."""
+    # SessionRepository is imported at module level, before the autouse fixture mocks it
+    from ra_aid.database.connection import DatabaseManager
+    from ra_aid.database.repositories.config_repository import ConfigRepository
+    from ra_aid.database.repositories.human_input_repository import get_human_input_repository
+    from ra_aid.database.repositories.trajectory_repository import (
+        TrajectoryRepository,
+        get_trajectory_repository,
+    )
+    from ra_aid.server.api_v1_sessions import router as sessions_router
+
+    with DatabaseManager() as db:
+        session_id = SessionRepository(db).create_session().id
+
+    def run_research_agent(**kwargs):
+        get_trajectory_repository().create(
+            step_data={"stage": "planning_stage", "display_title": "Planning Stage"},
+            record_type="stage_transition",
+            human_input_id=get_human_input_repository().get_most_recent_id(),
+        )
+
+    monkeypatch.setattr("ra_aid.__main__.run_research_agent", run_research_agent)
+    monkeypatch.setattr(ra_aid.server.api_v1_spawn_agent, "initialize_llm", MagicMock())
+    monkeypatch.setattr(ra_aid.server.api_v1_spawn_agent, "send_broadcast", lambda message: None)
+    ra_aid.server.api_v1_spawn_agent.run_agent_thread("Test task", session_id, ConfigRepository())
+
+    with DatabaseManager() as db:
+        app = FastAPI()
+        app.include_router(sessions_router)
+        app.dependency_overrides[get_repository] = lambda: SessionRepository(db)
+        app.dependency_overrides[get_trajectory_repository] = lambda: TrajectoryRepository(db)
+        response = TestClient(app).get(f"/v1/session/{session_id}/profile")
+
+    assert response.status_code == 200
+    stages = {stage["name"]: stage for stage in response.json()["stages"]}
+    assert set(stages) == {"research_stage", "planning_stage"}
+    assert stages["research_stage"]["entries"] == 1
+
+
+def test_spawned_agent_output_is_stored_in_trajectory(own_database, monkeypatch):
+    """Console output of a headless server agent is kept as a trajectory record of its session."""
+    from ra_aid.console.formatting import cpm
+    from ra_aid.database.connection import DatabaseManager
+    from ra_aid.database.repositories.config_repository import ConfigRepository
+    from ra_aid.database.repositories.trajectory_repository import (
+        TrajectoryRepository,
+        get_trajectory_repository,
+    )
+    from ra_aid.server.api_v1_sessions import router as sessions_router
+
+    with DatabaseManager() as db:
+        session_id = SessionRepository(db).create_session().id
+
+    def run_research_agent(**kwargs):
+        cpm("Looking into it", title="🔬 Researching...")
+
+    monkeypatch.setattr("ra_aid.__main__.run_research_agent", run_research_agent)
+    monkeypatch.setattr(ra_aid.server.api_v1_spawn_agent, "initialize_llm", MagicMock())
+    monkeypatch.setattr(ra_aid.server.api_v1_spawn_agent, "send_broadcast", lambda message: None)
+    ra_aid.server.api_v1_spawn_agent.run_agent_thread("Test task", session_id, ConfigRepository())
+
+    with DatabaseManager() as db:
+        app = FastAPI()
+        app.include_router(sessions_router)
+        app.dependency_overrides[get_repository] = lambda: SessionRepository(db)
+        app.dependency_overrides[get_trajectory_repository] = lambda: TrajectoryRepository(db)
+        response = TestClient(app).get(f"/v1/session/{session_id}/trajectory")
+
+    assert response.status_code == 200
+    (record,) = [r for r in response.json() if r["record_type"] == "agent_output"]
+    (event,) = json.loads(record["step_data"])["events"]
+    assert (event["kind"], event["title"], event["content"]) == (
+        "panel",
+        "🔬 Researching...",
+        "Looking into it",
+    )
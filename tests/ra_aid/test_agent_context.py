@@ -10,10 +10,12 @@ from ra_aid.agent_context import (
     get_completion_message,
     get_current_context,
     get_depth,
+    get_modified_files,
     is_completed,
     mark_plan_completed,
     mark_should_exit,
     mark_task_completed,
+    record_modified_file,
     reset_completion_flags,
     should_exit,
 )
@@ -403,3 +405,14 @@ class TestUtilityFunctions:
                 assert should_exit() is True
                 assert inner.agent_should_exit is True
                 assert outer.agent_should_exit is False
+
+    def test_record_modified_file_propagates_to_parents(self, tmp_path, monkeypatch):
+        """Files modified by a sub-agent are visible to its parents."""
+        monkeypatch.chdir(tmp_path)
+        with agent_context() as outer:
+            with agent_context() as inner:
+                record_modified_file(str(tmp_path / "pkg" / "mod.py"))
+                assert inner.modified_files == {"pkg/mod.py"}
+            assert get_modified_files() == {"pkg/mod.py"}
+            assert outer.modified_files == {"pkg/mod.py"}
+        assert get_modified_files() == set()
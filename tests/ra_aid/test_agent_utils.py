@@ -571,6 +571,41 @@ def test_run_agent_with_retry_checks_crash_status(monkeypatch, mock_config_repos
         assert "Agent has crashed: Test crash message" in result
 
 
+def test_run_agent_with_retry_releases_checkpoints(monkeypatch, mock_config_repository):
+    """Checkpoints of a finished run are deleted from the agent's checkpointer."""
+    from typing import Annotated, List, TypedDict
+
+    from langgraph.graph import StateGraph
+    from langgraph.graph.message import add_messages
+
+    from ra_aid.agent_utils import run_agent_with_retry
+    from ra_aid.checkpointer import PruningCheckpointer
+
+    class State(TypedDict):
+        messages: Annotated[List, add_messages]
+
+    builder = StateGraph(State)
+    builder.add_node("reply", lambda state: {"messages": [AIMessage(content="done")]})
+    builder.set_entry_point("reply")
+    builder.set_finish_point("reply")
+    checkpointer = PruningCheckpointer()
+    agent = builder.compile(checkpointer=checkpointer)
+
+    def fake_run_agent_stream(agent, msg_list, session_id=None):
+        agent.invoke({"messages": msg_list}, {"configurable": {"thread_id": "run-1"}})
+        assert "run-1" in checkpointer.storage
+
+    monkeypatch.setattr("ra_aid.agent_utils._run_agent_stream", fake_run_agent_stream)
+    monkeypatch.setattr("ra_aid.agent_utils._setup_interrupt_handling", lambda: None)
+    monkeypatch.setattr("ra_aid.agent_utils._restore_interrupt_handling", lambda handler: None)
+    monkeypatch.setattr("ra_aid.agent_utils.check_interrupt", lambda: None)
+
+    run_agent_with_retry(agent, "test prompt")
+
+    assert not checkpointer.storage
+    assert checkpointer.stats()["threads"] == 0
+
+
 def test_run_agent_with_retry_handles_badrequest_error(
     monkeypatch, mock_config_repository
 ):
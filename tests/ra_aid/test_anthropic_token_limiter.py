@@ -16,6 +16,7 @@ from ra_aid.anthropic_token_limiter import (
     adjust_claude_37_token_limit,
 )
 from ra_aid.anthropic_message_utils import has_tool_use, is_tool_pair
+from ra_aid.model_profile import clear_model_profile_cache
 from ra_aid.models_params import models_params
 
 
@@ -23,6 +24,10 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
     def setUp(self):
         from ra_aid.config import DEFAULT_MODEL
 
+        # Token limits are cached per model; start every test from scratch
+        clear_model_profile_cache()
+        self.addCleanup(clear_model_profile_cache)
+
         self.mock_model = MagicMock(spec=ChatAnthropic)
         self.mock_model.model = DEFAULT_MODEL
 
@@ -214,7 +219,7 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
         self.assertEqual(call_args["include_system"], True)
 
     @patch("ra_aid.anthropic_token_limiter.get_config_repository")
-    @patch("ra_aid.anthropic_token_limiter.get_model_info")
+    @patch("ra_aid.model_profile.get_model_info")
     @patch("ra_aid.anthropic_token_limiter.is_claude_37")
     @patch("ra_aid.anthropic_token_limiter.adjust_claude_37_token_limit")
     def test_get_model_token_limit_from_litellm(
@@ -261,7 +266,7 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
             patch(
                 "ra_aid.anthropic_token_limiter.get_config_repository"
             ) as mock_get_config_repo,
-            patch("ra_aid.anthropic_token_limiter.get_model_info") as mock_get_info,
+            patch("ra_aid.model_profile.get_model_info") as mock_get_info,
             patch(
                 "ra_aid.anthropic_token_limiter.adjust_claude_37_token_limit"
             ) as mock_adjust,
@@ -296,7 +301,7 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
             patch(
                 "ra_aid.anthropic_token_limiter.get_config_repository"
             ) as mock_get_config_repo,
-            patch("ra_aid.anthropic_token_limiter.get_model_info") as mock_get_info,
+            patch("ra_aid.model_profile.get_model_info") as mock_get_info,
             patch(
                 "ra_aid.anthropic_token_limiter.adjust_claude_37_token_limit"
             ) as mock_adjust,
@@ -317,7 +322,7 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
             mock_adjust.assert_called_once_with(120000, None)
 
     @patch("ra_aid.anthropic_token_limiter.get_config_repository")
-    @patch("ra_aid.anthropic_token_limiter.get_model_info")
+    @patch("ra_aid.model_profile.get_model_info")
     def test_get_model_token_limit_fallback(
         self, mock_get_model_info, mock_get_config_repo
     ):
@@ -332,14 +337,14 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
 
         # Test getting token limit from models_params fallback
         with patch(
-            "ra_aid.anthropic_token_limiter.models_params",
+            "ra_aid.model_profile.models_params",
             {"anthropic": {"claude2": {"token_limit": 100000}}},
         ):
             result = get_model_token_limit(mock_config)
             self.assertEqual(result, 100000)
 
     @patch("ra_aid.anthropic_token_limiter.get_config_repository")
-    @patch("ra_aid.anthropic_token_limiter.get_model_info")
+    @patch("ra_aid.model_profile.get_model_info")
     @patch("ra_aid.anthropic_token_limiter.adjust_claude_37_token_limit")
     def test_get_model_token_limit_for_different_agent_types(
         self, mock_adjust, mock_get_model_info, mock_get_config_repo
@@ -405,7 +410,7 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
             patch(
                 "ra_aid.anthropic_token_limiter.get_config_repository"
             ) as mock_get_config_repo,
-            patch("ra_aid.anthropic_token_limiter.models_params") as mock_models_params,
+            patch("ra_aid.model_profile.models_params") as mock_models_params,
             patch("litellm.get_model_info") as mock_get_info,
             patch(
                 "ra_aid.anthropic_token_limiter.adjust_claude_37_token_limit"
@@ -482,7 +487,7 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
             patch(
                 "ra_aid.anthropic_token_limiter.get_config_repository"
             ) as mock_get_config_repo,
-            patch("ra_aid.anthropic_token_limiter.get_model_info") as mock_get_info,
+            patch("ra_aid.model_profile.get_model_info") as mock_get_info,
             patch(
                 "ra_aid.anthropic_token_limiter.adjust_claude_37_token_limit"
             ) as mock_adjust,
@@ -512,7 +517,7 @@ class TestAnthropicTokenLimiter(unittest.TestCase):
                 "ra_aid.anthropic_token_limiter.get_config_repository"
             ) as mock_get_config_repo,
             patch("litellm.get_model_info") as mock_get_info,
-            patch("ra_aid.anthropic_token_limiter.models_params") as mock_models_params,
+            patch("ra_aid.model_profile.models_params") as mock_models_params,
             patch(
                 "ra_aid.anthropic_token_limiter.adjust_claude_37_token_limit"
             ) as mock_adjust,
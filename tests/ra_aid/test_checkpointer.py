@@ -0,0 +1,95 @@
+"""
+Tests for the bounded, pruning checkpointer.
+"""
+
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.graph import StateGraph
+from langgraph.graph.message import add_messages
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ra_aid.checkpointer import (
+    MAX_CHECKPOINTS_PER_THREAD,
+    MAX_THREADS,
+    PruningCheckpointer,
+    SqliteChannelStore,
+    checkpointer_stats,
+    create_checkpointer,
+)
+
+
+class State(TypedDict):
+    messages: Annotated[List, add_messages]
+
+
+def build_graph(checkpointer):
+    builder = StateGraph(State)
+    builder.add_node("reply", lambda state: {"messages": [AIMessage(content=f"reply {len(state['messages'])}")]})
+    builder.set_entry_point("reply")
+    builder.set_finish_point("reply")
+    return builder.compile(checkpointer=checkpointer)
+
+
+def run_turns(graph, thread_id, turns):
+    config = {"configurable": {"thread_id": thread_id}}
+    for turn in range(turns):
+        graph.invoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config)
+    return graph.get_state(config)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def checkpointer(request, tmp_path):
+    store = SqliteChannelStore(tmp_path / "checkpoints.db") if request.param == "sqlite" else None
+    checkpointer = PruningCheckpointer(max_checkpoints_per_thread=3, max_threads=2, channel_store=store)
+    yield checkpointer
+    if store is not None:
+        store.close()
+
+
+def test_keeps_latest_checkpoints_and_full_state(checkpointer):
+    graph = build_graph(checkpointer)
+
+    state = run_turns(graph, "thread-1", 10)
+
+    # The conversation is intact although older checkpoints were dropped
+    assert len(state.values["messages"]) == 20
+    assert state.values["messages"][-1].content == "reply 19"
+    stats = checkpointer.stats()
+    assert stats["checkpoints"] == 3
+    assert stats["pruned_checkpoints"] > 0
+    # Only the channel values referenced by retained checkpoints remain
+    assert stats["channel_values"] <= 3 * 3
+
+
+def test_evicts_least_recently_used_threads(checkpointer):
+    graph = build_graph(checkpointer)
+    for thread_id in ("a", "b", "c"):
+        run_turns(graph, thread_id, 1)
+
+    assert set(checkpointer.storage) == {"b", "c"}
+    assert checkpointer.stats()["evicted_threads"] == 1
+    assert not any(key[0] == "a" for key in checkpointer.blobs)
+    # An evicted thread starts over
+    assert len(run_turns(graph, "a", 1).values["messages"]) == 2
+
+
+def test_sqlite_store_removes_its_file(tmp_path):
+    store = SqliteChannelStore(tmp_path / "checkpoints.db")
+    store[("thread", "", "messages", "1")] = ("msgpack", b"data")
+    assert store[("thread", "", "messages", "1")] == ("msgpack", b"data")
+    assert store.size_bytes() == 4
+
+    store.close()
+    assert not (tmp_path / "checkpoints.db").exists()
+
+
+def test_create_checkpointer_uses_config(mock_config_repository):
+    mock_config_repository.set("checkpointer", "memory")
+
+    checkpointer = create_checkpointer()
+
+    assert checkpointer.stats()["backend"] == "memory"
+    assert checkpointer.max_checkpoints_per_thread == MAX_CHECKPOINTS_PER_THREAD
+    assert checkpointer.max_threads == MAX_THREADS
+    assert checkpointer_stats()["checkpointers"] >= 1
@@ -0,0 +1,115 @@
+"""
+Tests for compaction of old tool outputs.
+"""
+
+from unittest.mock import MagicMock
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.prebuilt.chat_agent_executor import AgentState
+
+from ra_aid.anthropic_token_limiter import base_state_modifier
+from ra_aid.context_compaction import (
+    LAST_RESULT_CLOSE,
+    LAST_RESULT_OPEN,
+    ToolOutputCompactor,
+)
+
+
+def count_chars(messages):
+    return sum(len(str(message.content)) for message in messages)
+
+
+def tool_round(index, output):
+    call_id = f"call_{index}"
+    return [
+        AIMessage(content="", tool_calls=[{"id": call_id, "name": "ripgrep_search", "args": {"pattern": "x"}}]),
+        ToolMessage(content=output, tool_call_id=call_id),
+    ]
+
+
+def build_history(rounds, output_size=5000):
+    messages = [SystemMessage(content="system"), HumanMessage(content="task")]
+    for index in range(rounds):
+        messages += tool_round(index, "\n".join(f"match {index}.{line}" for line in range(output_size // 10)))
+    return messages
+
+
+def test_below_watermark_is_unchanged():
+    messages = build_history(3)
+    result = ToolOutputCompactor().compact_messages(messages, 100000, count_chars, watermark=0.5)
+    assert result == messages
+
+
+def test_compacts_oldest_outputs_and_keeps_pairing():
+    messages = build_history(6)
+    total = count_chars(messages)
+    compactor = ToolOutputCompactor()
+
+    result = compactor.compact_messages(messages, total, count_chars, watermark=0.5, keep_recent=2)
+
+    assert len(result) == len(messages)
+    assert count_chars(result) <= total * 0.5
+    # Oldest outputs are stubs, the two most recent are untouched
+    assert result[3].content.startswith("[Output of ripgrep_search compacted")
+    assert "match 0.0" in result[3].content
+    assert result[-1] is messages[-1] and result[-3] is messages[-3]
+    for ai_message, tool_message in zip(result[2::2], result[3::2]):
+        assert isinstance(tool_message, ToolMessage)
+        assert tool_message.tool_call_id == ai_message.tool_calls[0]["id"]
+    # The input list is not modified
+    assert messages[3].content.startswith("match 0.0")
+
+
+def test_summaries_are_cached_by_content_hash():
+    summarizer = MagicMock(return_value="42 matches in 3 files")
+    compactor = ToolOutputCompactor(summarizer=summarizer)
+    output = "line\n" * 1000
+
+    first = compactor.compact_text("ripgrep_search", output)
+    second = compactor.compact_text("ripgrep_search", output)
+
+    assert first == second
+    assert "42 matches in 3 files" in first
+    summarizer.assert_called_once()
+
+
+def test_failing_summarizer_falls_back_to_stub():
+    compactor = ToolOutputCompactor(summarizer=MagicMock(side_effect=RuntimeError("model down")))
+    assert compactor.compact_text("run_shell_command", "log\n" * 1000).startswith(
+        "[Output of run_shell_command compacted"
+    )
+
+
+def test_ciayn_last_result_messages_are_compacted():
+    output = "x" * 5000
+    messages = [HumanMessage(content="task")]
+    for _ in range(3):
+        messages += [
+            AIMessage(content="read_file_tool('a.py')"),
+            HumanMessage(content=f"\\n{LAST_RESULT_OPEN}{output}{LAST_RESULT_CLOSE}"),
+        ]
+
+    result = ToolOutputCompactor().compact_messages(
+        messages, count_chars(messages), count_chars, watermark=0.5, keep_recent=1
+    )
+
+    assert result[2].content.startswith(f"\\n{LAST_RESULT_OPEN}[Output of previous tool call compacted")
+    assert result[2].content.endswith(LAST_RESULT_CLOSE)
+    assert result[-1].content == messages[-1].content
+
+
+def test_state_modifier_compacts_before_trimming(mock_config_repository):
+    mock_config_repository.set("compaction_watermark", 0.5)
+    messages = build_history(8)
+    # Limit fits about half of the raw history
+    max_input_tokens = int(sum(len(m.content) for m in messages) // 2 * 0.6)
+
+    result = base_state_modifier(AgentState(messages=messages), max_input_tokens=max_input_tokens)
+
+    # Nothing had to be dropped once the old outputs were compacted
+    assert len(result) == len(messages)
+    assert "compacted to save context" in result[3].content
+
+    mock_config_repository.set("compaction_watermark", 0)
+    trimmed = base_state_modifier(AgentState(messages=messages), max_input_tokens=max_input_tokens)
+    assert len(trimmed) < len(messages)
@@ -65,6 +65,7 @@ def test_initialize_expert_defaults(clean_env, mock_openai, monkeypatch):
         reasoning_effort="high",
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "o1", "provider": "openai"},
     )
 
@@ -80,6 +81,7 @@ def test_initialize_expert_openai_custom(clean_env, mock_openai, monkeypatch):
         temperature=0,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "gpt-4-preview", "provider": "openai"},
     )
 
@@ -129,6 +131,7 @@ def test_initialize_expert_openrouter(clean_env, mock_openai, monkeypatch):
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "models/mistral-large", "provider": "openrouter"},
     )
 
@@ -146,6 +149,7 @@ def test_initialize_expert_makehub(clean_env, mock_openai, monkeypatch):
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "anthropic/claude-4-sonnet", "provider": "makehub"},
     )
 
@@ -163,6 +167,7 @@ def test_initialize_expert_openai_compatible(clean_env, mock_openai, monkeypatch
         temperature=0,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "local-model", "provider": "openai-compatible"},
     )
 
@@ -200,6 +205,7 @@ def test_initialize_openai(clean_env, mock_openai):
         temperature=0.7,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "gpt-4", "provider": "openai"},
     )
 
@@ -251,6 +257,7 @@ def test_initialize_openrouter(clean_env, mock_openai):
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "mistral-large", "provider": "openrouter"},
     )
 
@@ -268,6 +275,7 @@ def test_initialize_makehub(clean_env, mock_openai):
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "anthropic/claude-4-sonnet", "provider": "makehub"},
     )
 
@@ -285,6 +293,7 @@ def test_initialize_openai_compatible(clean_env, mock_openai):
         temperature=0.3,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "local-model", "provider": "openai-compatible"},
     )
 
@@ -311,6 +320,7 @@ def test_temperature_defaults(clean_env, mock_openai, mock_anthropic, mock_gemin
         temperature=0.3,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "test-model", "provider": "openai-compatible"},
     )
 
@@ -322,6 +332,7 @@ def test_temperature_defaults(clean_env, mock_openai, mock_anthropic, mock_gemin
         temperature=0.7,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "test-model", "provider": "openai"},
     )
 
@@ -353,6 +364,7 @@ def test_temperature_defaults(clean_env, mock_openai, mock_anthropic, mock_gemin
         reasoning_effort="high",
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "o1", "provider": "openai"},
     )
 
@@ -363,6 +375,7 @@ def test_temperature_defaults(clean_env, mock_openai, mock_anthropic, mock_gemin
         reasoning_effort="high",
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "o1-mini", "provider": "openai"},
     )
 
@@ -385,6 +398,7 @@ def test_explicit_temperature(clean_env, mock_openai, mock_anthropic, mock_gemin
         temperature=test_temp,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "test-model", "provider": "openai"},
     )
 
@@ -420,6 +434,7 @@ def test_explicit_temperature(clean_env, mock_openai, mock_anthropic, mock_gemin
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "test-model", "provider": "openrouter"},
     )
 
@@ -433,6 +448,7 @@ def test_explicit_temperature(clean_env, mock_openai, mock_anthropic, mock_gemin
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "test-model", "provider": "makehub"},
     )
 
@@ -562,6 +578,7 @@ def test_initialize_llm_cross_provider(
         temperature=0.7,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "gpt-4", "provider": "openai"},
     )
 
@@ -600,6 +617,7 @@ def test_initialize_llm_cross_provider(
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "anthropic/claude-4-sonnet", "provider": "makehub"},
     )
 
@@ -640,6 +658,7 @@ def test_environment_variable_precedence(clean_env, mock_openai, monkeypatch):
         reasoning_effort="high",
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "o1", "provider": "openai"},
     )
 
@@ -712,6 +731,7 @@ def test_reasoning_effort_only_passed_to_supported_models(
         temperature=0,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "gpt-4", "provider": "openai"},
     )
 
@@ -732,6 +752,7 @@ def test_reasoning_effort_passed_to_supported_models(
         reasoning_effort="high",
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "o1", "provider": "openai"},
     )
 
@@ -751,6 +772,7 @@ def test_initialize_deepseek(
         temperature=0.7,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "deepseek-reasoner", "provider": "deepseek"},
     )
 
@@ -762,6 +784,7 @@ def test_initialize_deepseek(
         temperature=0.7,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "deepseek-chat", "provider": "deepseek"},
     )
 
@@ -774,6 +797,7 @@ def test_initialize_deepseek(
         temperature=0.7,
         timeout=180,
         max_retries=5,
+        stream_usage=True,
         metadata={"model_name": "other-model", "provider": "deepseek"},
     )
 
@@ -794,6 +818,7 @@ def test_initialize_openrouter_deepseek(
         timeout=180,
         max_retries=5,
         default_headers={"HTTP-Referer": "https://ra-aid.ai", "X-Title": "RA.Aid"},
+        stream_usage=True,
         metadata={"model_name": "deepseek/deepseek-r1", "provider": "openrouter"},
     )
 
@@ -825,6 +850,7 @@ def test_makehub_price_performance_ratio(clean_env, mock_openai, monkeypatch):
             timeout=180,
             max_retries=5,
             default_headers=expected_headers,
+            stream_usage=True,
             metadata={"model_name": "anthropic/claude-4-sonnet", "provider": "makehub"},
         )
 
@@ -855,5 +881,47 @@ def test_makehub_no_price_performance_ratio(clean_env, mock_openai, monkeypatch)
             timeout=180,
             max_retries=5,
             default_headers=expected_headers,
+            stream_usage=True,
             metadata={"model_name": "anthropic/claude-4-sonnet", "provider": "makehub"},
         )
+
+
+def test_initialize_fake_replays_script(clean_env, monkeypatch, tmp_path):
+    """Test the fake provider replays CIAYN text and tool calls in order."""
+    from ra_aid.chat_models.scripted_chat import ChatScripted, ScriptExhaustedError
+    from ra_aid.model_detection import should_use_react_agent
+
+    script = tmp_path / "script.json"
+    script.write_text(
+        '{"usage": {"input_tokens": 100, "output_tokens": 7}, "responses": ['
+        '"read_file_tool(filepath=\'app.py\')", '
+        '{"tool_calls": [{"name": "task_completed", "args": {"message": "done"}}]}]}'
+    )
+    monkeypatch.setenv("FAKE_LLM_SCRIPT", str(script))
+
+    with patch("ra_aid.llm.get_config_repository", return_value=Mock(get=Mock(return_value=None))):
+        model = initialize_llm("fake", "ciayn")
+
+    assert isinstance(model, ChatScripted)
+    assert not should_use_react_agent(model)
+
+    chunks = list(model.stream([HumanMessage(content="task")]))
+    assert "".join(chunk.content for chunk in chunks) == "read_file_tool(filepath='app.py')"
+    assert chunks[-1].usage_metadata["input_tokens"] == 100
+
+    response = model.invoke([HumanMessage(content="task")])
+    assert response.tool_calls[0]["name"] == "task_completed"
+    assert response.tool_calls[0]["args"] == {"message": "done"}
+    assert model.calls == 2
+    assert model.input_tokens == 200
+    assert model.output_tokens == 14
+
+    with pytest.raises(ScriptExhaustedError):
+        model.invoke([HumanMessage(content="task")])
+
+
+def test_initialize_fake_requires_script(clean_env, monkeypatch):
+    """Test the fake provider reports a missing script."""
+    monkeypatch.delenv("FAKE_LLM_SCRIPT", raising=False)
+    with pytest.raises(ValueError, match="FAKE_LLM_SCRIPT"):
+        initialize_llm("fake", "react")
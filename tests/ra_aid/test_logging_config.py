@@ -0,0 +1,54 @@
+"""Tests for the logging setup."""
+
+import glob
+import logging
+import os
+from logging.handlers import QueueHandler
+
+import pytest
+
+from ra_aid.logging_config import get_logger, setup_logging, stop_queue_listener
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    stop_queue_listener()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def read_logs(base_dir):
+    contents = ""
+    for path in glob.glob(os.path.join(base_dir, "logs", "*.log")):
+        with open(path, encoding="utf-8") as f:
+            contents += f.read()
+    return contents
+
+
+def test_file_logging_goes_through_a_queue(tmp_path, restore_root_logger):
+    setup_logging(log_mode="file", log_level="info", base_dir=str(tmp_path))
+
+    (handler,) = restore_root_logger.handlers
+    assert isinstance(handler, QueueHandler)
+
+    logger = get_logger("test")
+    logger.info("kept %s", "record")
+    logger.debug("dropped record")
+    stop_queue_listener()
+
+    contents = read_logs(tmp_path)
+    assert "kept record" in contents
+    assert "dropped record" not in contents
+
+
+def test_root_level_follows_log_level(tmp_path, restore_root_logger):
+    setup_logging(log_mode="file", log_level="warning", base_dir=str(tmp_path))
+
+    # Debug records are not even created
+    assert not get_logger("test").isEnabledFor(logging.DEBUG)
+
+    setup_logging(log_mode="file", log_level="debug", base_dir=str(tmp_path))
+    assert get_logger("test").isEnabledFor(logging.DEBUG)
@@ -0,0 +1,91 @@
+"""
+Tests for the latency histograms.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.tools import tool
+
+from ra_aid.metrics import (
+    TOOL_DURATION,
+    Histogram,
+    MetricsRegistry,
+    get_metrics_registry,
+    instrument_tools,
+)
+
+
+@pytest.fixture
+def registry():
+    registry = get_metrics_registry()
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 0]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(5.6)
+    assert histogram.quantile(0.5) <= 0.1
+    assert 1.0 <= histogram.quantile(0.95) <= 5.0
+
+
+def test_prometheus_rendering_is_cumulative():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe(TOOL_DURATION, 0.05, tool="read_file_tool", status="ok")
+    registry.observe(TOOL_DURATION, 0.5, tool="read_file_tool", status="ok")
+    registry.observe(TOOL_DURATION, 2.0, tool='say "hi"', status="error")
+
+    text = registry.render_prometheus()
+
+    assert "# TYPE ra_aid_tool_duration_seconds histogram" in text
+    assert 'ra_aid_tool_duration_seconds_bucket{status="ok",tool="read_file_tool",le="0.1"} 1' in text
+    assert 'ra_aid_tool_duration_seconds_bucket{status="ok",tool="read_file_tool",le="1.0"} 2' in text
+    assert 'ra_aid_tool_duration_seconds_bucket{status="ok",tool="read_file_tool",le="+Inf"} 2' in text
+    assert 'ra_aid_tool_duration_seconds_count{status="ok",tool="read_file_tool"} 2' in text
+    assert 'tool="say \\"hi\\""' in text
+
+
+def test_timed_records_errors():
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        with registry.timed(TOOL_DURATION, tool="x", status="ok"):
+            raise ValueError("boom")
+
+    (key,) = registry.snapshot()[TOOL_DURATION]
+    assert dict(key) == {"tool": "x", "status": "error"}
+
+
+def test_instrumented_tools_record_each_call_once(registry):
+    @tool
+    def sample_tool(value: int) -> int:
+        """Double a value."""
+        return value * 2
+
+    instrument_tools([sample_tool])
+    instrument_tools([sample_tool])
+
+    assert sample_tool.invoke({"value": 2}) == 4
+    # CIAYN agents call the function directly
+    assert sample_tool.func(3) == 6
+    assert sample_tool.func.__name__ == "sample_tool"
+
+    series = registry.snapshot()[TOOL_DURATION]
+    assert series[(("status", "ok"), ("tool", "sample_tool"))].count == 2
+
+
+def test_metrics_endpoint(registry):
+    from ra_aid.server.server import app
+
+    registry.observe(TOOL_DURATION, 0.2, tool="ripgrep_search", status="ok")
+
+    response = TestClient(app).get("/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'ra_aid_tool_duration_seconds_count{status="ok",tool="ripgrep_search"} 1' in response.text
@@ -0,0 +1,88 @@
+"""
+Tests for resolved, cached model profiles.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from ra_aid.callbacks.default_callback_handler import DefaultCallbackHandler
+from ra_aid.model_profile import (
+    build_model_profile,
+    clear_model_profile_cache,
+    get_model_profile,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_profile_cache():
+    clear_model_profile_cache()
+    yield
+    clear_model_profile_cache()
+
+
+def test_profile_is_resolved_once_per_key():
+    info = {"max_input_tokens": 100000, "input_cost_per_token": 3e-06, "output_cost_per_token": 1.5e-05}
+    with patch("ra_aid.model_profile.get_model_info", return_value=info) as get_info:
+        first = get_model_profile("anthropic", "claude-x")
+        assert get_model_profile("anthropic", "claude-x") is first
+        get_info.assert_called_once_with("anthropic/claude-x")
+
+        # A different model is a separate entry
+        other = get_model_profile("anthropic", "claude-y")
+        assert other is not first
+        assert get_info.call_count == 2
+
+    assert first.max_input_tokens == 100000
+    assert first.token_limit_source == "litellm"
+    assert first.cost_rates(10) == (Decimal("0.000003"), Decimal("0.000015"))
+    assert first.cost_source == "litellm"
+
+
+def test_falls_back_to_models_params_and_model_costs():
+    with (
+        patch("ra_aid.model_profile.get_model_info", side_effect=Exception("not found")),
+        patch(
+            "ra_aid.model_profile.models_params",
+            {"openrouter": {"gemini-2.5-pro-exp-03-25": {"token_limit": 1000000, "supports_thinking": True}}},
+        ),
+    ):
+        profile = build_model_profile("openrouter", "gemini-2.5-pro-exp-03-25")
+
+    assert profile.max_input_tokens == 1000000
+    assert profile.token_limit_source == "models_params"
+    assert profile.supports_thinking is True
+    assert profile.supports_think_tag is None
+    # Tiered pricing from MODEL_COSTS
+    assert profile.cost_source == "model_costs"
+    assert profile.cost_rates(1000) == (Decimal("0.00000125"), Decimal("0.00001000"))
+    assert profile.cost_rates(300000) == (Decimal("0.00000250"), Decimal("0.00001500"))
+
+
+def test_unknown_model():
+    with patch("ra_aid.model_profile.get_model_info", side_effect=Exception("not found")):
+        profile = build_model_profile("unknown", "unknown-model")
+    assert profile.max_input_tokens is None
+    assert profile.cost_source is None
+    assert profile.cost_rates(10) == (Decimal("0"), Decimal("0"))
+    with pytest.raises(TypeError):
+        profile.params["supports_thinking"] = True
+
+
+def test_callback_handler_uses_cached_profile(mock_config_repository):
+    info = {"max_input_tokens": 8000, "input_cost_per_token": 1e-06, "output_cost_per_token": 2e-06}
+    with (
+        patch("ra_aid.model_profile.get_model_info", return_value=info) as get_info,
+        patch("ra_aid.callbacks.default_callback_handler.get_trajectory_repository"),
+        patch("ra_aid.callbacks.default_callback_handler.get_session_repository"),
+    ):
+        DefaultCallbackHandler._instances = {}
+        handler = DefaultCallbackHandler("cheap-model", "openai")
+        handler._initialize_model_costs()
+        DefaultCallbackHandler._instances = {}
+
+    get_info.assert_called_once_with("openai/cheap-model")
+    assert handler.model_profile is get_model_profile("openai", "cheap-model")
+    assert handler.input_cost_per_token == Decimal("0.000001")
+    assert handler.output_cost_per_token == Decimal("0.000002")
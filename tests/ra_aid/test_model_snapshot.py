@@ -0,0 +1,121 @@
+"""
+Tests for the offline litellm model snapshot.
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import litellm
+import pytest
+
+from ra_aid import model_snapshot
+from ra_aid.model_snapshot import (
+    SNAPSHOT_FORMAT,
+    apply_model_snapshot,
+    build_snapshot,
+    load_snapshot,
+    refresh_model_snapshot,
+    reset_applied_snapshot,
+)
+
+MODEL_MAP = {
+    "sample_spec": {"max_tokens": "set to max_output_tokens if provider specifies it"},
+    "test-provider/chat-model": {
+        "litellm_provider": "test-provider",
+        "mode": "chat",
+        "max_input_tokens": 123456,
+        "input_cost_per_token": 1e-06,
+        "output_cost_per_token": 2e-06,
+        "source": "https://example.com/pricing",
+    },
+    "test-provider/embedding-model": {"mode": "embedding", "max_input_tokens": 8192},
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    """Point the refreshed snapshot at a temporary file and reset the applied state."""
+    path = tmp_path / "model_snapshot.json"
+    monkeypatch.setenv("RA_AID_MODEL_SNAPSHOT", str(path))
+    reset_applied_snapshot()
+    yield path
+    litellm.model_cost.pop("test-provider/chat-model", None)
+    reset_applied_snapshot()
+
+
+def test_package_import_disables_litellm_network_fetch():
+    assert os.environ.get("LITELLM_LOCAL_MODEL_COST_MAP")
+
+
+def test_build_snapshot_keeps_chat_models_and_used_fields():
+    snapshot = build_snapshot(MODEL_MAP, "test")
+    assert list(snapshot["models"]) == ["test-provider/chat-model"]
+    entry = snapshot["models"]["test-provider/chat-model"]
+    assert entry["max_input_tokens"] == 123456
+    assert "source" not in entry
+    assert snapshot["source"] == "test"
+
+
+def test_refresh_writes_snapshot_and_apply_merges_it(snapshot_path):
+    response = MagicMock()
+    response.json.return_value = MODEL_MAP
+    with patch("httpx.get", return_value=response) as http_get:
+        result = refresh_model_snapshot()
+
+    http_get.assert_called_once()
+    assert result["path"] == str(snapshot_path)
+    assert result["model_count"] == 1
+    assert json.loads(snapshot_path.read_text())["models"]["test-provider/chat-model"]
+
+    applied = apply_model_snapshot()
+    assert applied["path"] == str(snapshot_path)
+    assert litellm.get_model_info("test-provider/chat-model")["max_input_tokens"] == 123456
+    # Applied once per process
+    with patch.object(model_snapshot, "active_snapshot") as active:
+        assert apply_model_snapshot() is applied
+        active.assert_not_called()
+
+
+def test_refresh_from_local_file(snapshot_path, tmp_path):
+    source = tmp_path / "model_prices.json"
+    source.write_text(json.dumps(MODEL_MAP))
+    with patch("httpx.get") as http_get:
+        result = refresh_model_snapshot(source=str(source))
+    http_get.assert_not_called()
+    assert result["model_count"] == 1
+
+
+def test_without_refresh_litellm_data_is_used(snapshot_path):
+    assert apply_model_snapshot() is None
+    # litellm's own bundled map is the baseline
+    assert litellm.get_model_info("claude-3-7-sonnet-20250219")["max_input_tokens"]
+
+
+def test_invalid_refreshed_snapshot_is_ignored(snapshot_path):
+    snapshot_path.write_text("{not json")
+    assert apply_model_snapshot() is None
+
+
+def test_snapshot_skipped_after_litellm_upgrade(snapshot_path, tmp_path):
+    source = tmp_path / "model_prices.json"
+    source.write_text(json.dumps(MODEL_MAP))
+    with patch.object(model_snapshot, "installed_litellm_version", return_value="1.0.0"):
+        refresh_model_snapshot(source=str(source))
+    with patch.object(model_snapshot, "installed_litellm_version", return_value="999.0.0"):
+        assert apply_model_snapshot() is None
+
+
+def test_refresh_command_points_custom_output_at_env_var(snapshot_path, tmp_path, capsys):
+    from ra_aid.__main__ import handle_refresh_model_snapshot
+
+    source = tmp_path / "model_prices.json"
+    source.write_text(json.dumps(MODEL_MAP))
+    output = tmp_path / "elsewhere.json"
+    args = MagicMock(source=str(source), output=str(output))
+    with pytest.raises(SystemExit) as exit_info:
+        handle_refresh_model_snapshot(args)
+    assert exit_info.value.code == 0
+    # Rich wraps long lines
+    printed = capsys.readouterr().out.replace("\n", "")
+    assert f"RA_AID_MODEL_SNAPSHOT={output.resolve()}" in printed
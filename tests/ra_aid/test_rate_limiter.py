@@ -0,0 +1,163 @@
+"""
+Tests for the shared LLM rate limiter.
+"""
+
+import threading
+from unittest.mock import patch
+
+import peewee
+import pytest
+
+from ra_aid.database.models import RateLimitBucket, database_proxy
+from ra_aid.rate_limiter import (
+    MemoryBucketStore,
+    RateLimit,
+    RateLimiter,
+    SqliteBucketStore,
+    get_rate_limiter,
+    parse_rate_limit,
+    reset_rate_limiter,
+)
+
+
+@pytest.fixture
+def no_sleep():
+    """Record sleeps instead of waiting."""
+    sleeps = []
+    with patch("ra_aid.rate_limiter.time.sleep", side_effect=sleeps.append):
+        yield sleeps
+
+
+@pytest.fixture
+def bucket_db(tmp_path):
+    """Point the models at a file database with the bucket table."""
+    db = peewee.SqliteDatabase(str(tmp_path / "limits.db"), pragmas={"journal_mode": "wal"})
+    previous = database_proxy.obj
+    database_proxy.initialize(db)
+    db.create_tables([RateLimitBucket])
+    yield db
+    database_proxy.initialize(previous)
+    db.close()
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit("anthropic:rpm=50,tpm=40000") == (
+        "anthropic",
+        RateLimit(requests_per_minute=50, tokens_per_minute=40000),
+    )
+    assert parse_rate_limit("openai/gpt-4o:tpm=1000") == (
+        "openai/gpt-4o",
+        RateLimit(tokens_per_minute=1000),
+    )
+    for spec in ("anthropic", "anthropic:", "anthropic:rps=1", "anthropic:rpm=x", "anthropic:rpm=0"):
+        with pytest.raises(ValueError):
+            parse_rate_limit(spec)
+
+
+def test_model_limit_takes_precedence_over_provider_limit():
+    limiter = RateLimiter(
+        {"openai": RateLimit(requests_per_minute=10), "openai/o3": RateLimit(requests_per_minute=1)}
+    )
+    assert limiter.resolve("openai", "o3") == "openai/o3"
+    assert limiter.resolve("openai", "gpt-4o") == "openai"
+    assert limiter.resolve("anthropic", "claude") is None
+
+
+def test_requests_beyond_burst_wait(no_sleep):
+    """A bucket holds one minute of requests; further requests wait for the refill."""
+    limiter = RateLimiter({"anthropic": RateLimit(requests_per_minute=60)})
+
+    for _ in range(60):
+        assert limiter.acquire("anthropic", "claude") == 0
+    waited = limiter.acquire("anthropic", "claude")
+
+    assert waited == pytest.approx(1.0, abs=0.05)
+    assert no_sleep == [waited]
+    stats = limiter.stats()["anthropic"]
+    assert stats["requests"] == 61
+    assert stats["waited_requests"] == 1
+    assert stats["max_wait_seconds"] == pytest.approx(1.0, abs=0.05)
+
+
+def test_token_estimates_and_usage_correction(no_sleep):
+    """Estimated tokens are reserved up front and corrected by actual usage."""
+    limiter = RateLimiter({"anthropic": RateLimit(tokens_per_minute=6000)})
+
+    assert limiter.acquire("anthropic", "claude", tokens=5000) == 0
+    # The call really used 7000 tokens, so the bucket is 1000 in debt
+    limiter.record_usage("anthropic", "claude", estimated_tokens=5000, actual_tokens=7000)
+    waited = limiter.acquire("anthropic", "claude", tokens=100)
+
+    # 1100 tokens of debt at 100 tokens/second
+    assert waited == pytest.approx(11.0, abs=0.1)
+    assert limiter.stats()["anthropic"]["actual_tokens"] == 7000
+
+
+def test_waits_are_exported_as_histogram(no_sleep):
+    """Every limited call is observed in the rate limit wait histogram."""
+    from ra_aid.metrics import RATE_LIMIT_WAIT, get_metrics_registry
+
+    registry = get_metrics_registry()
+    registry.reset()
+    limiter = RateLimiter({"anthropic": RateLimit(requests_per_minute=1)})
+    limiter.acquire("anthropic", "claude")
+    waited = limiter.acquire("anthropic", "claude")
+    limiter.acquire("openai", "gpt-4o")
+
+    (histogram,) = registry.snapshot()[RATE_LIMIT_WAIT].values()
+    assert histogram.count == 2
+    assert histogram.sum == pytest.approx(waited)
+    assert histogram.sum == pytest.approx(limiter.stats()["anthropic"]["total_wait_seconds"])
+    assert 'ra_aid_rate_limit_wait_seconds_count{limit="anthropic"} 2' in registry.render_prometheus()
+    registry.reset()
+
+
+def test_unlimited_model_does_not_wait(no_sleep):
+    limiter = RateLimiter({"anthropic": RateLimit(requests_per_minute=1)})
+    for _ in range(5):
+        assert limiter.acquire("openai", "gpt-4o") == 0
+    assert no_sleep == []
+    assert limiter.stats() == {}
+
+
+def test_memory_store_is_shared_between_threads(no_sleep):
+    limiter = RateLimiter({"anthropic": RateLimit(requests_per_minute=100)}, store=MemoryBucketStore())
+    threads = [
+        threading.Thread(target=lambda: [limiter.acquire("anthropic", "m") for _ in range(30)])
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 120 requests against a burst of 100: the last 20 had to wait
+    assert limiter.stats()["anthropic"]["waited_requests"] == 20
+
+
+def test_sqlite_store_shares_buckets_between_limiters(bucket_db, no_sleep):
+    """Two limiters (as in two processes) share bucket state through the database."""
+    limits = {"anthropic": RateLimit(requests_per_minute=2)}
+    first = RateLimiter(limits, store=SqliteBucketStore())
+    second = RateLimiter(limits, store=SqliteBucketStore())
+
+    assert first.acquire("anthropic", "m") == 0
+    assert second.acquire("anthropic", "m") == 0
+    assert first.acquire("anthropic", "m") == pytest.approx(30.0, abs=0.5)
+    assert RateLimitBucket.get(RateLimitBucket.key == "anthropic:requests").level < 0
+
+
+def test_get_rate_limiter_reads_config(mock_config_repository):
+    reset_rate_limiter()
+    try:
+        assert get_rate_limiter() is None
+
+        mock_config_repository.set("rate_limits", {"anthropic": {"rpm": 50, "tpm": None}})
+        limiter = get_rate_limiter()
+        assert limiter.limits == {"anthropic": RateLimit(requests_per_minute=50)}
+        assert get_rate_limiter() is limiter
+
+        mock_config_repository.set("rate_limits", {"anthropic": {"rpm": 10, "tpm": None}})
+        assert get_rate_limiter() is not limiter
+    finally:
+        reset_rate_limiter()
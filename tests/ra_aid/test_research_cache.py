@@ -0,0 +1,176 @@
+"""
+Tests for reuse of research results across runs.
+"""
+
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ra_aid.database.repositories.related_files_repository import RelatedFilesRepository
+from ra_aid.research_cache import (
+    CachedResearch,
+    ResearchCache,
+    collect_research,
+    format_cached_research_section,
+    normalize_task,
+    repository_state,
+    research_baseline,
+    restore_research,
+    task_key,
+)
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    git(repo, "config", "user.email", "dev@example.com")
+    git(repo, "config", "user.name", "dev")
+    (repo / "app.py").write_text("print('hello')\n")
+    git(repo, "add", "app.py")
+    git(repo, "commit", "-q", "-m", "initial")
+    return repo
+
+
+def test_task_keys_ignore_case_whitespace_and_trailing_punctuation():
+    assert normalize_task("  Add   a CLI flag.\n") == "add a cli flag"
+    assert task_key("Add a CLI flag") == task_key("add a  cli flag.")
+    assert task_key("Add a CLI flag") != task_key("Add a CLI flag", research_only=True)
+
+
+def test_fingerprint_tracks_dirty_contents_but_not_project_state(repo):
+    clean = repository_state(str(repo))
+    assert clean.dirty_files == []
+
+    (repo / ".ra-aid").mkdir()
+    (repo / ".ra-aid" / "pk.db").write_text("db")
+    assert repository_state(str(repo)).fingerprint == clean.fingerprint
+
+    (repo / "app.py").write_text("print('changed')\n")
+    first_edit = repository_state(str(repo))
+    assert first_edit.dirty_files == ["app.py"]
+    assert first_edit.fingerprint != clean.fingerprint
+
+    (repo / "app.py").write_text("print('changed again')\n")
+    assert repository_state(str(repo)).fingerprint != first_edit.fingerprint
+
+
+def test_no_state_outside_git(tmp_path):
+    assert repository_state(str(tmp_path)) is None
+
+
+def test_lookup_hit_stale_and_miss(repo, tmp_path):
+    cache = ResearchCache(tmp_path / "research_cache")
+    key = task_key("Add a CLI flag")
+    state = repository_state(str(repo))
+
+    assert cache.lookup(key, state).status == "miss"
+
+    cache.store(key, CachedResearch(task="Add a CLI flag", head=state.head, fingerprint=state.fingerprint, result="done"))
+    hit = cache.lookup(key, state)
+    assert hit.status == "hit" and hit.entry.result == "done"
+
+    (repo / "cli.py").write_text("import argparse\n")
+    stale = cache.lookup(key, repository_state(str(repo)))
+    assert stale.status == "stale"
+    assert stale.changed_files == ["cli.py"]
+    assert "cli.py" in format_cached_research_section(stale)
+
+    stats = ResearchCache(cache.root).stats()
+    assert stats == {"hit": 1, "stale": 1, "miss": 1, "tasks": 1}
+
+
+def test_old_tree_states_are_pruned(tmp_path):
+    cache = ResearchCache(tmp_path / "research_cache", max_entries_per_task=2)
+    key = task_key("task")
+    for index in range(4):
+        cache.store(key, CachedResearch(task="task", head="h", fingerprint=f"f{index}", created_at=index))
+    assert [entry.fingerprint for entry in cache.entries(key)] == ["f3", "f2"]
+
+
+def test_restore_skips_results_already_present(repo):
+    note_repo = MagicMock()
+    note_repo.get_notes_dict.return_value = {1: "existing note"}
+    fact_repo = MagicMock()
+    fact_repo.get_facts_dict.return_value = {}
+    snippet_repo = MagicMock()
+    snippet_repo.get_snippets_dict.return_value = {}
+    files_repo = RelatedFilesRepository()
+    entry = CachedResearch(
+        task="task",
+        head="h",
+        fingerprint="f",
+        research_notes=["existing note", "new note"],
+        key_facts=["uses argparse"],
+        key_snippets=[{"filepath": "app.py", "line_number": 1, "snippet": "print", "description": None}],
+        related_files=["app.py", "deleted.py"],
+    )
+
+    with patch(
+        "ra_aid.database.repositories.research_note_repository.get_research_note_repository", return_value=note_repo
+    ), patch(
+        "ra_aid.database.repositories.key_fact_repository.get_key_fact_repository", return_value=fact_repo
+    ), patch(
+        "ra_aid.database.repositories.key_snippet_repository.get_key_snippet_repository", return_value=snippet_repo
+    ), patch(
+        "ra_aid.database.repositories.related_files_repository.get_related_files_repository", return_value=files_repo
+    ):
+        restored = restore_research(entry, str(repo))
+
+    assert restored == {"research_notes": 1, "key_facts": 1, "key_snippets": 1, "related_files": 1}
+    note_repo.create.assert_called_once_with("new note")
+    assert list(files_repo.get_all().values()) == [str(repo / "app.py")]
+
+
+def test_collect_only_keeps_results_created_during_the_run(repo):
+    note_repo = MagicMock()
+    note_repo.get_notes_dict.return_value = {1: "note from another task"}
+    fact_repo = MagicMock()
+    fact_repo.get_facts_dict.return_value = {1: "old fact"}
+    snippet_repo = MagicMock()
+    snippet_repo.get_snippets_dict.return_value = {}
+    files_repo = RelatedFilesRepository()
+    files_repo.add_file(str(repo / "app.py"))
+
+    with patch(
+        "ra_aid.database.repositories.research_note_repository.get_research_note_repository", return_value=note_repo
+    ), patch(
+        "ra_aid.database.repositories.key_fact_repository.get_key_fact_repository", return_value=fact_repo
+    ), patch(
+        "ra_aid.database.repositories.key_snippet_repository.get_key_snippet_repository", return_value=snippet_repo
+    ), patch(
+        "ra_aid.database.repositories.related_files_repository.get_related_files_repository", return_value=files_repo
+    ):
+        baseline = research_baseline()
+        # The research run adds one note and one related file
+        note_repo.get_notes_dict.return_value = {1: "note from another task", 2: "new note"}
+        (repo / "cli.py").write_text("import app\n")
+        files_repo.add_file(str(repo / "cli.py"))
+
+        entry = collect_research("task", repository_state(str(repo)), "done", baseline)
+
+    assert entry.research_notes == ["new note"]
+    assert entry.key_facts == []
+    assert entry.related_files == ["cli.py"]
+
+
+
+def test_corrupt_entry_falls_back_to_fresh_research(repo, tmp_path):
+    from ra_aid.agents.research_agent import _lookup_research_cache
+
+    cache = ResearchCache(tmp_path / "cache")
+    state = repository_state(str(repo))
+    cache.store(task_key("task", False), CachedResearch(task="task", head=state.head, fingerprint=state.fingerprint))
+
+    with patch("ra_aid.agents.research_agent.get_research_cache", return_value=cache), patch(
+        "ra_aid.agents.research_agent.repository_state", return_value=state
+    ), patch("ra_aid.agents.research_agent.research_baseline", return_value={}), patch(
+        "ra_aid.agents.research_agent.restore_research", side_effect=ValueError("corrupt entry")
+    ):
+        assert _lookup_research_cache("task", False, False, "thread") is None
@@ -0,0 +1,64 @@
+"""
+Tests for the startup task runner.
+"""
+
+import contextvars
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ra_aid.startup import StartupTaskRunner
+
+request_var = contextvars.ContextVar("request_var", default=None)
+
+
+def test_run_concurrently_overlaps_steps_and_records_timings():
+    runner = StartupTaskRunner()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def step(value):
+        # Every step waits for the others, so this only passes if they run at the same time
+        barrier.wait()
+        return value
+
+    results = runner.run_concurrently({name: (lambda name=name: step(name)) for name in ("a", "b", "c")})
+
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    assert set(runner.timings) == {"a", "b", "c"}
+
+
+def test_run_concurrently_propagates_context_and_errors():
+    runner = StartupTaskRunner()
+    request_var.set("main")
+    finished = []
+
+    def slow():
+        time.sleep(0.05)
+        finished.append(request_var.get())
+
+    def failing():
+        raise SystemExit(1)
+
+    with pytest.raises(SystemExit):
+        runner.run_concurrently({"slow": slow, "failing": failing})
+    # The other step still ran to completion, with the caller's context
+    assert finished == ["main"]
+
+
+def test_background_step_and_debug_summary():
+    runner = StartupTaskRunner()
+    release = threading.Event()
+
+    future = runner.start_background("version_check", lambda: release.wait(5) and "new version")
+    with runner.step("status"):
+        assert not future.done()
+    release.set()
+    assert future.result(timeout=5) == "new version"
+
+    with patch("ra_aid.startup.logger") as logger:
+        runner.log_summary()
+    summary = logger.debug.call_args[0][0]
+    assert summary.startswith("Startup finished in")
+    assert "version_check=" in summary and "status=" in summary
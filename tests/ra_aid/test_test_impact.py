@@ -0,0 +1,175 @@
+"""
+Tests for test-impact selection of user-defined test commands.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from ra_aid.test_impact import (
+    ImportGraph,
+    TestImpactMap,
+    parse_imports,
+    select_affected_tests,
+    subset_test_command,
+)
+from ra_aid.tools.handle_user_defined_test_cmd_execution import TestCommandExecutor
+
+
+def write(root, path, content=""):
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    write(tmp_path, "pkg/__init__.py")
+    write(tmp_path, "pkg/core.py", "def add(a, b):\n    return a + b\n")
+    write(tmp_path, "pkg/api.py", "from .core import add\n")
+    write(tmp_path, "pkg/cli.py", "import pkg.api\n")
+    write(tmp_path, "pkg/other.py", "import os\n")
+    write(tmp_path, "tests/test_api.py", "from pkg.api import add\n")
+    write(tmp_path, "tests/test_cli.py", "from pkg import cli\n")
+    write(tmp_path, "tests/test_other.py", "import pkg.other\n")
+    write(tmp_path, "tests/helpers.py", "from pkg.core import add\n")
+    write(tmp_path, "tests/test_helpers.py", "import helpers\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("ra_aid.test_impact._impact_map_path", lambda: None)
+    return tmp_path
+
+
+def test_parse_imports_records_level_module_and_names():
+    assert parse_imports("import a.b\nfrom ..c import d, e\nfrom . import f\n") == [
+        (0, "a.b", []),
+        (2, "c", ["d", "e"]),
+        (1, "", ["f"]),
+    ]
+
+
+def test_affected_tests_follow_transitive_and_relative_imports(project):
+    assert select_affected_tests(["pkg/core.py"]) == [
+        "tests/test_api.py",
+        "tests/test_cli.py",
+        "tests/test_helpers.py",
+    ]
+    assert select_affected_tests(["pkg/other.py"]) == ["tests/test_other.py"]
+    assert select_affected_tests([str(project / "tests/test_api.py")]) == [
+        "tests/test_api.py"
+    ]
+
+
+def test_src_layout_modules_resolve_without_prefix():
+    graph = ImportGraph(
+        {
+            "src/lib_a/__init__.py": [],
+            "src/lib_a/util.py": [],
+            "tests/test_util.py": [(0, "lib_a", ["util"])],
+        }
+    )
+    assert graph.affected_tests(["src/lib_a/util.py"]) == {"tests/test_util.py"}
+
+
+@pytest.mark.parametrize(
+    "modified",
+    [
+        [],
+        ["setup.cfg"],
+        ["tests/conftest.py"],
+        ["pkg/deleted.py"],
+        ["../outside.py"],
+        ["pkg/__init__.py", "README.md"],
+    ],
+)
+def test_selection_falls_back_to_full_command(project, modified):
+    write(project, "setup.cfg")
+    write(project, "README.md")
+    write(project, "tests/conftest.py")
+    assert select_affected_tests(modified) is None
+
+
+def test_selection_without_affected_tests_falls_back(project):
+    write(project, "scripts/tool.py")
+    assert select_affected_tests(["scripts/tool.py"]) is None
+
+
+def test_impact_map_reparses_only_changed_files(project):
+    cache_path = project / ".ra-aid" / "test_impact.json"
+    paths = ["pkg/core.py", "pkg/api.py"]
+    TestImpactMap(str(project), cache_path).update(paths)
+    assert cache_path.is_file()
+
+    write(project, "pkg/api.py", "from .core import add\nimport json\n")
+    with patch("ra_aid.test_impact.parse_imports", wraps=parse_imports) as parse:
+        files = TestImpactMap(str(project), cache_path).update(paths)
+    parse.assert_called_once()
+    assert files["pkg/api.py"] == [(1, "core", ["add"]), (0, "json", [])]
+
+    files = TestImpactMap(str(project), cache_path).update(["pkg/core.py"])
+    assert list(files) == ["pkg/core.py"]
+
+
+def test_subset_command_replaces_pytest_paths(project):
+    tests = ["tests/test_api.py", "tests/test_cli.py"]
+    assert (
+        subset_test_command("python -m pytest -x tests --ignore tests/slow", tests)
+        == "python -m pytest -x --ignore tests/slow tests/test_api.py tests/test_cli.py"
+    )
+    assert subset_test_command("pytest tests/test_api.py::test_add", tests[:1]) == (
+        "pytest tests/test_api.py"
+    )
+
+
+def test_subset_command_needs_pytest_or_template(project):
+    tests = ["tests/test_api.py"]
+    assert subset_test_command("make test", tests) is None
+    assert subset_test_command("pytest tests && ruff check", tests) is None
+    assert (
+        subset_test_command("make test", tests, "tox -e py -- {tests}")
+        == "tox -e py -- tests/test_api.py"
+    )
+
+
+@pytest.fixture
+def executor():
+    config = {"test_cmd": "pytest tests", "test_impact": True, "max_test_cmd_retries": 3}
+    return TestCommandExecutor(config, "original", auto_test=True)
+
+
+def test_executor_stops_at_failing_affected_tests(project, executor):
+    with (
+        patch(
+            "ra_aid.tools.handle_user_defined_test_cmd_execution.get_modified_files",
+            return_value={"pkg/other.py"},
+        ),
+        patch(
+            "ra_aid.tools.handle_user_defined_test_cmd_execution.run_shell_command"
+        ) as mock_run,
+    ):
+        mock_run.invoke.return_value = {"success": False, "output": "1 failed"}
+        executor.run_test_command("pytest tests", "original")
+
+    mock_run.invoke.assert_called_once()
+    assert mock_run.invoke.call_args.args[0]["command"] == "pytest tests/test_other.py"
+    assert executor.state.test_attempts == 1
+    assert not executor.state.should_break
+    assert "1 failed" in executor.state.prompt
+
+
+def test_executor_runs_full_command_after_affected_tests_pass(project, executor):
+    with (
+        patch(
+            "ra_aid.tools.handle_user_defined_test_cmd_execution.get_modified_files",
+            return_value={"pkg/other.py"},
+        ),
+        patch(
+            "ra_aid.tools.handle_user_defined_test_cmd_execution.run_shell_command"
+        ) as mock_run,
+    ):
+        mock_run.invoke.return_value = {"success": True, "output": ""}
+        executor.run_test_command("pytest tests", "original")
+
+    commands = [call.args[0]["command"] for call in mock_run.invoke.call_args_list]
+    assert commands == ["pytest tests/test_other.py", "pytest tests"]
+    assert executor.state.test_attempts == 1
+    assert executor.state.should_break
@@ -0,0 +1,155 @@
+"""
+Tests for reuse of test command results for an unchanged tree.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ra_aid.test_result_cache import MAX_RESULTS, TestResultCache, file_sha256
+from ra_aid.tools.handle_user_defined_test_cmd_execution import TestCommandExecutor
+
+MODULE = "ra_aid.tools.handle_user_defined_test_cmd_execution"
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "app.py").write_text("print('hello')\n")
+    (tmp_path / "test_app.py").write_text("def test_app():\n    pass\n")
+    return tmp_path
+
+
+@pytest.fixture
+def cache(project):
+    return TestResultCache(project / ".ra-aid" / "test_results.json", root=str(project))
+
+
+def test_tree_hash_follows_file_contents(project, cache):
+    before = cache.tree_hash()
+    assert cache.tree_hash() == before
+
+    (project / "app.py").write_text("print('changed')\n")
+    changed = cache.tree_hash()
+    assert changed != before
+
+    (project / "app.py").write_text("print('hello')\n")
+    assert cache.tree_hash() == before
+
+    (project / "new.py").write_text("")
+    assert cache.tree_hash() != before
+
+
+def test_tree_hash_rehashes_only_changed_files(project, cache):
+    cache.tree_hash()
+    (project / "app.py").write_text("print('changed')\n")
+
+    reloaded = TestResultCache(cache.path, root=str(project))
+    with patch("ra_aid.test_result_cache.file_sha256", wraps=file_sha256) as sha256:
+        reloaded.tree_hash()
+    sha256.assert_called_once_with(str(project / "app.py"))
+
+
+def test_results_are_keyed_by_command_and_tree(project, cache):
+    tree_hash = cache.tree_hash()
+    cache.store("pytest", tree_hash, {"success": False, "return_code": 1, "output": "1 failed"})
+
+    reloaded = TestResultCache(cache.path, root=str(project))
+    cached = reloaded.lookup("pytest", tree_hash)
+    assert (cached["success"], cached["return_code"], cached["output"]) == (False, 1, "1 failed")
+    assert reloaded.lookup("pytest -x", tree_hash) is None
+    assert reloaded.lookup("pytest", "0" * 64) is None
+
+
+def test_results_are_bounded(cache):
+    for index in range(MAX_RESULTS + 3):
+        cache.store(f"cmd {index}", "tree", {"success": True, "output": ""})
+    assert cache.lookup("cmd 0", "tree") is None
+    assert cache.lookup(f"cmd {MAX_RESULTS + 2}", "tree") is not None
+
+
+@pytest.fixture
+def executor(cache):
+    config = {"test_cmd": "pytest", "test_result_cache": True, "max_test_cmd_retries": 3}
+    with patch(f"{MODULE}.get_test_result_cache", return_value=cache):
+        yield TestCommandExecutor(config, "original", auto_test=True)
+
+
+def test_unchanged_tree_reuses_pass_and_records_skip(project, executor):
+    trajectory_repo = MagicMock()
+    with (
+        patch(f"{MODULE}.run_shell_command") as mock_run,
+        patch(f"{MODULE}.get_trajectory_repository", return_value=trajectory_repo),
+        patch(f"{MODULE}.get_human_input_repository"),
+    ):
+        mock_run.invoke.return_value = {"success": True, "return_code": 0, "output": "1 passed"}
+        executor.run_shell("pytest", 60)
+        result = executor.run_shell("pytest", 60)
+
+        mock_run.invoke.assert_called_once()
+        assert result["output"] == "1 passed"
+        kwargs = trajectory_repo.create.call_args.kwargs
+        assert kwargs["record_type"] == "test_result_cache_hit"
+        assert kwargs["step_data"]["success"] is True
+
+        (project / "app.py").write_text("print('changed')\n")
+        executor.run_shell("pytest", 60)
+
+    assert mock_run.invoke.call_count == 2
+
+
+def test_unchanged_tree_replays_failure(executor):
+    with patch(f"{MODULE}.run_shell_command") as mock_run:
+        mock_run.invoke.return_value = {"success": False, "return_code": 1, "output": "1 failed"}
+        executor.run_test_command("pytest", "original")
+        executor.run_test_command("pytest", "original")
+
+    mock_run.invoke.assert_called_once()
+    assert executor.state.test_attempts == 2
+    assert "1 failed" in executor.state.prompt
+
+
+def test_runs_that_change_files_are_not_cached(project, executor):
+    def edit_during_run(_):
+        (project / "generated.py").write_text("")
+        return {"success": True, "return_code": 0, "output": ""}
+
+    with patch(f"{MODULE}.run_shell_command") as mock_run:
+        mock_run.invoke.side_effect = edit_during_run
+        executor.run_shell("pytest", 60)
+        executor.run_shell("pytest", 60)
+
+    assert mock_run.invoke.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        {
+            "success": False,
+            "return_code": -9,
+            "output": "[Process exceeded timeout (60 seconds expected)]",
+            "timed_out": True,
+        },
+        {"success": False, "return_code": 1, "output": "No such file", "error": True},
+        {"success": False, "return_code": 1, "output": "cancelled", "cancelled": True},
+    ],
+    ids=["timed_out", "error", "cancelled"],
+)
+def test_unfinished_runs_are_not_replayed(executor, result):
+    with patch(f"{MODULE}.run_shell_command") as mock_run:
+        mock_run.invoke.return_value = result
+        executor.run_test_command("pytest", "original")
+        executor.run_test_command("pytest", "original")
+
+    assert mock_run.invoke.call_count == 2
+    assert executor.state.test_attempts == 2
+
+
+def test_cache_is_off_unless_configured(cache):
+    with patch(f"{MODULE}.get_test_result_cache", return_value=cache):
+        executor = TestCommandExecutor({"test_cmd": "pytest"}, "original")
+    with patch(f"{MODULE}.run_shell_command") as mock_run:
+        mock_run.invoke.return_value = {"success": True, "return_code": 0, "output": ""}
+        executor.run_shell("pytest", 60)
+        executor.run_shell("pytest", 60)
+    assert mock_run.invoke.call_count == 2
@@ -119,4 +119,31 @@ def test_missing_version_key(monkeypatch):
     result = check_for_newer_version()
     
     # Check that no message is returned
-    assert result == ""
\ No newline at end of file
+    assert result == ""
+def test_cached_version_is_reused(monkeypatch, tmp_path):
+    """Test that a cached result skips the request until it expires."""
+    monkeypatch.setattr('ra_aid.version_check.current_version', '0.15.2')
+    mock_response = Mock()
+    mock_response.json.return_value = {"version": "0.16.0"}
+    mock_get = Mock(return_value=mock_response)
+    monkeypatch.setattr('ra_aid.version_check.requests.get', mock_get)
+
+    assert "0.16.0" in check_for_newer_version(cache_dir=str(tmp_path))
+    assert "0.16.0" in check_for_newer_version(cache_dir=str(tmp_path))
+    assert mock_get.call_count == 1
+    assert (tmp_path / "version_check.json").exists()
+
+    # An expired cache entry triggers a new request
+    mock_response.json.return_value = {"version": "0.15.2"}
+    assert check_for_newer_version(cache_dir=str(tmp_path), max_age=0) == ""
+    assert mock_get.call_count == 2
+
+def test_failed_check_is_not_cached(monkeypatch, tmp_path):
+    """Test that errors are not written to the cache."""
+    def mock_get(*args, **kwargs):
+        raise requests.RequestException("Connection error")
+
+    monkeypatch.setattr('ra_aid.version_check.requests.get', mock_get)
+
+    assert check_for_newer_version(cache_dir=str(tmp_path)) == ""
+    assert not (tmp_path / "version_check.json").exists()
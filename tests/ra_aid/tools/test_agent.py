@@ -304,4 +304,14 @@ def test_request_task_implementation_uses_key_fact_repository(reset_memory, mock
         )
         
         # Check that the formatted key facts are included in the response
-        assert "Formatted facts" in result
\ No newline at end of file
+        assert "Formatted facts" in result
+
+def test_request_task_implementation_returns_to_planning_stage(reset_memory, mock_functions):
+    """Test that the planning stage resumes in the trajectory once a task is implemented."""
+    with patch('ra_aid.agents.implementation_agent.run_task_implementation_agent'):
+        request_task_implementation("test task")
+
+    trajectory_repo = mock_functions['get_trajectory_repository'].return_value
+    last_record = trajectory_repo.create.call_args.kwargs
+    assert last_record["record_type"] == "stage_transition"
+    assert last_record["step_data"]["stage"] == "planning_stage"
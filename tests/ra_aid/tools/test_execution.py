@@ -180,9 +180,9 @@ def test_execute_test_command(
             mock_ask_human.invoke.return_value = mock_responses["ask_human_response"]
 
         if "shell_cmd_result_error" in mock_responses:
-            mock_run_cmd.side_effect = mock_responses["shell_cmd_result_error"]
+            mock_run_cmd.invoke.side_effect = mock_responses["shell_cmd_result_error"]
         elif "shell_cmd_result" in mock_responses:
-            mock_run_cmd.return_value = mock_responses["shell_cmd_result"]
+            mock_run_cmd.invoke.return_value = mock_responses["shell_cmd_result"]
 
         # Execute test command
         result = execute_test_command(config, original_prompt, test_attempts, auto_test)
@@ -197,9 +197,11 @@ def test_execute_test_command(
         if auto_test and test_attempts < config.get("max_test_cmd_retries", 5):
             if config.get("test_cmd"):
                 # Verify run_shell_command called with command and configured timeout
-                mock_run_cmd.assert_called_once_with(
-                    config["test_cmd"],
-                    timeout=config.get("test_cmd_timeout", DEFAULT_TEST_CMD_TIMEOUT),
+                mock_run_cmd.invoke.assert_called_once_with(
+                    {
+                        "command": config["test_cmd"],
+                        "timeout": config.get("test_cmd_timeout", DEFAULT_TEST_CMD_TIMEOUT),
+                    }
                 )
 
         # Verify logging for max retries
@@ -220,7 +222,7 @@ def test_execute_test_command_error_handling() -> None:
         ) as mock_logger,
     ):
         # Simulate run_shell_command raising an exception
-        mock_run_cmd.side_effect = Exception("Command failed")
+        mock_run_cmd.invoke.side_effect = Exception("Command failed")
 
         result = execute_test_command(config, "original prompt", 0, True)
 
@@ -54,7 +54,7 @@ def test_run_test_command_success(test_executor):
     with patch(
         "ra_aid.tools.handle_user_defined_test_cmd_execution.run_shell_command"
     ) as mock_run:
-        mock_run.return_value = {"success": True, "output": ""}
+        mock_run.invoke.return_value = {"success": True, "output": ""}
         test_executor.run_test_command("test", "original")
         assert test_executor.state.should_break
         assert test_executor.state.test_attempts == 1
@@ -65,7 +65,7 @@ def test_run_test_command_failure(test_executor):
     with patch(
         "ra_aid.tools.handle_user_defined_test_cmd_execution.run_shell_command"
     ) as mock_run:
-        mock_run.return_value = {"success": False, "output": "error"}
+        mock_run.invoke.return_value = {"success": False, "output": "error"}
         test_executor.run_test_command("test", "original")
         assert not test_executor.state.should_break
         assert test_executor.state.test_attempts == 1
@@ -77,7 +77,7 @@ def test_run_test_command_error(test_executor):
     with patch(
         "ra_aid.tools.handle_user_defined_test_cmd_execution.run_shell_command"
     ) as mock_run:
-        mock_run.side_effect = Exception("Generic error")
+        mock_run.invoke.side_effect = Exception("Generic error")
         test_executor.run_test_command("test", "original")
         assert test_executor.state.should_break
         assert test_executor.state.test_attempts == 1
@@ -96,7 +96,7 @@ def test_run_test_command_timeout(test_executor):
         # Create a TimeoutExpired exception with configured timeout
         timeout = test_executor.config.get("test_cmd_timeout", DEFAULT_TEST_CMD_TIMEOUT)
         timeout_exc = subprocess.TimeoutExpired(cmd="test", timeout=timeout)
-        mock_run.side_effect = timeout_exc
+        mock_run.invoke.side_effect = timeout_exc
 
         test_executor.run_test_command("test", "original")
 
@@ -123,7 +123,7 @@ def test_run_test_command_called_process_error(test_executor):
         process_error = subprocess.CalledProcessError(
             returncode=1, cmd="test", output="Command failed output"
         )
-        mock_run.side_effect = process_error
+        mock_run.invoke.side_effect = process_error
 
         test_executor.run_test_command("test", "original")
 
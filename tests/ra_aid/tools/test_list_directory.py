@@ -1,3 +1,5 @@
+import os
+import subprocess
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -132,3 +134,74 @@ def test_invalid_path():
     assert "Error: Path does not exist: /nonexistent/path" in result
     
     # We now allow files to be passed to list_directory_tree, so we don't test for this case anymore
+
+
+def test_nested_gitignore(temp_dir):
+    """Nested .gitignore files apply relative to their own directory"""
+    (temp_dir / ".gitignore").write_text("*.log\n")
+    pkg = temp_dir / "pkg"
+    (pkg / "generated").mkdir(parents=True)
+    (pkg / ".gitignore").write_text("generated/\n/local.txt\n")
+    (pkg / "generated" / "out.py").write_text("x")
+    (pkg / "local.txt").write_text("x")
+    (pkg / "keep.py").write_text("x")
+    (pkg / "debug.log").write_text("x")
+    (temp_dir / "local.txt").write_text("x")
+
+    result = list_directory_tree.invoke({"path": str(temp_dir), "max_depth": 3})
+
+    assert "keep.py" in result
+    assert "generated" not in result
+    assert "debug.log" not in result
+    # Anchored to pkg/, so the root local.txt stays visible
+    assert result.count("local.txt") == 1
+
+
+def test_entry_caps_summarize_the_rest(temp_dir):
+    """Entries beyond the caps are summarized instead of listed"""
+    for index in range(30):
+        (temp_dir / f"file_{index:02d}.txt").write_text("x")
+
+    result = list_directory_tree.invoke({"path": str(temp_dir), "max_entries_per_dir": 10})
+    assert "file_09.txt" in result
+    assert "file_10.txt" not in result
+    assert "20 more entries (0 directories, 20 files)" in result
+
+    result = list_directory_tree.invoke({"path": str(temp_dir), "max_total_entries": 5})
+    assert "file_04.txt" in result
+    assert "file_05.txt" not in result
+    assert "listing stopped after 5 entries; 25 more not shown" in result
+
+
+def test_use_file_index_lists_git_files(temp_dir):
+    """With the file index, only files git reports are listed"""
+    subprocess.run(["git", "init", "-q"], cwd=temp_dir, check=True)
+    (temp_dir / ".gitignore").write_text("ignored/\n")
+    (temp_dir / "ignored").mkdir()
+    (temp_dir / "ignored" / "secret.py").write_text("x")
+    (temp_dir / "src").mkdir()
+    (temp_dir / "src" / "app.py").write_text("x")
+    (temp_dir / "empty").mkdir()
+
+    result = list_directory_tree.invoke(
+        {"path": str(temp_dir), "max_depth": 2, "use_file_index": True}
+    )
+
+    assert "app.py" in result
+    assert "ignored" not in result
+    # Git does not report empty directories
+    assert "empty" not in result
+
+
+def test_followed_symlink_loop_is_not_descended(temp_dir):
+    """A followed symlink to an ancestor is listed but not scanned again"""
+    (temp_dir / "sub").mkdir()
+    (temp_dir / "sub" / "file.txt").write_text("x")
+    os.symlink(temp_dir, temp_dir / "sub" / "loop")
+
+    result = list_directory_tree.invoke(
+        {"path": str(temp_dir), "max_depth": 10, "follow_links": True}
+    )
+
+    assert "loop/" in result
+    assert result.count("file.txt") == 1
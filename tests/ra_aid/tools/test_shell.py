@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from ra_aid.database.repositories.config_repository import ConfigRepositoryManager
+from ra_aid.proc.interactive import CommandOutput
 from ra_aid.tools.shell import run_shell_command
 
 
@@ -157,6 +158,7 @@ def test_shell_command_interactive_rejected(
     assert result["success"] is False
     assert result["return_code"] == 1
     assert "cancelled by user" in result["output"]
+    assert result["cancelled"] is True
     mock_prompt.ask.assert_called_once_with(
         "Execute this command? (y=yes, n=no, c=enable cowboy mode for session)",
         choices=["y", "n", "c"],
@@ -177,4 +179,16 @@ def test_shell_command_execution_error(mock_console, mock_prompt, mock_run_inter
 
     assert result["success"] is False
     assert result["return_code"] == 1
-    assert "Command failed" in result["output"]
\ No newline at end of file
+    assert "Command failed" in result["output"]
+    assert result["error"] is True
+
+
+def test_shell_command_timeout(mock_console, mock_prompt, mock_run_interactive, mock_config_repository):
+    """Test that a command stopped for exceeding its timeout is flagged"""
+    mock_config_repository.set("cowboy_mode", True)
+    mock_run_interactive.return_value = CommandOutput(b"partial", -9, timed_out=True)
+
+    result = run_shell_command.invoke({"command": "sleep 100", "timeout": 1})
+
+    assert result["success"] is False
+    assert result["timed_out"] is True
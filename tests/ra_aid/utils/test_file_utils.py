@@ -4,7 +4,7 @@ import os
 import pytest
 from unittest.mock import patch, MagicMock
 
-from ra_aid.utils.file_utils import is_binary_file, _is_binary_fallback, _is_binary_content
+from ra_aid.utils.file_utils import atomic_write, is_binary_file, _is_binary_fallback, _is_binary_content
 
 
 def test_c_source_file_detection():
@@ -212,4 +212,19 @@ def test_comprehensive_binary_detection():
             assert result == expected_binary, f"Failed for extension {ext} with content: {content[:20]}..."
         finally:
             # Clean up the temporary file
-            os.unlink(tmp_path)
\ No newline at end of file
+            os.unlink(tmp_path)
+
+def test_atomic_write_replaces_file_and_cleans_up(tmp_path):
+    """atomic_write creates parents, replaces content and leaves no temp files."""
+    path = tmp_path / "nested" / "data.json"
+    atomic_write(path, "first")
+    atomic_write(path, b"second")
+    assert path.read_bytes() == b"second"
+    assert os.listdir(path.parent) == ["data.json"]
+
+    # A failed write keeps the old content and removes its temporary file
+    with patch("ra_aid.utils.file_utils.os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            atomic_write(path, "third")
+    assert path.read_bytes() == b"second"
+    assert os.listdir(path.parent) == ["data.json"]
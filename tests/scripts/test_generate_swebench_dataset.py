@@ -0,0 +1,136 @@
+import json
+import subprocess
+
+import pytest
+
+from ra_aid.scripts.generate_swebench_dataset import (
+    MirrorCache,
+    PredictionCheckpoint,
+    VenvCache,
+    load_local_dataset,
+    python_version_for,
+    run_worker_pool,
+    venv_key,
+    write_predictions,
+)
+
+
+def git(*args, cwd):
+    return subprocess.run(
+        ["git", "-c", "user.email=test@example.com", "-c", "user.name=test", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def mirrors_dir(tmp_path):
+    """A local bare mirror of a two-commit repo, as <owner>__<name>.git."""
+    source = tmp_path / "source"
+    source.mkdir()
+    git("init", "-q", cwd=source)
+    (source / "app.py").write_text("VALUE = 1\n")
+    git("add", ".", cwd=source)
+    git("commit", "-q", "-m", "first", cwd=source)
+    (source / "app.py").write_text("VALUE = 2\n")
+    git("commit", "-q", "-am", "second", cwd=source)
+
+    mirrors = tmp_path / "mirrors"
+    git("clone", "-q", "--mirror", str(source), str(mirrors / "org__app.git"), cwd=tmp_path)
+    return mirrors
+
+
+def commits(mirrors_dir):
+    return git("rev-list", "--reverse", "HEAD", cwd=mirrors_dir / "org__app.git").split()
+
+
+def test_load_local_dataset(tmp_path):
+    jsonl = tmp_path / "instances.jsonl"
+    jsonl.write_text('{"instance_id": "a"}\n\n{"instance_id": "b"}\n')
+    splits = tmp_path / "instances.json"
+    splits.write_text(json.dumps({"dev": [{"instance_id": "a"}], "test": [{"instance_id": "b"}]}))
+
+    assert [i["instance_id"] for i in load_local_dataset(jsonl)] == ["a", "b"]
+    assert [i["instance_id"] for i in load_local_dataset(splits)] == ["a", "b"]
+
+
+def test_checkpoint_resumes_and_drops_partial_record(tmp_path):
+    path = tmp_path / "predictions.jsonl"
+    checkpoint = PredictionCheckpoint(path)
+    checkpoint.record({"instance_id": "a", "model_patch": "", "model_name_or_path": "ra-aid"})
+    with open(path, "a") as f:
+        f.write('{"instance_id": "b", "model_pa')
+
+    resumed = PredictionCheckpoint(path)
+    assert resumed.done("a")
+    assert not resumed.done("b")
+    resumed.record({"instance_id": "b", "model_patch": "x", "model_name_or_path": "ra-aid"})
+    assert PredictionCheckpoint(path).predictions["b"]["model_patch"] == "x"
+
+
+def test_worktrees_from_mirror(tmp_path, mirrors_dir):
+    first, second = commits(mirrors_dir)
+    mirrors = MirrorCache(mirrors_dir, offline=True)
+
+    one = mirrors.add_worktree("org/app", first, tmp_path / "worktrees" / "one")
+    two = mirrors.add_worktree("org/app", second, tmp_path / "worktrees" / "two")
+    assert (one / "app.py").read_text() == "VALUE = 1\n"
+    assert (two / "app.py").read_text() == "VALUE = 2\n"
+
+    mirrors.remove_worktree("org/app", one)
+    assert not one.exists()
+    assert two.exists()
+
+
+def test_offline_mirror_cache_never_clones(tmp_path, mirrors_dir):
+    mirrors = MirrorCache(mirrors_dir, offline=True)
+
+    with pytest.raises(RuntimeError, match="No local mirror"):
+        mirrors.add_worktree("org/missing", "0" * 40, tmp_path / "worktree")
+    with pytest.raises(RuntimeError, match="does not have commit"):
+        mirrors.add_worktree("org/app", "0" * 40, tmp_path / "worktree")
+
+
+def test_worker_pool_uses_cached_venv_and_checkpoints(tmp_path, mirrors_dir):
+    first, second = commits(mirrors_dir)
+    mirrors = MirrorCache(mirrors_dir, offline=True)
+    venvs = VenvCache(tmp_path / "venvs", mirrors, offline=True)
+
+    # A ready cached venv whose ra-aid edits the checkout
+    venv = tmp_path / "venvs" / venv_key("org/app", first, python_version_for("org/app"))
+    (venv / "bin").mkdir(parents=True)
+    (venv / VenvCache.READY_FILE).touch()
+    ra_aid = venv / "bin" / "ra-aid"
+    ra_aid.write_text('#!/bin/sh\necho "FIXED = True" >> app.py\n')
+    ra_aid.chmod(0o755)
+
+    instances = [
+        {
+            "instance_id": f"org__app-{index}",
+            "repo": "org/app",
+            "base_commit": commit,
+            "environment_setup_commit": first,
+            "problem_statement": "Fix the app",
+            "FAIL_TO_PASS": ["test_app"],
+        }
+        for index, commit in enumerate((first, second))
+    ]
+    instances.append(dict(instances[0], instance_id="org__missing-0", repo="org/missing"))
+
+    checkpoint = PredictionCheckpoint(tmp_path / "predictions.jsonl")
+    run_worker_pool(
+        instances, checkpoint, 2, mirrors, venvs, tmp_path / "worktrees", tmp_path / "logs"
+    )
+
+    # Failed instances are not checkpointed, so a resumed run retries them
+    assert set(checkpoint.predictions) == {"org__app-0", "org__app-1"}
+    assert "+FIXED = True" in checkpoint.predictions["org__app-1"]["model_patch"]
+    assert not (tmp_path / "worktrees" / "org__app-0").exists()
+
+    predictions_file = tmp_path / "predictions.json"
+    write_predictions(predictions_file, instances, PredictionCheckpoint(tmp_path / "predictions.jsonl"))
+    predictions = json.loads(predictions_file.read_text())
+    assert [p["instance_id"] for p in predictions] == [i["instance_id"] for i in instances]
+    assert predictions[2]["model_patch"] == ""